@@ -0,0 +1,192 @@
+"""Compares the per-stage runtime of the QoD pipeline with the legacy and the current input dtype policy.
+
+The legacy policy keeps the weather columns as nullable Float64 and utc_datetime as a string, while the current
+policy (SchemaDefinitions.qod_input_schema()) uses float64 with nan and datetime64[ns] timestamps.
+
+Usage:
+    PYTHONPATH=src python benchmarks/dtype_policy_benchmark.py --model WS1000 --parameter wind_speed --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import warnings
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from obc_sqc.model.annotation_utils import AnnotationUtils
+from obc_sqc.model.filling_ignoring_period import FillingIgnoringPeriod
+from obc_sqc.model.hour_averaging import HourAveraging
+from obc_sqc.model.initial_params import InitialParams
+from obc_sqc.model.minute_averaging import MinuteAveraging
+from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from obc_sqc.model.raw_data_check import RawDataCheck
+from obc_sqc.schema.schema import SchemaDefinitions
+
+LEGACY_INPUT_SCHEMA: dict = {
+    **{column: "Float64" for column in SchemaDefinitions.weather_data_columns()},
+    "model": str,
+    "utc_datetime": str,
+}
+
+
+def synthetic_input(model: str, date: str = "2023-10-30", seed: int = 0) -> pd.DataFrame:
+    """Creates 30 hours (the 6-hour lookback and a day) of raw data with ~5% of missing rows.
+
+    Args:
+    ----
+        model (str): the weather station model, e.g. WS1000 or WS2000
+        date (str): the day under test, formatted as %Y-%m-%d
+        seed (int): the seed of the random generator
+
+    Returns:
+    -------
+        pd.DataFrame: the raw data, following the legacy input dtypes
+    """
+    rng: np.random.Generator = np.random.default_rng(seed)
+    data_timestep: int = InitialParams.picking_initial_parameters(model)[5]
+
+    start: pd.Timestamp = pd.Timestamp(date) - pd.Timedelta(hours=6)
+    end: pd.Timestamp = pd.Timestamp(date) + pd.Timedelta(hours=23, minutes=59, seconds=59)
+    timestamps: pd.DatetimeIndex = pd.date_range(start, end, freq=f"{data_timestep}s")
+    n_rows: int = len(timestamps)
+    hour: np.ndarray = (timestamps.hour + timestamps.minute / 60).to_numpy()
+
+    df: pd.DataFrame = pd.DataFrame({
+        "utc_datetime": timestamps.strftime("%Y-%m-%d %H:%M:%S"),
+        "temperature": np.round(10 + 5 * np.sin((hour - 9) / 24 * 2 * np.pi) + rng.normal(0, 0.1, n_rows), 1),
+        "humidity": np.round(np.clip(70 - 15 * np.sin((hour - 9) / 24 * 2 * np.pi) + rng.normal(0, 1, n_rows), 10, 99)),
+        "wind_speed": np.round(np.abs(rng.normal(3, 1, n_rows)), 1),
+        "wind_direction": np.round(rng.uniform(0, 359, n_rows)),
+        "pressure": np.round(1013 + rng.normal(0, 0.2, n_rows), 1),
+        "illuminance": np.round(np.clip(50000 * np.sin((hour - 6) / 12 * np.pi), 0, None)),
+        "precipitation_accumulated": np.round(np.cumsum(rng.random(n_rows) < 0.01) * 0.254, 3),  # noqa: PLR2004
+        "model": model,
+    })
+    df.loc[rng.random(n_rows) < 0.05, SchemaDefinitions.weather_data_columns()] = np.nan  # noqa: PLR2004
+
+    return df.astype(LEGACY_INPUT_SCHEMA)
+
+
+def stage_chain(df: pd.DataFrame, parameter: str) -> list[tuple[str, Callable[[], None]]]:
+    """Builds the stages of a single parameter, in the order ObcSqcCheck.run executes them.
+
+    Each stage consumes the output of the previous one, so the stages must be called in order.
+
+    Args:
+    ----
+        df (pd.DataFrame): the raw data of a device
+        parameter (str): the parameter under test, e.g. temperature or wind_speed
+
+    Returns:
+    -------
+        list[tuple[str, Callable[[], None]]]: the name and the callable of every stage
+    """
+    params: tuple = InitialParams.picking_initial_parameters(df["model"].iloc[0])
+    i: int = params[11].index(parameter)
+    state: dict[str, pd.DataFrame] = {"df": df.copy()}
+
+    def obc() -> None:
+        state["df"] = ObcSqcCheck.obc(state["df"], parameter, params[19][0][i], params[19][1][i])
+
+    def filling() -> None:
+        state["df"] = FillingIgnoringPeriod.filling_ignoring_period(state["df"], parameter, params[8], params[5])
+        # the constant checks are not part of the benchmark, so their annotations are cleared
+        state["df"][["ann_constant", "ann_constant_long", "ann_constant_frozen"]] = 0
+
+    def raw_check() -> None:
+        state["df"] = RawDataCheck.raw_data_suspicious_check(
+            state["df"], parameter, params[15][i], params[5], params[7], params[12][i], params[0], params[1], params[2]
+        )
+        state["df"] = AnnotationUtils.text_annotation(state["df"])
+
+    def minute_averaging() -> None:
+        state["df"], state["minute_averaging"] = MinuteAveraging.minute_averaging(
+            state["df"],
+            parameter,
+            params[17][i],
+            params[13][i],
+            params[12][i],
+            params[7],
+            params[16][i],
+            params[2],
+            params[0],
+            params[23],
+            params[24],
+        )
+
+    def hour_averaging() -> None:
+        HourAveraging.hour_averaging(state["minute_averaging"], params[9], params[14][i], parameter)
+
+    return [
+        ("obc", obc),
+        ("filling_ignoring_period", filling),
+        ("raw_data_suspicious_check", raw_check),
+        ("minute_averaging", minute_averaging),
+        ("hour_averaging", hour_averaging),
+    ]
+
+
+def time_stages(df: pd.DataFrame, parameter: str, repeat: int) -> dict[str, float]:
+    """Runs the stage chain several times and keeps the fastest time of every stage.
+
+    Args:
+    ----
+        df (pd.DataFrame): the raw data of a device
+        parameter (str): the parameter under test
+        repeat (int): the number of runs
+
+    Returns:
+    -------
+        dict[str, float]: the best time of every stage [in seconds]
+    """
+    best: dict[str, float] = {}
+    for _ in range(repeat):
+        for name, stage in stage_chain(df, parameter):
+            start: float = time.perf_counter()
+            stage()
+            elapsed: float = time.perf_counter() - start
+            best[name] = min(best.get(name, elapsed), elapsed)
+
+    return best
+
+
+def main() -> None:
+    """Prints the per-stage timings of both dtype policies and the resulting speedup."""
+    parser = argparse.ArgumentParser(description="OBC SQC dtype policy benchmark")
+
+    parser.add_argument("--model", choices=["WS1000", "WS2000"], default="WS1000")
+    parser.add_argument("--parameter", default="wind_speed")
+    parser.add_argument("--repeat", type=int, default=3)
+
+    (k_args, unknown_args) = parser.parse_known_args(sys.argv[1:])
+
+    args = vars(k_args)
+
+    warnings.filterwarnings("ignore")
+
+    legacy_df: pd.DataFrame = synthetic_input(args["model"])
+
+    start: float = time.perf_counter()
+    current_df: pd.DataFrame = ObcSqcCheck.prepare_input(legacy_df)
+    prepare_time: float = time.perf_counter() - start
+
+    legacy: dict[str, float] = time_stages(legacy_df, args["parameter"], args["repeat"])
+    current: dict[str, float] = time_stages(current_df, args["parameter"], args["repeat"])
+
+    print(f"{args['model']} {args['parameter']}, {len(legacy_df)} rows, prepare_input took {prepare_time:.4f}s")
+    print(f"{'stage':<28}{'Float64/str [s]':>18}{'float64/datetime [s]':>24}{'speedup':>10}")
+    for name in legacy:
+        print(f"{name:<28}{legacy[name]:>18.4f}{current[name]:>24.4f}{legacy[name] / current[name]:>9.2f}x")
+
+    legacy_total: float = sum(legacy.values())
+    current_total: float = sum(current.values()) + prepare_time
+    print(f"{'total':<28}{legacy_total:>18.4f}{current_total:>24.4f}{legacy_total / current_total:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Measures the throughput of scoring a whole fleet day, and how it scales with the number of scoring processes.
+
+A day of an N-device fleet (mixed WS1000/WS2000 with gaps and outages, from the synthetic generator or from day
+parquets) is scored through BatchScoring, the path of file_model_inference, once per worker count. Every run
+reports devices/sec (and /hour), the p50/p95/p99 latency of a device, the peak RSS of the parent and of a worker,
+and the parallel efficiency against a single worker. The report is written as JSON, for sizing the Bacalhau jobs.
+
+Usage:
+    PYTHONPATH=src python benchmarks/fleet_benchmark.py --devices 64 --report fleet_benchmark.json
+    PYTHONPATH=src python benchmarks/fleet_benchmark.py --input_dir /datasets/synthetic --date 2023-12-14 --workers 8
+    PYTHONPATH=src python benchmarks/fleet_benchmark.py --devices 64 --workers 1 --batch_size 32
+    PYTHONPATH=src python benchmarks/fleet_benchmark.py --devices 64 --batch_size 32 --value_dtype float32
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import warnings
+from functools import partial
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from obc_sqc.iface.batch_scoring import BatchScoring, DeviceOutcome
+from obc_sqc.iface.file_model_inference import read_shard
+from obc_sqc.iface.sharding import Shard
+from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from obc_sqc.schema.schema import SchemaDefinitions
+from obc_sqc.synthetic.station_data_generator import FaultRates, StationDataGenerator
+
+
+def fleet_day(args: dict) -> pd.DataFrame:
+    """Generates or reads the raw data of a fleet for a date and the 6 hours before it.
+
+    Args:
+    ----
+        args (dict): the command line arguments
+
+    Returns:
+    -------
+        pd.DataFrame: the raw data of every device, with its device ID
+    """
+    date: pd.Timestamp = pd.Timestamp(args["date"])
+    day_before: pd.Timestamp = date - pd.Timedelta(days=1)
+
+    if args["input_dir"] is not None:
+        day_paths: list[str] = [
+            os.path.join(args["input_dir"], f"{day.strftime('%Y_%m_%d')}.parquet") for day in [day_before, date]
+        ]
+        fleet_df: pd.DataFrame = read_shard(day_paths[0], day_paths[1], "parquet", Shard(0, 1))
+        device_ids: list[str] = sorted(fleet_df["device_id"].unique())[: args["devices"]]
+        fleet_df = fleet_df[fleet_df["device_id"].isin(device_ids)]
+    else:
+        generator: StationDataGenerator = StationDataGenerator(
+            args["devices"],
+            ws2000_share=args["ws2000_share"],
+            faults=FaultRates(gap_rate=args["gap_rate"], outage_rate=args["outage_rate"]),
+            seed=args["seed"],
+        )
+        fleet_df = pd.concat([generator.generate_day(str(day.date())) for day in [day_before, date]])
+
+    input_schema: dict = {"device_id": str, **SchemaDefinitions.qod_storage_schema(args["value_dtype"])}
+    fleet_df = fleet_df[list(input_schema.keys())].astype(input_schema)
+    in_window: pd.Series = fleet_df["utc_datetime"].between(
+        date - pd.Timedelta(hours=6), date + pd.Timedelta(hours=23, minutes=59, seconds=59)
+    )
+
+    return fleet_df[in_window].reset_index(drop=True)
+
+
+def timed_score(score_fn: Callable[..., pd.DataFrame], df: pd.DataFrame, **kwargs: object) -> pd.DataFrame:
+    """Scores a device, attaching the time it took and the peak RSS of the process to the result.
+
+    Args:
+    ----
+        score_fn (Callable[..., pd.DataFrame]): the scoring function, e.g. ObcSqcCheck.run
+        df (pd.DataFrame): the raw data of a device
+        **kwargs (object): passed on to score_fn, e.g. the matrices of a batch
+
+    Returns:
+    -------
+        pd.DataFrame: the result of the device, with "latency" [in seconds] and "max_rss" [in bytes] in its attrs
+    """
+    start: float = time.perf_counter()
+    result_df: pd.DataFrame = score_fn(df, **kwargs)
+    result_df.attrs["latency"] = time.perf_counter() - start
+    result_df.attrs["max_rss"] = max_rss_bytes()
+
+    return result_df
+
+
+def max_rss_bytes() -> int:
+    """Returns the peak resident set size of this process.
+
+    Args:
+    ----
+        None
+
+    Returns:
+    -------
+        int: the peak RSS [in bytes]
+    """
+    max_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Reported in kilobytes on Linux and in bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def run(fleet_df: pd.DataFrame, workers: int, engine: str, batch_size: int) -> dict:
+    """Scores the fleet with a number of worker processes.
+
+    Args:
+    ----
+        fleet_df (pd.DataFrame): the raw data of every device, with its device ID
+        workers (int): the number of scoring processes, 1 scores in-process
+        engine (str): the engine of the checks, one of ObcSqcCheck.ENGINES
+        batch_size (int): the devices of the same model checked together, 1 to check each on its own
+
+    Returns:
+    -------
+        dict: the throughput, latency percentiles and peak RSS of the run
+    """
+    score_fn: Callable[[pd.DataFrame], pd.DataFrame] = partial(timed_score, partial(ObcSqcCheck.run, engine=engine))
+
+    start: float = time.perf_counter()
+    outcomes: list[DeviceOutcome] = BatchScoring.score_devices(fleet_df, score_fn, workers, batch_size)
+    wall: float = time.perf_counter() - start
+
+    scored: list[pd.DataFrame] = [outcome.result for outcome in outcomes if outcome.result is not None]
+    latencies: np.ndarray = np.array([result_df.attrs["latency"] for result_df in scored])
+    worker_rss: int = max((result_df.attrs["max_rss"] for result_df in scored), default=0)
+
+    return {
+        "workers": workers,
+        "devices": len(outcomes),
+        "failures": len(outcomes) - len(scored),
+        "wall_seconds": wall,
+        "devices_per_second": len(outcomes) / wall,
+        "devices_per_hour": 3600 * len(outcomes) / wall,
+        "latency_seconds": {
+            f"p{q}": float(np.percentile(latencies, q)) if latencies.size else None for q in (50, 95, 99)
+        },
+        "peak_rss_bytes": {
+            "parent": max_rss_bytes(),
+            "worker": worker_rss,
+            # The worker peaks are reached at different times, so this is an upper bound of the job's memory
+            "total_upper_bound": max_rss_bytes() + (workers * worker_rss if workers > 1 else 0),
+        },
+    }
+
+
+def main() -> None:
+    """Scores a fleet day with every worker count and writes the throughput report."""
+    parser = argparse.ArgumentParser(description="OBC SQC fleet throughput benchmark")
+
+    parser.add_argument(
+        "--devices", help="Devices of the fleet, or the first ones of --input_dir", type=int, default=32
+    )
+    parser.add_argument("--date", help="Date to score, formatted as %Y-%m-%d", default="2023-10-30")
+    parser.add_argument("--input_dir", help="Day parquets to read instead of generating the fleet", default=None)
+    parser.add_argument("--ws2000_share", help="Share of WS2000 devices of a generated fleet", type=float, default=0.5)
+    parser.add_argument("--gap_rate", help="Share of observations lost", type=float, default=0.02)
+    parser.add_argument("--outage_rate", help="Share of device-days with a 2-hour outage", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--workers", help="Worker counts to run, defaults to 1, 2, 4... up to the CPUs", type=int, action="append"
+    )
+    parser.add_argument("--engine", choices=ObcSqcCheck.ENGINES, default="pandas")
+    parser.add_argument(
+        "--batch_size", help="Devices of the same model checked together, with --engine pandas", type=int, default=1
+    )
+    parser.add_argument(
+        "--value_dtype",
+        help="dtype the weather values are held in",
+        choices=SchemaDefinitions.storage_dtypes(),
+        default="float64",
+    )
+    parser.add_argument("--report", help="Write the results to this JSON report", default=None)
+
+    (k_args, unknown_args) = parser.parse_known_args(sys.argv[1:])
+
+    args = vars(k_args)
+
+    warnings.filterwarnings("ignore")
+
+    cpus: int = os.cpu_count() or 1
+    worker_counts: list[int] = args["workers"] or sorted({
+        *[2**i for i in range(cpus.bit_length()) if 2**i <= cpus],
+        cpus,
+    })
+
+    fleet_df: pd.DataFrame = fleet_day(args)
+    models: dict[str, int] = fleet_df.groupby("device_id")["model"].first().value_counts().to_dict()
+
+    results: list[dict] = []
+    print(f"{'workers':>8}{'devices/s':>12}{'p50 [s]':>10}{'p95 [s]':>10}{'p99 [s]':>10}{'RSS [MiB]':>12}{'eff.':>7}")
+    for workers in worker_counts:
+        result: dict = run(fleet_df, workers, args["engine"], args["batch_size"])
+
+        # Against a single worker when it was run, otherwise against the smallest worker count
+        base: dict = results[0] if results else result
+        result["parallel_efficiency"] = (
+            result["devices_per_second"] * base["workers"] / (base["devices_per_second"] * workers)
+        )
+        results.append(result)
+
+        latency: dict = result["latency_seconds"]
+        print(
+            f"{workers:>8}{result['devices_per_second']:>12.3f}{latency['p50'] or 0:>10.3f}{latency['p95'] or 0:>10.3f}"
+            f"{latency['p99'] or 0:>10.3f}{result['peak_rss_bytes']['total_upper_bound'] / 2**20:>12.0f}"
+            f"{result['parallel_efficiency']:>7.2f}"
+        )
+
+    if args["report"]:
+        with open(args["report"], "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                    "machine": platform.platform(),
+                    "cpus": cpus,
+                    "python": platform.python_version(),
+                    "pandas": pd.__version__,
+                    "numpy": np.__version__,
+                    "engine": args["engine"],
+                    "batch_size": args["batch_size"],
+                    "value_dtype": args["value_dtype"],
+                    "date": args["date"],
+                    "input": args["input_dir"] or "synthetic",
+                    "models": models,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
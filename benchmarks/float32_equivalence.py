@@ -0,0 +1,220 @@
+"""Checks that holding the raw weather values as float32 leaves the scores and annotations unchanged.
+
+Every device is scored twice through BatchScoring: once with its weather values held as float64 and once as float32
+(SchemaDefinitions.qod_storage_schema(), the --value_dtype of file_model_inference). The inputs are the raw device
+days of the test fixtures and a synthetic fleet (mixed WS1000/WS2000 with gaps and outages). Every device-hour whose
+{parameter}_score (the valid percentage of the hour), hourly/qod score or annotations differ is listed in the report,
+along with the memory the weather values of every input take in both dtypes.
+
+Usage:
+    PYTHONPATH=src python benchmarks/float32_equivalence.py --devices 32 --report float32_equivalence.json
+    PYTHONPATH=src python benchmarks/float32_equivalence.py --devices 64 --batch_size 16 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import glob
+import json
+import os
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from obc_sqc.iface.batch_scoring import BatchScoring
+from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from obc_sqc.schema.schema import SchemaDefinitions
+from obc_sqc.synthetic.station_data_generator import FaultRates, StationDataGenerator
+
+FIXTURES_DIR: str = os.path.join(os.path.dirname(__file__), "..", "tests", "obc_sqc", "fixtures_data")
+
+
+def fixture_days() -> pd.DataFrame:
+    """Collects the distinct raw device days the stage fixtures were made from.
+
+    Args:
+    ----
+        None
+
+    Returns:
+    -------
+        pd.DataFrame: the raw data of every fixture day, with a device ID made of its model and first timestamp
+    """
+    input_columns: list[str] = list(SchemaDefinitions.qod_input_schema().keys())
+    days: dict[str, pd.DataFrame] = {}
+
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*", "input", "*.parquet"))):
+        day_df: pd.DataFrame = pd.read_parquet(path)
+        if not set(input_columns) <= set(day_df.columns):
+            continue
+        day_df = day_df[input_columns]
+        device_id: str = f"fixture-{day_df['model'].iloc[0]}-{pd.Timestamp(day_df['utc_datetime'].iloc[0]):%Y%m%d}"
+        days.setdefault(device_id, day_df.assign(device_id=device_id))
+
+    return pd.concat(days.values(), ignore_index=True)
+
+
+def synthetic_day(args: dict) -> pd.DataFrame:
+    """Generates the raw data of a fleet for a date and the 6 hours before it.
+
+    Args:
+    ----
+        args (dict): the command line arguments
+
+    Returns:
+    -------
+        pd.DataFrame: the raw data of every device, with its device ID
+    """
+    date: pd.Timestamp = pd.Timestamp(args["date"])
+    generator: StationDataGenerator = StationDataGenerator(
+        args["devices"],
+        ws2000_share=args["ws2000_share"],
+        faults=FaultRates(gap_rate=args["gap_rate"], outage_rate=args["outage_rate"]),
+        seed=args["seed"],
+    )
+    fleet_df: pd.DataFrame = pd.concat([
+        generator.generate_day(str(day.date())) for day in [date - pd.Timedelta(days=1), date]
+    ])
+    in_window: pd.Series = pd.to_datetime(fleet_df["utc_datetime"]).between(
+        date - pd.Timedelta(hours=6), date + pd.Timedelta(hours=23, minutes=59, seconds=59)
+    )
+
+    return fleet_df[in_window].reset_index(drop=True)
+
+
+def score(fleet_df: pd.DataFrame, value_dtype: str, workers: int, batch_size: int) -> pd.DataFrame:
+    """Scores a fleet with its weather values held in a dtype.
+
+    Args:
+    ----
+        fleet_df (pd.DataFrame): the raw data of every device, with its device ID
+        value_dtype (str): one of SchemaDefinitions.storage_dtypes()
+        workers (int): the number of scoring processes
+        batch_size (int): the devices of the same model checked together
+
+    Returns:
+    -------
+        pd.DataFrame: the results of every device, sorted by device and hour
+    """
+    storage_schema: dict = {"device_id": str, **SchemaDefinitions.qod_storage_schema(value_dtype)}
+    stored_df: pd.DataFrame = fleet_df[list(storage_schema.keys())].astype(storage_schema)
+    results_df: pd.DataFrame = BatchScoring.combine(
+        BatchScoring.score_devices(stored_df, ObcSqcCheck.run, workers, batch_size)
+    )
+
+    return results_df.sort_values(["device_id", "year", "month", "day", "hour"]).reset_index(drop=True)
+
+
+def changes(float64_df: pd.DataFrame, float32_df: pd.DataFrame) -> list[dict]:
+    """Lists the device-hours whose scores or annotations differ between the two dtypes.
+
+    Args:
+    ----
+        float64_df (pd.DataFrame): the results with float64 values
+        float32_df (pd.DataFrame): the results with float32 values
+
+    Returns:
+    -------
+        list[dict]: the device, hour, column and both values of every difference
+    """
+    compared: list[str] = [
+        column
+        for column in SchemaDefinitions.mlflow_obc_sqc_batch_schema()
+        if column.endswith(("_score", "annotation")) or column == "status"
+    ]
+    if len(float64_df) != len(float32_df) or not float64_df["device_id"].equals(float32_df["device_id"]):
+        raise ValueError("The two runs scored different device-hours")
+
+    found: list[dict] = []
+    for column in compared:
+        before: pd.Series = float64_df[column]
+        after: pd.Series = float32_df[column]
+        differs: np.ndarray = ((before != after) & ~(before.isna() & after.isna())).fillna(True).to_numpy()
+
+        found.extend(
+            {
+                "device_id": float64_df["device_id"].iloc[row],
+                "hour": f"{float64_df['year'].iloc[row]:04d}-{float64_df['month'].iloc[row]:02d}-"
+                f"{float64_df['day'].iloc[row]:02d} {float64_df['hour'].iloc[row]:02d}:00",
+                "column": column,
+                "float64": None if pd.isna(before.iloc[row]) else before.iloc[row],
+                "float32": None if pd.isna(after.iloc[row]) else after.iloc[row],
+            }
+            for row in np.flatnonzero(differs)
+        )
+
+    return found
+
+
+def main() -> None:
+    """Scores the fixture days and a synthetic fleet in both dtypes and writes the equivalence report."""
+    parser = argparse.ArgumentParser(description="OBC SQC float32 storage equivalence report")
+
+    parser.add_argument("--devices", help="Devices of the synthetic fleet", type=int, default=32)
+    parser.add_argument("--date", help="Date of the synthetic fleet, formatted as %Y-%m-%d", default="2023-10-30")
+    parser.add_argument("--ws2000_share", help="Share of WS2000 devices of the fleet", type=float, default=0.5)
+    parser.add_argument("--gap_rate", help="Share of observations lost", type=float, default=0.02)
+    parser.add_argument("--outage_rate", help="Share of device-days with a 2-hour outage", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", help="Processes scoring the devices", type=int, default=1)
+    parser.add_argument("--batch_size", help="Devices of the same model checked together", type=int, default=1)
+    parser.add_argument("--report", help="Write the results to this JSON report", default=None)
+
+    (k_args, unknown_args) = parser.parse_known_args(sys.argv[1:])
+
+    args = vars(k_args)
+
+    warnings.filterwarnings("ignore")
+
+    inputs: dict[str, pd.DataFrame] = {"fixtures": fixture_days(), "synthetic": synthetic_day(args)}
+    weather_columns: list[str] = SchemaDefinitions.weather_data_columns()
+
+    sources: list[dict] = []
+    print(f"{'input':>10}{'devices':>9}{'hours':>8}{'changed':>9}{'float64 [MiB]':>15}{'float32 [MiB]':>15}")
+    for name, fleet_df in inputs.items():
+        float64_df: pd.DataFrame = score(fleet_df, "float64", args["workers"], args["batch_size"])
+        float32_df: pd.DataFrame = score(fleet_df, "float32", args["workers"], args["batch_size"])
+        found: list[dict] = changes(float64_df, float32_df)
+
+        source: dict = {
+            "input": name,
+            "devices": int(float64_df["device_id"].nunique()),
+            "device_hours": len(float64_df),
+            "changed_device_hours": len({(change["device_id"], change["hour"]) for change in found}),
+            "weather_bytes": {
+                value_dtype: int(fleet_df[weather_columns].astype(value_dtype).memory_usage(index=False).sum())
+                for value_dtype in SchemaDefinitions.storage_dtypes()
+            },
+            "changes": found,
+        }
+        sources.append(source)
+
+        print(
+            f"{name:>10}{source['devices']:>9}{source['device_hours']:>8}{source['changed_device_hours']:>9}"
+            f"{source['weather_bytes']['float64'] / 2**20:>15.1f}{source['weather_bytes']['float32'] / 2**20:>15.1f}"
+        )
+        for change in found:
+            where: str = f"{change['device_id']} {change['hour']} {change['column']}"
+            print(f"  {where}: {change['float64']} -> {change['float32']}")
+
+    if args["report"]:
+        with open(args["report"], "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                    "qod_version": ObcSqcCheck.QOD_VERSION,
+                    "batch_size": args["batch_size"],
+                    "synthetic": {key: args[key] for key in ["devices", "date", "ws2000_share", "seed"]},
+                    "sources": sources,
+                },
+                f,
+                indent=2,
+                default=str,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Measures the import time of the QoD entry points with `python -X importtime` and checks it against a budget.
+
+Every module is imported in a fresh interpreter, several times, and the fastest cumulative time is reported along
+with the slowest third-party packages it pulls in. The run fails when a module exceeds its budget or imports one
+of the forbidden packages (see import_time_budget.json).
+
+Usage:
+    PYTHONPATH=src python benchmarks/import_time_report.py --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BUDGET_FILE: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_time_budget.json")
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Imports a module in a fresh interpreter and parses the report of -X importtime.
+
+    Args:
+    ----
+        module (str): the module to import
+
+    Returns:
+    -------
+        dict[str, int]: the cumulative import time of every imported module [in microseconds]
+    """
+    completed: subprocess.CompletedProcess = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times: dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (field.strip() for field in line.removeprefix("import time:").split("|"))
+        times[name] = int(cumulative)
+
+    return times
+
+
+def report(module: str, repeat: int) -> dict[str, int]:
+    """Keeps the fastest of several measurements of a module.
+
+    Args:
+    ----
+        module (str): the module to import
+        repeat (int): the number of measurements
+
+    Returns:
+    -------
+        dict[str, int]: the cumulative import time of every imported module, of the fastest measurement
+    """
+    runs: list[dict[str, int]] = [import_times(module) for _ in range(repeat)]
+    return min(runs, key=lambda times: times[module])
+
+
+def main() -> None:
+    """Prints the import time report and exits with 1 when the budget is exceeded."""
+    parser = argparse.ArgumentParser(description="OBC SQC import time report")
+
+    parser.add_argument("--budget", help="Budget file", default=BUDGET_FILE)
+    parser.add_argument("--repeat", help="Measurements per module", type=int, default=3)
+    parser.add_argument("--top", help="Number of top-level packages listed per module", type=int, default=5)
+
+    (k_args, unknown_args) = parser.parse_known_args(sys.argv[1:])
+
+    args = vars(k_args)
+
+    with open(args["budget"], encoding="utf-8") as f:
+        budget: dict = json.load(f)
+
+    violations: list[str] = []
+    print(f"{'module':<42}{'import [ms]':>14}{'budget [ms]':>14}")
+    for module, max_time in budget["modules"].items():
+        times: dict[str, int] = report(module, args["repeat"])
+        print(f"{module:<42}{times[module] / 1000:>14.1f}{max_time / 1000:>14.1f}")
+
+        top_level: dict[str, int] = {name: t for name, t in times.items() if "." not in name and name != module}
+        for name, t in sorted(top_level.items(), key=lambda item: -item[1])[: args["top"]]:
+            print(f"    {name:<38}{t / 1000:>14.1f}")
+
+        if times[module] > max_time:
+            violations.append(f"{module} took {times[module] / 1000:.1f}ms, budget is {max_time / 1000:.1f}ms")
+        forbidden: list[str] = [name for name in budget["forbidden"] if name in times]
+        if forbidden:
+            violations.append(f"{module} imports {forbidden}")
+
+    for violation in violations:
+        print(f"FAIL: {violation}")
+
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Times every stage of the QoD pipeline separately, on synthetic 30-hour days of WS1000 (16s) and WS2000 (180s).
+
+The stages are run in the order ObcSqcCheck.run executes them, per parameter, so every stage gets the same input
+it gets in production. Each stage keeps the fastest of --repeat runs. Results can be saved as a JSON baseline and
+later runs compared against it, flagging every stage that got slower than --threshold times its baseline.
+
+Usage:
+    PYTHONPATH=src python benchmarks/stage_benchmark.py --save benchmarks/baselines/stage_benchmark.json
+    PYTHONPATH=src python benchmarks/stage_benchmark.py --compare benchmarks/baselines/stage_benchmark.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+import warnings
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from dtype_policy_benchmark import synthetic_input
+
+from obc_sqc.model.annotation_utils import AnnotationUtils
+from obc_sqc.model.constant_data_check import ConstantDataCheck
+from obc_sqc.model.filling_ignoring_period import FillingIgnoringPeriod
+from obc_sqc.model.hour_averaging import HourAveraging
+from obc_sqc.model.initial_params import InitialParams
+from obc_sqc.model.minute_averaging import MinuteAveraging
+from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from obc_sqc.model.raw_data_check import RawDataCheck
+from obc_sqc.model.time_normalisation import TimeNormalisation
+from obc_sqc.schema.schema import SchemaDefinitions
+
+
+def normalised_input(prepared_df: pd.DataFrame) -> pd.DataFrame:
+    """Normalises the prepared raw data, as the parameter loop of ObcSqcCheck.run receives them.
+
+    Args:
+    ----
+        prepared_df (pd.DataFrame): the output of ObcSqcCheck.prepare_input()
+
+    Returns:
+    -------
+        pd.DataFrame: the time-normalised raw data
+    """
+    params: tuple = InitialParams.picking_initial_parameters(prepared_df["model"].iloc[0])
+    df: pd.DataFrame = TimeNormalisation.time_normalisation_dataframe(prepared_df, params[5], params[6])
+
+    weather_columns: list[str] = SchemaDefinitions.weather_data_columns()
+    df.loc[df[weather_columns].isna().any(axis=1), weather_columns] = np.nan
+
+    return df
+
+
+def parameter_matrices(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Runs the stages of ObcSqcCheck.run that cover all parameters at once.
+
+    Args:
+    ----
+        df (pd.DataFrame): the normalised raw data of a device
+
+    Returns:
+    -------
+        tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]: the ann_obc, {parameter}_for_raw_check and
+            {parameter}_consec_filling values of every parameter
+    """
+    params: tuple = InitialParams.picking_initial_parameters(df["model"].iloc[0])
+    ann_obc_df: pd.DataFrame = ObcSqcCheck.obc_matrix(df[params[11]], params[19][0], params[19][1])
+    filled_values, consec_filling = FillingIgnoringPeriod.filling_ignoring_period_matrix(
+        df[params[11]], params[8], params[5]
+    )
+
+    return ann_obc_df, filled_values, consec_filling
+
+
+def parameter_chain(  # noqa: C901
+    df: pd.DataFrame, parameter: str, matrices: tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]
+) -> list[tuple[str, Callable[[], None]]]:
+    """Builds the stages of a single parameter, in the order ObcSqcCheck.run executes them.
+
+    Each stage consumes the output of the previous one, so the stages must be called in order.
+
+    Args:
+    ----
+        df (pd.DataFrame): the normalised raw data of a device
+        parameter (str): the parameter under test, e.g. temperature or wind_speed
+        matrices (tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]): the output of parameter_matrices()
+
+    Returns:
+    -------
+        list[tuple[str, Callable[[], None]]]: the name and the callable of every stage
+    """
+    model: str = df["model"].iloc[0]
+    params: tuple = InitialParams.picking_initial_parameters(model)
+    i: int = params[11].index(parameter)
+    ann_obc_df, filled_values, consec_filling = matrices
+    state: dict = {}
+
+    def projection() -> None:
+        state["df"] = ObcSqcCheck.parameter_projection(df, parameter, filled_values)
+        if parameter != "precipitation_accumulated":
+            state["df"]["ann_obc"] = ann_obc_df[parameter]
+        state["df"][f"{parameter}_for_raw_check"] = filled_values[parameter]
+        state["df"][f"{parameter}_consec_filling"] = consec_filling[parameter]
+
+    def obc_precipitation() -> None:
+        state["df"] = ObcSqcCheck.obc_precipitation(state["df"], params[19][0][i], params[19][1][i])
+        state["df"]["ann_constant"] = 0
+        state["df"]["ann_constant_long"] = 0
+        state["df"]["ann_constant_frozen"] = 0
+
+    def constant_check() -> None:
+        state["df"]["date"] = state["df"]["utc_datetime"] + pd.Timedelta(seconds=params[5])
+        state["df"] = ConstantDataCheck.constant_data_check(
+            state["df"], parameter, params[18][i], params[3], params[4], params[10], params[21][i], params[22]
+        )
+
+    def raw_check() -> None:
+        state["df"] = RawDataCheck.raw_data_suspicious_check(
+            state["df"], parameter, params[15][i], params[5], params[7], params[12][i], params[0], params[1], params[2]
+        )
+
+    def text_annotation() -> None:
+        state["df"] = AnnotationUtils.text_annotation(state["df"])
+
+    def minute_averaging() -> None:
+        state["df"], state["minute_averaging"] = MinuteAveraging.minute_averaging(
+            state["df"],
+            parameter,
+            params[17][i],
+            params[13][i],
+            params[12][i],
+            params[7],
+            params[16][i],
+            params[2],
+            params[0],
+            params[23],
+            params[24],
+        )
+
+    def hour_averaging() -> None:
+        HourAveraging.hour_averaging(state["minute_averaging"], params[9], params[14][i], parameter)
+
+    def error_codes_hourly() -> None:
+        AnnotationUtils.error_codes_hourly(state["df"], state["minute_averaging"])
+
+    stages: list[tuple[str, Callable[[], None]]] = [("parameter_projection", projection)]
+    if parameter == "precipitation_accumulated":
+        stages.append(("obc_precipitation", obc_precipitation))
+    else:
+        stages.append((f"constant_data_check[{parameter}]", constant_check))
+
+    stages += [
+        ("raw_data_suspicious_check", raw_check),
+        ("text_annotation", text_annotation),
+        ("minute_averaging", minute_averaging),
+    ]
+    # Only stations with sampling rate <30sec average per minute and then per hour
+    if model == "WS1000":
+        stages.append(("hour_averaging", hour_averaging))
+
+    return [*stages, ("error_codes_hourly", error_codes_hourly)]
+
+
+def time_model(model: str, parameters: list[str], repeat: int) -> dict[str, float]:
+    """Times every stage of a model on its synthetic day, keeping the fastest of several runs.
+
+    Args:
+    ----
+        model (str): the weather station model
+        parameters (list[str]): the parameters to time, empty for all of them
+        repeat (int): the number of runs
+
+    Returns:
+    -------
+        dict[str, float]: the best time of every stage, keyed by {model}/{parameter}/{stage} [in seconds]
+    """
+    params: tuple = InitialParams.picking_initial_parameters(model)
+    raw_df: pd.DataFrame = synthetic_input(model)
+    prepared_df: pd.DataFrame = ObcSqcCheck.prepare_input(raw_df)
+    df: pd.DataFrame = normalised_input(prepared_df)
+    result_df: pd.DataFrame = ObcSqcCheck.run(raw_df)
+
+    def record(name: str, stage: Callable[[], object]) -> None:
+        start: float = time.perf_counter()
+        stage()
+        elapsed: float = time.perf_counter() - start
+        best[name] = min(best.get(name, elapsed), elapsed)
+
+    best: dict[str, float] = {}
+    for _ in range(repeat):
+        record(f"{model}/prepare_input", lambda: ObcSqcCheck.prepare_input(raw_df))
+        record(f"{model}/time_normalisation", lambda: normalised_input(prepared_df))
+
+        record(f"{model}/parameter_matrices", lambda: parameter_matrices(df))
+
+        # Every parameter runs, so that the parameters selected get the same input as in ObcSqcCheck.run
+        matrices: tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame] = parameter_matrices(df)
+        for parameter in params[11]:
+            for name, stage in parameter_chain(df, parameter, matrices):
+                if parameters and parameter not in parameters:
+                    stage()
+                else:
+                    record(f"{model}/{parameter}/{name}", stage)
+
+        record(f"{model}/daily_annotations", lambda: ObcSqcCheck.daily_annotations(result_df))
+
+    return best
+
+
+def compare(
+    results: dict[str, float], baseline: dict[str, float], threshold: float, min_delta: float
+) -> list[str]:
+    """Finds the stages that got slower than their baseline.
+
+    Args:
+    ----
+        results (dict[str, float]): the timings of this run
+        baseline (dict[str, float]): the timings of the baseline
+        threshold (float): the max allowed ratio of a timing to its baseline
+        min_delta (float): slowdowns smaller than this are ignored, as sub-millisecond stages are noisy [in seconds]
+
+    Returns:
+    -------
+        list[str]: the names of the regressed stages
+    """
+    return [
+        name
+        for name, t in results.items()
+        if name in baseline and t > threshold * baseline[name] and t - baseline[name] > min_delta
+    ]
+
+
+def main() -> None:
+    """Prints the timing of every stage and saves or compares them against a JSON baseline."""
+    parser = argparse.ArgumentParser(description="OBC SQC per-stage benchmark")
+
+    parser.add_argument("--model", choices=["WS1000", "WS2000"], action="append", help="Defaults to both models")
+    parser.add_argument("--parameter", action="append", help="Parameters to time, defaults to all of them")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="Write the timings to this JSON baseline")
+    parser.add_argument("--compare", help="Compare the timings with this JSON baseline")
+    parser.add_argument("--threshold", help="Slowdown ratio reported as a regression", type=float, default=1.25)
+    parser.add_argument("--min_delta", help="Slowdowns ignored below this [s]", type=float, default=0.005)
+
+    (k_args, unknown_args) = parser.parse_known_args(sys.argv[1:])
+
+    args = vars(k_args)
+
+    warnings.filterwarnings("ignore")
+
+    results: dict[str, float] = {}
+    for model in args["model"] or ["WS1000", "WS2000"]:
+        results.update(time_model(model, args["parameter"] or [], args["repeat"]))
+
+    baseline: dict[str, float] = {}
+    if args["compare"]:
+        with open(args["compare"], encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    print(f"{'stage':<64}{'time [s]':>12}{'baseline [s]':>14}{'ratio':>8}")
+    for name, t in results.items():
+        if name in baseline:
+            print(f"{name:<64}{t:>12.4f}{baseline[name]:>14.4f}{t / baseline[name]:>8.2f}")
+        else:
+            print(f"{name:<64}{t:>12.4f}")
+
+    if args["save"]:
+        with open(args["save"], "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                    "machine": platform.platform(),
+                    "python": platform.python_version(),
+                    "pandas": pd.__version__,
+                    "numpy": np.__version__,
+                    "repeat": args["repeat"],
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    regressions: list[str] = compare(results, baseline, args["threshold"], args["min_delta"])
+    for name in regressions:
+        print(f"REGRESSION: {name} {results[name]:.4f}s vs {baseline[name]:.4f}s")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
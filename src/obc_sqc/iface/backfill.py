@@ -0,0 +1,430 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import time
+import uuid
+from functools import partial
+from typing import Callable, Iterator
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from obc_sqc.iface.batch_scoring import BatchScoring, DeviceOutcome
+from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from obc_sqc.model.profiling_sampler import ProfilingSampler
+from obc_sqc.schema.schema import SchemaDefinitions
+from obc_sqc.storage.progress_journal import ProgressJournal
+from obc_sqc.storage.result_cache import ResultCache
+
+logger = logging.getLogger("obc_sqc")
+logger.addHandler(logging.StreamHandler())
+logger.setLevel(logging.DEBUG)
+
+
+class Backfill:
+    """Recomputes the QoD of a range of dates from day parquets, reading every day once.
+
+    The range is read in chunks of consecutive days. Every date is scored with the 6 hours before it, so the last
+    6 hours of a chunk are carried over to the next one instead of reading the day before again. Only one chunk is
+    held in memory at a time, whatever the length of the range, and the results of all dates are appended to a
+    single parquet file.
+
+    Given a ProgressJournal, the results of every date are written to their own file under
+    {output_file_path}.parts as soon as the date is scored, and every device-date is recorded in the journal along
+    with that file. A restarted backfill skips the device-dates completed by a previous run, and the single parquet
+    file is assembled from the parts once every date is done.
+
+    Every device to score, i.e. the selected devices or, without a selection, every device found in the day
+    parquets of the range, gets a result for every date whatever the chunk size: score_fn is called with the date
+    as the date keyword, and a device without any data within a date gets the NO_DATA result of ObcSqcCheck.run
+    for it.
+    """
+
+    # The data before a date that its QoD depends on
+    HALO: pd.Timedelta = pd.Timedelta(hours=6)
+
+    def __init__(
+        self,
+        input_dir: str,
+        device_ids: list[str] | None = None,
+        chunk_days: int = 7,
+        score_workers: int = 1,
+        score_fn: Callable[..., pd.DataFrame] = ObcSqcCheck.run,
+        journal: ProgressJournal | None = None,
+    ) -> None:
+        """Creates the backfill.
+
+        Args:
+        ----
+            input_dir (str): the directory of the day parquets, named %Y_%m_%d.parquet
+            device_ids (list[str] | None): the devices to score, None for every device found
+            chunk_days (int): the number of days read and held in memory at once
+            score_workers (int): the number of processes scoring the devices of a date
+            score_fn (Callable[..., pd.DataFrame]): the scoring function taking the date keyword, e.g. ObcSqcCheck.run
+            journal (ProgressJournal | None): the journal of the completed device-dates, to resume an interrupted run
+        """
+        self.input_dir: str = input_dir
+        self.device_ids: list[str] | None = device_ids
+        self.chunk_days: int = chunk_days
+        self.score_workers: int = score_workers
+        self.score_fn: Callable[..., pd.DataFrame] = score_fn
+        self.journal: ProgressJournal | None = journal
+
+    def read_day(self, day: pd.Timestamp) -> pd.DataFrame:
+        """Reads the raw data of the devices for a day.
+
+        Args:
+        ----
+            day (pd.Timestamp): the day
+
+        Returns:
+        -------
+            pd.DataFrame: the raw data along with the device ID, empty when the day parquet is missing
+        """
+        input_schema: dict = {"device_id": str, **SchemaDefinitions.qod_input_schema()}
+        path: str = os.path.join(self.input_dir, f"{day:%Y_%m_%d}.parquet")
+
+        if not os.path.exists(path):
+            logger.warning("Missing day parquet %s", path)
+            return pd.DataFrame(columns=list(input_schema.keys())).astype(input_schema)
+
+        # Only the rows of the requested devices are decoded
+        filters: list[tuple] | None = None if self.device_ids is None else [("device_id", "in", self.device_ids)]
+        day_df: pd.DataFrame = pq.read_table(path, columns=list(input_schema.keys()), filters=filters).to_pandas()
+
+        return day_df.astype(input_schema)
+
+    def chunks(self, start_date: pd.Timestamp, end_date: pd.Timestamp) -> Iterator[list[pd.Timestamp]]:
+        """Splits a range of dates into chunks of consecutive days.
+
+        Args:
+        ----
+            start_date (pd.Timestamp): the first date
+            end_date (pd.Timestamp): the last date (included)
+
+        Returns:
+        -------
+            Iterator[list[pd.Timestamp]]: the days of every chunk
+        """
+        days: pd.DatetimeIndex = pd.date_range(start_date, end_date, freq="D")
+        for chunk_start in range(0, len(days), self.chunk_days):
+            chunk_end: int = chunk_start + self.chunk_days
+            yield list(days[chunk_start:chunk_end])
+
+    def score_date(
+        self,
+        loaded_df: pd.DataFrame,
+        date: pd.Timestamp,
+        expected_device_ids: list[str],
+        skipped_device_ids: set[str] | None = None,
+    ) -> pd.DataFrame:
+        """Scores every device of a date, those without data within it getting the NO_DATA result of the date.
+
+        Args:
+        ----
+            loaded_df (pd.DataFrame): the raw data of the devices, covering the date and the halo before it
+            date (pd.Timestamp): the date
+            expected_device_ids (list[str]): the devices to score, e.g. Backfill.expected_device_ids of the range
+            skipped_device_ids (set[str] | None): devices not to score, e.g. completed by a previous run
+
+        Returns:
+        -------
+            pd.DataFrame: the results, following SchemaDefinitions.mlflow_obc_sqc_batch_schema(), with the date
+        """
+        end_date: pd.Timestamp = date + pd.Timedelta(hours=23, minutes=59, seconds=59)
+        skipped: set[str] = skipped_device_ids or set()
+
+        # Only devices with data within the date itself are scored on their window, as the halo alone would score
+        # the day before
+        with_data: list[str] = self.date_device_ids(loaded_df, date)
+        device_ids: list[str] = [device_id for device_id in with_data if device_id not in skipped]
+        without_data: list[str] = [
+            device_id
+            for device_id in expected_device_ids
+            if device_id not in with_data and device_id not in skipped
+        ]
+        date_devices: pd.Series = loaded_df["device_id"].isin(device_ids)
+        window_df: pd.DataFrame = loaded_df[
+            date_devices & loaded_df["utc_datetime"].between(date - self.HALO, end_date)
+        ].reset_index(drop=True)
+
+        score_fn: Callable[[pd.DataFrame], pd.DataFrame] = partial(self.score_fn, date=str(date.date()))
+        outcomes: list[DeviceOutcome] = BatchScoring.score_devices(window_df, score_fn, self.score_workers)
+
+        input_schema: dict = SchemaDefinitions.qod_input_schema()
+        empty_df: pd.DataFrame = pd.DataFrame(columns=list(input_schema.keys())).astype(input_schema)
+        outcomes += [BatchScoring.score_device(device_id, empty_df.copy(), score_fn) for device_id in without_data]
+
+        for outcome in outcomes:
+            if outcome.result is None:
+                logger.error("Failed to score device %s on %s: %s", outcome.device_id, date.date(), outcome.exception)
+
+        result_df: pd.DataFrame = BatchScoring.combine(outcomes)
+        result_df["date"] = str(date.date())
+
+        return result_df
+
+    def expected_device_ids(self, start_date: pd.Timestamp, end_date: pd.Timestamp) -> list[str]:
+        """Lists the devices to score on every date of a range: the selected devices, or every device of its days.
+
+        Without a selection, only the device_id column of the day parquets is read, so the devices do not depend
+        on which days are held in memory at once.
+
+        Args:
+        ----
+            start_date (pd.Timestamp): the first date
+            end_date (pd.Timestamp): the last date (included)
+
+        Returns:
+        -------
+            list[str]: the IDs of the devices
+        """
+        if self.device_ids is not None:
+            return list(self.device_ids)
+
+        device_ids: set[str] = set()
+        for day in pd.date_range(start_date, end_date, freq="D"):
+            path: str = os.path.join(self.input_dir, f"{day:%Y_%m_%d}.parquet")
+            if os.path.exists(path):
+                day_device_ids: pa.ChunkedArray = pq.read_table(path, columns=["device_id"])["device_id"]
+                device_ids.update(str(device_id) for device_id in day_device_ids.unique().to_pylist())
+
+        return sorted(device_ids)
+
+    @staticmethod
+    def date_device_ids(loaded_df: pd.DataFrame, date: pd.Timestamp) -> list[str]:
+        """Lists the devices with data within a date.
+
+        Args:
+        ----
+            loaded_df (pd.DataFrame): the raw data of the devices
+            date (pd.Timestamp): the date
+
+        Returns:
+        -------
+            list[str]: the IDs of the devices
+        """
+        end_date: pd.Timestamp = date + pd.Timedelta(hours=23, minutes=59, seconds=59)
+        return list(loaded_df.loc[loaded_df["utc_datetime"].between(date, end_date), "device_id"].unique())
+
+    def write_part(self, result_df: pd.DataFrame, date: pd.Timestamp, output_file_path: str) -> None:
+        """Writes the results of a date to a file of its own and records its device-dates in the journal.
+
+        Args:
+        ----
+            result_df (pd.DataFrame): the results of the date
+            date (pd.Timestamp): the date
+            output_file_path (str): the parquet file of the backfill results
+        """
+        if self.journal is None:
+            raise ValueError("Writing the results of a date to a part needs a journal")
+
+        parts_dir: str = f"{output_file_path}.parts"
+        os.makedirs(parts_dir, exist_ok=True)
+
+        # A retry of a date gets a new part, leaving the results of the devices completed earlier in place
+        part_path: str = os.path.join(parts_dir, f"{date.date()}.{uuid.uuid4().hex[:12]}.parquet")
+        result_df.to_parquet(f"{part_path}.tmp", index=False)
+        os.replace(f"{part_path}.tmp", part_path)
+
+        statuses: pd.DataFrame = result_df.drop_duplicates(["device_id"])
+        for device_id, status in zip(statuses["device_id"], statuses["status"], strict=True):
+            self.journal.record(device_id, str(date.date()), status, part_path)
+
+    def assemble_parts(self, start_date: str, end_date: str, output_file_path: str) -> None:
+        """Writes the results recorded in the journal for a range of dates to a single parquet file.
+
+        Args:
+        ----
+            start_date (str): the first date, formatted as %Y-%m-%d
+            end_date (str): the last date (included), formatted as %Y-%m-%d
+            output_file_path (str): the parquet file of the results
+        """
+        if self.journal is None:
+            raise ValueError("Assembling the parts needs a journal")
+
+        # The latest outcome of every device-date in the range, grouped per part
+        units: dict[str, set[tuple[str, str]]] = {}
+        for (device_id, date), entry in sorted(self.journal.entries.items(), key=lambda item: item[0][1]):
+            if start_date <= date <= end_date and entry.output is not None:
+                units.setdefault(entry.output, set()).add((device_id, date))
+
+        tmp_path: str = f"{output_file_path}.tmp"
+        writer: pq.ParquetWriter | None = None
+        try:
+            for part_path, part_units in units.items():
+                part_df: pd.DataFrame = pd.read_parquet(part_path)
+                keep: pd.Series = pd.Series(
+                    [unit in part_units for unit in zip(part_df["device_id"], part_df["date"], strict=True)],
+                    index=part_df.index,
+                )
+
+                table: pa.Table = pa.Table.from_pandas(
+                    part_df[keep], schema=None if writer is None else writer.schema, preserve_index=False
+                )
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table)
+        except BaseException:
+            if writer is not None:
+                writer.close()
+                os.remove(tmp_path)
+            raise
+
+        if writer is None:
+            logger.warning("No device had data between %s and %s", start_date, end_date)
+            return
+
+        writer.close()
+        os.replace(tmp_path, output_file_path)
+
+    def run(self, start_date: str, end_date: str, output_file_path: str) -> dict[str, int]:  # noqa: C901
+        """Scores every date of a range and writes all results to one parquet file.
+
+        The file is written under a temporary name and renamed once complete, so a failed backfill never leaves
+        a partial output behind.
+
+        Args:
+        ----
+            start_date (str): the first date, formatted as %Y-%m-%d
+            end_date (str): the last date (included), formatted as %Y-%m-%d
+            output_file_path (str): the parquet file of the results
+
+        Returns:
+        -------
+            dict[str, int]: the number of dates, of device-dates scored successfully or not and of device-dates
+                            skipped as completed by a previous run
+        """
+        summary: dict[str, int] = {"dates": 0, "success": 0, "failure": 0, "skipped": 0}
+        tmp_path: str = f"{output_file_path}.tmp"
+        writer: pq.ParquetWriter | None = None
+
+        first_date: pd.Timestamp = pd.Timestamp(start_date)
+        halo_df: pd.DataFrame = self.read_day(first_date - pd.Timedelta(days=1))
+        carry_df: pd.DataFrame = halo_df[halo_df["utc_datetime"] >= first_date - self.HALO]
+        expected_device_ids: list[str] = self.expected_device_ids(first_date, pd.Timestamp(end_date))
+
+        try:
+            for days in self.chunks(first_date, pd.Timestamp(end_date)):
+                loaded_df: pd.DataFrame = pd.concat(
+                    [carry_df, *[self.read_day(day) for day in days]], ignore_index=True
+                ).drop_duplicates()
+
+                for date in days:
+                    skipped_device_ids: set[str] = set()
+                    if self.journal is not None:
+                        skipped_device_ids = {
+                            device_id
+                            for device_id in expected_device_ids
+                            if self.journal.is_completed(device_id, str(date.date()))
+                        }
+
+                    result_df: pd.DataFrame = self.score_date(loaded_df, date, expected_device_ids, skipped_device_ids)
+                    summary["dates"] += 1
+                    summary["skipped"] += len(skipped_device_ids)
+                    if result_df.empty:
+                        continue
+
+                    statuses: pd.Series = result_df.drop_duplicates(["device_id"])["status"]
+                    summary["success"] += int((statuses == "success").sum())
+                    summary["failure"] += int((statuses == "failure").sum())
+
+                    if self.journal is not None:
+                        self.write_part(result_df, date, output_file_path)
+                        continue
+
+                    table: pa.Table = pa.Table.from_pandas(
+                        result_df, schema=None if writer is None else writer.schema, preserve_index=False
+                    )
+                    if writer is None:
+                        writer = pq.ParquetWriter(tmp_path, table.schema)
+                    writer.write_table(table)
+
+                # Keep only the halo of the next chunk
+                next_date: pd.Timestamp = days[-1] + pd.Timedelta(days=1)
+                carry_df = loaded_df[loaded_df["utc_datetime"] >= next_date - self.HALO]
+        except BaseException:
+            if writer is not None:
+                writer.close()
+                os.remove(tmp_path)
+            raise
+
+        if self.journal is not None:
+            self.assemble_parts(start_date, end_date, output_file_path)
+            return summary
+
+        if writer is None:
+            logger.warning("No device had data between %s and %s", start_date, end_date)
+            return summary
+
+        writer.close()
+        os.replace(tmp_path, output_file_path)
+
+        return summary
+
+
+def main() -> None:
+    """Recomputes the QoD of every date in a range, for a device, a set of devices or all devices of the data.
+
+    The day parquets of --input_dir are expected as %Y_%m_%d.parquet, including the day before --start_date.
+    """
+    parser = argparse.ArgumentParser(description="OBC SQC backfill")
+
+    devices = parser.add_mutually_exclusive_group()
+    devices.add_argument("--device_id", help="Device ID, all devices are scored when no device is given")
+    devices.add_argument("--device_ids_file", help="File with one device ID per line")
+    parser.add_argument("--start_date", help="First date, formatted as %Y-%m-%d", required=True)
+    parser.add_argument("--end_date", help="Last date (included), formatted as %Y-%m-%d", required=True)
+    parser.add_argument("--input_dir", help="Directory of the day parquets", required=True)
+    parser.add_argument("--output_file_path", help="Parquet file of the results", default="backfill.parquet")
+    parser.add_argument("--chunk_days", help="Days held in memory at once", type=int, default=7)
+    parser.add_argument("--score_workers", help="Processes scoring the devices of a date", type=int, default=1)
+    parser.add_argument("--cache_dir", help="Directory of a result cache, skipping unchanged inputs", default=None)
+    parser.add_argument("--cache_max_bytes", help="Size of the result cache [bytes]", type=int, default=1 << 30)
+    parser.add_argument("--profile_dir", help="Directory of the cProfile captures of sampled and slow devices")
+    parser.add_argument("--profile_every", help="Profile one in this many devices, 0 for none", type=int, default=0)
+    parser.add_argument("--profile_slow_seconds", help="Profile the devices slower than this [s]", type=float)
+    parser.add_argument(
+        "--journal_path", help="Progress journal, resuming the device-dates left by an interrupted run", default=None
+    )
+
+    (k_args, unknown_args) = parser.parse_known_args(sys.argv[1:])
+
+    args = vars(k_args)
+
+    device_ids: list[str] | None = None
+    if args["device_id"] is not None:
+        device_ids = [args["device_id"]]
+    elif args["device_ids_file"] is not None:
+        with open(args["device_ids_file"], encoding="utf-8") as f:
+            device_ids = [line.strip() for line in f if line.strip()]
+
+    score_fn: Callable[[pd.DataFrame], pd.DataFrame] = ObcSqcCheck.run
+    if args["profile_dir"] is not None:
+        score_fn = ProfilingSampler(args["profile_dir"], args["profile_every"], args["profile_slow_seconds"])
+    if args["cache_dir"] is not None:
+        score_fn = ResultCache(args["cache_dir"], args["cache_max_bytes"], score_fn)
+
+    journal: ProgressJournal | None = None
+    if args["journal_path"] is not None:
+        journal = ProgressJournal(args["journal_path"])
+
+    backfill: Backfill = Backfill(
+        args["input_dir"], device_ids, args["chunk_days"], args["score_workers"], score_fn=score_fn, journal=journal
+    )
+
+    start: float = time.perf_counter()
+    try:
+        summary: dict[str, int] = backfill.run(args["start_date"], args["end_date"], args["output_file_path"])
+    finally:
+        if journal is not None:
+            journal.close()
+    logger.info("Backfilled %s in %.1fs", summary, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
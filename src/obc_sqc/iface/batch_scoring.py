@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, NamedTuple
+
+import pandas as pd
+
+from obc_sqc.model.batch_engine import BatchEngine, ParameterMatrices
+from obc_sqc.schema.schema import SchemaDefinitions
+from obc_sqc.storage.shared_day import SharedDay
+
+
+class DeviceOutcome(NamedTuple):
+    """The outcome of scoring a single device of a batch."""
+
+    device_id: str
+    result: pd.DataFrame | None
+    exception: str | None
+    # The station model of the device, which the QoD result itself leaves empty
+    model: str = ""
+
+
+class BatchScoring:
+    """Scores a long-format frame holding the raw data of many devices, one device at a time."""
+
+    @staticmethod
+    def score_device(
+        device_id: str, device_df: pd.DataFrame, score_fn: Callable[[pd.DataFrame], pd.DataFrame]
+    ) -> DeviceOutcome:
+        """Scores a single device, capturing any failure instead of raising it.
+
+        Args:
+        ----
+            device_id (str): the device ID
+            device_df (pd.DataFrame): the raw data of the device
+            score_fn (Callable[[pd.DataFrame], pd.DataFrame]): the scoring function, e.g. ObcSqcCheck.run
+
+        Returns:
+        -------
+            DeviceOutcome: the result of the device, or the formatted traceback of its failure
+        """
+        # Lets wrappers of the scoring function, e.g. a ProfilingSampler, know the device
+        device_df.attrs["device_id"] = device_id
+        model: str = str(device_df["model"].iloc[0]) if "model" in device_df and not device_df.empty else ""
+
+        try:
+            return DeviceOutcome(device_id, score_fn(device_df), None, model)
+        except Exception as _:
+            return DeviceOutcome(device_id, None, traceback.format_exc(), model)
+
+    @staticmethod
+    def score_device_batch(
+        device_groups: list[tuple[str, pd.DataFrame]], score_fn: Callable[..., pd.DataFrame]
+    ) -> list[DeviceOutcome]:
+        """Scores devices together, running the checks of the devices of each model over all of them at once.
+
+        Args:
+        ----
+            device_groups (list[tuple[str, pd.DataFrame]]): the device ID and the raw data of every device
+            score_fn (Callable[..., pd.DataFrame]): the scoring function, taking the parameter matrices of the
+                            device as its matrices keyword, e.g. ObcSqcCheck.run
+
+        Returns:
+        -------
+            list[DeviceOutcome]: the outcome of every device, in the order of device_groups
+        """
+        try:
+            matrices: list[ParameterMatrices | None] = BatchEngine.parameter_matrices([
+                device_df for _, device_df in device_groups
+            ])
+        except Exception as _:
+            # Every device is then checked on its own, so that a failure is reported by the device causing it
+            matrices = [None] * len(device_groups)
+
+        return [
+            BatchScoring.score_device(device_id, device_df, partial(score_fn, matrices=device_matrices))
+            for (device_id, device_df), device_matrices in zip(device_groups, matrices, strict=True)
+        ]
+
+    @staticmethod
+    def score_shared_devices(
+        day_path: str,
+        devices: list[tuple[str, int, int]],
+        score_fn: Callable[..., pd.DataFrame],
+        batch_size: int,
+    ) -> list[DeviceOutcome]:
+        """Scores devices of a day shared through SharedDay, in a worker process.
+
+        Args:
+        ----
+            day_path (str): the IPC file of the day
+            devices (list[tuple[str, int, int]]): the device ID, the offset and the number of rows of every device
+            score_fn (Callable[..., pd.DataFrame]): the scoring function, e.g. ObcSqcCheck.run
+            batch_size (int): above 1, the devices are checked together by BatchEngine
+
+        Returns:
+        -------
+            list[DeviceOutcome]: the outcome of every device, in the order of devices
+        """
+        device_groups: list[tuple[str, pd.DataFrame]] = [
+            (device_id, SharedDay.device_frame(day_path, offset, length)) for device_id, offset, length in devices
+        ]
+
+        return BatchScoring.score_group(device_groups, score_fn, batch_size)
+
+    @staticmethod
+    def score_group(
+        device_groups: list[tuple[str, pd.DataFrame]], score_fn: Callable[..., pd.DataFrame], batch_size: int
+    ) -> list[DeviceOutcome]:
+        """Scores devices, together when batching and one at a time otherwise.
+
+        Args:
+        ----
+            device_groups (list[tuple[str, pd.DataFrame]]): the device ID and the raw data of every device
+            score_fn (Callable[..., pd.DataFrame]): the scoring function, e.g. ObcSqcCheck.run
+            batch_size (int): above 1, the devices are checked together by BatchEngine
+
+        Returns:
+        -------
+            list[DeviceOutcome]: the outcome of every device, in the order of device_groups
+        """
+        if batch_size > 1:
+            return BatchScoring.score_device_batch(device_groups, score_fn)
+
+        return [BatchScoring.score_device(device_id, device_df, score_fn) for device_id, device_df in device_groups]
+
+    @staticmethod
+    def batches(models: list[str], batch_size: int) -> list[list[int]]:
+        """Splits devices into the groups scored together, each in a process of its own when parallel.
+
+        Args:
+        ----
+            models (list[str]): the station model of every device
+            batch_size (int): the maximum devices of a batch, 1 to score every device on its own
+
+        Returns:
+        -------
+            list[list[int]]: the positions of the devices of every group
+        """
+        if batch_size <= 1:
+            return [[i] for i in range(len(models))]
+
+        # Devices of the same model next to each other, so that a batch stacks as many of them as possible
+        order: list[int] = sorted(range(len(models)), key=lambda i: models[i])
+        return [order[slice(start, start + batch_size)] for start in range(0, len(order), batch_size)]
+
+    @staticmethod
+    def score_devices(
+        model_input: pd.DataFrame,
+        score_fn: Callable[[pd.DataFrame], pd.DataFrame],
+        max_workers: int = 1,
+        batch_size: int = 1,
+    ) -> list[DeviceOutcome]:
+        """Scores every device of a batch.
+
+        When parallel, the raw data is handed to the processes through a SharedDay: each of them maps the day and
+        reads the slices of its devices, instead of receiving pickled copies of their frames.
+
+        Args:
+        ----
+            model_input (pd.DataFrame): the raw data of all devices, with an extra "device_id" column
+            score_fn (Callable[[pd.DataFrame], pd.DataFrame]): the scoring function, e.g. ObcSqcCheck.run
+            max_workers (int): the number of processes scoring devices in parallel, 1 scores them in-process
+            batch_size (int): the devices of the same model checked together by BatchEngine, 1 to check every
+                            device on its own. Above 1, score_fn must take the matrices keyword of ObcSqcCheck.run
+
+        Returns:
+        -------
+            list[DeviceOutcome]: the outcome of every device, in order of first appearance in model_input
+        """
+        device_models: pd.Series = model_input.groupby("device_id", sort=False)["model"].first()
+        device_ids: list[str] = [str(device_id) for device_id in device_models.index]
+        batches: list[list[int]] = BatchScoring.batches([str(model) for model in device_models], batch_size)
+
+        if max_workers <= 1 or len(batches) <= 1:
+            device_groups: list[tuple[str, pd.DataFrame]] = [
+                (str(device_id), device_df.drop(columns=["device_id"]).reset_index(drop=True))
+                for device_id, device_df in model_input.groupby("device_id", sort=False)
+            ]
+            batch_outcomes: list[list[DeviceOutcome]] = [
+                BatchScoring.score_group([device_groups[i] for i in batch], score_fn, batch_size) for batch in batches
+            ]
+        else:
+            # The pool is shut down before the day is removed
+            with (
+                SharedDay.write(model_input) as shared_day,
+                ProcessPoolExecutor(max_workers=min(max_workers, len(batches))) as pool,
+            ):
+                futures = [
+                    pool.submit(
+                        BatchScoring.score_shared_devices,
+                        shared_day.path,
+                        [(device_ids[i], *shared_day.devices[device_ids[i]]) for i in batch],
+                        score_fn,
+                        batch_size,
+                    )
+                    for batch in batches
+                ]
+                batch_outcomes = [future.result() for future in futures]
+
+        # Every device belongs to exactly one batch, so every position is filled
+        outcomes: dict[int, DeviceOutcome] = {
+            i: outcome
+            for batch, outcomes_of_batch in zip(batches, batch_outcomes, strict=True)
+            for i, outcome in zip(batch, outcomes_of_batch, strict=True)
+        }
+
+        return [outcomes[i] for i in range(len(device_ids))]
+
+    @staticmethod
+    def combine(outcomes: list[DeviceOutcome]) -> pd.DataFrame:
+        """Concatenates the results of a batch, adding the device ID, model and status of every row.
+
+        A failed device is represented by a single row with status "failure" and empty scores. The model is taken
+        from the input of the device, and left as returned by the scoring function when the outcome has none.
+
+        Args:
+        ----
+            outcomes (list[DeviceOutcome]): the outcome of every device
+
+        Returns:
+        -------
+            pd.DataFrame: the results, following SchemaDefinitions.mlflow_obc_sqc_batch_schema()
+        """
+        batch_schema: dict = SchemaDefinitions.mlflow_obc_sqc_batch_schema()
+        frames: list[pd.DataFrame] = []
+
+        for outcome in outcomes:
+            if outcome.result is not None:
+                device_result: pd.DataFrame = outcome.result.assign(device_id=outcome.device_id, status="success")
+            else:
+                device_result = pd.DataFrame({"device_id": [outcome.device_id], "status": ["failure"]})
+                device_result = device_result.reindex(columns=list(batch_schema.keys()))
+                str_columns: list[str] = [column for column, dtype in batch_schema.items() if dtype is str]
+                device_result[str_columns] = device_result[str_columns].fillna("")
+            if outcome.model:
+                device_result = device_result.assign(model=outcome.model)
+            frames.append(device_result.reindex(columns=list(batch_schema.keys())))
+
+        if not frames:
+            return pd.DataFrame(columns=list(batch_schema.keys())).astype(batch_schema)
+
+        return pd.concat(frames, ignore_index=True).astype(batch_schema)
@@ -2,22 +2,31 @@ from __future__ import annotations
 
 import argparse
 import datetime
+import json
 import logging
 import sys
 import time
+from functools import partial
+from typing import Callable
 
-import awswrangler as wr
 import pandas as pd
 
+from obc_sqc.iface.fleet_pipeline import DirectoryResultWriter, FleetPipeline, S3DeviceReader
+from obc_sqc.iface.sharding import Shard
 from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from obc_sqc.model.profiling_sampler import ProfilingSampler
+from obc_sqc.model.stage_instrumentation import StageInstrumentation
 from obc_sqc.schema.schema import SchemaDefinitions
+from obc_sqc.storage.partitioned_writer import PartitionedResultWriter
+from obc_sqc.storage.progress_journal import ProgressJournal
+from obc_sqc.storage.result_cache import ResultCache
 
 logger = logging.getLogger("obc_sqc")
 logger.addHandler(logging.StreamHandler())
 logger.setLevel(logging.DEBUG)
 
 
-def main():
+def main():  # noqa: PLR0912, PLR0915, C901
     """The algo requires an input a timeseries in csv with raw data of parameters of 'temperature',
     'humidity', 'wind_speed', 'wind_direction', 'pressure' and 'illuminance'. The following are conducted:
      - create a new timeframe with fixed time interval
@@ -32,13 +41,96 @@ def main():
 
     parser = argparse.ArgumentParser(description="OBC SQC Direct Inference")
 
-    parser.add_argument("--device_id", help="Device ID", required=True)
+    devices = parser.add_mutually_exclusive_group(required=True)
+    devices.add_argument("--device_id", help="Device ID")
+    devices.add_argument("--device_ids_file", help="File with one device ID per line, scored as a fleet")
     parser.add_argument("--date", help="Input date formatted as %Y-%m-%d", required=True)
+    parser.add_argument("--output_dir", help="Directory of the per-device results of a fleet", default="results")
+    parser.add_argument(
+        "--output_format",
+        help="csv: one csv per device, dataset: a parquet dataset partitioned by date and model, for a fleet",
+        choices=["csv", "dataset"],
+        default="csv",
+    )
+    parser.add_argument("--read_workers", help="Threads prefetching device data", type=int, default=8)
+    parser.add_argument("--score_workers", help="Processes scoring devices", type=int, default=None)
+    parser.add_argument("--queue_size", help="Capacity of the pipeline queues", type=int, default=16)
+    parser.add_argument("--cache_dir", help="Directory of a result cache, skipping unchanged inputs", default=None)
+    parser.add_argument("--cache_max_bytes", help="Size of the result cache [bytes]", type=int, default=1 << 30)
+    parser.add_argument("--profile_dir", help="Directory of the cProfile captures of sampled and slow devices")
+    parser.add_argument("--profile_every", help="Profile one in this many devices, 0 for none", type=int, default=0)
+    parser.add_argument("--profile_slow_seconds", help="Profile the devices slower than this [s]", type=float)
+    parser.add_argument(
+        "--stage_report",
+        help="JSON file of the per-stage timings, row counts and peak memory of a single device",
+        default=None,
+    )
+    parser.add_argument(
+        "--shard_index", help="Shard of the devices of --device_ids_file to score, from 0 to shard_count - 1", type=int
+    )
+    parser.add_argument("--shard_count", help="Number of shards the devices are split into", type=int)
+    parser.add_argument(
+        "--journal_path", help="Progress journal of a fleet, resuming the devices left by an interrupted run"
+    )
 
     (k_args, unknown_args) = parser.parse_known_args(sys.argv[1:])
 
     args = vars(k_args)
 
+    if (args["shard_index"] is None) != (args["shard_count"] is None):
+        parser.error("--shard_index and --shard_count must be given together")
+    if args["device_ids_file"] is None and args["shard_count"] is not None:
+        parser.error("--shard_index/--shard_count require --device_ids_file")
+
+    if args["device_ids_file"] is not None:
+        with open(args["device_ids_file"], encoding="utf-8") as f:
+            device_ids: list[str] = [line.strip() for line in f if line.strip()]
+
+        # Only the devices of the shard are read, the rest are left to the other shards
+        if args["shard_count"] is not None:
+            device_ids = Shard(args["shard_index"], args["shard_count"]).select(device_ids)
+
+        score_fn: Callable[[pd.DataFrame], pd.DataFrame] = ObcSqcCheck.run
+        if args["profile_dir"] is not None:
+            score_fn = ProfilingSampler(args["profile_dir"], args["profile_every"], args["profile_slow_seconds"])
+        if args["cache_dir"] is not None:
+            score_fn = ResultCache(args["cache_dir"], args["cache_max_bytes"], score_fn)
+
+        journal: ProgressJournal | None = None
+        if args["journal_path"] is not None:
+            journal = ProgressJournal(args["journal_path"])
+
+        write_fn: Callable[[str, pd.DataFrame], str] = DirectoryResultWriter(args["output_dir"])
+        if args["output_format"] == "dataset":
+            score_fn = partial(PartitionedResultWriter.tag_model, score_fn)
+            write_fn = PartitionedResultWriter(args["output_dir"], args["date"])
+
+        pipeline = FleetPipeline(
+            read_fn=S3DeviceReader("wxm-lake", args["date"], max_pool_connections=args["read_workers"]),
+            score_fn=score_fn,
+            write_fn=write_fn,
+            read_workers=args["read_workers"],
+            score_workers=args["score_workers"],
+            queue_size=args["queue_size"],
+            journal=journal,
+            date=args["date"],
+            commit_fn=write_fn.close if isinstance(write_fn, PartitionedResultWriter) else None,
+        )
+        try:
+            statuses: dict[str, str] = pipeline.run(device_ids)
+        finally:
+            if isinstance(write_fn, PartitionedResultWriter):
+                write_fn.abort()
+            if journal is not None:
+                journal.close()
+
+        failed: list[str] = [device_id for device_id, status in statuses.items() if status != "success"]
+        logger.info("Scored %d/%d devices, failed: %s", len(statuses) - len(failed), len(statuses), failed)
+        return
+
+    # awswrangler is only needed for reading a single device, the fleet readers use boto3 directly
+    import awswrangler as wr  # noqa: PLC0415
+
     # Convert start and end dates to datetime
     input_date: datetime = datetime.datetime.strptime(args["date"], "%Y-%m-%d")
     starting_date = input_date - pd.Timedelta(hours=6)
@@ -63,10 +155,14 @@ def main():
 
     # In-memory filtering
     df_with_schema: pd.DataFrame = wr_df[
-        (wr_df["utc_datetime"] >= str(starting_date)) & (wr_df["utc_datetime"] <= str(end_date))
+        (wr_df["utc_datetime"] >= starting_date) & (wr_df["utc_datetime"] <= end_date)
     ].reset_index(drop=True)
 
-    result_df: pd.DataFrame = qod_model.run(df_with_schema)
+    with StageInstrumentation(enabled=args["stage_report"] is not None) as stages:
+        result_df: pd.DataFrame = qod_model.run(df_with_schema, stages, date=args["date"])
+    if args["stage_report"] is not None:
+        with open(args["stage_report"], "w", encoding="utf-8") as f:
+            json.dump(stages.report(), f, indent=2)
     result_df.to_csv(f"fnl.csv", index=True)
     pd.set_option("display.max_rows", 500)
     pd.set_option("display.max_columns", 500)
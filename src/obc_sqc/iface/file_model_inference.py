@@ -2,14 +2,24 @@ from __future__ import annotations
 
 import argparse
 import datetime
+import json
 import logging
+import os
 import sys
 import time
+from functools import partial
+from typing import Callable
 
 import pandas as pd
 
+from obc_sqc.iface.batch_scoring import BatchScoring, DeviceOutcome
+from obc_sqc.iface.sharding import Shard
 from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from obc_sqc.model.profiling_sampler import ProfilingSampler
+from obc_sqc.model.stage_instrumentation import StageInstrumentation
 from obc_sqc.schema.schema import SchemaDefinitions
+from obc_sqc.storage.grid_series import GridSeries
+from obc_sqc.storage.partitioned_writer import PartitionedResultWriter
 
 logger = logging.getLogger("obc_sqc")
 logger.addHandler(logging.StreamHandler())
@@ -20,7 +30,69 @@ import warnings
 warnings.filterwarnings("ignore")
 
 
-def main():
+def read_series(path: str) -> pd.DataFrame:
+    """Reads the grid series of a device for a day, a device without a series for the day having no data.
+
+    Args:
+    ----
+        path (str): the directory of the series
+
+    Returns:
+    -------
+        pd.DataFrame: the data of the series, as GridSeries.to_dataframe() returns them, empty when it is missing
+    """
+    try:
+        return GridSeries.open(path).to_dataframe()
+    except FileNotFoundError:
+        logger.warning("Missing grid series %s", path)
+        input_schema: dict = SchemaDefinitions.qod_input_schema()
+        return pd.DataFrame(columns=list(input_schema.keys())).astype(input_schema)
+
+
+def read_shard(day1: str, day2: str, input_format: str, shard: Shard, value_dtype: str = "float64") -> pd.DataFrame:
+    """Reads the data of the devices of a shard from the files of two days.
+
+    Args:
+    ----
+        day1 (str): the day parquet, or the day directory of a series store, of the day before
+        day2 (str): the day parquet, or the day directory of a series store, of the day to score
+        input_format (str): parquet or grid_series
+        shard (Shard): the shard of the devices to read
+        value_dtype (str): the dtype the weather values are held in, one of SchemaDefinitions.storage_dtypes()
+
+    Returns:
+    -------
+        pd.DataFrame: the raw data of the devices of the shard, with their device ID
+    """
+    input_schema: dict = {"device_id": str, **SchemaDefinitions.qod_storage_schema(value_dtype)}
+    frames: list[pd.DataFrame] = []
+
+    for day in [day1, day2]:
+        if input_format == "grid_series":
+            # Every device of a day is a directory of the store, next to the hidden directories the series point to
+            device_ids: list[str] = sorted(
+                name
+                for name in os.listdir(day)
+                if not name.startswith(".") and os.path.isdir(os.path.join(day, name))
+            )
+            frames.extend(
+                read_series(os.path.join(day, device_id)).assign(device_id=device_id)
+                for device_id in shard.select(device_ids)
+            )
+        else:
+            frames.append(shard.read_day_parquet(day, list(input_schema.keys())))
+
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=list(input_schema.keys())).astype(input_schema)
+
+    fleet_df: pd.DataFrame = pd.concat(frames)[list(input_schema.keys())].astype(input_schema)
+
+    # A series holds a single observation per slot
+    return fleet_df if input_format == "grid_series" else fleet_df.drop_duplicates()
+
+
+def main() -> None:  # noqa: PLR0912, PLR0915, C901
     """The algo requires an input a timeseries in csv with raw data of parameters of 'temperature',
     'humidity', 'wind_speed', 'wind_direction', 'pressure' and 'illuminance'. The following are conducted:
      - create a new timeframe with fixed time interval
@@ -35,44 +107,144 @@ def main():
 
     parser = argparse.ArgumentParser(description="OBC SQC Direct Inference")
 
-    parser.add_argument("--device_id", help="Device ID", required=True)
+    parser.add_argument("--device_id", help="Device ID, every device of the day files is scored when not given")
     parser.add_argument("--date", help="", required=True)
     parser.add_argument("--day1", help="", required=True)
     parser.add_argument("--day2", help="", required=True)
     parser.add_argument("--output_file_path", help="", default="output.parquet")
+    parser.add_argument(
+        "--input_format",
+        help="parquet: day1/day2 are day parquet files, grid_series: day1/day2 are day directories of a series store",
+        choices=["parquet", "grid_series"],
+        default="parquet",
+    )
+    parser.add_argument(
+        "--stage_report", help="JSON file of the per-stage timings, row counts and peak memory", default=None
+    )
+    parser.add_argument(
+        "--engine",
+        help="Engine of the checks, polars requires the optional polars package",
+        choices=ObcSqcCheck.ENGINES,
+        default="pandas",
+    )
+    parser.add_argument("--shard_index", help="Shard of the devices to score, from 0 to shard_count - 1", type=int)
+    parser.add_argument("--shard_count", help="Number of shards the devices are split into", type=int)
+    parser.add_argument("--score_workers", help="Processes scoring the devices", type=int, default=1)
+    parser.add_argument(
+        "--batch_size",
+        help="Devices of the same model checked together by the NumPy batch engine, 1 to check each on its own",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--value_dtype",
+        help="dtype the weather values of every device are held in until scored, float32 halves their memory",
+        choices=SchemaDefinitions.storage_dtypes(),
+        default="float64",
+    )
+    parser.add_argument("--profile_dir", help="Directory of the cProfile captures of sampled and slow devices")
+    parser.add_argument("--profile_every", help="Profile one in this many devices, 0 for none", type=int, default=0)
+    parser.add_argument("--profile_slow_seconds", help="Profile the devices slower than this [s]", type=float)
+    parser.add_argument(
+        "--output_format",
+        help="parquet: a single parquet file, dataset: output_file_path is the root of a parquet dataset "
+        "partitioned by date and model, shared by the shards. Only for scoring every device, not with --device_id",
+        choices=["parquet", "dataset"],
+        default="parquet",
+    )
 
     (k_args, unknown_args) = parser.parse_known_args(sys.argv[1:])
 
     args = vars(k_args)
 
+    if (args["shard_index"] is None) != (args["shard_count"] is None):
+        parser.error("--shard_index and --shard_count must be given together")
+    if args["device_id"] is not None and args["shard_count"] is not None:
+        parser.error("--device_id cannot be combined with --shard_index/--shard_count")
+    if args["device_id"] is not None and args["output_format"] == "dataset":
+        parser.error("--output_format dataset cannot be combined with --device_id")
+    if args["batch_size"] > 1 and (args["engine"] != "pandas" or args["profile_dir"] is not None):
+        parser.error("--batch_size cannot be combined with --engine polars or --profile_dir")
+
     # Convert start and end dates to datetime
-    input_date: datetime = datetime.datetime.strptime(args["date"], "%Y-%m-%d")
+    input_date: datetime.datetime = datetime.datetime.strptime(args["date"], "%Y-%m-%d")
     starting_date = input_date - pd.Timedelta(hours=6)
     end_date = input_date + pd.Timedelta(hours=23, minutes=59, seconds=59)
 
+    if args["device_id"] is None:
+        shard: Shard = Shard(args["shard_index"] or 0, args["shard_count"] or 1)
+        fleet_df: pd.DataFrame = read_shard(
+            args["day1"], args["day2"], args["input_format"], shard, args["value_dtype"]
+        )
+        fleet_df = fleet_df[
+            (fleet_df["utc_datetime"] >= starting_date) & (fleet_df["utc_datetime"] <= end_date)
+        ].reset_index(drop=True)
+
+        score_fn: Callable[[pd.DataFrame], pd.DataFrame] = partial(ObcSqcCheck.run, engine=args["engine"])
+        if args["profile_dir"] is not None:
+            score_fn = ProfilingSampler(
+                args["profile_dir"], args["profile_every"], args["profile_slow_seconds"], score_fn
+            )
+        outcomes: list[DeviceOutcome] = BatchScoring.score_devices(
+            fleet_df, score_fn, args["score_workers"], args["batch_size"]
+        )
+        for outcome in outcomes:
+            if outcome.result is None:
+                logger.error("Failed to score device %s: %s", outcome.device_id, outcome.exception)
+
+        if args["output_format"] == "dataset":
+            # Every shard adds files of its own to the dataset, so there is nothing to merge afterwards
+            with PartitionedResultWriter(args["output_file_path"], args["date"]) as writer:
+                for outcome in outcomes:
+                    writer.write(BatchScoring.combine([outcome]))
+            return
+
+        # The output of a shard is keyed by the shard, to be combined by obc_sqc.iface.sharding
+        output_file_path: str = args["output_file_path"]
+        if args["shard_count"] is not None:
+            output_file_path = shard.path(output_file_path)
+        BatchScoring.combine(outcomes).to_parquet(f"{output_file_path}.parquet", index=False)
+        return
+
     # QoD object/model/classifier
     qod_model = ObcSqcCheck()
 
-    df1: pd.DataFrame = pd.read_parquet(args["day1"]).query(f"device_id == '{args['device_id']}'")
-    df2: pd.DataFrame = pd.read_parquet(args["day2"]).query(f"device_id == '{args['device_id']}'")
-    device_df: pd.DataFrame = (
-        pd.concat(
-            [
-                df1,
-                df2,
-            ]
+    if args["input_format"] == "grid_series":
+        # The series are memory-mapped and their frames are views of the mapped arrays, already typed and holding a
+        # single observation per slot. Sorted by time, the window is a slice of each of them, so only its rows are
+        # read and copied, once, by the concatenation
+        frames: list[pd.DataFrame] = []
+        for day in [args["day1"], args["day2"]]:
+            day_df: pd.DataFrame = read_series(os.path.join(day, args["device_id"]))
+            first: int = day_df["utc_datetime"].searchsorted(starting_date, side="left")
+            last: int = day_df["utc_datetime"].searchsorted(end_date, side="right")
+            frames.append(day_df.iloc[first:last])
+        df_with_schema: pd.DataFrame = pd.concat(frames, ignore_index=True)
+    else:
+        df1 = pd.read_parquet(args["day1"]).query(f"device_id == '{args['device_id']}'").drop(columns=["device_id"])
+        df2 = pd.read_parquet(args["day2"]).query(f"device_id == '{args['device_id']}'").drop(columns=["device_id"])
+
+        device_df: pd.DataFrame = (
+            pd.concat(
+                [
+                    df1,
+                    df2,
+                ]
+            )
+            .astype(SchemaDefinitions.qod_input_schema())
+            .drop_duplicates()
         )
-        .drop(columns=["device_id"])
-        .astype(SchemaDefinitions.qod_input_schema())
-        .drop_duplicates()
-    )
 
-    # In-memory filtering
-    df_with_schema: pd.DataFrame = device_df[
-        (device_df["utc_datetime"] >= str(starting_date)) & (device_df["utc_datetime"] <= str(end_date))
-    ].reset_index(drop=True)
+        # In-memory filtering
+        df_with_schema = device_df[
+            (device_df["utc_datetime"] >= starting_date) & (device_df["utc_datetime"] <= end_date)
+        ].reset_index(drop=True)
 
-    result_df: pd.DataFrame = qod_model.run(df_with_schema)
+    with StageInstrumentation(enabled=args["stage_report"] is not None) as stages:
+        result_df: pd.DataFrame = qod_model.run(df_with_schema, stages, args["engine"], args["date"])
+    if args["stage_report"] is not None:
+        with open(args["stage_report"], "w", encoding="utf-8") as f:
+            json.dump(stages.report(), f, indent=2)
     result_df.to_parquet(f"{args['output_file_path']}.parquet", index=False)
 
 
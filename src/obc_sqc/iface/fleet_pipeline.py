@@ -0,0 +1,397 @@
+from __future__ import annotations
+
+import datetime
+import io
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Iterable
+
+import pandas as pd
+
+from obc_sqc.schema.schema import SchemaDefinitions
+
+if TYPE_CHECKING:
+    from obc_sqc.storage.progress_journal import ProgressJournal
+
+logger = logging.getLogger("obc_sqc")
+
+
+class DeviceReader:
+    """Reads the raw data a device needs for the QoD of a date: the date itself and the 6 hours before it.
+
+    The data are expected in a hive-partitioned dataset, i.e. {root}/device_id={device_id}/date={%Y-%m-%d}/*.parquet,
+    and only the partitions of the window are read. Subclasses implement read_partitions() for a storage backend.
+    """
+
+    def __init__(self, date: str) -> None:
+        """Sets the window of the reader.
+
+        Args:
+        ----
+            date (str): the date to calculate QoD for, formatted as %Y-%m-%d
+        """
+        input_date: datetime.datetime = datetime.datetime.strptime(date, "%Y-%m-%d")
+        self.starting_date: pd.Timestamp = pd.Timestamp(input_date - pd.Timedelta(hours=6))
+        self.end_date: pd.Timestamp = pd.Timestamp(input_date + pd.Timedelta(hours=23, minutes=59, seconds=59))
+
+    def partition_dates(self) -> list[str]:
+        """Returns the date partitions that overlap with the window.
+
+        Args:
+        ----
+            None
+
+        Returns:
+        -------
+            list[str]: the dates, formatted as %Y-%m-%d
+        """
+        return [str(d.date()) for d in pd.date_range(self.starting_date.normalize(), self.end_date.normalize())]
+
+    def read_partitions(self, device_id: str) -> list[pd.DataFrame]:
+        """Reads the date partitions of a device.
+
+        Args:
+        ----
+            device_id (str): the device ID
+
+        Returns:
+        -------
+            list[pd.DataFrame]: one dataframe per parquet file found
+        """
+        raise NotImplementedError
+
+    def __call__(self, device_id: str) -> pd.DataFrame:
+        """Reads the data of a device and keeps only the rows within the window.
+
+        Args:
+        ----
+            device_id (str): the device ID
+
+        Returns:
+        -------
+            pd.DataFrame: the raw data, following SchemaDefinitions.qod_input_schema(), empty when the device has
+                          no partition in the window
+        """
+        input_schema: dict = SchemaDefinitions.qod_input_schema()
+        frames: list[pd.DataFrame] = self.read_partitions(device_id)
+        if not frames:
+            logger.warning("No data found for device %s in %s", device_id, self.partition_dates())
+            return pd.DataFrame(columns=list(input_schema.keys())).astype(input_schema)
+
+        device_df: pd.DataFrame = (
+            pd.concat([frame[list(input_schema.keys())] for frame in frames], ignore_index=True)
+            .astype(input_schema)
+            .drop_duplicates()
+        )
+
+        # In-memory filtering
+        return device_df[
+            (device_df["utc_datetime"] >= self.starting_date) & (device_df["utc_datetime"] <= self.end_date)
+        ].reset_index(drop=True)
+
+
+class LocalDeviceReader(DeviceReader):
+    """Reads device data from a dataset on the local filesystem."""
+
+    def __init__(self, root: str, date: str) -> None:
+        """Creates the reader.
+
+        Args:
+        ----
+            root (str): the root directory of the dataset
+            date (str): the date to calculate QoD for, formatted as %Y-%m-%d
+        """
+        super().__init__(date)
+        self.root: str = root
+
+    def read_partitions(self, device_id: str) -> list[pd.DataFrame]:  # noqa: D102
+        frames: list[pd.DataFrame] = []
+        for date in self.partition_dates():
+            partition: str = os.path.join(self.root, f"device_id={device_id}", f"date={date}")
+            if os.path.isdir(partition):
+                frames.append(pd.read_parquet(partition))
+
+        return frames
+
+
+class S3DeviceReader(DeviceReader):
+    """Reads device data from a dataset on S3.
+
+    A single S3 client is shared by all the reader threads. Clients are thread-safe and keep a pool of
+    connections, so concurrent reads reuse established connections instead of opening a session per device.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        date: str,
+        prefix: str = "device_data/by_device_date",
+        max_pool_connections: int = 16,
+        endpoint_url: str | None = None,
+    ) -> None:
+        """Creates the reader and its S3 client.
+
+        Args:
+        ----
+            bucket (str): the bucket of the dataset
+            date (str): the date to calculate QoD for, formatted as %Y-%m-%d
+            prefix (str): the key prefix of the dataset within the bucket
+            max_pool_connections (int): the size of the connection pool, should be >= the number of reader threads
+            endpoint_url (str | None): a custom S3 endpoint, e.g. a local stand-in
+        """
+        import boto3  # noqa: PLC0415
+        from botocore.config import Config  # noqa: PLC0415
+
+        super().__init__(date)
+        self.bucket: str = bucket
+        self.prefix: str = prefix
+        self.client = boto3.session.Session().client(
+            "s3", endpoint_url=endpoint_url, config=Config(max_pool_connections=max_pool_connections)
+        )
+
+    def read_partitions(self, device_id: str) -> list[pd.DataFrame]:  # noqa: D102
+        frames: list[pd.DataFrame] = []
+        paginator = self.client.get_paginator("list_objects_v2")
+
+        for date in self.partition_dates():
+            partition: str = f"{self.prefix}/device_id={device_id}/date={date}/"
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=partition):
+                for item in page.get("Contents", []):
+                    body: bytes = self.client.get_object(Bucket=self.bucket, Key=item["Key"])["Body"].read()
+                    frames.append(pd.read_parquet(io.BytesIO(body)))
+
+        return frames
+
+
+class DirectoryResultWriter:
+    """Writes the result of every device to {output_dir}/{device_id}.csv.
+
+    A result is written under a temporary name and renamed once complete, so a file found in output_dir always
+    holds a whole result, even after a crash.
+    """
+
+    def __init__(self, output_dir: str) -> None:
+        """Creates the writer.
+
+        Args:
+        ----
+            output_dir (str): the directory of the results, created if missing
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir: str = output_dir
+
+    def __call__(self, device_id: str, result_df: pd.DataFrame) -> str:
+        """Writes the result of a device.
+
+        Args:
+        ----
+            device_id (str): the device ID
+            result_df (pd.DataFrame): the QoD result of the device
+
+        Returns:
+        -------
+            str: the file of the result
+        """
+        path: str = os.path.join(self.output_dir, f"{device_id}.csv")
+        result_df.to_csv(f"{path}.tmp", index=True)
+        os.replace(f"{path}.tmp", path)
+
+        return path
+
+
+class FleetPipeline:
+    """Scores a list of devices with overlapping reads, scoring and writes.
+
+    The pipeline has three stages connected with bounded queues:
+     - reader threads prefetch the data of the next devices,
+     - a worker pool scores the devices whose data are available,
+     - a writer thread writes the results, in the order the devices were scheduled.
+    At most queue_size devices wait to be scored and at most queue_size devices are being scored or wait to be
+    written, so memory stays bounded regardless of the number of devices. A failing device is reported and
+    does not stop the rest of the fleet.
+
+    Given the date of the devices, score_fn is called with it as the date keyword, so that a device without any
+    observation in its window, or without any partition at all, gets the NO_DATA result of the date, as
+    ObcSqcCheck.run does.
+
+    The scoring processes are started with the forkserver (or spawn) method rather than forked, as forking while
+    the reader and writer threads hold locks could leave the workers deadlocked.
+
+    Given a ProgressJournal, every written or failed device is recorded in it as soon as it finishes, and the
+    devices already completed for the date by a previous run are skipped. When the results only reach their files
+    once the writer is closed, e.g. with a PartitionedResultWriter, the writer is closed through commit_fn and the
+    written devices are only recorded after it returns, so a crash before then leaves them to be scored again.
+    """
+
+    def __init__(
+        self,
+        read_fn: Callable[[str], pd.DataFrame],
+        score_fn: Callable[..., pd.DataFrame],
+        write_fn: Callable[[str, pd.DataFrame], str | None],
+        read_workers: int = 8,
+        score_workers: int | None = None,
+        queue_size: int = 16,
+        use_processes: bool = True,
+        journal: ProgressJournal | None = None,
+        date: str | None = None,
+        commit_fn: Callable[[], object] | None = None,
+    ) -> None:
+        """Creates the pipeline.
+
+        Args:
+        ----
+            read_fn (Callable[[str], pd.DataFrame]): reads the data of a device, e.g. an S3DeviceReader
+            score_fn (Callable[..., pd.DataFrame]): scores the data of a device, e.g. ObcSqcCheck.run, taking the
+                                                    date keyword when date is given. Must be picklable when
+                                                    use_processes is True
+            write_fn (Callable[[str, pd.DataFrame], str | None]): writes the result of a device, returning the
+                                                                   file it was written to, if any
+            read_workers (int): the number of reader threads
+            score_workers (int | None): the size of the scoring pool, defaults to the number of CPUs
+            queue_size (int): the capacity of each queue
+            use_processes (bool): score in a process pool (for the CPU-bound QoD) or in a thread pool
+            journal (ProgressJournal | None): the journal of the completed devices, to resume an interrupted run
+            date (str | None): the date the devices are scored for, formatted as %Y-%m-%d, passed on to score_fn.
+                               Required with a journal
+            commit_fn (Callable[[], object] | None): called once every result is handed to write_fn, before the
+                                                     written devices are recorded in the journal, e.g.
+                                                     PartitionedResultWriter.close
+        """
+        if journal is not None and date is None:
+            raise ValueError("A journaled pipeline needs the date of its devices")
+
+        self.read_fn: Callable[[str], pd.DataFrame] = read_fn
+        self.score_fn: Callable[..., pd.DataFrame] = score_fn
+        self.write_fn: Callable[[str, pd.DataFrame], str | None] = write_fn
+        self.read_workers: int = read_workers
+        self.score_workers: int = score_workers or os.cpu_count() or 1
+        self.queue_size: int = queue_size
+        self.use_processes: bool = use_processes
+        self.journal: ProgressJournal | None = journal
+        self.date: str | None = date
+        self.commit_fn: Callable[[], object] | None = commit_fn
+
+    def record(self, device_id: str, status: str, output: str | None = None) -> None:
+        """Records the outcome of a device in the journal, if any.
+
+        Args:
+        ----
+            device_id (str): the device ID
+            status (str): "success" or "failure"
+            output (str | None): the file of the result
+        """
+        # __init__ refuses a journal without a date
+        if self.journal is not None and self.date is not None:
+            self.journal.record(device_id, self.date, status, output)
+
+    def run(self, device_ids: Iterable[str]) -> dict[str, str]:  # noqa: PLR0915, C901
+        """Scores all the devices.
+
+        Args:
+        ----
+            device_ids (Iterable[str]): the IDs of the devices
+
+        Returns:
+        -------
+            dict[str, str]: the status of every device scored, "success" or "failure", leaving out the devices
+                            skipped as completed by a previous run
+        """
+        device_ids = list(dict.fromkeys(device_ids))
+        statuses: dict[str, str] = {}
+
+        if self.journal is not None and self.date is not None:
+            completed: set[str] = {
+                device_id for device_id in device_ids if self.journal.is_completed(device_id, self.date)
+            }
+            if completed:
+                logger.info("Skipping %d devices completed by a previous run", len(completed))
+            device_ids = [device_id for device_id in device_ids if device_id not in completed]
+
+        pending_ids: queue.Queue[str] = queue.Queue()
+        for device_id in device_ids:
+            pending_ids.put(device_id)
+
+        read_queue: queue.Queue[tuple[str, pd.DataFrame | None]] = queue.Queue(maxsize=self.queue_size)
+        write_queue: queue.Queue[tuple[str, Future] | None] = queue.Queue()
+        in_flight: threading.BoundedSemaphore = threading.BoundedSemaphore(self.queue_size)
+
+        # The written devices waiting for commit_fn before they are recorded
+        uncommitted: list[tuple[str, str | None]] = []
+
+        def read() -> None:
+            while True:
+                try:
+                    device_id: str = pending_ids.get_nowait()
+                except queue.Empty:
+                    return
+
+                try:
+                    read_queue.put((device_id, self.read_fn(device_id)))
+                except Exception as e:
+                    logger.error("Failed to read device %s: %r", device_id, e)
+                    read_queue.put((device_id, None))
+
+        def write() -> None:
+            while (item := write_queue.get()) is not None:
+                device_id, future = item
+                try:
+                    output: str | None = self.write_fn(device_id, future.result())
+                    statuses[device_id] = "success"
+                    if self.commit_fn is None:
+                        self.record(device_id, "success", output)
+                    else:
+                        uncommitted.append((device_id, output))
+                except Exception as e:
+                    logger.error("Failed to score device %s: %r", device_id, e)
+                    statuses[device_id] = "failure"
+                    self.record(device_id, "failure")
+                finally:
+                    in_flight.release()
+
+        readers: list[threading.Thread] = [
+            threading.Thread(target=read, name=f"qod-reader-{i}", daemon=True)
+            for i in range(min(self.read_workers, len(device_ids)))
+        ]
+        writer: threading.Thread = threading.Thread(target=write, name="qod-writer", daemon=True)
+        for thread in [*readers, writer]:
+            thread.start()
+
+        make_pool: Callable[[], Executor] = partial(ThreadPoolExecutor, max_workers=self.score_workers)
+        if self.use_processes:
+            start_method: str = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            make_pool = partial(
+                ProcessPoolExecutor,
+                max_workers=self.score_workers,
+                mp_context=multiprocessing.get_context(start_method),
+            )
+
+        score_kwargs: dict[str, str] = {} if self.date is None else {"date": self.date}
+        with make_pool() as pool:
+            # Every device comes out of the read queue exactly once, either with its data or as a failed read
+            for _ in range(len(device_ids)):
+                device_id, device_df = read_queue.get()
+                if device_df is None:
+                    statuses[device_id] = "failure"
+                    self.record(device_id, "failure")
+                    continue
+
+                device_df.attrs["device_id"] = device_id
+                in_flight.acquire()
+                write_queue.put((device_id, pool.submit(self.score_fn, device_df, **score_kwargs)))
+
+        write_queue.put(None)
+        writer.join()
+        for thread in readers:
+            thread.join()
+
+        if self.commit_fn is not None:
+            self.commit_fn()
+            for device_id, output in uncommitted:
+                self.record(device_id, "success", output)
+
+        return {device_id: statuses[device_id] for device_id in device_ids}
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+
+from obc_sqc.storage.grid_series import GridSeries
+
+logger = logging.getLogger("obc_sqc")
+logger.addHandler(logging.StreamHandler())
+logger.setLevel(logging.DEBUG)
+
+
+def main() -> None:
+    """Converts a day parquet, as consumed by file_model_inference, to a grid series store.
+
+    Each device of the day is written to {output_root}/{day}/{device_id}, which can then be passed to
+    file_model_inference with --input_format grid_series --day1 {output_root}/{day1} --day2 {output_root}/{day2}.
+    """
+    parser = argparse.ArgumentParser(description="OBC SQC grid series converter")
+
+    parser.add_argument("--day_file", help="Path of the day parquet", required=True)
+    parser.add_argument("--day", help="The day of the parquet, formatted as %Y_%m_%d", required=True)
+    parser.add_argument("--output_root", help="Root directory of the series store", required=True)
+    parser.add_argument("--dtype", help="dtype of the stored values", choices=["float64", "float32"], default="float64")
+
+    (k_args, unknown_args) = parser.parse_known_args(sys.argv[1:])
+
+    args = vars(k_args)
+
+    converted: int = GridSeries.convert_day_parquet(args["day_file"], args["output_root"], args["day"], args["dtype"])
+    logger.info("Converted %d devices of %s to %s", converted, args["day"], args["output_root"])
+
+
+if __name__ == "__main__":
+    main()
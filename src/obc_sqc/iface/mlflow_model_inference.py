@@ -39,23 +39,11 @@ if __name__ == "__main__":
     starting_date = input_date - pd.Timedelta(hours=6)
     end_date = input_date + pd.Timedelta(hours=23, minutes=59, seconds=59)
 
-    qod_input_schema = {
-        "temperature": "Float64",
-        "humidity": "Float64",
-        "wind_speed": "Float64",
-        "wind_direction": "Float64",
-        "pressure": "Float64",
-        "illuminance": "Float64",
-        "precipitation_accumulated": "Float64",
-        "model": str,
-        "utc_datetime": str,
-    }
-
     wr_df: pd.DataFrame = (
         wr.s3.read_parquet(
             f"s3://wxm-lake/device_data/by_device_date/device_id={args['device_id']}/",
             dataset=True,
-            columns=list(qod_input_schema.keys()),
+            columns=list(SchemaDefinitions.qod_input_schema().keys()),
             partition_filter=lambda x: (str(starting_date.date()) <= x["date"] <= str(end_date.date())),
         )
         .drop(columns=["device_id", "date"])
@@ -65,9 +53,12 @@ if __name__ == "__main__":
 
     # In-memory filtering
     df_with_schema: pd.DataFrame = wr_df[
-        (wr_df["utc_datetime"] >= str(starting_date)) & (wr_df["utc_datetime"] <= str(end_date))
+        (wr_df["utc_datetime"] >= starting_date) & (wr_df["utc_datetime"] <= end_date)
     ].reset_index(drop=True)
 
+    # The signature of the registered model expects utc_datetime as a string
+    df_with_schema["utc_datetime"] = df_with_schema["utc_datetime"].dt.strftime("%Y-%m-%d %H:%M:%S")
+
     pd.set_option("display.max_rows", 500)
     pd.set_option("display.max_columns", 500)
     pd.set_option("display.width", 1000)
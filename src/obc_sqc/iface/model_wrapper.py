@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import datetime
-import os
 import socket
 import traceback
 from typing import Any
@@ -9,37 +8,42 @@ from typing import Any
 import mlflow
 import pandas as pd
 
+from obc_sqc.iface.batch_scoring import BatchScoring, DeviceOutcome
+from obc_sqc.iface.opensearch_logging import BulkLogShipper
 from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from obc_sqc.model.stage_instrumentation import StageInstrumentation
 from obc_sqc.schema.schema import SchemaDefinitions
-import awswrangler as wr
-import opensearchpy
 import logging
 
 logger = logging.getLogger("obc_sqc")
 
 
 class ObcSqcCheckWrapper(mlflow.pyfunc.PythonModel):  # noqa: D101
-    def setup_os_logging(self) -> None:
-        cur_date: str = str(datetime.datetime.now().date())
-        self.es_index: str = f"mlflow-qod-logs-{cur_date}"
-        self.opensearch_client: opensearchpy.OpenSearch = wr.opensearch.connect(
-            host=os.environ["ES_QOD_HOST"], username=os.environ["ES_QOD_USER"], password=os.environ["ES_QOD_PASSWORD"]
-        )
+    def ship_log(self, doc_info: dict, log_to_opensearch: bool) -> None:
+        # Documents are buffered by the process-wide shipper and indexed in bulk from its background thread
+        if log_to_opensearch:
+            BulkLogShipper.shared().log(doc_info)
+        elif doc_info["status"] == "success":
+            logger.info(doc_info)
+        else:
+            logger.error(doc_info)
 
     def predict(self, context, model_input: pd.DataFrame, params: dict[str, Any] | None = None) -> pd.DataFrame:
+        # A long-format frame with the data of many devices is scored per device
+        if "device_id" in model_input.columns:
+            return self.predict_batch(model_input, params)
+
         log_to_opensearch: bool = params["log_to_opensearch"]
         device_id: str = params["device_id"]
+        instrument_stages: bool = params.get("instrument_stages", False)
         cur_date: str = str(datetime.datetime.now().date())
         proc_ts_utc: str = f"{datetime.datetime.now().replace(microsecond=0).isoformat()}.000Z"
 
         try:
-            # Log to an OS index
-            if log_to_opensearch:
-                self.setup_os_logging()
-
             # Inference
             model: ObcSqcCheck = ObcSqcCheck()
-            result: pd.DataFrame = model.run(model_input)
+            with StageInstrumentation(enabled=instrument_stages) as stages:
+                result: pd.DataFrame = model.run(model_input, stages)
             result_score: float = result["qod_score"].iloc[0]
 
             doc_info: dict = {
@@ -50,11 +54,10 @@ class ObcSqcCheckWrapper(mlflow.pyfunc.PythonModel):  # noqa: D101
                 "score": result_score,
                 "status": "success",
             }
+            if instrument_stages:
+                doc_info["stages"] = stages.report()
 
-            if log_to_opensearch:
-                wr.opensearch.index_documents(self.opensearch_client, documents=[doc_info], index=self.es_index)
-            else:
-                logger.info(doc_info)
+            self.ship_log(doc_info, log_to_opensearch)
 
             return result
         except Exception as _:
@@ -70,14 +73,36 @@ class ObcSqcCheckWrapper(mlflow.pyfunc.PythonModel):  # noqa: D101
                 "status": "failure",
             }
 
-            if log_to_opensearch:
-                wr.opensearch.index_documents(self.opensearch_client, documents=[doc_info], index=self.es_index)
-            else:
-                logger.error(doc_info)
+            self.ship_log(doc_info, log_to_opensearch)
 
             return pd.DataFrame(columns=SchemaDefinitions.mlflow_obc_sqc_schema().keys()).astype(
                 SchemaDefinitions.mlflow_obc_sqc_schema()
             )
-        finally:
-            if log_to_opensearch:
-                self.opensearch_client.close()
+
+    def predict_batch(self, model_input: pd.DataFrame, params: dict[str, Any] | None = None) -> pd.DataFrame:
+        """Scores every device of a long-format frame, holding a "device_id" column.
+
+        A failing device is reported with status "failure" and does not affect the rest of the batch.
+        """
+        log_to_opensearch: bool = params["log_to_opensearch"]
+        max_workers: int = params.get("max_workers", 1)
+        cur_date: str = str(datetime.datetime.now().date())
+        proc_ts_utc: str = f"{datetime.datetime.now().replace(microsecond=0).isoformat()}.000Z"
+
+        outcomes: list[DeviceOutcome] = BatchScoring.score_devices(model_input, ObcSqcCheck.run, max_workers)
+
+        for outcome in outcomes:
+            doc_info: dict = {
+                "@timestamp": proc_ts_utc,
+                "hostname": socket.gethostname(),
+                "device_id": outcome.device_id,
+                "date": cur_date,
+            }
+            if outcome.result is not None:
+                doc_info.update(score=outcome.result["qod_score"].iloc[0], status="success")
+            else:
+                doc_info.update(exception=outcome.exception, status="failure")
+
+            self.ship_log(doc_info, log_to_opensearch)
+
+        return BatchScoring.combine(outcomes)
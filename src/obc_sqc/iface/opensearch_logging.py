@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import atexit
+import collections
+import datetime
+import logging
+import os
+import threading
+from typing import Any
+
+logger = logging.getLogger("obc_sqc")
+
+
+class BulkLogShipper:
+    """Ships status documents to OpenSearch in bulk, from a background thread.
+
+    Documents are buffered in memory and sent with a single bulk request whenever max_batch_size documents are
+    waiting or flush_interval seconds have passed, whichever comes first. The client is created once and reused
+    by every flush, so logging a document never waits for a connection or an index round trip. Documents that
+    fail to be shipped are put back in the buffer and retried with the next flush; when more than max_buffer_size
+    documents are waiting, the oldest are dropped.
+    """
+
+    _shared: BulkLogShipper | None = None
+    _shared_lock: threading.Lock = threading.Lock()
+
+    def __init__(
+        self,
+        client: Any,
+        index_prefix: str = "mlflow-qod-logs",
+        max_batch_size: int = 500,
+        flush_interval: float = 5.0,
+        max_buffer_size: int = 100_000,
+    ) -> None:
+        """Creates the shipper and starts its flush thread.
+
+        Args:
+        ----
+            client (opensearchpy.OpenSearch): the client used for all bulk requests
+            index_prefix (str): documents are indexed to {index_prefix}-{%Y-%m-%d of the day they were logged}
+            max_batch_size (int): the number of buffered documents that triggers a flush
+            flush_interval (float): the max time a document waits in the buffer [in seconds]
+            max_buffer_size (int): the max number of buffered documents
+        """
+        self.client: Any = client
+        self.index_prefix: str = index_prefix
+        self.max_batch_size: int = max_batch_size
+        self.flush_interval: float = flush_interval
+
+        self._buffer: collections.deque[tuple[str, dict]] = collections.deque(maxlen=max_buffer_size)
+        self._lock: threading.Lock = threading.Lock()
+        self._flush_lock: threading.Lock = threading.Lock()
+        self._wake_up: threading.Event = threading.Event()
+        self._closed: bool = False
+
+        self._thread: threading.Thread = threading.Thread(target=self._run, name="qod-log-shipper", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def connect_from_env(pool_maxsize: int = 4) -> Any:
+        """Creates an OpenSearch client from the ES_QOD_HOST, ES_QOD_PORT, ES_QOD_USER and ES_QOD_PASSWORD variables.
+
+        ES_QOD_HOST may be given as a URL, i.e. with an https:// prefix. ES_QOD_PORT defaults to 443.
+
+        Args:
+        ----
+            pool_maxsize (int): the max number of connections kept open to the cluster
+
+        Returns:
+        -------
+            opensearchpy.OpenSearch: the client
+        """
+        import opensearchpy  # noqa: PLC0415
+
+        host: str = os.environ["ES_QOD_HOST"].removeprefix("https://").rstrip("/")
+
+        return opensearchpy.OpenSearch(
+            hosts=[{"host": host, "port": int(os.environ.get("ES_QOD_PORT", "443"))}],
+            http_auth=(os.environ["ES_QOD_USER"], os.environ["ES_QOD_PASSWORD"]),
+            use_ssl=True,
+            verify_certs=True,
+            pool_maxsize=pool_maxsize,
+        )
+
+    @staticmethod
+    def shared() -> BulkLogShipper:
+        """Returns the shipper of the process, creating it from the environment on first use.
+
+        The shared shipper is flushed and closed when the interpreter exits.
+
+        Args:
+        ----
+            None
+
+        Returns:
+        -------
+            BulkLogShipper: the shared shipper
+        """
+        with BulkLogShipper._shared_lock:
+            if BulkLogShipper._shared is None:
+                BulkLogShipper._shared = BulkLogShipper(BulkLogShipper.connect_from_env())
+                atexit.register(BulkLogShipper._shared.close)
+
+            return BulkLogShipper._shared
+
+    def log(self, doc: dict) -> None:
+        """Buffers a document to be shipped.
+
+        Args:
+        ----
+            doc (dict): the document
+        """
+        if self._closed:
+            raise RuntimeError("The log shipper is closed")
+
+        index: str = f"{self.index_prefix}-{datetime.datetime.now().date()}"
+        with self._lock:
+            self._buffer.append((index, doc))
+            full: bool = len(self._buffer) >= self.max_batch_size
+
+        if full:
+            self._wake_up.set()
+
+    def pending(self) -> int:
+        """Returns the number of buffered documents.
+
+        Args:
+        ----
+            None
+
+        Returns:
+        -------
+            int: the number of documents waiting to be shipped
+        """
+        with self._lock:
+            return len(self._buffer)
+
+    def flush(self) -> int:
+        """Ships all the buffered documents, in bulk requests of up to max_batch_size documents.
+
+        Args:
+        ----
+            None
+
+        Returns:
+        -------
+            int: the number of documents shipped
+        """
+        shipped: int = 0
+
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch: list[tuple[str, dict]] = [
+                        self._buffer.popleft() for _ in range(min(self.max_batch_size, len(self._buffer)))
+                    ]
+                if not batch:
+                    return shipped
+
+                body: list[dict] = []
+                for index, doc in batch:
+                    body.extend(({"index": {"_index": index}}, doc))
+
+                try:
+                    response: dict = self.client.bulk(body=body)
+                except Exception as e:
+                    logger.error("Failed to ship %d log documents: %r", len(batch), e)
+                    # Put the batch back ahead of the documents logged meanwhile. Refilling the bounded buffer in
+                    # time order drops the oldest documents when it overflows
+                    with self._lock:
+                        requeued: list[tuple[str, dict]] = [*batch, *self._buffer]
+                        self._buffer.clear()
+                        self._buffer.extend(requeued)
+                    return shipped
+
+                if response.get("errors"):
+                    failed: int = sum(1 for item in response["items"] if item["index"].get("error"))
+                    logger.error("%d of %d log documents were rejected", failed, len(batch))
+
+                shipped += len(batch)
+
+    def close(self) -> None:
+        """Stops the flush thread, ships the remaining documents and closes the client."""
+        if self._closed:
+            return
+
+        self._closed = True
+        self._wake_up.set()
+        self._thread.join()
+        self.flush()
+        self.client.close()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake_up.wait(self.flush_interval)
+            self._wake_up.clear()
+            self.flush()
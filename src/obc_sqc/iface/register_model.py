@@ -3,6 +3,7 @@ from __future__ import annotations
 import mlflow
 
 from obc_sqc.iface.model_wrapper import ObcSqcCheckWrapper
+from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
 from obc_sqc.schema.schema import SchemaDefinitions
 
 
@@ -27,7 +28,9 @@ def main():  # noqa: D103
         print(f"Model info: {model_info}")
 
         cur_model_uri: str = model_info.model_uri
-        model_reg_result = mlflow.register_model(cur_model_uri, "obc_sqc", tags={"project": "qod", "version": "1.0.6"})
+        model_reg_result = mlflow.register_model(
+            cur_model_uri, "obc_sqc", tags={"project": "qod", "version": ObcSqcCheck.QOD_VERSION}
+        )
         print(f"New model version: {model_reg_result.version}")
 
 
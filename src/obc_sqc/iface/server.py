@@ -0,0 +1,474 @@
+from __future__ import annotations
+
+import argparse
+import datetime
+import http.server
+import json
+import logging
+import multiprocessing
+import multiprocessing.pool
+import os
+import signal
+import sys
+import threading
+import time
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from obc_sqc.schema.schema import SchemaDefinitions
+from obc_sqc.storage.result_cache import ResultCache
+
+logger = logging.getLogger("obc_sqc")
+logger.addHandler(logging.StreamHandler())
+logger.setLevel(logging.DEBUG)
+
+
+class ScoringTimeout(TimeoutError):
+    """Raised in a worker process when scoring a request outlives the request timeout."""
+
+
+class InvalidRequest(ValueError):
+    """Raised in a worker process when the payload of a request cannot be turned into the raw data of a device."""
+
+
+class ScoringRequest:
+    """Turns the JSON payload of a request into the raw data of a device.
+
+    A payload holds either the data themselves, as {"records": [{"utc_datetime": ..., "temperature": ..., ...}]},
+    or a reference to a parquet file, as {"file": path, "device_id": optional ID, "date": optional %Y-%m-%d}.
+    For file references, the rows are filtered to the device and to the QoD window of the date. Files are only
+    read from under the file root of the server, and not at all when it has none. The date is passed on to the
+    scoring function, so a device without any observation gets the NO_DATA result of the date.
+    """
+
+    @staticmethod
+    def resolve_file(path: str, file_root: str | None) -> str:
+        """Returns the real path of a referenced file, if it lies under the file root.
+
+        Args:
+        ----
+            path (str): the file of the payload, absolute or relative to the file root
+            file_root (str | None): the directory files may be read from, None to refuse every file
+
+        Returns:
+        -------
+            str: the real path of the file
+        """
+        if file_root is None:
+            raise ValueError("File payloads are disabled, the server has no file root")
+
+        root: str = os.path.realpath(file_root)
+        real_path: str = os.path.realpath(os.path.join(root, path))
+        if os.path.commonpath([root, real_path]) != root:
+            raise ValueError(f"The file {path} is outside of the file root")
+
+        return real_path
+
+    @staticmethod
+    def load(payload: dict[str, Any], file_root: str | None = None) -> pd.DataFrame:
+        """Loads the raw data of a request.
+
+        Args:
+        ----
+            payload (dict[str, Any]): the JSON payload of the request
+            file_root (str | None): the directory file payloads may be read from, None to refuse them
+
+        Returns:
+        -------
+            pd.DataFrame: the raw data, following SchemaDefinitions.qod_input_schema()
+        """
+        input_schema: dict = SchemaDefinitions.qod_input_schema()
+
+        if "records" in payload:
+            # An empty list of records is a device without any observation
+            device_df: pd.DataFrame = pd.DataFrame.from_records(payload["records"])
+            if device_df.empty:
+                device_df = pd.DataFrame(columns=list(input_schema.keys()))
+        elif "file" in payload:
+            device_df = pd.read_parquet(ScoringRequest.resolve_file(payload["file"], file_root))
+            if payload.get("device_id") is not None:
+                device_df = device_df[device_df["device_id"] == payload["device_id"]]
+        else:
+            raise ValueError('The payload must contain either "records" or "file"')
+
+        missing: list[str] = [column for column in input_schema if column not in device_df.columns]
+        if missing:
+            raise ValueError(f"Missing columns {missing}")
+        if device_df.empty and payload.get("date") is None:
+            raise ValueError("No data to score, the date to score must be given")
+
+        device_df = device_df[list(input_schema.keys())].astype(input_schema).drop_duplicates()
+
+        if payload.get("date") is not None:
+            input_date: datetime.datetime = datetime.datetime.strptime(payload["date"], "%Y-%m-%d")
+            starting_date = input_date - pd.Timedelta(hours=6)
+            end_date = input_date + pd.Timedelta(hours=23, minutes=59, seconds=59)
+            device_df = device_df[
+                (device_df["utc_datetime"] >= starting_date) & (device_df["utc_datetime"] <= end_date)
+            ]
+
+        return device_df.reset_index(drop=True)
+
+    @staticmethod
+    def score(
+        payload: dict[str, Any],
+        score_fn: Callable[..., pd.DataFrame],
+        file_root: str | None = None,
+        timeout: float | None = None,
+    ) -> pd.DataFrame:
+        """Loads and scores the data of a request. Runs in the worker processes.
+
+        With a timeout, a SIGALRM aborts the request once it is due, so that the worker is free for the next
+        requests instead of finishing a request whose client was already answered with 504. The errors of loading
+        the payload are raised as InvalidRequest, while those of score_fn are raised as they are.
+
+        Args:
+        ----
+            payload (dict[str, Any]): the JSON payload of the request
+            score_fn (Callable[..., pd.DataFrame]): the scoring function, taking the date keyword when the payload
+                            has a date
+            file_root (str | None): the directory file payloads may be read from, None to refuse them
+            timeout (float | None): the max time the request may take [in seconds], None for no limit
+
+        Returns:
+        -------
+            pd.DataFrame: the result
+        """
+        score_kwargs: dict[str, str] = {} if payload.get("date") is None else {"date": payload["date"]}
+
+        def load_and_score() -> pd.DataFrame:
+            try:
+                device_df: pd.DataFrame = ScoringRequest.load(payload, file_root)
+            except (ValueError, KeyError, TypeError, FileNotFoundError) as e:
+                raise InvalidRequest(repr(e)) from e
+
+            return score_fn(device_df, **score_kwargs)
+
+        if timeout is None:
+            return load_and_score()
+
+        def on_alarm(signum: int, frame: Any) -> None:
+            raise ScoringTimeout(f"Scoring took longer than {timeout}s")
+
+        previous_handler = signal.signal(signal.SIGALRM, on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            return load_and_score()
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+
+
+def warm_up_worker(score_fn: Callable[[pd.DataFrame], pd.DataFrame] | None) -> None:
+    """Initializes a worker process by scoring a synthetic WS2000 day.
+
+    This runs every stage once, so that lazily imported modules and first-call setup of pandas and numpy are
+    paid when the server starts instead of by the first requests.
+
+    Args:
+    ----
+        score_fn (Callable[[pd.DataFrame], pd.DataFrame] | None): the scoring function, None skips the warm-up
+    """
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if score_fn is None:
+        return
+
+    timestamps: pd.DatetimeIndex = pd.date_range("2023-10-29 18:00:00", "2023-10-30 23:57:00", freq="180s")
+    n_rows: int = len(timestamps)
+    hour: np.ndarray = (timestamps.hour + timestamps.minute / 60).to_numpy()
+
+    warm_up_df: pd.DataFrame = pd.DataFrame({
+        "utc_datetime": timestamps,
+        "temperature": np.round(10 + 5 * np.sin((hour - 9) / 24 * 2 * np.pi), 1),
+        "humidity": np.round(70 - 15 * np.sin((hour - 9) / 24 * 2 * np.pi)),
+        "wind_speed": np.round(3 + np.sin(np.arange(n_rows)), 1),
+        "wind_direction": np.arange(n_rows) % 360.0,
+        "pressure": np.full(n_rows, 1013.0) + np.arange(n_rows) % 3 / 10,
+        "illuminance": np.round(np.clip(50000 * np.sin((hour - 6) / 12 * np.pi), 0, None)),
+        "precipitation_accumulated": np.zeros(n_rows),
+        "model": "WS2000",
+    })
+
+    try:
+        score_fn(warm_up_df)
+    except Exception as e:
+        logger.warning("Warm-up of worker failed: %r", e)
+
+
+class QodServer:
+    """An HTTP service scoring devices with a pool of pre-forked, warm worker processes.
+
+    Endpoints:
+     - POST /score: scores the payload described in ScoringRequest and returns {"status", "result"}
+     - GET /health: returns the number of requests in flight and whether the server is draining
+
+    A payload that cannot be loaded is answered with 400 and a request body larger than max_body_bytes with 413,
+    before it is read, while any other failure of scoring is answered with 500. A request running for longer than
+    request_timeout is answered with 504, and aborted in its worker. The requests in flight are counted until
+    their tasks leave the pool, not until they are answered. On drain() (bound to SIGTERM by main()), new requests
+    are answered with 503, requests in flight are given up to drain_timeout to complete and then the server and
+    the pool shut down.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        workers: int | None = None,
+        request_timeout: float = 120.0,
+        drain_timeout: float = 30.0,
+        score_fn: Callable[[pd.DataFrame], pd.DataFrame] = ObcSqcCheck.run,
+        warm_up: bool = True,
+        file_root: str | None = None,
+        max_body_bytes: int = 64 << 20,
+    ) -> None:
+        """Forks and warms up the worker pool and binds the HTTP server.
+
+        Args:
+        ----
+            host (str): the address to listen to
+            port (int): the port to listen to, 0 picks a free port
+            workers (int | None): the number of worker processes, defaults to the number of CPUs
+            request_timeout (float): the max time a request may take [in seconds]
+            drain_timeout (float): the max time to wait for requests in flight when draining [in seconds]
+            score_fn (Callable[[pd.DataFrame], pd.DataFrame]): the scoring function, must be picklable
+            warm_up (bool): score a synthetic day in every worker before serving
+            file_root (str | None): the directory file payloads may be read from, None to refuse them
+            max_body_bytes (int): the max size of a request body [in bytes]
+        """
+        self.request_timeout: float = request_timeout
+        self.drain_timeout: float = drain_timeout
+        self.score_fn: Callable[[pd.DataFrame], pd.DataFrame] = score_fn
+        self.file_root: str | None = file_root
+        self.max_body_bytes: int = max_body_bytes
+
+        self.draining: bool = False
+        self.in_flight: int = 0
+        self._in_flight_changed: threading.Condition = threading.Condition()
+
+        self.workers: int = workers or multiprocessing.cpu_count()
+        self.pool: multiprocessing.pool.Pool = multiprocessing.Pool(
+            self.workers, initializer=warm_up_worker, initargs=(score_fn if warm_up else None,)
+        )
+        # Pool runs the initializers as the workers start, a round trip to every worker waits for them
+        self.pool.map(time.sleep, [0] * self.workers, chunksize=1)
+
+        self.httpd: QodHTTPServer = QodHTTPServer((host, port), self)
+
+    @property
+    def port(self) -> int:  # noqa: D102
+        return self.httpd.server_address[1]
+
+    def serve_forever(self) -> None:
+        """Serves requests until drain() is called, then closes the pool."""
+        logger.info("Serving QoD on port %d with %d workers", self.port, self.workers)
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+            self.pool.close()
+            self.pool.join()
+
+    def drain(self) -> None:
+        """Stops accepting requests, waits for the requests in flight and stops serve_forever().
+
+        Must be called from another thread than serve_forever().
+        """
+        with self._in_flight_changed:
+            self.draining = True
+            drained: bool = self._in_flight_changed.wait_for(lambda: self.in_flight == 0, self.drain_timeout)
+
+        if not drained:
+            logger.warning("%d requests still in flight after %ss, terminating", self.in_flight, self.drain_timeout)
+            self.pool.terminate()
+
+        self.httpd.shutdown()
+
+    def score(self, payload: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        """Scores a request in the pool.
+
+        Args:
+        ----
+            payload (dict[str, Any]): the JSON payload of the request
+
+        Returns:
+        -------
+            tuple[int, dict[str, Any]]: the HTTP status code and the response body
+        """
+        # Checked and counted at once, so that drain() cannot miss a request admitted while it starts
+        with self._in_flight_changed:
+            if self.draining:
+                return 503, {"status": "failure", "exception": "The server is draining"}
+            self.in_flight += 1
+
+        try:
+            # The task is uncounted once it leaves its worker, which may be after the request was answered
+            pending = self.pool.apply_async(
+                ScoringRequest.score,
+                (payload, self.score_fn, self.file_root, self.request_timeout),
+                callback=self.task_done,
+                error_callback=self.task_done,
+            )
+        except Exception as e:
+            self.task_done(None)
+            return 500, {"status": "failure", "exception": repr(e)}
+
+        try:
+            result_df: pd.DataFrame = pending.get(self.request_timeout)
+            return 200, {"status": "success", "result": json.loads(result_df.to_json(orient="records"))}
+        except (multiprocessing.TimeoutError, ScoringTimeout):
+            return 504, {"status": "failure", "exception": f"Scoring took longer than {self.request_timeout}s"}
+        except InvalidRequest as e:
+            return 400, {"status": "failure", "exception": str(e)}
+        except Exception as e:
+            return 500, {"status": "failure", "exception": repr(e)}
+
+    def task_done(self, _: object) -> None:
+        """Uncounts a task that left the pool, called by the result thread of the pool.
+
+        Args:
+        ----
+            _ (object): the result or the exception of the task
+        """
+        with self._in_flight_changed:
+            self.in_flight -= 1
+            self._in_flight_changed.notify_all()
+
+
+class QodHTTPServer(http.server.ThreadingHTTPServer):
+    """The HTTP server of a QodServer, handling every request in a daemon thread."""
+
+    daemon_threads: bool = True
+
+    def __init__(self, server_address: tuple[str, int], qod_server: QodServer) -> None:
+        """Binds the HTTP server.
+
+        Args:
+        ----
+            server_address (tuple[str, int]): the address and port to listen to
+            qod_server (QodServer): the server scoring the requests
+        """
+        super().__init__(server_address, QodRequestHandler)
+        self.qod_server: QodServer = qod_server
+
+
+class QodRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Routes the HTTP requests of a QodServer."""
+
+    protocol_version: str = "HTTP/1.1"
+    server: QodHTTPServer
+
+    def do_GET(self) -> None:  # noqa: D102
+        if self.path != "/health":
+            self.respond(404, {"status": "failure", "exception": f"Unknown path {self.path}"})
+            return
+
+        qod_server: QodServer = self.server.qod_server
+        self.respond(
+            503 if qod_server.draining else 200,
+            {"status": "draining" if qod_server.draining else "ok", "in_flight": qod_server.in_flight},
+        )
+
+    def do_POST(self) -> None:  # noqa: D102
+        if self.path != "/score":
+            self.respond(404, {"status": "failure", "exception": f"Unknown path {self.path}"})
+            return
+
+        qod_server: QodServer = self.server.qod_server
+        try:
+            content_length: int = int(self.headers.get("Content-Length", 0))
+        except ValueError as e:
+            self.close_connection = True
+            self.respond(400, {"status": "failure", "exception": repr(e)})
+            return
+
+        # Refused before reading, the body is left unread and the connection closed
+        if not 0 <= content_length <= qod_server.max_body_bytes:
+            self.close_connection = True
+            self.respond(
+                413 if content_length > 0 else 400,
+                {"status": "failure", "exception": f"Invalid request body size {content_length}"},
+            )
+            return
+
+        try:
+            payload: Any = json.loads(self.rfile.read(content_length))
+        except json.JSONDecodeError as e:
+            self.respond(400, {"status": "failure", "exception": repr(e)})
+            return
+
+        if not isinstance(payload, dict):
+            self.respond(400, {"status": "failure", "exception": "The payload must be a JSON object"})
+            return
+
+        self.respond(*qod_server.score(payload))
+
+    def respond(self, code: int, body: dict[str, Any]) -> None:
+        """Sends a JSON response.
+
+        Args:
+        ----
+            code (int): the HTTP status code
+            body (dict[str, Any]): the response body
+        """
+        content: bytes = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002, D102
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+def main() -> None:
+    """Runs the QoD server until SIGTERM or SIGINT, on which it drains gracefully."""
+    parser = argparse.ArgumentParser(description="OBC SQC inference server")
+
+    parser.add_argument("--host", help="Address to listen to", default="127.0.0.1")
+    parser.add_argument("--port", help="Port to listen to", type=int, default=8080)
+    parser.add_argument("--workers", help="Number of worker processes", type=int, default=None)
+    parser.add_argument("--request_timeout", help="Max duration of a request [s]", type=float, default=120.0)
+    parser.add_argument("--cache_dir", help="Directory of a result cache, skipping unchanged inputs", default=None)
+    parser.add_argument("--cache_max_bytes", help="Size of the result cache [bytes]", type=int, default=1 << 30)
+    parser.add_argument("--drain_timeout", help="Max wait for requests in flight on shutdown [s]", type=float,
+                        default=30.0)
+    parser.add_argument("--file_root", help="Directory file payloads may be read from, none are read by default")
+    parser.add_argument("--max_body_bytes", help="Max size of a request body [bytes]", type=int, default=64 << 20)
+
+    (k_args, unknown_args) = parser.parse_known_args(sys.argv[1:])
+
+    args = vars(k_args)
+
+    score_fn: Callable[[pd.DataFrame], pd.DataFrame] = ObcSqcCheck.run
+    if args["cache_dir"] is not None:
+        score_fn = ResultCache(args["cache_dir"], args["cache_max_bytes"])
+
+    server = QodServer(
+        host=args["host"],
+        port=args["port"],
+        workers=args["workers"],
+        request_timeout=args["request_timeout"],
+        drain_timeout=args["drain_timeout"],
+        score_fn=score_fn,
+        file_root=args["file_root"],
+        max_body_bytes=args["max_body_bytes"],
+    )
+
+    def on_signal(signum: int, frame: Any) -> None:
+        logger.info("Received signal %d, draining", signum)
+        threading.Thread(target=server.drain, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, on_signal)
+    signal.signal(signal.SIGINT, on_signal)
+
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
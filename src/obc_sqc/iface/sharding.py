@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+import os
+import sys
+from typing import Iterable
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from obc_sqc.schema.schema import SchemaDefinitions
+
+logger = logging.getLogger("obc_sqc")
+logger.addHandler(logging.StreamHandler())
+logger.setLevel(logging.DEBUG)
+
+
+class Shard:
+    """One of shard_count disjoint parts of the fleet, chosen by a stable hash of the device ID.
+
+    Every job of a split run is given the same shard_count and its own index, and scores only the devices hashing
+    to it, so the jobs need no coordinator and a device always lands on the same shard. The hash does not depend on
+    the process (unlike hash()), nor on the other devices of the day. Every shard writes its results under its own
+    name, combined afterwards by merge().
+    """
+
+    def __init__(self, index: int, count: int) -> None:
+        """Creates the shard.
+
+        Args:
+        ----
+            index (int): the index of the shard, from 0 to count - 1
+            count (int): the number of shards the fleet is split into
+        """
+        if count < 1 or not 0 <= index < count:
+            raise ValueError(f"Invalid shard {index} of {count}, expected 0 <= index < count")
+
+        self.index: int = index
+        self.count: int = count
+
+    @staticmethod
+    def of(device_id: str, count: int) -> int:
+        """Returns the shard of a device.
+
+        Args:
+        ----
+            device_id (str): the device ID
+            count (int): the number of shards
+
+        Returns:
+        -------
+            int: the index of the shard the device belongs to
+        """
+        digest: bytes = hashlib.blake2b(device_id.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big") % count
+
+    @property
+    def name(self) -> str:
+        """The name of the shard, e.g. shard-00003-of-00016."""
+        return f"shard-{self.index:05d}-of-{self.count:05d}"
+
+    def select(self, device_ids: Iterable[str]) -> list[str]:
+        """Keeps the devices of the shard.
+
+        Args:
+        ----
+            device_ids (Iterable[str]): the device IDs
+
+        Returns:
+        -------
+            list[str]: the device IDs of the shard, in their original order
+        """
+        return [device_id for device_id in device_ids if Shard.of(device_id, self.count) == self.index]
+
+    def path(self, output_file_path: str) -> str:
+        """Keys an output path by the shard.
+
+        Args:
+        ----
+            output_file_path (str): the output path of an unsplit run, without extension
+
+        Returns:
+        -------
+            str: the output path of the shard, without extension
+        """
+        return f"{output_file_path}.{self.name}"
+
+    def read_day_parquet(self, path: str, columns: list[str]) -> pd.DataFrame:
+        """Reads the rows of the devices of the shard from a day parquet.
+
+        Only the device_id column is decoded to find the devices of the shard, which are then pushed down to the
+        reader as a filter, so the rows of the other shards are skipped at the row group level where possible.
+
+        Args:
+        ----
+            path (str): the day parquet
+            columns (list[str]): the columns to read, including "device_id"
+
+        Returns:
+        -------
+            pd.DataFrame: the rows of the devices of the shard
+        """
+        device_ids: list[str] = pq.read_table(path, columns=["device_id"]).column("device_id").unique().to_pylist()
+        shard_device_ids: list[str] = self.select(str(device_id) for device_id in device_ids)
+
+        if not shard_device_ids:
+            return pq.read_table(path, columns=columns).schema.empty_table().to_pandas()
+
+        return pq.read_table(path, columns=columns, filters=[("device_id", "in", shard_device_ids)]).to_pandas()
+
+    @staticmethod
+    def merge(output_file_path: str, count: int) -> int:
+        """Combines the parquet outputs of all shards into {output_file_path}.parquet.
+
+        The shard outputs are expected to follow SchemaDefinitions.mlflow_obc_sqc_batch_schema().
+
+        Args:
+        ----
+            output_file_path (str): the output path of the unsplit run, without extension
+            count (int): the number of shards
+
+        Returns:
+        -------
+            int: the number of rows of the combined output
+        """
+        shard_paths: list[str] = [f"{Shard(index, count).path(output_file_path)}.parquet" for index in range(count)]
+        missing: list[str] = [path for path in shard_paths if not os.path.exists(path)]
+        if missing:
+            raise FileNotFoundError(f"Missing shard outputs: {missing}")
+
+        # A shard without devices holds no rows, and no types either
+        batch_schema: dict = SchemaDefinitions.mlflow_obc_sqc_batch_schema()
+        merged_df: pd.DataFrame = pd.concat(
+            [pd.DataFrame(columns=list(batch_schema.keys()))] + [pd.read_parquet(path) for path in shard_paths],
+            ignore_index=True,
+        ).astype(batch_schema)
+
+        # Readers see either no file or the complete one
+        tmp_path: str = f"{output_file_path}.parquet.tmp"
+        merged_df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, f"{output_file_path}.parquet")
+
+        return len(merged_df)
+
+
+def main() -> None:
+    """Combines the outputs of the shards of a split file_model_inference run."""
+    parser = argparse.ArgumentParser(description="OBC SQC shard merge")
+
+    parser.add_argument("--output_file_path", help="Output path of the split run, without extension", required=True)
+    parser.add_argument("--shard_count", help="Number of shards the run was split into", type=int, required=True)
+
+    (k_args, unknown_args) = parser.parse_known_args(sys.argv[1:])
+
+    args = vars(k_args)
+
+    rows: int = Shard.merge(args["output_file_path"], args["shard_count"])
+    logger.info("Merged %d shards into %s.parquet (%d rows)", args["shard_count"], args["output_file_path"], rows)
+
+
+if __name__ == "__main__":
+    main()
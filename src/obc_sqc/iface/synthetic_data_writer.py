@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+
+from obc_sqc.synthetic.station_data_generator import FaultRates, StationDataGenerator
+
+logger = logging.getLogger("obc_sqc")
+logger.addHandler(logging.StreamHandler())
+logger.setLevel(logging.DEBUG)
+
+
+def main() -> None:
+    """Writes synthetic day parquets for a fleet of stations, as consumed by file_model_inference.
+
+    Every day of the range is written to {output_dir}/{%Y_%m_%d}.parquet. The QoD of a date needs the day before
+    it too, e.g. --start_date 2023-12-13 --end_date 2023-12-14 allows scoring 2023-12-14.
+    """
+    parser = argparse.ArgumentParser(description="OBC SQC synthetic data writer")
+
+    parser.add_argument("--start_date", help="First day, formatted as %Y-%m-%d", required=True)
+    parser.add_argument("--end_date", help="Last day (included), formatted as %Y-%m-%d", required=True)
+    parser.add_argument("--output_dir", help="Directory of the day parquets", required=True)
+    parser.add_argument("--devices", help="Number of devices", type=int, default=100)
+    parser.add_argument("--ws2000_share", help="Share of WS2000 devices", type=float, default=0.5)
+    parser.add_argument("--seed", help="Seed of the random generators", type=int, default=0)
+    parser.add_argument("--chunk_size", help="Devices generated and written at once", type=int, default=1000)
+    for fault, default in FaultRates._field_defaults.items():
+        parser.add_argument(f"--{fault}", help="See FaultRates", type=type(default), default=default)
+
+    (k_args, unknown_args) = parser.parse_known_args(sys.argv[1:])
+
+    args = vars(k_args)
+
+    generator: StationDataGenerator = StationDataGenerator(
+        args["devices"],
+        ws2000_share=args["ws2000_share"],
+        faults=FaultRates(**{fault: args[fault] for fault in FaultRates._fields}),
+        seed=args["seed"],
+    )
+
+    start: float = time.perf_counter()
+    paths: list[str] = generator.write_days(
+        args["start_date"], args["end_date"], args["output_dir"], args["chunk_size"]
+    )
+    logger.info("Wrote %d days of %d devices in %.1fs", len(paths), args["devices"], time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+from __future__ import annotations
+
+from typing import Callable
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from obc_sqc.model.filling_ignoring_period import FillingIgnoringPeriod
+from obc_sqc.model.initial_params import InitialParams
+from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from obc_sqc.model.time_normalisation import TimeNormalisation
+from obc_sqc.schema.schema import SchemaDefinitions
+
+# The parameter matrices of a device, as returned by PolarsEngine.parameter_matrices()
+ParameterMatrices = tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]
+
+
+class BatchEngine:
+    """The checks of all parameters up to the constant data check, for many devices of the same model at once.
+
+    Devices of the same model share the grid step, the time windows and the thresholds of InitialParams, so
+    after time normalisation their values are stacked into a (devices x slots) array per parameter, padded with
+    nan past the end of the shorter devices. The out of bounds check and the filling run over the stacked values,
+    and the rolling statistics of the constant data checks become cumulative sums and block-wise running extremes
+    along the slots, so a batch costs a fixed number of NumPy operations instead of a pandas rolling apply per
+    window, statistic, parameter and device.
+
+    The grid of a device is regular, so a time window of the checks is a fixed number of slots. The rolling
+    medians are only ever compared with a threshold, which is decided by counting the values on each side of it;
+    only the windows holding as many values on each side compute their median. The results are identical to
+    ObcSqcCheck.obc_matrix(), FillingIgnoringPeriod.filling_ignoring_period_matrix() and
+    ConstantDataCheck.constant_data_check(), in the layout of PolarsEngine.parameter_matrices(), to be passed
+    to ObcSqcCheck.run() as its matrices. The minute and hour averages still run per device in run().
+    """
+
+    @staticmethod
+    def window_sum(values: npt.NDArray, window: int) -> npt.NDArray[np.int64]:
+        """Sums the values of the window slots before every slot.
+
+        Args:
+        ----
+            values (npt.NDArray): a (devices x slots) array of counts or booleans
+            window (int): the slots of the window
+
+        Returns:
+        -------
+            npt.NDArray[np.int64]: the sum over slots [j - window, j - 1] of every slot j
+        """
+        cumulative: npt.NDArray[np.int64] = np.zeros((values.shape[0], values.shape[1] + 1), dtype=np.int64)
+        np.cumsum(values, axis=1, out=cumulative[:, 1:])
+        slots: npt.NDArray[np.int64] = np.arange(values.shape[1])
+
+        return cumulative[:, slots] - cumulative[:, np.maximum(slots - window, 0)]
+
+    @staticmethod
+    def window_extreme(values: npt.NDArray[np.float64], window: int, ufunc: np.ufunc) -> npt.NDArray[np.float64]:
+        """Computes the maximum or the minimum of the values of the window slots before every slot.
+
+        The running extremes within blocks of window slots, from the left and from the right, cover any window
+        with two lookups (van Herk/Gil-Werman), whatever its length.
+
+        Args:
+        ----
+            values (npt.NDArray[np.float64]): a (devices x slots) array, nan where missing
+            window (int): the slots of the window
+            ufunc (np.ufunc): np.fmax or np.fmin, which skip nan
+
+        Returns:
+        -------
+            npt.NDArray[np.float64]: the extreme over slots [j - window, j - 1] of every slot j, nan without values
+        """
+        devices, slots = values.shape
+        blocks: int = -(-(slots + window) // window)
+        padded: npt.NDArray[np.float64] = np.full((devices, blocks * window), np.nan)
+        values_end: int = window + slots
+        padded[:, window:values_end] = values
+
+        # The window of slot j spans padded[j:j + window]
+        blocked: npt.NDArray[np.float64] = padded.reshape(devices, blocks, window)
+        from_left: npt.NDArray[np.float64] = ufunc.accumulate(blocked, axis=2).reshape(devices, -1)
+        from_right: npt.NDArray[np.float64] = ufunc.accumulate(blocked[:, :, ::-1], axis=2)[:, :, ::-1].reshape(
+            devices, -1
+        )
+        starts: npt.NDArray[np.int64] = np.arange(slots)
+
+        return ufunc(from_right[:, starts], from_left[:, starts + window - 1])
+
+    @staticmethod
+    def window_median_beyond(
+        values: npt.NDArray[np.float64],
+        window: int,
+        threshold: float,
+        above: bool,
+        median: Callable[[npt.NDArray[np.float64]], float],
+    ) -> npt.NDArray[np.bool_]:
+        """Checks whether the median of the window slots before every slot is above or below a threshold.
+
+        With n values in the window, an odd n is decided by whether more than n / 2 values lie beyond the
+        threshold and an even n by whether more or fewer than n / 2 do; only a window with exactly n / 2 values
+        beyond it depends on the two middle values, and computes its median.
+
+        Args:
+        ----
+            values (npt.NDArray[np.float64]): a (devices x slots) array, nan where missing
+            window (int): the slots of the window
+            threshold (float): the threshold
+            above (bool): True to check median > threshold, False to check median < threshold
+            median (Callable[[npt.NDArray[np.float64]], float]): the median of the pandas check, e.g. np.nanmedian,
+                            for the windows decided by their middle values
+
+        Returns:
+        -------
+            npt.NDArray[np.bool_]: the check of every slot, False for a window without values
+        """
+        counts: npt.NDArray[np.int64] = BatchEngine.window_sum(~np.isnan(values), window)
+        with np.errstate(invalid="ignore"):
+            beyond: npt.NDArray[np.bool_] = values > threshold if above else values < threshold
+        beyond_counts: npt.NDArray[np.int64] = BatchEngine.window_sum(beyond, window)
+
+        result: npt.NDArray[np.bool_] = 2 * beyond_counts > counts
+        tied: npt.NDArray[np.bool_] = (counts > 0) & (counts % 2 == 0) & (2 * beyond_counts == counts)
+        ties: tuple[npt.NDArray[np.intp], ...] = np.nonzero(tied)
+        for device, slot in zip(*ties, strict=True):
+            window_start: int = max(slot - window, 0)
+            window_median: float = median(values[device, window_start:slot])
+            result[device, slot] = window_median > threshold if above else window_median < threshold
+
+        return result
+
+    @staticmethod
+    def backward_flag(condition: npt.NDArray[np.bool_], window: int, guard: int) -> npt.NDArray[np.int64]:
+        """Annotates every slot with a condition holding within the window slots after it, from the guard slot.
+
+        Args:
+        ----
+            condition (npt.NDArray[np.bool_]): a (devices x slots) array of the condition
+            window (int): the slots of the window
+            guard (int): the first slot the condition counts from
+
+        Returns:
+        -------
+            npt.NDArray[np.int64]: 1 where the condition holds in slots [j + 1, j + window] of slot j, else 0
+        """
+        slots: npt.NDArray[np.int64] = np.arange(condition.shape[1])
+        counted: npt.NDArray[np.bool_] = condition & (slots >= guard)
+        cumulative: npt.NDArray[np.int64] = np.zeros((condition.shape[0], condition.shape[1] + 1), dtype=np.int64)
+        np.cumsum(counted, axis=1, out=cumulative[:, 1:])
+        ends: npt.NDArray[np.int64] = np.minimum(slots + window, condition.shape[1] - 1)
+
+        return (cumulative[:, ends + 1] - cumulative[:, slots + 1] > 0).astype(np.int64)
+
+    @staticmethod
+    def backward_latest(annotations: npt.NDArray[np.float64], window: int) -> npt.NDArray[np.float64]:
+        """Annotates every slot with the latest annotation within the window slots after it.
+
+        Args:
+        ----
+            annotations (npt.NDArray[np.float64]): a (devices x slots) array, nan where a slot has no annotation
+            window (int): the slots of the window
+
+        Returns:
+        -------
+            npt.NDArray[np.float64]: the annotation of the latest annotated slot of [j + 1, j + window] of slot j,
+                            else 0
+        """
+        slots: npt.NDArray[np.int64] = np.arange(annotations.shape[1])
+        latest: npt.NDArray[np.int64] = np.maximum.accumulate(np.where(np.isnan(annotations), -1, slots), axis=1)
+        ends: npt.NDArray[np.int64] = np.minimum(slots + window, annotations.shape[1] - 1)
+        source: npt.NDArray[np.int64] = latest[:, ends]
+
+        return np.where(source > slots, np.take_along_axis(annotations, np.maximum(source, 0), axis=1), 0.0)
+
+    @staticmethod
+    def constant_annotations(
+        values: dict[str, npt.NDArray[np.float64]],
+        lengths: npt.NDArray[np.int64],
+        parameter: str,
+        time_window_constant: int,
+        time_window_constant_max: int,
+        data_timestep: int,
+        ann_constant: int,
+        ann_constant_frozen: int,
+        rh_threshold: float,
+    ) -> dict[str, npt.NDArray]:
+        """Runs the constant data checks of a parameter over the stacked values of the devices.
+
+        Args:
+        ----
+            values (dict[str, npt.NDArray[np.float64]]): the (devices x slots) {parameter}_for_raw_check values
+                            of every parameter, nan past the end of every device
+            lengths (npt.NDArray[np.int64]): the slots of every device
+            parameter (str): the parameter, e.g. temperature, humidity, wind speed etc.
+            time_window_constant (int): the time window to search for constant data [in minutes]
+            time_window_constant_max (int): the bigger time window to search for constant data [in minutes]
+            data_timestep (int): the timestep of the data [in seconds]
+            ann_constant (int): the annotation for constant data
+            ann_constant_frozen (int): the annotation for wind data constant under freezing conditions
+            rh_threshold (float): the threshold below which constant humidity values are suspicious
+
+        Returns:
+        -------
+            dict[str, npt.NDArray]: the (devices x slots) ann_constant, ann_constant_long and ann_constant_frozen
+                            annotations the parameter has, along with non_nan_count for humidity
+        """
+        value: npt.NDArray[np.float64] = values[parameter]
+        slots: npt.NDArray[np.int64] = np.arange(value.shape[1])
+        in_device: npt.NDArray[np.bool_] = slots < lengths[:, None]
+
+        def constant_windows(minutes: int) -> tuple[int, npt.NDArray[np.int64], npt.NDArray[np.bool_], int]:
+            # Slots within the window, counts of values, whether the values are all equal and the guard slot
+            window: int = 60 * minutes // data_timestep
+            counts: npt.NDArray[np.int64] = BatchEngine.window_sum(~np.isnan(value), window)
+            equal: npt.NDArray[np.bool_] = (counts > 0) & (
+                BatchEngine.window_extreme(value, window, np.fmax) == BatchEngine.window_extreme(value, window, np.fmin)
+            )
+            return window, counts, equal, -(-60 * minutes // data_timestep)
+
+        window, counts, equal, guard = constant_windows(time_window_constant)
+
+        # ConstantDataCheck.get_number_of_rows_of_last_day(): the slots within the window before the last slot
+        rows: npt.NDArray[np.int64] = np.minimum(window, lengths - 1)[:, None]
+        all_non_nan_constant: npt.NDArray[np.bool_] = (counts == rows) & equal & in_device
+
+        annotations: dict[str, npt.NDArray] = {}
+
+        if parameter in {"humidity", "temperature"}:
+            below_rh: npt.NDArray[np.bool_] = BatchEngine.window_median_beyond(
+                values["humidity"], window, rh_threshold, False, np.nanmedian
+            )
+            annotations["ann_constant"] = BatchEngine.backward_flag(all_non_nan_constant & below_rh, window, guard)
+            if parameter == "humidity":
+                annotations["non_nan_count"] = np.where(counts > 0, counts, np.nan)
+
+        elif parameter == "illuminance":
+            non_zero: npt.NDArray[np.bool_] = BatchEngine.window_sum(value == 0, window) == 0
+            annotations["ann_constant"] = BatchEngine.backward_flag(all_non_nan_constant & non_zero, window, guard)
+
+        elif parameter in {"wind_direction", "wind_speed"}:
+            temperature: npt.NDArray[np.float64] = values["temperature"]
+            temperature_gt_0: npt.NDArray[np.bool_] = BatchEngine.window_median_beyond(
+                temperature, window, 0, True, np.nanmedian
+            )
+            temperature_lt_0: npt.NDArray[np.bool_] = (
+                BatchEngine.window_sum(~np.isnan(temperature), window) > 0
+            ) & ~temperature_gt_0
+            humidity_lt_85: npt.NDArray[np.bool_] = BatchEngine.window_median_beyond(
+                values["humidity"], window, 85, False, lambda x: float(np.nanpercentile(x, 50))
+            )
+
+            # Frozen: the annotation of the highest priority condition, applied last in ConstantDataCheck
+            frozen: npt.NDArray[np.bool_] = all_non_nan_constant & temperature_lt_0
+            constant: npt.NDArray[np.bool_] = all_non_nan_constant & temperature_gt_0 & humidity_lt_85
+            if parameter == "wind_speed":
+                # Missing values are neither equal to 0 nor counted as missing by the pandas rolling sums
+                in_window: npt.NDArray[np.bool_] = np.minimum(slots, window) > 0
+                all_0: npt.NDArray[np.bool_] = in_window & (BatchEngine.window_sum(value == 0, window) == rows)
+                all_not_0: npt.NDArray[np.bool_] = in_window & (
+                    BatchEngine.window_sum(np.isnan(value) | (value != 0), window) == rows
+                )
+                frozen = frozen & all_0
+                constant = (constant & all_0) | (all_non_nan_constant & all_not_0)
+
+            annotated: npt.NDArray[np.bool_] = (slots >= guard) & (frozen | constant)
+            annotations["ann_constant"] = BatchEngine.backward_latest(
+                np.where(annotated, np.where(frozen, 0, ann_constant), np.nan), window
+            )
+            annotations["ann_constant_frozen"] = BatchEngine.backward_latest(
+                np.where(annotated, np.where(frozen, ann_constant_frozen, 0), np.nan), window
+            )
+
+            window_max, _, equal_max, guard_max = constant_windows(time_window_constant_max)
+            day: npt.NDArray[np.bool_] = equal_max & BatchEngine.window_median_beyond(
+                temperature, window_max, 0, True, np.nanmedian
+            )
+            annotations["ann_constant_long"] = BatchEngine.backward_flag(day & in_device, window_max, guard_max)
+
+        else:
+            annotations["ann_constant"] = BatchEngine.backward_flag(all_non_nan_constant, window, guard)
+
+        if parameter == "temperature":
+            window_max, counts_max, equal_max, guard_max = constant_windows(time_window_constant_max)
+            rows_max: npt.NDArray[np.int64] = np.minimum(window_max, lengths - 1)[:, None]
+            annotations["ann_constant_long"] = BatchEngine.backward_flag(
+                (counts_max == rows_max) & equal_max & in_device, window_max, guard_max
+            )
+
+        return annotations
+
+    @staticmethod
+    def normalised_devices(frames: list[pd.DataFrame]) -> list[tuple[str, pd.DataFrame] | None]:
+        """Normalises the raw data of every device like ObcSqcCheck.run(), keeping the devices a batch can hold.
+
+        Args:
+        ----
+            frames (list[pd.DataFrame]): the raw data of every device
+
+        Returns:
+        -------
+            list[tuple[str, pd.DataFrame] | None]: the model and the normalised data of every device, None for a
+                            device without values, which run() scores without any check, or off a regular grid
+        """
+        weather_columns: list[str] = SchemaDefinitions.weather_data_columns()
+        devices: list[tuple[str, pd.DataFrame] | None] = []
+
+        for df in frames:
+            if df.empty:
+                devices.append(None)
+                continue
+
+            prepared_df: pd.DataFrame = ObcSqcCheck.prepare_input(df)
+            model: str = prepared_df["model"].iloc[0]
+            data_timestep, time_tolerance = InitialParams.picking_initial_parameters(model)[5:7]
+            normalised_df: pd.DataFrame = TimeNormalisation.time_normalisation_dataframe(
+                prepared_df, data_timestep, time_tolerance
+            )
+            missing: pd.Series = normalised_df[weather_columns].isna().any(axis=1)
+            normalised_df.loc[missing, weather_columns] = np.nan
+
+            steps: npt.NDArray[np.int64] = np.diff(normalised_df["utc_datetime"].to_numpy("datetime64[s]").view("i8"))
+            devices.append(None if missing.all() or (steps != data_timestep).any() else (model, normalised_df))
+
+        return devices
+
+    @staticmethod
+    def parameter_matrices(frames: list[pd.DataFrame]) -> list[ParameterMatrices | None]:
+        """Runs the out of bounds check, the filling and the constant data checks of many devices at once.
+
+        Args:
+        ----
+            frames (list[pd.DataFrame]): the raw data of every device, of any models
+
+        Returns:
+        -------
+            list[ParameterMatrices | None]: the matrices of every device, to pass to ObcSqcCheck.run(), or None
+                            for a device that run() checks on its own
+        """
+        devices: list[tuple[str, pd.DataFrame] | None] = BatchEngine.normalised_devices(frames)
+        value_dtype: np.dtype = BatchEngine.value_dtype(frames)
+        matrices: list[ParameterMatrices | None] = [None] * len(frames)
+
+        for model in sorted({device[0] for device in devices if device is not None}):
+            batch: dict[int, pd.DataFrame] = {
+                i: device[1] for i, device in enumerate(devices) if device is not None and device[0] == model
+            }
+            for i, device_matrices in zip(
+                batch, BatchEngine.model_matrices(model, list(batch.values()), value_dtype), strict=True
+            ):
+                matrices[i] = device_matrices
+
+        return matrices
+
+    @staticmethod
+    def value_dtype(frames: list[pd.DataFrame]) -> np.dtype:
+        """Picks the dtype the values of a batch are held in, float32 only when every raw weather value was.
+
+        Args:
+        ----
+            frames (list[pd.DataFrame]): the raw data of every device
+
+        Returns:
+        -------
+            np.dtype: float32 or float64
+        """
+        weather_columns: list[str] = SchemaDefinitions.weather_data_columns()
+        float32: np.dtype = np.dtype("float32")
+
+        if frames and all((df[weather_columns].dtypes == float32).all() for df in frames):
+            return float32
+
+        return np.dtype("float64")
+
+    @staticmethod
+    def model_matrices(
+        model: str, frames: list[pd.DataFrame], value_dtype: npt.DTypeLike = "float64"
+    ) -> list[ParameterMatrices]:
+        """Runs the out of bounds check, the filling and the constant data checks of devices of the same model.
+
+        Args:
+        ----
+            model (str): the station model of every device
+            frames (list[pd.DataFrame]): the output of time_normalisation_dataframe() of every device, on a
+                            regular grid and with the rows missing any weather variable masked
+            value_dtype (npt.DTypeLike): the dtype of the stacked values and of the filled values of every device. The
+                            checks compute in float64, which float32 values widen to exactly
+
+        Returns:
+        -------
+            list[ParameterMatrices]: the matrices of every device, like PolarsEngine.parameter_matrices()
+        """
+        (
+            ann_unident_spk,
+            ann_no_datum,
+            ann_invalid_datum,
+            ann_constant,
+            ann_constant_frozen,
+            data_timestep,
+            time_tolerance,
+            time_window_median,
+            ignoring_period,
+            fnl_timeslot,
+            rh_threshold,
+            parameters,
+            availability_threshold_median,
+            availability_threshold_m,
+            availability_threshold_h,
+            raw_cntrl_thresholds,
+            minute_cntrl_thresholds,
+            minute_averaging_period,
+            time_window_constant,
+            obc_limits,
+            start_timestamp,
+            time_window_constant_max,
+            ann_constant_max,
+            pr_int,
+            preprocess_time_window,
+        ) = InitialParams.picking_initial_parameters(model)
+
+        # (slots x devices * parameters), every device holding a block of columns, padded with nan at its end
+        lengths: npt.NDArray[np.int64] = np.array([len(df) for df in frames])
+        blocks: list[slice] = [
+            slice(device * len(parameters), (device + 1) * len(parameters)) for device in range(len(frames))
+        ]
+        stacked: npt.NDArray[np.floating] = np.full(
+            (lengths.max(), len(frames) * len(parameters)), np.nan, dtype=value_dtype
+        )
+        for device, df in enumerate(frames):
+            stacked[: lengths[device], blocks[device]] = df[parameters].to_numpy(dtype=value_dtype)
+        stacked_df: pd.DataFrame = pd.DataFrame(stacked)
+
+        ann_obc: npt.NDArray[np.int64] = ObcSqcCheck.obc_matrix(
+            stacked_df, obc_limits[0] * len(frames), obc_limits[1] * len(frames)
+        ).to_numpy()
+        filled_df, consec_filling_df = FillingIgnoringPeriod.filling_ignoring_period_matrix(
+            stacked_df, ignoring_period, data_timestep
+        )
+        filled: npt.NDArray[np.float64] = filled_df.to_numpy()
+        consec_filling: npt.NDArray[np.int64] = consec_filling_df.to_numpy()
+
+        # (devices x slots) per parameter, the filling having run on past the end of the shorter devices
+        in_device: npt.NDArray[np.bool_] = np.arange(lengths.max()) < lengths[:, None]
+        values: dict[str, npt.NDArray[np.float64]] = {
+            parameter: np.where(in_device, filled[:, slice(i, None, len(parameters))].T, np.nan)
+            for i, parameter in enumerate(parameters)
+        }
+
+        constant: dict[str, npt.NDArray] = {}
+        for i, parameter in enumerate(parameters):
+            if parameter == "precipitation_accumulated":
+                continue
+            for annotation, annotated in BatchEngine.constant_annotations(
+                values,
+                lengths,
+                parameter,
+                time_window_constant[i],
+                time_window_constant_max[i],
+                data_timestep,
+                ann_constant,
+                ann_constant_frozen,
+                rh_threshold,
+            ).items():
+                constant[f"{parameter}__{annotation}"] = annotated
+
+        matrices: list[ParameterMatrices] = []
+        for device, df in enumerate(frames):
+            rows: slice = slice(0, lengths[device])
+            matrices.append((
+                pd.DataFrame(ann_obc[rows, blocks[device]], index=df.index, columns=parameters),
+                # Filling only repeats raw values, so they are stored back in value_dtype without rounding
+                pd.DataFrame(filled[rows, blocks[device]].astype(value_dtype), index=df.index, columns=parameters),
+                pd.DataFrame(consec_filling[rows, blocks[device]], index=df.index, columns=parameters),
+                pd.DataFrame({name: annotated[device, rows] for name, annotated in constant.items()}, index=df.index),
+            ))
+
+        return matrices
@@ -658,3 +658,36 @@ class ConstantDataCheck:
         fnl_df = fnl_df.reset_index(drop=False, names=["date"])
 
         return fnl_df
+
+    @staticmethod
+    def precomputed_constant_data_check(
+        fnl_df: pd.DataFrame, parameter: str, constant_df: pd.DataFrame
+    ) -> pd.DataFrame:
+        """Adds the constant data annotations of a parameter, computed beforehand by an engine for all parameters.
+
+        The result is the one of constant_data_check().
+
+        Args:
+        ----
+            fnl_df (pd.DataFrame): the data of the parameter, with a "date" column
+            parameter (str): the parameter
+            constant_df (pd.DataFrame): the constant data annotations of PolarsEngine.parameter_matrices() or
+                            BatchEngine.parameter_matrices()
+
+        Returns:
+        -------
+            pd.DataFrame: the data with "date" as the first column and the ann_constant, ann_constant_long and
+                            ann_constant_frozen columns
+        """
+        annotated_df: pd.DataFrame = fnl_df[["date", *[c for c in fnl_df.columns if c != "date"]]].reset_index(
+            drop=True
+        )
+
+        for annotation in ["ann_constant", "ann_constant_long", "ann_constant_frozen"]:
+            column: str = f"{parameter}__{annotation}"
+            annotated_df[annotation] = constant_df[column].to_numpy() if column in constant_df.columns else 0
+
+        if parameter == "humidity":
+            annotated_df["non_nan_count"] = constant_df["humidity__non_nan_count"].to_numpy()
+
+        return annotated_df
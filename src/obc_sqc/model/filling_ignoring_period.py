@@ -1,11 +1,8 @@
 from __future__ import annotations
 
-import typing
-
 import numpy as np
-
-if typing.TYPE_CHECKING:
-    import pandas as pd
+import numpy.typing as npt
+import pandas as pd
 
 
 class FillingIgnoringPeriod:
@@ -81,3 +78,74 @@ class FillingIgnoringPeriod:
         fnl_df[f"{parameter}_consec_filling"] = mask.astype(int).groupby((~mask).cumsum()).cumsum() * mask
 
         return fnl_df
+
+    @staticmethod
+    def last_valid_row(mask: npt.NDArray[np.bool_]) -> npt.NDArray[np.int64]:
+        """Finds per column the last row up to every row that is not masked.
+
+        Args:
+        ----
+            mask (npt.NDArray[np.bool_]): an (n_rows x n_columns) matrix, True where a value is missing
+
+        Returns:
+        -------
+            npt.NDArray[np.int64]: the row of the last available value per row and column, -1 before the first one
+        """
+        rows: npt.NDArray[np.int64] = np.arange(mask.shape[0])[:, None]
+        return np.maximum.accumulate(np.where(mask, -1, rows), axis=0)
+
+    @staticmethod
+    def filling_ignoring_period_matrix(
+        values_df: pd.DataFrame, ignoring_period: int, data_timestep: int
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Runs filling_ignoring_period() for all the columns of a dataframe at once.
+
+        The forward fills, the gap runs and the counts of consecutive filled values are computed in a single
+        pass over the (n_rows x n_columns) matrix of the values, instead of once per parameter.
+
+        Args:
+        ----
+            values_df (pd.DataFrame): the parameters to fill, e.g. the weather columns of the output of
+                        time_normalisation_dataframe()
+            ignoring_period (int): the period within nans can be replaced with the latest valid value [in seconds]
+            data_timestep (int): the desired timestep of the final df [in seconds]
+
+        Returns:
+        -------
+            tuple[pd.DataFrame, pd.DataFrame]: the {parameter}_for_raw_check and the {parameter}_consec_filling
+                        values of filling_ignoring_period(), with the columns and index of values_df
+        """
+        rows_in_one_minute: int = int(round(ignoring_period / data_timestep))
+        values: npt.NDArray[np.float64] = values_df.to_numpy(dtype="float64")
+        mask: npt.NDArray[np.bool_] = np.isnan(values)
+        columns: npt.NDArray[np.int64] = np.arange(values.shape[1])[None, :]
+        rows: npt.NDArray[np.int64] = np.arange(values.shape[0])[:, None]
+
+        # Fill single missing values with the previous value, setting consecutive missing values to nan
+        last_valid: npt.NDArray[np.int64] = FillingIgnoringPeriod.last_valid_row(mask)
+        for_raw_check: npt.NDArray[np.float64] = np.where(
+            last_valid >= 0, values[np.maximum(last_valid, 0), columns], np.nan
+        )
+        consecutive_mask: npt.NDArray[np.bool_] = mask & np.vstack([np.zeros_like(mask[:1]), mask[:-1]])
+        for_raw_check[consecutive_mask] = np.nan
+
+        # Fill the first rows_in_one_minute values of every gap left with the previous valid value
+        for_raw_check_mask: npt.NDArray[np.bool_] = np.isnan(for_raw_check)
+        last_valid = FillingIgnoringPeriod.last_valid_row(for_raw_check_mask)
+        fill: npt.NDArray[np.bool_] = (
+            for_raw_check_mask & (last_valid >= 0) & (rows - last_valid <= rows_in_one_minute)
+        )
+        for_raw_check = np.where(fill, for_raw_check[np.maximum(last_valid, 0), columns], for_raw_check)
+
+        # Filled values and the value after them, counted per run of consecutive ones
+        filled: npt.NDArray[np.bool_] = mask & ~np.isnan(for_raw_check)
+        filled = filled | np.vstack([np.zeros_like(filled[:1]), filled[:-1]])
+        filled_count: npt.NDArray[np.int64] = np.cumsum(filled, axis=0)
+        consec_filling: npt.NDArray[np.int64] = filled_count - np.maximum.accumulate(
+            np.where(filled, 0, filled_count), axis=0
+        )
+
+        return (
+            pd.DataFrame(for_raw_check, index=values_df.index, columns=values_df.columns),
+            pd.DataFrame(consec_filling, index=values_df.index, columns=values_df.columns),
+        )
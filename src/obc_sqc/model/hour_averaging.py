@@ -23,7 +23,7 @@ class HourAveraging:
         -------
             pd.Series: A Series representing the calculated u component of wind.
         """
-        wind_u: pd.Series = -1 * wind_speed_avg * np.sin(wind_direction_avg.astype("Float64") * np.pi / 180.0)
+        wind_u: pd.Series = -1 * wind_speed_avg * np.sin(wind_direction_avg * np.pi / 180.0)
         return wind_u
 
     @staticmethod
@@ -39,7 +39,7 @@ class HourAveraging:
         -------
             pd.Series: A Series representing the calculated v component of wind.
         """
-        wind_v: pd.Series = -1 * wind_speed_avg * np.cos(wind_direction_avg.astype("Float64") * np.pi / 180.0)
+        wind_v: pd.Series = -1 * wind_speed_avg * np.cos(wind_direction_avg * np.pi / 180.0)
         return wind_v
 
     @staticmethod
@@ -1,11 +1,29 @@
 from __future__ import annotations
 
+from typing import Any
+
 import numpy as np
 
 
 class InitialParams:  # noqa: D101
     @staticmethod
-    def picking_initial_parameters(station_type):
+    def time_grid(station_type: str) -> tuple[int, int]:
+        """Returns the grid the raw data of a weather station model are snapped to.
+
+        Args:
+        ----
+            station_type (str): the weather station model
+
+        Returns:
+        -------
+            tuple[int, int]: the timestep of the raw data and the max distance of a datum from its slot [in seconds]
+        """
+        (_, _, _, _, _, data_timestep, time_tolerance, *_) = InitialParams.picking_initial_parameters(station_type)
+
+        return data_timestep, time_tolerance
+
+    @staticmethod
+    def picking_initial_parameters(station_type: str) -> tuple[Any, ...]:
         """This def sets the appropriate parameterization for a given weather station model
 
         station_type (str): the weather station model (M5 or Helium)
@@ -130,7 +148,7 @@ class InitialParams:  # noqa: D101
             # the time window between start_timestamp and the first timestamp of the current day [in minutes]
             preprocess_timewindow = 360
 
-            parameters_for_testing: list[str] = [
+            parameters_for_testing = [
                 "humidity",
                 "temperature",
                 "wind_direction",
@@ -27,7 +27,7 @@ class MinuteAveraging:
         -------
             pd.Series: A Series representing the calculated u component of wind.
         """
-        wind_u: pd.Series = -1 * wind_speed_avg * np.sin(wind_direction_avg.astype("Float64") * np.pi / 180.0)
+        wind_u: pd.Series = -1 * wind_speed_avg * np.sin(wind_direction_avg * np.pi / 180.0)
         return wind_u
 
     @staticmethod
@@ -43,7 +43,7 @@ class MinuteAveraging:
         -------
             pd.Series: A Series representing the calculated v component of wind.
         """
-        wind_v: pd.Series = -1 * wind_speed_avg * np.cos(wind_direction_avg.astype("Float64") * np.pi / 180.0)
+        wind_v: pd.Series = -1 * wind_speed_avg * np.cos(wind_direction_avg * np.pi / 180.0)
         return wind_v
 
     @staticmethod
@@ -323,13 +323,13 @@ class MinuteAveraging:
         """
         # calculate the rolling median with the time_window_median
         rolling_median: pd.Series = (
-            minute_averaging[f"{parameter}_avg"].astype("Float64").rolling(f"{time_window_median}min").median()
+            minute_averaging[f"{parameter}_avg"].rolling(f"{time_window_median}min").median()
         )
 
         # Then we only keep median values if >availability_threshold of the data is available
         # calculate the number of available observations within the window
         available_observations: pd.Series = (
-            minute_averaging[f"{parameter}_avg"].astype("Float64").rolling(f"{time_window_median}min").count()
+            minute_averaging[f"{parameter}_avg"].rolling(f"{time_window_median}min").count()
         )
 
         # calculate the total number of possible observations within the window (10 minutes / 16 seconds)
@@ -349,12 +349,12 @@ class MinuteAveraging:
 
         # abs difference between consecutive averages
         # TODO: remove roundings
-        minute_averaging["diff_abs"] = minute_averaging[f"{parameter}_avg"].astype("Float64").diff().abs().round(2)
+        minute_averaging["diff_abs"] = minute_averaging[f"{parameter}_avg"].diff().abs().round(2)
 
         # abs difference between an obs and the x-min median
         # TODO: remove roundings
         minute_averaging["median_diff_abs"] = (
-            (minute_averaging[f"{parameter}_avg"] - minute_averaging["rolling_median"]).astype("Float64").abs().round(2)
+            (minute_averaging[f"{parameter}_avg"] - minute_averaging["rolling_median"]).abs().round(2)
         )
 
         # creating a new column for annotating invalid jumps between consecutive averages
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import json
 
+import numpy as np
+import numpy.typing as npt
 import pandas as pd
 
 from obc_sqc.model.annotation_utils import AnnotationUtils
@@ -11,15 +13,70 @@ from obc_sqc.model.hour_averaging import HourAveraging
 from obc_sqc.model.initial_params import InitialParams
 from obc_sqc.model.minute_averaging import MinuteAveraging
 from obc_sqc.model.raw_data_check import RawDataCheck
+from obc_sqc.model.stage_instrumentation import StageInstrumentation
+from obc_sqc.model.time_normalisation import TimeNormalisation
 from obc_sqc.schema.schema import SchemaDefinitions
 
 
 class ObcSqcCheck:
     """This class is the main class of the OBC/SQC algorithm."""
 
+    # The version of the algorithm, reported with every result
+    QOD_VERSION: str = "1.0.7"
+
+    # The engines run() can execute the checks with, "polars" requiring the optional polars package
+    ENGINES: tuple[str, ...] = ("pandas", "polars")
+
+    # Whether run() builds the result of a device without any value directly, which gives the same result as
+    # running every check over nan
+    NO_DATA_SHORTCUT: bool = True
+
+    @staticmethod
+    def prepare_input(df: pd.DataFrame) -> pd.DataFrame:
+        """Casts the raw data to SchemaDefinitions.qod_input_schema().
+
+        The input may come with nullable Float64 weather columns and utc_datetime as strings (e.g. through
+        the mlflow signature). Casting once here lets every later stage work on float64 with nan and native
+        timestamps, without converting back and forth.
+
+        Args:
+        ----
+            df (pd.DataFrame): the raw data of a device
+
+        Returns:
+        -------
+            pd.DataFrame: a copy of the raw data following SchemaDefinitions.qod_input_schema()
+        """
+        input_schema: dict = SchemaDefinitions.qod_input_schema()
+        prepared_df: pd.DataFrame = df.copy()
+
+        for column in SchemaDefinitions.weather_data_columns():
+            # to_numpy maps pd.NA of the nullable types to nan
+            prepared_df[column] = prepared_df[column].to_numpy(dtype=input_schema[column], na_value=np.nan)
+
+        prepared_df["utc_datetime"] = pd.to_datetime(prepared_df["utc_datetime"])
+
+        return prepared_df
+
     @staticmethod
-    def run(df: pd.DataFrame) -> pd.DataFrame:  # noqa: D102, PLR0915, C901
-        model: str = df["model"].iloc[0]
+    def run(  # noqa: D102, PLR0915, PLR0912, C901
+        df: pd.DataFrame,
+        instrumentation: StageInstrumentation | None = None,
+        engine: str = "pandas",
+        date: str | None = None,
+        matrices: tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame] | None = None,
+    ) -> pd.DataFrame:
+        if engine not in ObcSqcCheck.ENGINES:
+            raise ValueError(f"Unknown engine {engine}, expected one of {ObcSqcCheck.ENGINES}")
+
+        # Every stage runs through stages.call(), which only records it when instrumentation is given and enabled
+        stages: StageInstrumentation = instrumentation or StageInstrumentation(enabled=False)
+
+        df = stages.call("prepare_input", None, ObcSqcCheck.prepare_input, df)
+
+        # A device without any observation has no model, its parameters are then those of a WS1000, as its result
+        # does not depend on the model
+        model: str = df["model"].iloc[0] if not df.empty else "WS1000"
 
         (
             ann_unident_spk,
@@ -49,48 +106,157 @@ class ObcSqcCheck:
             preprocess_time_window,
         ) = InitialParams.picking_initial_parameters(model)
 
+        # A device without any observation has no time span to score, so its result is the NO_DATA result of the
+        # whole date
+        if df.empty:
+            if date is None:
+                raise ValueError("The input has no observations, the date to score must be given")
+            day: pd.Timestamp = pd.Timestamp(date).normalize()
+            hours: pd.DatetimeIndex = pd.date_range(day, periods=24, freq="60min")
+            no_data_df: pd.DataFrame = stages.call(
+                "no_data_result", None, ObcSqcCheck.no_data_result, df, hours, day, parameters_for_testing
+            )
+            return stages.call("daily_annotations", None, ObcSqcCheck.daily_annotations, no_data_df)
+
+        # Snap the observations to the fixed grid of data_timestep, inserting empty slots for gaps
+        df = stages.call(
+            "time_normalisation",
+            None,
+            TimeNormalisation.time_normalisation_dataframe,
+            df,
+            data_timestep,
+            time_tolerance,
+        )
+
+        # Rows missing any weather variable are treated as missing for every parameter. The mask is applied once,
+        # as the parameter chains below only read df through their own projections.
+        weather_columns: list[str] = SchemaDefinitions.weather_data_columns()
+        missing: pd.Series = df[weather_columns].isna().any(axis=1)
+        df.loc[missing, weather_columns] = np.nan
+
+        # An offline device, or one missing a whole parameter, is left without any value. Every hour of it is then
+        # NO_DATA with a zero score, built directly instead of running every check over nan
+        if ObcSqcCheck.NO_DATA_SHORTCUT and missing.all():
+            hours = stages.call(
+                "no_data_hours",
+                None,
+                ObcSqcCheck.no_data_hours,
+                df,
+                minute_averaging_period,
+                preprocess_time_window,
+                fnl_timeslot if model == "WS1000" else None,
+            )
+            no_data_df = stages.call(
+                "no_data_result",
+                None,
+                ObcSqcCheck.no_data_result,
+                df,
+                hours,
+                df["utc_datetime"].max().normalize(),
+                parameters_for_testing,
+            )
+            return stages.call("daily_annotations", None, ObcSqcCheck.daily_annotations, no_data_df)
+
+        # Out of bounds check and filling of nans within the ignoring_period with the previous available value,
+        # once over the matrix of all parameters
+        constant_df: pd.DataFrame | None = None
+        if matrices is not None:
+            # Computed along with other devices of the model, e.g. by BatchEngine.parameter_matrices()
+            ann_obc_df, filled_values, consec_filling, constant_df = matrices
+            # Held as float32 when the raw values were, the checks below compute in float64
+            filled_values = filled_values.astype("float64", copy=False)
+        elif engine == "polars":
+            # Polars is an optional dependency, only imported when selected
+            from obc_sqc.model.polars_engine import PolarsEngine  # noqa: PLC0415
+
+            # The constant data checks of all parameters run in the same query
+            ann_obc_df, filled_values, consec_filling, constant_df = stages.call(
+                "polars_parameter_matrices",
+                None,
+                PolarsEngine.parameter_matrices,
+                df,
+                parameters_for_testing,
+                obc_limits,
+                ignoring_period,
+                data_timestep,
+                time_window_constant,
+                time_window_constant_max,
+                ann_constant,
+                ann_constant_frozen,
+                rh_threshold,
+            )
+        else:
+            ann_obc_df = stages.call(
+                "obc_matrix", None, ObcSqcCheck.obc_matrix, df[parameters_for_testing], obc_limits[0], obc_limits[1]
+            )
+            filled_values, consec_filling = stages.call(
+                "filling_ignoring_period_matrix",
+                None,
+                FillingIgnoringPeriod.filling_ignoring_period_matrix,
+                df[parameters_for_testing],
+                ignoring_period,
+                data_timestep,
+            )
+
         # Parameter to results
         results_mapping: dict[str, dict[str, pd.DataFrame]] = {}
 
         # loop through all parameters of a station
         for i, parameter in enumerate(parameters_for_testing):
-            # Drop missing rows with missing weather data
-            df.loc[
-                df[SchemaDefinitions.weather_data_columns()].isna().sum(axis=1) > 0,
-                SchemaDefinitions.weather_data_columns(),
-            ] = pd.NA
+            final_df: pd.DataFrame = stages.call(
+                "parameter_projection", parameter, ObcSqcCheck.parameter_projection, df, parameter, filled_values
+            )
 
-            # Out of bounds check
+            # The out of bounds check of precipitation is applied to its increase, after filling
             if parameter != "precipitation_accumulated":
-                final_df: pd.DataFrame = ObcSqcCheck.obc(df, parameter, obc_limits[0][i], obc_limits[1][i])
+                final_df["ann_obc"] = ann_obc_df[parameter]
 
-            # Here we fill nans within the ignoring_period with previous available value, otherwise with nan
-            final_df: pd.DataFrame = FillingIgnoringPeriod.filling_ignoring_period(
-                final_df, parameter, ignoring_period, data_timestep
-            )
+            final_df[f"{parameter}_for_raw_check"] = filled_values[parameter]
+            final_df[f"{parameter}_consec_filling"] = consec_filling[parameter]
 
             # Out of bounds check for precipitation must be applied after the filling_ignoring_period
             if parameter == "precipitation_accumulated":
-                final_df: pd.DataFrame = ObcSqcCheck.obc_precipitation(final_df, obc_limits[0][i], obc_limits[1][i])
+                final_df = stages.call(
+                    "obc_precipitation",
+                    parameter,
+                    ObcSqcCheck.obc_precipitation,
+                    final_df,
+                    obc_limits[0][i],
+                    obc_limits[1][i],
+                )
 
             if parameter != "precipitation_accumulated":
                 # Shift all rows by 1 slot
                 final_df["date"] = pd.to_datetime(final_df["utc_datetime"]) + pd.Timedelta(seconds=data_timestep)
 
-                final_df_param = ConstantDataCheck.constant_data_check(
-                    final_df,
-                    parameter,
-                    time_window_constant[i],
-                    ann_constant,
-                    ann_constant_frozen,
-                    rh_threshold,
-                    time_window_constant_max[i],
-                    ann_constant_max,
-                )
+                if constant_df is not None:
+                    final_df_param = stages.call(
+                        "constant_data_check",
+                        parameter,
+                        ConstantDataCheck.precomputed_constant_data_check,
+                        final_df,
+                        parameter,
+                        constant_df,
+                    )
+                else:
+                    final_df_param = stages.call(
+                        "constant_data_check",
+                        parameter,
+                        ConstantDataCheck.constant_data_check,
+                        final_df,
+                        parameter,
+                        time_window_constant[i],
+                        ann_constant,
+                        ann_constant_frozen,
+                        rh_threshold,
+                        time_window_constant_max[i],
+                        ann_constant_max,
+                    )
             else:
                 final_df_param = final_df
                 final_df_param["ann_constant"] = 0
-                final_df_param["ann_constant_max"] = 0
+                final_df_param["ann_constant_long"] = 0
+                final_df_param["ann_constant_frozen"] = 0
 
             # Here, ONLY for WS2000 if wind speed is constantly at 0m/s for certain predefined period,
             # but wind direction varies, so that wind direction does not come with any of the constant annotations,
@@ -108,7 +274,10 @@ class ObcSqcCheck:
                     final_df_param.loc[merged_df["ann_constant_long_wdir"] == 0, "ann_constant_long"] = 0
                     final_df_param.loc[merged_df["ann_constant_frozen_wdir"] == 0, "ann_constant_frozen"] = 0
 
-            final_df_param = RawDataCheck.raw_data_suspicious_check(
+            final_df_param = stages.call(
+                "raw_data_suspicious_check",
+                parameter,
+                RawDataCheck.raw_data_suspicious_check,
                 final_df_param,
                 parameter,
                 raw_cntrl_thresholds[i],
@@ -119,10 +288,13 @@ class ObcSqcCheck:
                 ann_no_datum,
                 ann_invalid_datum,
             )
-            final_df_param = AnnotationUtils.text_annotation(final_df_param)
+            final_df_param = stages.call("text_annotation", parameter, AnnotationUtils.text_annotation, final_df_param)
 
             # minute_averaging() can produce averages per minute (for WS1000) or per hour (for WS2000)
-            final_df_param, minute_averaging = MinuteAveraging.minute_averaging(
+            final_df_param, minute_averaging = stages.call(
+                "minute_averaging",
+                parameter,
+                MinuteAveraging.minute_averaging,
                 final_df_param,
                 parameter,
                 minute_averaging_period[i],
@@ -166,7 +338,10 @@ class ObcSqcCheck:
 
             # Only stations with sampling rate <30sec can have both per minute and per hour checks
             if model == "WS1000":
-                results_mapping[parameter]["hour_averaging"] = HourAveraging.hour_averaging(
+                results_mapping[parameter]["hour_averaging"] = stages.call(
+                    "hour_averaging",
+                    parameter,
+                    HourAveraging.hour_averaging,
                     minute_averaging,
                     fnl_timeslot,
                     availability_threshold_h[i],
@@ -177,7 +352,9 @@ class ObcSqcCheck:
 
             # calculate the hourly annotations (for both raw and minute-averaged data),
             # for the current parameter
-            hourly_annotation: pd.Series = AnnotationUtils.error_codes_hourly(fnl_raw_process, minute_averaging)
+            hourly_annotation: pd.Series = stages.call(
+                "error_codes_hourly", parameter, AnnotationUtils.error_codes_hourly, fnl_raw_process, minute_averaging
+            )
 
             # assign the result to a new column, named "hourly_annotation", belonging to the "hour_averaging" key
             # of the results_mapping[parameter]
@@ -236,12 +413,12 @@ class ObcSqcCheck:
         total_rewards: float = ObcSqcCheck.calculate_daily_score(
             parameters_for_testing, results_mapping, flattened_results
         )
-        qod_version: str = "1.0.6"
+        qod_version: str = ObcSqcCheck.QOD_VERSION
 
         result_df["qod_score"] = total_rewards
         result_df["hourly_score"] = result_df[[f"{x}_score" for x in results_mapping]].mean(axis=1)
         result_df["qod_version"] = qod_version
-        final_df: pd.DataFrame = result_df.reset_index(names=["utc_datetime"])
+        final_df = result_df.reset_index(names=["utc_datetime"])
 
         final_df["year"] = final_df["utc_datetime"].dt.year
         final_df["month"] = final_df["utc_datetime"].dt.month
@@ -252,9 +429,85 @@ class ObcSqcCheck:
 
         final_df_24h: pd.DataFrame = final_df.head(24)
 
-        final_df_24h = ObcSqcCheck.daily_annotations(final_df_24h)
+        final_df_24h = stages.call("daily_annotations", None, ObcSqcCheck.daily_annotations, final_df_24h)
         return final_df_24h
 
+    @staticmethod
+    def no_data_hours(
+        df: pd.DataFrame, minute_averaging_period: list[int], preprocess_time_window: int, fnl_timeslot: int | None
+    ) -> pd.DatetimeIndex:
+        """Returns the hours the full chain scores for a device, without computing any average.
+
+        The hours follow the averages of every parameter: periods of minute_averaging_period from the period of
+        the first slot to the period of the last one, without those within preprocess_time_window of the first,
+        regrouped into slots of fnl_timeslot for the stations averaged per minute.
+
+        Args:
+        ----
+            df (pd.DataFrame): the output of time_normalisation_dataframe()
+            minute_averaging_period (list[int]): the averaging period of every parameter [in minutes]
+            preprocess_time_window (int): the time window before the scored period [in minutes]
+            fnl_timeslot (int | None): the final timeslot [in minutes], None when the averages are already hourly
+
+        Returns:
+        -------
+            pd.DatetimeIndex: the sorted hours of the result
+        """
+        first: pd.Timestamp = df["utc_datetime"].min()
+        last: pd.Timestamp = df["utc_datetime"].max()
+
+        hours: pd.DatetimeIndex = pd.DatetimeIndex([])
+        for averaging_period in sorted(set(minute_averaging_period)):
+            freq: str = f"{averaging_period}min"
+            periods: pd.DatetimeIndex = pd.date_range(first.floor(freq), last.floor(freq), freq=freq)
+            periods = periods[periods > periods[0] + pd.Timedelta(minutes=preprocess_time_window - 1)]
+
+            if fnl_timeslot is not None and len(periods) > 0:
+                freq = f"{fnl_timeslot}min"
+                periods = pd.date_range(periods[0].floor(freq), periods[-1].floor(freq), freq=freq)
+
+            hours = hours.union(periods)
+
+        return pd.DatetimeIndex(hours, freq=None)
+
+    @staticmethod
+    def no_data_result(
+        df: pd.DataFrame, hours: pd.DatetimeIndex, day: pd.Timestamp, parameters_for_testing: list[str]
+    ) -> pd.DataFrame:
+        """Builds the hourly result of a device without any value, before its daily annotations.
+
+        Every parameter scores 0 in every hour. The hours of the scored day are 100% NO_DATA, while the earlier
+        ones carry no annotation, as the hourly annotations only cover the last day.
+
+        Args:
+        ----
+            df (pd.DataFrame): the input of the device, only read by the stage instrumentation
+            hours (pd.DatetimeIndex): the hours of the result
+            day (pd.Timestamp): the scored day, at midnight
+            parameters_for_testing (list[str]): the parameters of the station
+
+        Returns:
+        -------
+            pd.DataFrame: the result of run() without the daily annotations
+        """
+        scored: npt.NDArray[np.bool_] = hours.normalize() == day
+        annotation: list[str] = [json.dumps([["NO_DATA", 100.0]]) if x else json.dumps([]) for x in scored]
+
+        result_df: pd.DataFrame = pd.DataFrame(index=range(len(hours)))
+        for parameter in parameters_for_testing:
+            result_df[f"{parameter}_score"] = np.zeros(len(hours), dtype="float64")
+            result_df[f"{parameter}_annotation"] = pd.Series(annotation, dtype=object)
+
+        result_df["qod_score"] = 0.0
+        result_df["hourly_score"] = np.zeros(len(hours), dtype="float64")
+        result_df["qod_version"] = pd.Series([ObcSqcCheck.QOD_VERSION] * len(hours), dtype=object)
+        result_df["year"] = hours.year.astype("int64")
+        result_df["month"] = hours.month.astype("int64")
+        result_df["day"] = hours.day.astype("int64")
+        result_df["hour"] = hours.hour.astype("int64")
+
+        return result_df.head(24)
+
     @staticmethod
     def daily_annotations(inp_df: pd.DataFrame) -> pd.DataFrame:  # noqa: D102
         annotated_cols: list[str] = [
@@ -269,7 +522,7 @@ class ObcSqcCheck:
         df = inp_df.copy()
 
         # Daily annotations per weather variable
-        daily_weather_ann: dict[str, [dict[str, float]]] = {}
+        daily_weather_ann: dict[str, dict[str, float]] = {}
 
         # All observed faults
         observed_faults: set[str] = set()
@@ -313,7 +566,61 @@ class ObcSqcCheck:
         return df
 
     @staticmethod
-    def obc(fnl_df, parameter, bottom_lim, upper_lim):
+    def parameter_projection(df: pd.DataFrame, parameter: str, filled_values: pd.DataFrame) -> pd.DataFrame:
+        """Selects the columns the checks of a parameter read, so that each parameter works on a narrow copy.
+
+        Args:
+        ----
+            df (pd.DataFrame): the output of time_normalisation_dataframe(), which is left unchanged
+            parameter (str): the parameter to project, e.g. temperature, humidity, wind speed etc.
+            filled_values (pd.DataFrame): the {parameter}_for_raw_check values of every parameter
+
+        Returns:
+        -------
+            pd.DataFrame: utc_datetime and the parameter, along with the other wind parameter for the wind vector
+                            averages and the filled temperature/humidity the constant checks depend on
+        """
+        columns: list[str] = ["utc_datetime", parameter]
+        if parameter in {"wind_speed", "wind_direction"}:
+            columns = ["utc_datetime", "wind_speed", "wind_direction"]
+
+        projection_df: pd.DataFrame = df[columns].copy()
+
+        # Constant temperature is judged by humidity, constant wind by temperature and humidity
+        covariates: list[str] = {
+            "temperature": ["humidity"],
+            "wind_direction": ["temperature", "humidity"],
+            "wind_speed": ["temperature", "humidity"],
+        }.get(parameter, [])
+        for covariate in covariates:
+            projection_df[f"{covariate}_for_raw_check"] = filled_values[covariate].copy()
+
+        return projection_df
+
+    @staticmethod
+    def obc_matrix(values_df: pd.DataFrame, bottom_lims: list[float], upper_lims: list[float]) -> pd.DataFrame:
+        """Runs obc() for all the columns of a dataframe at once.
+
+        Args:
+        ----
+            values_df (pd.DataFrame): the parameters to check, e.g. the weather columns of the output of
+                        time_normalisation_dataframe()
+            bottom_lims (list[float]): the bottom limit of every column, as defined by the manufacturer
+            upper_lims (list[float]): the upper limit of every column, as defined by the manufacturer
+
+        Returns:
+        -------
+            pd.DataFrame: the ann_obc annotation of every column, with the columns and index of values_df
+        """
+        values: npt.NDArray[np.float64] = values_df.to_numpy(dtype="float64")
+        ann_obc: npt.NDArray[np.bool_] = (
+            (values < np.asarray(bottom_lims, dtype="float64")) | (values > np.asarray(upper_lims, dtype="float64"))
+        ) & ~np.isnan(values)
+
+        return pd.DataFrame(ann_obc.astype(int), index=values_df.index, columns=values_df.columns)
+
+    @staticmethod
+    def obc(fnl_df: pd.DataFrame, parameter: str, bottom_lim: float, upper_lim: float) -> pd.DataFrame:
         """This def annotates data as faulty when they exceed the manufacturer's limits
 
         fnl_df (df): the output of time_normalisation_dataframe def, which is a dataframe
@@ -333,7 +640,7 @@ class ObcSqcCheck:
         return fnl_df
 
     @staticmethod
-    def obc_precipitation(fnl_df, bottom_lim, upper_lim):
+    def obc_precipitation(fnl_df: pd.DataFrame, bottom_lim: float, upper_lim: float) -> pd.DataFrame:
         """This def annotates precipitation data as faulty when they exceed the manufacturer's limits.
         Precipitation comes as accumulation, so we de-accumulate it and then we apply OBC
 
@@ -361,7 +668,11 @@ class ObcSqcCheck:
         return fnl_df
 
     @staticmethod
-    def calculate_daily_score(parameters_for_testing, results_mapping, flattened_results) -> float:  # noqa: D102
+    def calculate_daily_score(  # noqa: D102
+        parameters_for_testing: list[str],
+        results_mapping: dict[str, dict[str, pd.DataFrame]],
+        flattened_results: dict[str, list[pd.DataFrame]],
+    ) -> float:
         for param in parameters_for_testing:
             for key, value in results_mapping[param].items():
                 value["parameter"] = param
@@ -378,7 +689,7 @@ class ObcSqcCheck:
                 reward = hourly_reward_percentage / 100
                 adjusted_hourly_rewards[p].append(reward)
 
-        adjusted_daily_rewards: dict[any, float] = {}
+        adjusted_daily_rewards: dict[str, float] = {}
         for param_name, param_vals in adjusted_hourly_rewards.items():
             potential_daily_rewards: float = sum(param_vals) / len(param_vals)
             adjusted_daily_rewards[param_name] = potential_daily_rewards
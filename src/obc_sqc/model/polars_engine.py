@@ -0,0 +1,414 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import polars as pl
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class PolarsEngine:
+    """The checks of all parameters up to the constant data check, as a single Polars lazy query.
+
+    The out of bounds check, the filling of the ignoring period and the constant data checks of every parameter
+    are expressed over the normalised data of a device and collected at once, so the rolling windows of all
+    parameters run in Polars' multi-threaded engine instead of one pandas rolling apply per window and statistic.
+    The results are identical to ObcSqcCheck.obc_matrix(), FillingIgnoringPeriod.filling_ignoring_period_matrix()
+    and ConstantDataCheck.constant_data_check(). Missing values are nulls throughout the query.
+    """
+
+    @staticmethod
+    def equals(left: pl.Expr, right: pl.Expr | int) -> pl.Expr:
+        """Compares like pandas, where a comparison with a missing value is False.
+
+        Args:
+        ----
+            left (pl.Expr): the left operand
+            right (pl.Expr | int): the right operand
+
+        Returns:
+        -------
+            pl.Expr: the comparison, False where either operand is null
+        """
+        return (left == right).fill_null(False)
+
+    @staticmethod
+    def window_statistic(expr: pl.Expr, value_column: str) -> pl.Expr:
+        """Masks a rolling statistic like a pandas rolling apply with min_periods=1.
+
+        Args:
+        ----
+            expr (pl.Expr): the statistic over the rolling window
+            value_column (str): the column the window must hold at least one value of
+
+        Returns:
+        -------
+            pl.Expr: the statistic, null where the window holds no value of value_column
+        """
+        return pl.when(pl.col(value_column).count() > 0).then(expr)
+
+    @staticmethod
+    def rows_in_last_window(window: int) -> pl.Expr:
+        """Mirrors ConstantDataCheck.get_number_of_rows_of_last_day() on the time in seconds of the rows.
+
+        Args:
+        ----
+            window (int): the time window [in minutes]
+
+        Returns:
+        -------
+            pl.Expr: the number of rows within the window before the last row
+        """
+        t: pl.Expr = pl.col("t")
+        return ((t >= t.last() - 60 * window) & (t < t.last())).sum()
+
+    @staticmethod
+    def filling_columns(parameter: str, rows_in_ignoring_period: int) -> tuple[pl.Expr, pl.Expr]:
+        """Mirrors FillingIgnoringPeriod.filling_ignoring_period() for a parameter.
+
+        Args:
+        ----
+            parameter (str): the parameter to fill
+            rows_in_ignoring_period (int): the number of rows within the ignoring_period
+
+        Returns:
+        -------
+            tuple[pl.Expr, pl.Expr]: the {parameter}_for_raw_check and the {parameter}_consec_filling columns
+        """
+        value: pl.Expr = pl.col(parameter)
+        missing: pl.Expr = value.is_null()
+
+        # Fill single missing values with the previous value, then the first rows_in_ignoring_period values of
+        # every gap left
+        single_filled: pl.Expr = (
+            pl.when(missing & missing.shift(1).fill_null(False)).then(None).otherwise(value.forward_fill())
+        )
+        for_raw_check: pl.Expr = single_filled.forward_fill(limit=rows_in_ignoring_period)
+
+        # Filled values and the value after them, counted per run of consecutive ones
+        filled: pl.Expr = missing & for_raw_check.is_not_null()
+        filled = filled | filled.shift(1).fill_null(False)
+        filled_count: pl.Expr = filled.cast(pl.Int64).cum_sum()
+        consec_filling: pl.Expr = filled_count - pl.when(filled).then(0).otherwise(filled_count).cum_max()
+
+        return for_raw_check.alias(f"{parameter}_for_raw_check"), consec_filling.alias(f"{parameter}_consec_filling")
+
+    @staticmethod
+    def forward_statistics(
+        parameter: str, time_window_constant: int, time_window_constant_max: int
+    ) -> dict[int, list[pl.Expr]]:
+        """Lists the rolling statistics that the constant data check of a parameter reads.
+
+        Args:
+        ----
+            parameter (str): the parameter, e.g. temperature, humidity, wind speed etc.
+            time_window_constant (int): the time window to search for constant data [in minutes]
+            time_window_constant_max (int): the bigger time window to search for constant data [in minutes]
+
+        Returns:
+        -------
+            dict[int, list[pl.Expr]]: the statistics per time window, named {parameter}__{statistic}
+        """
+        column: str = f"{parameter}_for_raw_check"
+        value: pl.Expr = pl.col(column)
+        statistic = PolarsEngine.window_statistic
+
+        small: list[pl.Expr] = [
+            statistic(value.count(), column).alias(f"{parameter}__non_nan_count"),
+            statistic(value.drop_nulls().n_unique(), column).alias(f"{parameter}__unique_values"),
+        ]
+        day: list[pl.Expr] = []
+
+        if parameter in {"humidity", "temperature"}:
+            small.append(pl.col("humidity_for_raw_check").median().alias(f"{parameter}__median"))
+
+        if parameter == "temperature":
+            day += [
+                statistic(value.count(), column).alias(f"{parameter}__non_nan_count_max"),
+                statistic(value.drop_nulls().n_unique(), column).alias(f"{parameter}__unique_values_max"),
+            ]
+
+        if parameter in {"wind_direction", "wind_speed"}:
+            small += [
+                pl.col("temperature_for_raw_check").median().alias(f"{parameter}__median_temperature"),
+                pl.col("humidity_for_raw_check").median().alias(f"{parameter}__median_humidity"),
+            ]
+            day += [
+                statistic(value.drop_nulls().n_unique(), column).alias(f"{parameter}__unique_values_max"),
+                pl.col("temperature_for_raw_check").median().alias(f"{parameter}__median_max"),
+            ]
+
+        if parameter == "wind_speed":
+            # Missing values are neither equal to 0 nor counted as missing by the pandas rolling sums
+            small += [
+                pl.when(pl.len() > 0).then((value == 0).fill_null(False).sum()).alias(f"{parameter}__all_0"),
+                pl.when(pl.len() > 0).then((value != 0).fill_null(True).sum()).alias(f"{parameter}__all_not_0"),
+            ]
+
+        if parameter == "illuminance":
+            small.append(statistic((value != 0).fill_null(True).all(), column).alias(f"{parameter}__non_zero"))
+
+        statistics: dict[int, list[pl.Expr]] = {time_window_constant: small}
+        if day:
+            statistics.setdefault(time_window_constant_max, []).extend(day)
+
+        return statistics
+
+    @staticmethod
+    def constant_conditions(
+        parameter: str,
+        time_window_constant: int,
+        time_window_constant_max: int,
+        ann_constant: int,
+        ann_constant_frozen: int,
+        rh_threshold: float,
+    ) -> list[tuple[pl.Expr, int, str]]:
+        """Builds the rows of a parameter that start a constant data annotation, from its rolling statistics.
+
+        Args:
+        ----
+            parameter (str): the parameter, e.g. temperature, humidity, wind speed etc.
+            time_window_constant (int): the time window to search for constant data [in minutes]
+            time_window_constant_max (int): the bigger time window to search for constant data [in minutes]
+            ann_constant (int): the annotation for constant data
+            ann_constant_frozen (int): the annotation for wind data constant under freezing conditions
+            rh_threshold (float): the threshold below which constant humidity values are suspicious
+
+        Returns:
+        -------
+            list[tuple[pl.Expr, int, str]]: per annotation column, the condition (boolean for the checks
+                            annotating 1, else the annotation with nulls where not annotating), its time window
+                            and the name of the annotation column
+        """
+        equals = PolarsEngine.equals
+
+        def stat(name: str) -> pl.Expr:
+            return pl.col(f"{parameter}__{name}")
+
+        t: pl.Expr = pl.col("t")
+        rows: pl.Expr = PolarsEngine.rows_in_last_window(time_window_constant)
+        all_non_nan_constant: pl.Expr = equals(stat("non_nan_count"), rows) & equals(stat("unique_values"), 1)
+        guard: pl.Expr = t >= t.first() + 60 * time_window_constant
+
+        if parameter in {"humidity", "temperature"}:
+            conditions: list[tuple[pl.Expr, int, str]] = [
+                (
+                    all_non_nan_constant & (stat("median") < rh_threshold).fill_null(False),
+                    time_window_constant,
+                    "ann_constant",
+                )
+            ]
+            if parameter == "temperature":
+                rows_max: pl.Expr = PolarsEngine.rows_in_last_window(time_window_constant_max)
+                conditions.append((
+                    equals(stat("non_nan_count_max"), rows_max) & equals(stat("unique_values_max"), 1),
+                    time_window_constant_max,
+                    "ann_constant_long",
+                ))
+            return conditions
+
+        if parameter == "illuminance":
+            return [(all_non_nan_constant & stat("non_zero").fill_null(False), time_window_constant, "ann_constant")]
+
+        if parameter not in {"wind_direction", "wind_speed"}:
+            return [(all_non_nan_constant, time_window_constant, "ann_constant")]
+
+        temperature_lt_0: pl.Expr = (stat("median_temperature") <= 0).fill_null(False)
+        humidity_lt_85: pl.Expr = stat("median_humidity") < 85  # noqa: PLR2004
+        temp_gt_0_hum_lt_85: pl.Expr = ((stat("median_temperature") > 0) & humidity_lt_85).fill_null(False)
+
+        # Frozen: the annotation of the highest priority condition, applied last in ConstantDataCheck
+        frozen: pl.Expr = all_non_nan_constant & temperature_lt_0
+        constant: pl.Expr = all_non_nan_constant & temp_gt_0_hum_lt_85
+        if parameter == "wind_speed":
+            frozen = frozen & equals(stat("all_0"), rows)
+            constant = (constant & equals(stat("all_0"), rows)) | (
+                all_non_nan_constant & equals(stat("all_not_0"), rows)
+            )
+
+        annotated: pl.Expr = guard & (frozen | constant)
+        day: pl.Expr = equals(stat("unique_values_max"), 1) & (stat("median_max") > 0).fill_null(False)
+
+        return [
+            (
+                pl.when(annotated).then(pl.when(frozen).then(0).otherwise(ann_constant)),
+                time_window_constant,
+                "ann_constant",
+            ),
+            (
+                pl.when(annotated).then(pl.when(frozen).then(ann_constant_frozen).otherwise(0)),
+                time_window_constant,
+                "ann_constant_frozen",
+            ),
+            (day, time_window_constant_max, "ann_constant_long"),
+        ]
+
+    @staticmethod
+    def backward_annotation(parameter: str, condition: str, window: int, is_flag: bool) -> pl.Expr:
+        """Spreads a condition over the window before it, like the reversed rolling windows of ConstantDataCheck.
+
+        Args:
+        ----
+            parameter (str): the parameter
+            condition (str): the name of the condition column
+            window (int): the time window [in minutes]
+            is_flag (bool): True for a boolean condition, annotating 1 where it holds after the guard within the
+                            window, else the annotation of the latest row within the window that has one
+
+        Returns:
+        -------
+            pl.Expr: the aggregation over the reversed window, named {parameter}__{condition}
+        """
+        value: pl.Expr = pl.col(f"{parameter}__{condition}")
+        if is_flag:
+            t: pl.Expr = pl.col("t")
+            guard: pl.Expr = t >= pl.col("t0") + 60 * window
+            expr: pl.Expr = (value & guard).any().cast(pl.Int64)
+        else:
+            # The reversed window lists the latest rows first
+            expr = value.drop_nulls().first().fill_null(0).cast(pl.Float64)
+
+        return expr.alias(f"{parameter}__{condition}")
+
+    @staticmethod
+    def parameter_matrices(
+        df: pd.DataFrame,
+        parameters: list[str],
+        obc_limits: list[list[float]],
+        ignoring_period: int,
+        data_timestep: int,
+        time_window_constant: list[int],
+        time_window_constant_max: list[int],
+        ann_constant: int,
+        ann_constant_frozen: int,
+        rh_threshold: float,
+    ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Runs the out of bounds check, the filling and the constant data checks of all parameters in one query.
+
+        Args:
+        ----
+            df (pd.DataFrame): the output of time_normalisation_dataframe()
+            parameters (list[str]): the parameters to check
+            obc_limits (list[list[float]]): the bottom and the upper limit of every parameter
+            ignoring_period (int): the period within nans can be replaced with the latest valid value [in seconds]
+            data_timestep (int): the timestep of the data [in seconds]
+            time_window_constant (list[int]): the time window of every parameter to search for constant data
+                            [in minutes]
+            time_window_constant_max (list[int]): the bigger time window of every parameter to search for
+                            constant data [in minutes]
+            ann_constant (int): the annotation for constant data
+            ann_constant_frozen (int): the annotation for wind data constant under freezing conditions
+            rh_threshold (float): the threshold below which constant humidity values are suspicious
+
+        Returns:
+        -------
+            tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]: the ann_obc annotation, the
+                            {parameter}_for_raw_check and the {parameter}_consec_filling values of every parameter,
+                            and the ann_constant, ann_constant_long and ann_constant_frozen annotations of every
+                            parameter except precipitation, as {parameter}__{annotation} columns
+        """
+        rows_in_ignoring_period: int = int(round(ignoring_period / data_timestep))
+        constant_parameters: list[str] = [p for p in parameters if p != "precipitation_accumulated"]
+
+        # The constant data checks run on the time of the next slot, in seconds
+        values: pl.DataFrame = pl.from_pandas(df[["utc_datetime", *parameters]], nan_to_null=True)
+        data: pl.LazyFrame = values.lazy().with_columns(t=pl.col("utc_datetime").dt.epoch("s") + data_timestep)
+        data = data.with_columns(
+            *[
+                ((pl.col(p) < obc_limits[0][i]) | (pl.col(p) > obc_limits[1][i]))
+                .fill_null(False)
+                .cast(pl.Int64)
+                .alias(f"{p}_ann_obc")
+                for i, p in enumerate(parameters)
+            ],
+            *[expr for p in parameters for expr in PolarsEngine.filling_columns(p, rows_in_ignoring_period)],
+        )
+
+        # The rolling statistics of all parameters, one rolling window per distinct time window
+        statistics: dict[int, list[pl.Expr]] = {}
+        for p in constant_parameters:
+            i: int = parameters.index(p)
+            for window, exprs in PolarsEngine.forward_statistics(
+                p, time_window_constant[i], time_window_constant_max[i]
+            ).items():
+                statistics.setdefault(window, []).extend(exprs)
+
+        checked: pl.LazyFrame = pl.concat(
+            [data]
+            + [
+                data.rolling("t", period=f"{60 * window}i", closed="left").agg(exprs).drop("t")
+                for window, exprs in statistics.items()
+            ],
+            how="horizontal",
+        )
+
+        annotations: dict[str, list[tuple[pl.Expr, int, str]]] = {
+            p: PolarsEngine.constant_conditions(
+                p,
+                time_window_constant[parameters.index(p)],
+                time_window_constant_max[parameters.index(p)],
+                ann_constant,
+                ann_constant_frozen,
+                rh_threshold,
+            )
+            for p in constant_parameters
+        }
+        checked = checked.with_columns(
+            pl.col("t").first().alias("t0"),
+            *[
+                condition.alias(f"{p}__{name}")
+                for p, conditions in annotations.items()
+                for condition, _, name in conditions
+            ],
+        )
+
+        # Every annotation spreads over the window before the row that starts it: a rolling window over the
+        # reversed rows, indexed by the time left until the last row
+        backward: dict[int, list[pl.Expr]] = {}
+        for p, conditions in annotations.items():
+            for _, window, name in conditions:
+                # Only the short checks of wind carry annotations other than 1
+                is_flag: bool = name == "ann_constant_long" or p not in {"wind_direction", "wind_speed"}
+                backward.setdefault(window, []).append(PolarsEngine.backward_annotation(p, name, window, is_flag))
+        reversed_checked: pl.LazyFrame = (
+            checked.reverse().with_columns(r=pl.col("t").first() - pl.col("t")).set_sorted("r")
+        )
+        constant_lf: pl.LazyFrame = pl.concat(
+            [
+                reversed_checked.rolling("r", period=f"{60 * window}i", closed="left").agg(exprs).drop("r")
+                for window, exprs in backward.items()
+            ],
+            how="horizontal",
+        ).reverse()
+
+        # The pandas check of humidity leaves its rolling count of values in the data
+        if "humidity" in constant_parameters:
+            constant_lf = pl.concat(
+                [constant_lf, checked.select(pl.col("humidity__non_nan_count").cast(pl.Float64))], how="horizontal"
+            )
+
+        matrices_lf: pl.LazyFrame = data.select(
+            *[pl.col(f"{p}_ann_obc") for p in parameters],
+            *[pl.col(f"{p}_for_raw_check") for p in parameters],
+            *[pl.col(f"{p}_consec_filling") for p in parameters],
+        )
+        matrices, constant = pl.collect_all([matrices_lf, constant_lf])
+
+        def to_pandas(frame: pl.DataFrame, suffix: str) -> pd.DataFrame:
+            columns: list[str] = [f"{p}{suffix}" for p in parameters]
+            result_df: pd.DataFrame = frame.select(columns).to_pandas()
+            result_df.columns = parameters
+            result_df.index = df.index
+            return result_df
+
+        constant_df: pd.DataFrame = constant.to_pandas()
+        constant_df.index = df.index
+
+        # Nulls come back as nan
+        return (
+            to_pandas(matrices, "_ann_obc").astype(int),
+            to_pandas(matrices, "_for_raw_check").astype("float64"),
+            to_pandas(matrices, "_consec_filling").astype(int),
+            constant_df,
+        )
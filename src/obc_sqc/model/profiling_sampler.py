@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import cProfile
+import datetime
+import hashlib
+import json
+import os
+import time
+import uuid
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+
+
+class ProfilingSampler:
+    """Captures cProfile profiles of a sample of the devices and of every slow device, in front of a scoring function.
+
+    A device is sampled when a stable hash of its ID falls in one of every sample_every buckets, so the same devices
+    are profiled in every process and every run. A device that is not sampled is scored without the profiler, and
+    when it takes longer than slow_seconds it is scored once more under the profiler, so only the outliers pay for
+    a second run. The device ID is taken from df.attrs["device_id"], set by BatchScoring and FleetPipeline; inputs
+    without one are sampled by their order within the process instead.
+
+    Every capture is written to output_dir as {device_id}.{reason}.{id}.pstats, for pstats or snakeviz, next to a
+    .json of its device ID, station model, input rows and wall time and an .input.parquet of the input to replay.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        sample_every: int = 0,
+        slow_seconds: float | None = None,
+        score_fn: Callable[..., pd.DataFrame] = ObcSqcCheck.run,
+    ) -> None:
+        """Creates the sampler, along with its directory if missing.
+
+        Args:
+        ----
+            output_dir (str): the directory of the profiles
+            sample_every (int): profile one in sample_every devices, 0 to sample none
+            slow_seconds (float | None): profile the devices scored slower than this, None to ignore wall time
+            score_fn (Callable[..., pd.DataFrame]): the scoring function, e.g. ObcSqcCheck.run
+        """
+        if sample_every < 0:
+            raise ValueError(f"Invalid sample_every {sample_every}, expected 0 or more")
+
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir: str = output_dir
+        self.sample_every: int = sample_every
+        self.slow_seconds: float | None = slow_seconds
+        self.score_fn: Callable[..., pd.DataFrame] = score_fn
+        self.calls: int = 0
+
+    def is_sampled(self, device_id: str | None) -> bool:
+        """Checks whether a device belongs to the sample.
+
+        Args:
+        ----
+            device_id (str | None): the device ID, None when unknown
+
+        Returns:
+        -------
+            bool: True if the device is profiled
+        """
+        self.calls += 1
+        if self.sample_every == 0:
+            return False
+        if device_id is None:
+            return (self.calls - 1) % self.sample_every == 0
+
+        digest: bytes = hashlib.blake2b(device_id.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big") % self.sample_every == 0
+
+    def capture(self, df: pd.DataFrame, device_id: str, reason: str, **kwargs: object) -> tuple[pd.DataFrame, str]:
+        """Scores a device under the profiler and writes the profile along with its metadata and input.
+
+        Args:
+        ----
+            df (pd.DataFrame): the raw data of the device
+            device_id (str): the device ID
+            reason (str): why the device is profiled, "sampled" or "slow"
+            **kwargs (object): passed on to score_fn, e.g. the date of ObcSqcCheck.run
+
+        Returns:
+        -------
+            tuple[pd.DataFrame, str]: the result of the device and the path of the profile
+        """
+        profiler: cProfile.Profile = cProfile.Profile()
+        start: float = time.perf_counter()
+        result_df: pd.DataFrame = profiler.runcall(self.score_fn, df, **kwargs)
+        wall: float = time.perf_counter() - start
+
+        path: str = os.path.join(self.output_dir, f"{device_id}.{reason}.{uuid.uuid4().hex[:12]}")
+        profiler.dump_stats(f"{path}.pstats")
+        df.to_parquet(f"{path}.input.parquet", index=False)
+        with open(f"{path}.json", "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "device_id": device_id,
+                    "model": str(df["model"].iloc[0]) if not df.empty else None,
+                    "rows": len(df),
+                    "reason": reason,
+                    "wall_seconds": wall,
+                    "qod_version": ObcSqcCheck.QOD_VERSION,
+                    "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                },
+                f,
+                indent=2,
+            )
+
+        return result_df, f"{path}.pstats"
+
+    def __call__(self, df: pd.DataFrame, **kwargs: object) -> pd.DataFrame:
+        """Scores a device, profiling it when it is sampled or slow.
+
+        Args:
+        ----
+            df (pd.DataFrame): the raw data of a device
+            **kwargs (object): passed on to score_fn, e.g. the date of ObcSqcCheck.run
+
+        Returns:
+        -------
+            pd.DataFrame: the result of the device
+        """
+        device_id: str | None = df.attrs.get("device_id")
+
+        if self.is_sampled(device_id):
+            return self.capture(df, device_id or "unknown", "sampled", **kwargs)[0]
+
+        start: float = time.perf_counter()
+        result_df: pd.DataFrame = self.score_fn(df, **kwargs)
+        if self.slow_seconds is not None and time.perf_counter() - start > self.slow_seconds:
+            self.capture(df, device_id or "unknown", "slow", **kwargs)
+
+        return result_df
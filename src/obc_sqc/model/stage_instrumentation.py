@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import time
+import tracemalloc
+from typing import TYPE_CHECKING, Any, Callable
+
+import pandas as pd
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+
+class StageInstrumentation:
+    """Records the wall time, CPU time, row counts and peak allocated bytes of every stage of ObcSqcCheck.run.
+
+    Stages are run through call(), which only forwards the call when the instrumentation is disabled. Peak
+    allocations are recorded while tracemalloc is tracing, i.e. within a `with StageInstrumentation() as stages:`
+    block or when tracing was started elsewhere, and are None otherwise.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        """Creates an empty record.
+
+        Args:
+        ----
+            enabled (bool): record the stages, a disabled instrumentation only runs them
+        """
+        self.enabled: bool = enabled
+        self.stages: list[dict[str, Any]] = []
+        self._started_tracing: bool = False
+
+    def __enter__(self) -> Self:  # noqa: D105
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:  # noqa: D105
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def call(self, stage: str, parameter: str | None, fn: Callable[..., Any], *args: Any) -> Any:
+        """Runs a stage and records it.
+
+        Args:
+        ----
+            stage (str): the name of the stage, e.g. obc or minute_averaging
+            parameter (str | None): the parameter the stage runs for, None for the stages of the whole device
+            fn (Callable[..., Any]): the stage
+            *args (Any): the arguments of the stage, the first being its input dataframe
+
+        Returns:
+        -------
+            Any: the output of the stage
+        """
+        if not self.enabled:
+            return fn(*args)
+
+        tracing: bool = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            allocated_before: int = tracemalloc.get_traced_memory()[0]
+
+        wall_start: float = time.perf_counter()
+        cpu_start: float = time.process_time()
+        output: Any = fn(*args)
+        cpu_time: float = time.process_time() - cpu_start
+        wall_time: float = time.perf_counter() - wall_start
+
+        # Stages producing several dataframes are measured by the last one, e.g. the averages of minute_averaging
+        output_df: Any = output[-1] if isinstance(output, tuple) else output
+
+        self.stages.append({
+            "stage": stage,
+            "parameter": parameter,
+            "wall_time": wall_time,
+            "cpu_time": cpu_time,
+            "rows_in": len(args[0]) if isinstance(args[0], (pd.DataFrame, pd.Series)) else None,
+            "rows_out": len(output_df) if isinstance(output_df, (pd.DataFrame, pd.Series)) else None,
+            "peak_bytes": tracemalloc.get_traced_memory()[1] - allocated_before if tracing else None,
+        })
+
+        return output
+
+    def report(self) -> dict[str, Any]:
+        """Returns the record of the run.
+
+        Args:
+        ----
+            None
+
+        Returns:
+        -------
+            dict[str, Any]: the totals of the run and the record of every stage, in the order they ran
+        """
+        peaks: list[int] = [stage["peak_bytes"] for stage in self.stages if stage["peak_bytes"] is not None]
+
+        return {
+            "wall_time": sum(stage["wall_time"] for stage in self.stages),
+            "cpu_time": sum(stage["cpu_time"] for stage in self.stages),
+            "peak_bytes": max(peaks) if peaks else None,
+            "stages": self.stages,
+        }
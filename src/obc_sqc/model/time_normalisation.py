@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from obc_sqc.schema.schema import SchemaDefinitions
+
+
+class TimeNormalisation:
+    """Standardises raw data over time, onto a fixed grid of data_timestep."""
+
+    @staticmethod
+    def time_normalisation_dataframe(
+        df: pd.DataFrame,
+        data_timestep: int,
+        time_tolerance: int,
+        start: pd.Timestamp | None = None,
+        end: pd.Timestamp | None = None,
+    ) -> pd.DataFrame:
+        """Snaps the raw observations of a device to a grid of fixed temporal resolution.
+
+        The grid is aligned to multiples of data_timestep (since the epoch). Every observation is assigned to its
+        nearest slot, as long as it lies within time_tolerance of it; observations further away are dropped. When
+        more than one observation is assigned to the same slot, the closest one is kept and, on a tie, the earliest
+        one. Slots without an observation are inserted as rows with nan weather data, so data that is already on
+        the grid is returned unchanged.
+
+        Args:
+        ----
+            df (pd.DataFrame): the raw data of a device, following SchemaDefinitions.qod_input_schema()
+            data_timestep (int): the timestep of the grid [in seconds]
+            time_tolerance (int): the max distance of an observation from its slot [in seconds]
+            start (pd.Timestamp | None): the first slot of the grid. When omitted, the slot of the first observation
+            end (pd.Timestamp | None): the last slot of the grid. When omitted, the slot of the last observation
+
+        Returns:
+        -------
+            pd.DataFrame: a dataframe with one row per slot, sorted by utc_datetime and with a fresh RangeIndex
+        """
+        timestamps: npt.NDArray[np.int64] = pd.to_datetime(df["utc_datetime"]).to_numpy("datetime64[ns]").view("i8")
+        order: npt.NDArray[np.intp] = np.argsort(timestamps, kind="stable")
+        timestamps = timestamps[order]
+
+        if len(timestamps) == 0 and (start is None or end is None):
+            return df.reset_index(drop=True)
+
+        grid, kept, kept_slots = TimeNormalisation.assign_slots(timestamps, data_timestep, time_tolerance, start, end)
+
+        normalised_df: pd.DataFrame = (
+            df.iloc[order[kept]]
+            .set_axis(kept_slots, axis=0)
+            .reindex(np.arange(len(grid)))
+            .reset_index(drop=True)
+        )
+        normalised_df["utc_datetime"] = pd.to_datetime(grid)
+
+        # Weather data of the inserted slots stay nan, the rest of the columns describe the device
+        for column in normalised_df.columns.difference([*SchemaDefinitions.weather_data_columns(), "utc_datetime"]):
+            normalised_df[column] = normalised_df[column].ffill().bfill()
+
+        return normalised_df
+
+    @staticmethod
+    def assign_slots(
+        timestamps: npt.NDArray[np.int64],
+        data_timestep: int,
+        time_tolerance: int,
+        start: pd.Timestamp | None = None,
+        end: pd.Timestamp | None = None,
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.intp], npt.NDArray[np.intp]]:
+        """Picks the observation kept in every slot of the grid, following time_normalisation_dataframe().
+
+        Args:
+        ----
+            timestamps (npt.NDArray[np.int64]): the sorted timestamps of the observations [in ns since the epoch],
+                            not empty unless both start and end are given
+            data_timestep (int): the timestep of the grid [in seconds]
+            time_tolerance (int): the max distance of an observation from its slot [in seconds]
+            start (pd.Timestamp | None): the first slot of the grid. When omitted, the slot of the first observation
+            end (pd.Timestamp | None): the last slot of the grid. When omitted, the slot of the last observation
+
+        Returns:
+        -------
+            tuple[npt.NDArray[np.int64], npt.NDArray[np.intp], npt.NDArray[np.intp]]: the slots of the grid [in ns
+                            since the epoch], the positions of the kept observations in timestamps and their slots
+        """
+        step_ns: int = data_timestep * 1_000_000_000
+        tolerance_ns: int = time_tolerance * 1_000_000_000
+
+        # Boundaries of the grid, as slot numbers since the epoch. Without explicit boundaries the grid spans
+        # all observations and is trimmed to the slots actually used further below
+        first_slot: int = -(-pd.Timestamp(start).value // step_ns) if start is not None else timestamps[0] // step_ns
+        last_slot: int = pd.Timestamp(end).value // step_ns if end is not None else -(-timestamps[-1] // step_ns)
+        grid: npt.NDArray[np.int64] = np.arange(first_slot, last_slot + 1, dtype=np.int64) * step_ns
+        if len(grid) == 0:
+            raise ValueError(f"The grid between {start} and {end} does not contain any slot")
+
+        # The candidate slots of every observation are the grid points right before and right after it
+        right: npt.NDArray[np.intp] = np.searchsorted(grid, timestamps, side="left")
+        left: npt.NDArray[np.intp] = np.clip(right - 1, 0, None)
+        right = np.clip(right, 0, len(grid) - 1)
+
+        distance_left: npt.NDArray[np.int64] = np.abs(timestamps - grid[left])
+        distance_right: npt.NDArray[np.int64] = np.abs(grid[right] - timestamps)
+
+        # On equal distance the earlier slot is preferred
+        use_right: npt.NDArray[np.bool_] = distance_right < distance_left
+        slots: npt.NDArray[np.intp] = np.where(use_right, right, left)
+        distance: npt.NDArray[np.int64] = np.where(use_right, distance_right, distance_left)
+
+        within_tolerance: npt.NDArray[np.bool_] = distance <= tolerance_ns
+        candidates: npt.NDArray[np.intp] = np.flatnonzero(within_tolerance)
+
+        # Sort by slot, then by distance, then by time, and keep the first observation of every slot
+        ranking: npt.NDArray[np.intp] = np.lexsort((timestamps[candidates], distance[candidates], slots[candidates]))
+        candidates = candidates[ranking]
+        _, first_of_slot = np.unique(slots[candidates], return_index=True)
+        kept: npt.NDArray[np.intp] = candidates[first_of_slot]
+
+        if start is None and len(kept) > 0:
+            first_kept_slot: int = slots[kept[0]]
+            grid = grid[first_kept_slot:]
+            slots = slots - first_kept_slot
+        if end is None and len(kept) > 0:
+            grid = grid[: slots[kept[-1]] + 1]
+
+        return grid, kept, slots[kept]
@@ -1,14 +1,14 @@
 from __future__ import annotations
 
-from mlflow.models import ModelSignature
-from mlflow.types import ColSpec, ParamSchema, ParamSpec
-from mlflow.types import DataType
-from mlflow.types import Schema
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from mlflow.models import ModelSignature
 
 
 class SchemaDefinitions:  # noqa: D101
     @staticmethod
-    def mlflow_obc_sqc_schema():  # noqa: D102
+    def mlflow_obc_sqc_schema() -> dict[str, Any]:  # noqa: D102
         return {
             "temperature_score": "Float64",
             "humidity_score": "Float64",
@@ -43,7 +43,20 @@ class SchemaDefinitions:  # noqa: D101
         }
 
     @staticmethod
-    def mlflow_signature():  # noqa: D102
+    def mlflow_obc_sqc_batch_schema() -> dict[str, Any]:  # noqa: D102
+        # The result of a batch of devices: the result of every device, along with its ID and scoring status
+        return {
+            "device_id": str,
+            **SchemaDefinitions.mlflow_obc_sqc_schema(),
+            "status": str,
+        }
+
+    @staticmethod
+    def mlflow_signature() -> ModelSignature:  # noqa: D102
+        # mlflow is imported here, so that the scoring path can use the rest of the schemas without importing it
+        from mlflow.models import ModelSignature  # noqa: PLC0415
+        from mlflow.types import ColSpec, DataType, ParamSchema, ParamSpec, Schema  # noqa: PLC0415
+
         # Log model for future use
         input_schema = Schema(
             [
@@ -56,6 +69,8 @@ class SchemaDefinitions:  # noqa: D101
                 ColSpec(DataType.double, "illuminance"),
                 ColSpec(DataType.double, "precipitation_accumulated"),
                 ColSpec(DataType.string, "model"),
+                # Present only when scoring a batch of devices
+                ColSpec(DataType.string, "device_id", optional=True),
             ]
         )
 
@@ -91,6 +106,8 @@ class SchemaDefinitions:  # noqa: D101
                 ColSpec(DataType.integer, "month"),
                 ColSpec(DataType.integer, "day"),
                 ColSpec(DataType.integer, "hour"),
+                ColSpec(DataType.string, "device_id", optional=True),
+                ColSpec(DataType.string, "status", optional=True),
             ]
         )
 
@@ -98,6 +115,8 @@ class SchemaDefinitions:  # noqa: D101
             [
                 ParamSpec("log_to_opensearch", "boolean", False),
                 ParamSpec("device_id", "string", "UNKNOWN"),
+                ParamSpec("max_workers", "integer", 1),
+                ParamSpec("instrument_stages", "boolean", False),
             ]
         )
 
@@ -105,21 +124,40 @@ class SchemaDefinitions:  # noqa: D101
         return signature
 
     @staticmethod
-    def qod_input_schema():  # noqa: D102
+    def qod_input_schema() -> dict[str, Any]:  # noqa: D102
+        # Weather columns are plain float64 with nan for missing values and utc_datetime is parsed once here,
+        # so the internal stages stay on numpy's fast paths instead of the nullable extension types
         return {
-            "temperature": "Float64",
-            "humidity": "Float64",
-            "wind_speed": "Float64",
-            "wind_direction": "Float64",
-            "pressure": "Float64",
-            "illuminance": "Float64",
-            "precipitation_accumulated": "Float64",
+            "temperature": "float64",
+            "humidity": "float64",
+            "wind_speed": "float64",
+            "wind_direction": "float64",
+            "pressure": "float64",
+            "illuminance": "float64",
+            "precipitation_accumulated": "float64",
             "model": str,
-            "utc_datetime": str,
+            "utc_datetime": "datetime64[ns]",
+        }
+
+    @staticmethod
+    def storage_dtypes() -> list[str]:  # noqa: D102
+        # The dtypes the weather values can be held in before scoring. Every check widens them to float64, so
+        # float32 halves the memory of a fleet at the cost of rounding the raw values to ~7 significant digits
+        return ["float64", "float32"]
+
+    @staticmethod
+    def qod_storage_schema(value_dtype: str = "float64") -> dict[str, Any]:  # noqa: D102
+        # qod_input_schema() with the weather columns held in one of storage_dtypes()
+        if value_dtype not in SchemaDefinitions.storage_dtypes():
+            raise ValueError(f"Unknown value dtype {value_dtype}, expected one of {SchemaDefinitions.storage_dtypes()}")
+        weather_columns: list[str] = SchemaDefinitions.weather_data_columns()
+        return {
+            column: value_dtype if column in weather_columns else dtype
+            for column, dtype in SchemaDefinitions.qod_input_schema().items()
         }
 
     @staticmethod
-    def weather_data_columns():  # noqa: D102
+    def weather_data_columns() -> list[str]:  # noqa: D102
         return [
             "temperature",
             "humidity",
@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import uuid
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from obc_sqc.model.initial_params import InitialParams
+from obc_sqc.model.time_normalisation import TimeNormalisation
+from obc_sqc.schema.schema import SchemaDefinitions
+
+
+class GridSeries:
+    """A device's weather data laid out on a fixed time grid, stored as memory-mappable arrays.
+
+    A series is a directory holding a small json header (grid origin, data_timestep, number of slots,
+    station model and value dtype), a packed presence bitmap and one dense array per weather column.
+    Slot i corresponds to the timestamp origin + i * data_timestep. Slots without an observation are
+    marked as absent in the bitmap and hold nan in every value array.
+
+    The directory of a series is a symlink to a hidden versioned directory next to it, so that write() can
+    replace a series by swapping the symlink, without a moment where the series is missing.
+    """
+
+    HEADER_FILE: str = "header.json"
+    PRESENCE_FILE: str = "presence.npy"
+    FORMAT_VERSION: int = 1
+
+    def __init__(
+        self,
+        origin: pd.Timestamp,
+        data_timestep: int,
+        model: str,
+        presence: npt.NDArray[np.bool_],
+        values: dict[str, npt.NDArray[np.floating]],
+    ) -> None:
+        """Creates a series from already gridded arrays.
+
+        Args:
+        ----
+            origin (pd.Timestamp): the timestamp of the first slot of the grid
+            data_timestep (int): the distance between two consecutive slots [in seconds]
+            model (str): the weather station model, e.g. WS1000 or WS2000
+            presence (npt.NDArray[np.bool_]): True for every slot that holds an observation
+            values (dict[str, npt.NDArray[np.floating]]): one array per weather column, as long as presence
+        """
+        self.origin: pd.Timestamp = pd.Timestamp(origin)
+        self.data_timestep: int = int(data_timestep)
+        self.model: str = model
+        self.presence: npt.NDArray[np.bool_] = presence
+        self.values: dict[str, npt.NDArray[np.floating]] = values
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self.presence)
+
+    @staticmethod
+    def data_timestep_of(model: str) -> int:
+        """Returns the timestep of the raw data of a station model [in seconds].
+
+        Args:
+        ----
+            model (str): the weather station model, e.g. WS1000 or WS2000
+
+        Returns:
+        -------
+            int: the timestep of the raw data
+        """
+        return InitialParams.time_grid(model)[0]
+
+    @staticmethod
+    def from_dataframe(df: pd.DataFrame, model: str | None = None, dtype: str = "float64") -> GridSeries:
+        """Converts the raw observations of a single device to a gridded series.
+
+        Observations are assigned to the slots of a grid aligned to multiples of data_timestep by the rule of
+        TimeNormalisation: the nearest slot within time_tolerance and, when more than one observation falls into
+        the same slot, the closest one, then the earliest one. The same input is therefore scored the same from
+        a parquet and from the store.
+
+        Args:
+        ----
+            df (pd.DataFrame): the raw data of one device, following SchemaDefinitions.qod_input_schema()
+            model (str | None): the weather station model. When omitted, the "model" column of df is used
+            dtype (str): the dtype of the stored value arrays, "float64" or "float32"
+
+        Returns:
+        -------
+            GridSeries: the gridded series
+        """
+        if model is None:
+            model = str(df["model"].iloc[0])
+
+        data_timestep, time_tolerance = InitialParams.time_grid(model)
+
+        timestamps: npt.NDArray[np.int64] = pd.to_datetime(df["utc_datetime"]).to_numpy("datetime64[ns]").view("i8")
+        order: npt.NDArray[np.intp] = np.argsort(timestamps, kind="stable")
+        timestamps = timestamps[order]
+
+        grid: npt.NDArray[np.int64] = np.zeros(0, dtype=np.int64)
+        kept: npt.NDArray[np.intp] = np.zeros(0, dtype=np.intp)
+        slots: npt.NDArray[np.intp] = np.zeros(0, dtype=np.intp)
+        if len(timestamps) > 0:
+            grid, kept, slots = TimeNormalisation.assign_slots(timestamps, data_timestep, time_tolerance)
+
+        presence: npt.NDArray[np.bool_] = np.zeros(len(grid), dtype=bool)
+        presence[slots] = True
+
+        values: dict[str, npt.NDArray[np.floating]] = {}
+        for column in SchemaDefinitions.weather_data_columns():
+            column_values: npt.NDArray[np.float64] = (
+                df[column].to_numpy(dtype="float64", na_value=np.nan)[order]
+                if column in df
+                else np.full(len(df), np.nan)
+            )
+            dense: npt.NDArray[np.floating] = np.full(len(grid), np.nan, dtype=dtype)
+            dense[slots] = column_values[kept]
+            values[column] = dense
+
+        origin: pd.Timestamp = pd.Timestamp(int(grid[0]) if len(grid) > 0 else 0)
+
+        return GridSeries(origin, data_timestep, model, presence, values)
+
+    def timestamps(self) -> pd.DatetimeIndex:
+        """Returns the timestamps of all the slots of the grid.
+
+        Args:
+        ----
+            None
+
+        Returns:
+        -------
+            pd.DatetimeIndex: the timestamp of every slot
+        """
+        return pd.date_range(self.origin, periods=len(self), freq=f"{self.data_timestep}s")
+
+    def to_dataframe(self, fill_absent: bool = True) -> pd.DataFrame:
+        """Converts the series back to the input layout of ObcSqcCheck.run.
+
+        With fill_absent, the weather columns are views of the value arrays, i.e. of the mapped files of an
+        opened series, and are not read until used. They keep the dtype of the series, which
+        ObcSqcCheck.prepare_input() widens to float64 when float32.
+
+        Args:
+        ----
+            fill_absent (bool): if True, slots without an observation are returned as rows of nan,
+                                otherwise only the present slots are returned, as copies
+
+        Returns:
+        -------
+            pd.DataFrame: the data, containing the columns of SchemaDefinitions.qod_input_schema(), one row per slot
+                            and sorted by utc_datetime
+        """
+        selection: slice | npt.NDArray[np.bool_] = slice(None) if fill_absent else np.asarray(self.presence)
+
+        data: dict[str, npt.NDArray | pd.DatetimeIndex] = {
+            column: np.asarray(self.values[column])[selection] for column in SchemaDefinitions.weather_data_columns()
+        }
+        data["utc_datetime"] = self.timestamps()[selection]
+
+        # Without copy=False, the columns would be copied into a single block
+        df: pd.DataFrame = pd.DataFrame(data, copy=False)
+        df["model"] = self.model
+
+        return df
+
+    def write(self, path: str) -> None:
+        """Writes the series to a directory.
+
+        The series is first written to a new hidden directory next to its final location, the symlink at path
+        is then atomically switched to it and only then the previous directory is removed. Readers therefore
+        find either the previous or the new series, never a partial or missing one.
+
+        Args:
+        ----
+            path (str): the directory of the series
+        """
+        parent: str = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        tmp_path: str = tempfile.mkdtemp(dir=parent, prefix=f".{os.path.basename(path)}.")
+
+        header: dict = {
+            "format_version": GridSeries.FORMAT_VERSION,
+            "origin": self.origin.isoformat(),
+            "data_timestep": self.data_timestep,
+            "length": len(self),
+            "model": self.model,
+            "columns": list(self.values),
+            "dtype": str(next(iter(self.values.values())).dtype) if self.values else "float64",
+        }
+
+        with open(os.path.join(tmp_path, GridSeries.HEADER_FILE), "w", encoding="utf-8") as f:
+            json.dump(header, f)
+
+        np.save(os.path.join(tmp_path, GridSeries.PRESENCE_FILE), np.packbits(self.presence))
+        for column, column_values in self.values.items():
+            np.save(os.path.join(tmp_path, f"{column}.npy"), np.ascontiguousarray(column_values))
+
+        previous_path: str | None = None
+        if os.path.islink(path):
+            previous_path = os.path.realpath(path)
+        elif os.path.isdir(path):
+            # A series written as a plain directory, before the symlinks, is moved aside once
+            previous_path = os.path.join(parent, f".{os.path.basename(path)}.{uuid.uuid4().hex[:12]}")
+            os.replace(path, previous_path)
+
+        link_path: str = os.path.join(parent, f".{os.path.basename(path)}.{uuid.uuid4().hex[:12]}.link")
+        os.symlink(os.path.basename(tmp_path), link_path)
+        os.replace(link_path, path)
+
+        if previous_path is not None:
+            shutil.rmtree(previous_path)
+
+    @staticmethod
+    def open(path: str) -> GridSeries:  # noqa: A003
+        """Opens a series written by write().
+
+        The value arrays are memory-mapped read-only, so no data is read until it is used. The files are read
+        from the directory the series points to when opened, and the series is opened anew when a concurrent
+        write() removes that directory in the meantime.
+
+        Args:
+        ----
+            path (str): the directory of the series
+
+        Returns:
+        -------
+            GridSeries: the memory-mapped series
+        """
+        series_path: str = os.path.realpath(path)
+        try:
+            return GridSeries.open_directory(series_path)
+        except FileNotFoundError:
+            if os.path.realpath(path) == series_path:
+                raise
+            return GridSeries.open_directory(os.path.realpath(path))
+
+    @staticmethod
+    def open_directory(path: str) -> GridSeries:
+        """Opens the files of a series in the directory holding them.
+
+        Args:
+        ----
+            path (str): the resolved directory of the series
+
+        Returns:
+        -------
+            GridSeries: the memory-mapped series
+        """
+        with open(os.path.join(path, GridSeries.HEADER_FILE), encoding="utf-8") as f:
+            header: dict = json.load(f)
+
+        if header["format_version"] != GridSeries.FORMAT_VERSION:
+            raise ValueError(f"Unsupported grid series format version {header['format_version']} in {path}")
+
+        length: int = header["length"]
+        packed: npt.NDArray[np.uint8] = np.load(os.path.join(path, GridSeries.PRESENCE_FILE), mmap_mode="r")
+        presence: npt.NDArray[np.bool_] = np.unpackbits(packed, count=length).astype(bool)
+
+        values: dict[str, npt.NDArray[np.floating]] = {
+            column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode="r") for column in header["columns"]
+        }
+
+        return GridSeries(pd.Timestamp(header["origin"]), header["data_timestep"], header["model"], presence, values)
+
+    @staticmethod
+    def device_path(root: str, day: str, device_id: str) -> str:
+        """Returns the directory of the series of a device for a day.
+
+        Args:
+        ----
+            root (str): the root directory of the series store
+            day (str): the day, formatted as %Y_%m_%d
+            device_id (str): the device ID
+
+        Returns:
+        -------
+            str: the directory of the series
+        """
+        return os.path.join(root, day, device_id)
+
+    @staticmethod
+    def convert_day_parquet(parquet_path: str, root: str, day: str, dtype: str = "float64") -> int:
+        """Converts a day parquet (the input of file_model_inference) to one series per device.
+
+        Args:
+        ----
+            parquet_path (str): the path of the day parquet
+            root (str): the root directory of the series store
+            day (str): the day, formatted as %Y_%m_%d
+            dtype (str): the dtype of the stored value arrays, "float64" or "float32"
+
+        Returns:
+        -------
+            int: the number of converted devices
+        """
+        columns: list[str] = ["device_id", *SchemaDefinitions.qod_input_schema().keys()]
+        day_df: pd.DataFrame = pd.read_parquet(parquet_path, columns=columns)
+
+        converted: int = 0
+        for device_id, device_df in day_df.groupby("device_id", sort=False):
+            series: GridSeries = GridSeries.from_dataframe(device_df.drop_duplicates(), dtype=dtype)
+            series.write(GridSeries.device_path(root, day, str(device_id)))
+            converted += 1
+
+        return converted
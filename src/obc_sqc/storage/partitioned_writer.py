@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import uuid
+from typing import TYPE_CHECKING, Callable
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from obc_sqc.schema.schema import SchemaDefinitions
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+
+class PartitionedResultWriter:
+    """Writes the results of many devices to a parquet dataset partitioned by date and station model.
+
+    Results are handed over to a background thread through a queue of at most max_pending frames, so the scoring
+    loop only waits when the writer falls behind. The thread groups the rows by partition and writes a row group
+    once a partition holds row_group_rows rows, giving one file per partition and run,
+    {root}/date={date}/model={model}/part-{uuid}.parquet, instead of one small file per device. The string and
+    integer columns (annotations, versions, hours) repeat a handful of values and are dictionary encoded, while
+    the scores are left plain, and every page is compressed with zstd.
+
+    The partitions follow the model column of the results, which the QoD itself leaves empty: results are expected
+    from BatchScoring.combine(), which fills it from the input of every device, or from a scoring function wrapped
+    by tag_model(), and rows without a model go to the "unknown" partition.
+
+    Files are written under a hidden temporary name, which dataset readers ignore, and renamed once closed, so the
+    dataset never shows a partial file, even after a crash.
+    """
+
+    PARTITION_COLUMNS: tuple[str, str] = ("date", "model")
+
+    # The partition of the rows without a model
+    UNKNOWN_MODEL: str = "unknown"
+
+    def __init__(self, root: str, date: str, row_group_rows: int = 65536, max_pending: int = 16) -> None:
+        """Creates the writer and starts its thread.
+
+        Args:
+        ----
+            root (str): the root directory of the dataset
+            date (str): the date of the results, formatted as %Y-%m-%d
+            row_group_rows (int): the rows of a partition buffered before they are written as a row group
+            max_pending (int): the frames waiting for the thread before write() blocks
+        """
+        self.root: str = root
+        self.date: str = date
+        self.row_group_rows: int = row_group_rows
+        self.run_id: str = uuid.uuid4().hex[:12]
+
+        batch_schema: dict = SchemaDefinitions.mlflow_obc_sqc_batch_schema()
+        self.columns: list[str] = [column for column in batch_schema if column not in self.PARTITION_COLUMNS]
+        arrow_schema: pa.Schema = pa.schema([
+            (column, {str: pa.string(), "Float64": pa.float64(), "Int64": pa.int64()}[batch_schema[column]])
+            for column in self.columns
+        ])
+
+        # Along with the pandas metadata, so that the nullable dtypes are read back as such
+        empty_df: pd.DataFrame = pd.DataFrame(columns=self.columns).astype({
+            column: batch_schema[column] for column in self.columns
+        })
+        self.schema: pa.Schema = pa.Table.from_pandas(empty_df, schema=arrow_schema, preserve_index=False).schema
+        self.dictionary_columns: list[str] = [
+            column for column in self.columns if batch_schema[column] in {str, "Int64"}
+        ]
+
+        self.pending: queue.Queue[pd.DataFrame | None] = queue.Queue(maxsize=max_pending)
+        self.buffers: dict[str, list[pd.DataFrame]] = {}
+        self.writers: dict[str, pq.ParquetWriter] = {}
+        self.error: BaseException | None = None
+        self.closed: bool = False
+
+        self.thread: threading.Thread = threading.Thread(target=self.drain, name="qod-dataset-writer", daemon=True)
+        self.thread.start()
+
+    def __enter__(self) -> Self:  # noqa: D105
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, *exc_info: object) -> None:  # noqa: D105
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @staticmethod
+    def partition_model(models: pd.Series) -> pd.Series:
+        """Returns the model partition of every row, empty when the row has no model.
+
+        Args:
+        ----
+            models (pd.Series): the model column of results
+
+        Returns:
+        -------
+            pd.Series: the station models, with "" for the missing ones
+        """
+        return models.where(models.notna() & (models.astype(str) != "nan"), "").astype(str)
+
+    def partition_dir(self, model: str) -> str:
+        """Returns the directory of a partition.
+
+        Args:
+        ----
+            model (str): the station model, empty when unknown
+
+        Returns:
+        -------
+            str: the directory of the partition
+        """
+        return os.path.join(self.root, f"date={self.date}", f"model={model or self.UNKNOWN_MODEL}")
+
+    def partition_path(self, model: str) -> str:
+        """Returns the final file of a partition, present once the writer is closed.
+
+        Args:
+        ----
+            model (str): the station model, empty when unknown
+
+        Returns:
+        -------
+            str: the parquet file of the partition
+        """
+        return os.path.join(self.partition_dir(model), f"part-{self.run_id}.parquet")
+
+    def temporary_path(self, model: str) -> str:
+        """Returns the file a partition is written to until the writer is closed.
+
+        Args:
+        ----
+            model (str): the station model, empty when unknown
+
+        Returns:
+        -------
+            str: the hidden temporary file of the partition
+        """
+        return os.path.join(self.partition_dir(model), f".part-{self.run_id}.parquet.tmp")
+
+    @staticmethod
+    def tag_model(score_fn: Callable[..., pd.DataFrame], df: pd.DataFrame, **kwargs: object) -> pd.DataFrame:
+        """Scores a device and fills the model column of its result, which the QoD leaves empty.
+
+        Bound to a scoring function with functools.partial, it stays picklable for a process pool.
+
+        Args:
+        ----
+            score_fn (Callable[..., pd.DataFrame]): the scoring function, e.g. ObcSqcCheck.run
+            df (pd.DataFrame): the raw data of a device
+            **kwargs (object): passed on to score_fn, e.g. the matrices of BatchScoring.score_device_batch()
+
+        Returns:
+        -------
+            pd.DataFrame: the result of the device, with the model it is partitioned by
+        """
+        return score_fn(df, **kwargs).assign(model=str(df["model"].iloc[0]))
+
+    def write(self, result_df: pd.DataFrame) -> None:
+        """Queues results for writing, waiting while max_pending frames are already queued.
+
+        Args:
+        ----
+            result_df (pd.DataFrame): results following SchemaDefinitions.mlflow_obc_sqc_batch_schema()
+        """
+        if self.error is not None:
+            raise self.error
+        if self.closed:
+            raise ValueError("The writer is closed")
+
+        self.pending.put(result_df)
+
+    def __call__(self, device_id: str, result_df: pd.DataFrame) -> str:
+        """Queues the result of a single device, as the write_fn of a FleetPipeline.
+
+        Args:
+        ----
+            device_id (str): the device ID
+            result_df (pd.DataFrame): the QoD result of the device
+
+        Returns:
+        -------
+            str: the file that will hold the result once the writer is closed. A FleetPipeline journals it only
+                 after closing the writer through its commit_fn
+        """
+        self.write(result_df.assign(device_id=device_id, status="success"))
+
+        return self.partition_path(self.partition_model(result_df["model"]).iloc[0] if not result_df.empty else "")
+
+    def drain(self) -> None:
+        """Groups the queued results by partition and writes full row groups, until close() or abort()."""
+        while (result_df := self.pending.get()) is not None:
+            if self.error is not None:
+                # Keep consuming, so that write() does not block once the thread has failed
+                continue
+
+            try:
+                for model, partition_df in result_df.groupby(self.partition_model(result_df["model"]), sort=False):
+                    buffer: list[pd.DataFrame] = self.buffers.setdefault(model, [])
+                    buffer.append(partition_df)
+                    if sum(len(df) for df in buffer) >= self.row_group_rows:
+                        self.flush(model)
+            except BaseException as e:
+                self.error = e
+
+    def flush(self, model: str) -> None:
+        """Writes the buffered rows of a partition as a row group.
+
+        Args:
+        ----
+            model (str): the station model of the partition
+        """
+        buffer: list[pd.DataFrame] = self.buffers.pop(model, [])
+        if not buffer:
+            return
+
+        batch_schema: dict = SchemaDefinitions.mlflow_obc_sqc_batch_schema()
+        partition_df: pd.DataFrame = pd.concat(buffer, ignore_index=True).reindex(columns=self.columns)
+        partition_df = partition_df.astype({column: batch_schema[column] for column in self.columns})
+        table: pa.Table = pa.Table.from_pandas(partition_df, schema=self.schema, preserve_index=False)
+
+        if model not in self.writers:
+            os.makedirs(self.partition_dir(model), exist_ok=True)
+            self.writers[model] = pq.ParquetWriter(
+                self.temporary_path(model),
+                self.schema,
+                use_dictionary=self.dictionary_columns,
+                compression="zstd",
+            )
+        self.writers[model].write_table(table, row_group_size=len(table))
+
+    def stop(self) -> None:
+        """Stops the thread once the queued results are consumed."""
+        if not self.closed:
+            self.closed = True
+            self.pending.put(None)
+            self.thread.join()
+
+    def close(self) -> list[str]:
+        """Writes the remaining rows and moves every partition file to its final name.
+
+        Args:
+        ----
+            None
+
+        Returns:
+        -------
+            list[str]: the files of the dataset written by this writer
+        """
+        self.stop()
+        if self.error is not None:
+            self.abort()
+            raise self.error
+
+        try:
+            for model in list(self.buffers):
+                self.flush(model)
+        except BaseException:
+            self.abort()
+            raise
+
+        paths: list[str] = []
+        for model, writer in self.writers.items():
+            writer.close()
+            os.replace(self.temporary_path(model), self.partition_path(model))
+            paths.append(self.partition_path(model))
+        self.writers = {}
+
+        return paths
+
+    def abort(self) -> None:
+        """Discards the results, leaving no file of this writer in the dataset."""
+        self.stop()
+        self.buffers = {}
+
+        for model, writer in self.writers.items():
+            writer.close()
+            os.remove(self.temporary_path(model))
+        self.writers = {}
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+
+class JournalEntry(NamedTuple):
+    """The latest outcome of a (device, date) unit of a fleet or backfill run."""
+
+    status: str
+    output: str | None
+
+
+class ProgressJournal:
+    """An append-only journal of the (device, date) units of a fleet or backfill run, for resuming it.
+
+    Every finished unit is appended as one json line, {"device_id", "date", "status", "output"}, where output is
+    the file holding its result. A line is written with a single write() on a file opened for appending and
+    synced to disk before the unit counts as done, so a crash or preemption loses at most the line being written,
+    and a torn last line is ignored when the journal is read again. A restarted run skips the units whose latest
+    entry is a success with its output still in place, and retries the failed and missing ones.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Opens the journal, reading the entries of previous runs.
+
+        Args:
+        ----
+            path (str): the journal file, created if missing
+        """
+        self.path: str = path
+        self.entries: dict[tuple[str, str], JournalEntry] = {}
+        self.lock: threading.Lock = threading.Lock()
+
+        content: bytes = b""
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                content = f.read()
+
+        for line in content.splitlines():
+            try:
+                entry: dict = json.loads(line)
+            except json.JSONDecodeError:
+                # The line being written when a previous run stopped
+                continue
+            self.entries[(entry["device_id"], entry["date"])] = JournalEntry(entry["status"], entry["output"])
+
+        self.fd: int = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+        # A torn last line is terminated, so that it does not swallow the next entry
+        if content and not content.endswith(b"\n"):
+            os.write(self.fd, b"\n")
+
+    def __enter__(self) -> Self:  # noqa: D105
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:  # noqa: D105
+        self.close()
+
+    def close(self) -> None:
+        """Closes the journal file."""
+        os.close(self.fd)
+
+    def record(self, device_id: str, date: str, status: str, output: str | None = None) -> None:
+        """Appends the outcome of a unit, returning once it is on disk.
+
+        Args:
+        ----
+            device_id (str): the device ID
+            date (str): the date, formatted as %Y-%m-%d
+            status (str): "success" or "failure"
+            output (str | None): the file holding the result of the unit
+        """
+        line: bytes = (
+            json.dumps({"device_id": device_id, "date": date, "status": status, "output": output}) + "\n"
+        ).encode()
+
+        with self.lock:
+            os.write(self.fd, line)
+            os.fsync(self.fd)
+            self.entries[(device_id, date)] = JournalEntry(status, output)
+
+    def is_completed(self, device_id: str, date: str) -> bool:
+        """Checks whether a unit has been completed by this or a previous run.
+
+        Args:
+        ----
+            device_id (str): the device ID
+            date (str): the date, formatted as %Y-%m-%d
+
+        Returns:
+        -------
+            bool: True if the latest entry of the unit is a success and its output still exists
+        """
+        entry: JournalEntry | None = self.entries.get((device_id, date))
+        if entry is None or entry.status != "success":
+            return False
+
+        return entry.output is None or os.path.exists(entry.output)
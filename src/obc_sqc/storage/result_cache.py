@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import os
+import tempfile
+from typing import IO, Callable
+
+import pandas as pd
+
+from obc_sqc.model.initial_params import InitialParams
+from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from obc_sqc.model.time_normalisation import TimeNormalisation
+from obc_sqc.schema.schema import SchemaDefinitions
+
+
+class ResultCache:
+    """A content-addressed cache of QoD results in front of a scoring function, stored in a local directory.
+
+    A result is keyed by a hash of the input window normalised to the grid of its station model, the model and
+    ObcSqcCheck.QOD_VERSION, so an unchanged device-day costs a hash and a file read instead of a run and a new
+    algorithm version never reads older results. Results are stored as {cache_dir}/{key[:2]}/{key}.parquet.
+
+    The size of the stored results is tracked in {cache_dir}/size, updated under a lock by every process sharing
+    cache_dir, so it survives the cache being pickled to the workers of a process pool. The directory is only
+    scanned by the first put and once the stored results exceed max_bytes, evicting the least recently used
+    results down to low_water * max_bytes.
+
+    Concurrent misses of the same key, from threads or processes sharing cache_dir, compute the result once: the
+    first one holds a lock file while scoring, and the rest wait for it and read its result. The holder removes
+    the lock file before releasing it, and a waiter that then acquires the removed file tries again.
+    """
+
+    # The file holding the size of the stored results, in cache_dir
+    SIZE_FILE: str = "size"
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int = 1 << 30,
+        score_fn: Callable[..., pd.DataFrame] = ObcSqcCheck.run,
+        low_water: float = 0.9,
+    ) -> None:
+        """Creates the cache, along with its directory if missing.
+
+        Args:
+        ----
+            cache_dir (str): the directory of the cached results
+            max_bytes (int): the size of the stored results above which the least recently used are evicted
+            score_fn (Callable[..., pd.DataFrame]): the scoring function, e.g. ObcSqcCheck.run
+            low_water (float): the fraction of max_bytes the stored results are evicted down to
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir: str = cache_dir
+        self.max_bytes: int = max_bytes
+        self.score_fn: Callable[..., pd.DataFrame] = score_fn
+        self.low_water: float = low_water
+
+    @staticmethod
+    def key(df: pd.DataFrame, date: str | None = None) -> str:
+        """Hashes the normalised input window of a device together with its station model and the QoD version.
+
+        Args:
+        ----
+            df (pd.DataFrame): the raw data of a device
+            date (str | None): the date the device is scored for, which only the result of an empty input
+                            depends on
+
+        Returns:
+        -------
+            str: the hex digest of the key
+        """
+        # Casting first makes e.g. nullable Float64 and float64 inputs with the same values share a key
+        input_df: pd.DataFrame = ObcSqcCheck.prepare_input(df)[list(SchemaDefinitions.qod_input_schema().keys())]
+
+        digest = hashlib.blake2b(digest_size=20)
+        if input_df.empty:
+            # The result is then the NO_DATA result of the date, whatever the model
+            digest.update(f"empty/{date}/{ObcSqcCheck.QOD_VERSION}".encode())
+            return digest.hexdigest()
+
+        # Row order and duplicate rows do not change the normalised window, nor then the key
+        model: str = str(input_df["model"].iloc[0])
+        input_df = input_df.drop_duplicates().sort_values(list(input_df.columns), ignore_index=True)
+        normalised_df: pd.DataFrame = TimeNormalisation.time_normalisation_dataframe(
+            input_df, *InitialParams.time_grid(model)
+        )
+
+        digest.update(pd.util.hash_pandas_object(normalised_df, index=False).to_numpy().tobytes())
+        digest.update(f"{model}/{ObcSqcCheck.QOD_VERSION}".encode())
+
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        """Returns the file of a cached result.
+
+        Args:
+        ----
+            key (str): the key of the result
+
+        Returns:
+        -------
+            str: the parquet file of the result
+        """
+        return os.path.join(self.cache_dir, key[:2], f"{key}.parquet")
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        """Reads a cached result, marking it as recently used.
+
+        Args:
+        ----
+            key (str): the key of the result
+
+        Returns:
+        -------
+            pd.DataFrame | None: the result, None when it is not cached
+        """
+        path: str = self.path(key)
+        try:
+            result_df: pd.DataFrame = pd.read_parquet(path)
+            os.utime(path)
+        except FileNotFoundError:
+            # Missing or evicted in the meantime
+            return None
+
+        return result_df
+
+    def put(self, key: str, result_df: pd.DataFrame) -> None:
+        """Stores a result, evicting the least recently used ones once the stored results exceed max_bytes.
+
+        Args:
+        ----
+            key (str): the key of the result
+            result_df (pd.DataFrame): the result
+        """
+        path: str = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Readers see either no file or a complete one
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        result_df.to_parquet(tmp_path)
+        size: int = os.path.getsize(tmp_path)
+
+        with open(os.path.join(self.cache_dir, self.SIZE_FILE), "a+", encoding="utf-8") as f:
+            # Released when the file is closed. Moving the result in place under the lock keeps a concurrent scan
+            # from counting it twice
+            fcntl.flock(f, fcntl.LOCK_EX)
+            os.replace(tmp_path, path)
+            f.seek(0)
+            content: str = f.read().strip()
+
+            stored_bytes: int
+            if not content or int(content) + size > self.max_bytes:
+                stored_bytes = self.evict()
+            else:
+                stored_bytes = int(content) + size
+
+            f.truncate(0)
+            f.write(str(stored_bytes))
+
+    def stored_bytes(self) -> int | None:
+        """Returns the size of the stored results, as tracked by put().
+
+        Args:
+        ----
+            None
+
+        Returns:
+        -------
+            int | None: the size of the stored results, None before the first put()
+        """
+        try:
+            with open(os.path.join(self.cache_dir, self.SIZE_FILE), encoding="utf-8") as f:
+                content: str = f.read().strip()
+        except FileNotFoundError:
+            return None
+
+        return int(content) if content else None
+
+    def evict(self) -> int:
+        """Scans the stored results and, over max_bytes, removes the least recently used down to low_water.
+
+        Lock files are left alone, they are removed by the holder of the lock.
+
+        Args:
+        ----
+            None
+
+        Returns:
+        -------
+            int: the size of the results left
+        """
+        entries: list[os.DirEntry] = [
+            entry
+            for shard in os.scandir(self.cache_dir)
+            if shard.is_dir()
+            for entry in os.scandir(shard.path)
+            if entry.name.endswith(".parquet")
+        ]
+        stats: list[tuple[float, int, str]] = []
+        for entry in entries:
+            try:
+                stat: os.stat_result = entry.stat()
+            except FileNotFoundError:
+                continue
+            stats.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_bytes: int = sum(size for _, size, _ in stats)
+        if total_bytes > self.max_bytes:
+            for _, size, path in sorted(stats):
+                if total_bytes <= self.max_bytes * self.low_water:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total_bytes -= size
+
+        return total_bytes
+
+    def lock(self, key: str) -> IO[str]:
+        """Opens and locks the lock file of a key, waiting for its current holder.
+
+        flock() excludes other processes and other open files of this process alike. A holder removes the lock
+        file before releasing it, so a file locked after its removal is stale and the lock is taken anew.
+
+        Args:
+        ----
+            key (str): the key of the result
+
+        Returns:
+        -------
+            IO[str]: the locked file, to pass to unlock()
+        """
+        lock_path: str = f"{self.path(key)}.lock"
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+
+        while True:
+            lock: IO[str] = open(lock_path, "a", encoding="utf-8")
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                if os.stat(lock_path).st_ino == os.fstat(lock.fileno()).st_ino:
+                    return lock
+            except FileNotFoundError:
+                pass
+            lock.close()
+
+    def unlock(self, key: str, lock: IO[str]) -> None:
+        """Removes the lock file of a key and releases it.
+
+        Args:
+        ----
+            key (str): the key of the result
+            lock (IO[str]): the file returned by lock()
+        """
+        try:
+            os.remove(f"{self.path(key)}.lock")
+        except FileNotFoundError:
+            pass
+        finally:
+            lock.close()
+
+    def __call__(self, df: pd.DataFrame, date: str | None = None, **kwargs: object) -> pd.DataFrame:
+        """Returns the cached result of a device, scoring it on a miss.
+
+        Args:
+        ----
+            df (pd.DataFrame): the raw data of a device
+            date (str | None): the date the device is scored for, passed on to score_fn when given
+            **kwargs (object): passed on to score_fn
+
+        Returns:
+        -------
+            pd.DataFrame: the result of score_fn
+        """
+        key: str = self.key(df, date)
+        if date is not None:
+            kwargs["date"] = date
+
+        result_df: pd.DataFrame | None = self.get(key)
+        if result_df is not None:
+            return result_df
+
+        lock: IO[str] = self.lock(key)
+        try:
+            # The result may have been stored while waiting for the lock
+            result_df = self.get(key)
+            if result_df is None:
+                result_df = self.score_fn(df, **kwargs)
+                self.put(key, result_df)
+        finally:
+            self.unlock(key, lock)
+
+        return result_df
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import functools
+import os
+import shutil
+import tempfile
+from typing import TYPE_CHECKING
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+import pyarrow as pa
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+
+class SharedDay:
+    """The raw data of a fleet, written once to an Arrow IPC file that the scoring processes memory-map.
+
+    The rows are grouped by device, so the data of a device is the (offset, length) slice of a single table. A
+    process is handed that slice instead of a pickled frame: it maps the file once, slices the table without
+    copying and only converts the rows of the device it scores to pandas. The day is therefore held once, in the
+    page cache, whatever the number of processes. The file is written to /dev/shm when available, so it stays in
+    memory, and is removed by close().
+    """
+
+    FILE_NAME: str = "day.arrow"
+
+    def __init__(self, directory: str, devices: dict[str, tuple[int, int]]) -> None:
+        """Creates the handle of a written day.
+
+        Args:
+        ----
+            directory (str): the directory holding the IPC file, removed by close()
+            devices (dict[str, tuple[int, int]]): the offset and the number of rows of every device, in order of
+                            first appearance
+        """
+        self.directory: str = directory
+        self.path: str = os.path.join(directory, self.FILE_NAME)
+        self.devices: dict[str, tuple[int, int]] = devices
+
+    def __enter__(self) -> Self:  # noqa: D105
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:  # noqa: D105
+        self.close()
+
+    @staticmethod
+    def write(fleet_df: pd.DataFrame, directory: str | None = None) -> SharedDay:
+        """Writes the raw data of a fleet, grouped by device, to an IPC file in a new temporary directory.
+
+        Args:
+        ----
+            fleet_df (pd.DataFrame): the raw data of all devices, with an extra "device_id" column
+            directory (str | None): where the temporary directory is created, /dev/shm or the system's
+                            temporary directory when omitted
+
+        Returns:
+        -------
+            SharedDay: the handle of the day, to be closed once scored
+        """
+        if directory is None and os.path.isdir("/dev/shm"):
+            directory = "/dev/shm"
+
+        # Rows without a device ID are dropped, as by groupby(), and a stable sort keeps every device's rows in order
+        fleet_df = fleet_df[fleet_df["device_id"].notna()]
+        codes, device_ids = pd.factorize(fleet_df["device_id"])
+        order: npt.NDArray[np.intp] = np.argsort(codes, kind="stable")
+        lengths: npt.NDArray[np.int64] = np.bincount(codes, minlength=len(device_ids))
+        offsets: npt.NDArray[np.int64] = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+
+        table: pa.Table = pa.Table.from_pandas(fleet_df.drop(columns=["device_id"]).iloc[order], preserve_index=False)
+        shared_day: SharedDay = SharedDay(
+            tempfile.mkdtemp(prefix="qod-day-", dir=directory),
+            {
+                str(device_id): (int(offset), int(length))
+                for device_id, offset, length in zip(device_ids, offsets, lengths, strict=True)
+            },
+        )
+
+        try:
+            with pa.OSFile(shared_day.path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        except BaseException:
+            shared_day.close()
+            raise
+
+        return shared_day
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def table(path: str) -> pa.Table:
+        """Maps the IPC file of a day, once per process.
+
+        Args:
+        ----
+            path (str): the IPC file
+
+        Returns:
+        -------
+            pa.Table: the table of the day, its buffers pointing into the mapped file
+        """
+        with pa.memory_map(path) as source:
+            return pa.ipc.open_file(source).read_all()
+
+    @staticmethod
+    def device_frame(path: str, offset: int, length: int) -> pd.DataFrame:
+        """Reads the raw data of a device from the IPC file of a day.
+
+        Args:
+        ----
+            path (str): the IPC file
+            offset (int): the first row of the device
+            length (int): the rows of the device
+
+        Returns:
+        -------
+            pd.DataFrame: the raw data of the device, without the device ID and with a fresh RangeIndex
+        """
+        return SharedDay.table(path).slice(offset, length).to_pandas()
+
+    def close(self) -> None:
+        """Removes the IPC file, which the processes that mapped it can keep reading until they exit."""
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+import math
+import os
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from obc_sqc.model.initial_params import InitialParams
+from obc_sqc.schema.schema import SchemaDefinitions
+
+MODELS: list[str] = ["WS1000", "WS2000"]
+
+
+class FaultRates(NamedTuple):
+    """The faults injected in the synthetic data and the QoD annotation each of them is expected to raise.
+
+    Rates of observations are fractions of the observations of every parameter. Rates of device-days are the
+    probabilities that a device (and, where it applies, a parameter of it) gets the fault on a day.
+    """
+
+    spike_rate: float = 0.0  # observations off by 1.5x the raw control threshold, within the limits -> SPIKE_INST
+    obc_rate: float = 0.0  # observations beyond the manufacturer's limits -> OBC
+    short_constant_rate: float = 0.0  # device-days with a plateau of 1.5x time_window_constant -> SHORT_CONST
+    long_constant_rate: float = 0.0  # device-days stuck at the value of the previous stuck day -> LONG_CONST
+    frozen_wind_rate: float = 0.0  # device-days below 0C with 0m/s wind for 1.5x time_window_constant -> FROZEN_SENSOR
+    gap_rate: float = 0.0  # observations lost -> NO_DATA
+    outage_rate: float = 0.0  # device-days with a 2-hour outage -> NO_DATA
+    jitter: int = 0  # max offset of the timestamps from the grid, absorbed by time normalisation [in seconds]
+    duplicate_rate: float = 0.0  # rows sent twice, dropped when the data are read
+
+
+class StationDataGenerator:
+    """Generates realistic raw data for a fleet of WS1000 and WS2000 stations, with controllable faults.
+
+    Every device gets its own climate (mean temperature, diurnal amplitude, humidity, pressure and wind) and every
+    day is generated for all the devices of a model at once, as (devices x slots) arrays. Pressure, wind direction
+    and accumulated precipitation are carried over from day to day, so consecutive days generated in order join
+    without jumps. A day is reproducible from the seed, the date and the state carried over from the previous days.
+    """
+
+    def __init__(self, n_devices: int, ws2000_share: float = 0.5, faults: FaultRates | None = None, seed: int = 0):
+        """Creates the devices of the fleet.
+
+        Args:
+        ----
+            n_devices (int): the number of devices, named synthetic-000000, synthetic-000001 etc.
+            ws2000_share (float): the share of WS2000 devices, the rest are WS1000
+            faults (FaultRates | None): the faults to inject, None for clean data
+            seed (int): the seed of the random generators
+        """
+        rng: np.random.Generator = np.random.default_rng(seed)
+
+        self.seed: int = seed
+        self.faults: FaultRates = faults or FaultRates()
+        self.device_ids: list[str] = [f"synthetic-{i:06d}" for i in range(n_devices)]
+        self.model_codes: npt.NDArray[np.int8] = (rng.random(n_devices) < ws2000_share).astype(np.int8)
+
+        # The climate of every device
+        self.temperature_mean: npt.NDArray[np.float64] = rng.normal(14, 5, n_devices)
+        self.temperature_amplitude: npt.NDArray[np.float64] = rng.uniform(3, 7, n_devices)
+        self.humidity_mean: npt.NDArray[np.float64] = rng.uniform(55, 75, n_devices)
+        self.pressure_mean: npt.NDArray[np.float64] = rng.normal(1013, 6, n_devices)
+        self.wind_speed_mean: npt.NDArray[np.float64] = rng.gamma(4, 0.75, n_devices)
+
+        # Carried over from day to day, stuck_values holds the value of every stuck sensor (nan when not stuck)
+        self.stuck_values: dict[str, npt.NDArray[np.float64]] = {
+            parameter: np.full(n_devices, np.nan) for parameter in SchemaDefinitions.weather_data_columns()
+        }
+        self.pressure_drift: npt.NDArray[np.float64] = np.zeros(n_devices)
+        self.wind_direction: npt.NDArray[np.float64] = rng.uniform(0, 360, n_devices)
+        self.precipitation: npt.NDArray[np.float64] = np.zeros(n_devices)
+
+    def generate_day(self, date: str, devices: npt.NDArray[np.int64] | None = None) -> pd.DataFrame:
+        """Generates a UTC day of raw data, in the layout of the day parquets.
+
+        Args:
+        ----
+            date (str): the day, formatted as %Y-%m-%d
+            devices (npt.NDArray[np.int64] | None): the indices of the devices to generate, None for all of them
+
+        Returns:
+        -------
+            pd.DataFrame: the raw data of the devices, with a "device_id" column and the columns of
+                          SchemaDefinitions.qod_input_schema(), ordered by model, device and time
+        """
+        if devices is None:
+            devices = np.arange(len(self.device_ids))
+
+        day: pd.Timestamp = pd.Timestamp(date)
+        frames: list[pd.DataFrame] = []
+        for code, model in enumerate(MODELS):
+            model_devices: npt.NDArray[np.int64] = devices[self.model_codes[devices] == code]
+            if model_devices.size:
+                # Every day and model has its own random stream, independent of the devices generated with it
+                rng: np.random.Generator = np.random.default_rng([self.seed, day.toordinal(), code])
+                frames.append(self._generate_model_day(model, model_devices, day, rng))
+
+        if not frames:
+            return self._empty_day()
+
+        return pd.concat(frames, ignore_index=True)
+
+    def write_day(self, date: str, output_dir: str, chunk_size: int = 1000) -> str:
+        """Generates a day and writes it to {output_dir}/{%Y_%m_%d}.parquet, chunk_size devices at a time.
+
+        Args:
+        ----
+            date (str): the day, formatted as %Y-%m-%d
+            output_dir (str): the directory of the day parquets, created if missing
+            chunk_size (int): the number of devices generated and written at once, bounding memory
+
+        Returns:
+        -------
+            str: the path of the day parquet
+        """
+        import pyarrow as pa  # noqa: PLC0415
+        import pyarrow.parquet as pq  # noqa: PLC0415
+
+        os.makedirs(output_dir, exist_ok=True)
+        path: str = os.path.join(output_dir, f"{pd.Timestamp(date).strftime('%Y_%m_%d')}.parquet")
+
+        writer: pq.ParquetWriter | None = None
+        try:
+            for start in range(0, len(self.device_ids), chunk_size):
+                devices: npt.NDArray[np.int64] = np.arange(start, min(start + chunk_size, len(self.device_ids)))
+                chunk_df: pd.DataFrame = self.generate_day(date, devices)
+                table: pa.Table = pa.Table.from_pandas(chunk_df, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+
+            if writer is None:
+                self._empty_day().to_parquet(path, index=False)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        return path
+
+    def write_days(self, start_date: str, end_date: str, output_dir: str, chunk_size: int = 1000) -> list[str]:
+        """Generates and writes every day of a date range, in order.
+
+        Args:
+        ----
+            start_date (str): the first day, formatted as %Y-%m-%d
+            end_date (str): the last day (included), formatted as %Y-%m-%d
+            output_dir (str): the directory of the day parquets
+            chunk_size (int): the number of devices generated and written at once
+
+        Returns:
+        -------
+            list[str]: the paths of the day parquets
+        """
+        return [
+            self.write_day(str(day.date()), output_dir, chunk_size) for day in pd.date_range(start_date, end_date)
+        ]
+
+    def _empty_day(self) -> pd.DataFrame:
+        columns: list[str] = ["device_id", *SchemaDefinitions.qod_input_schema().keys()]
+        return pd.DataFrame(columns=columns).astype({"device_id": str, **SchemaDefinitions.qod_input_schema()})
+
+    def _generate_model_day(  # noqa: PLR0915, C901
+        self, model: str, devices: npt.NDArray[np.int64], day: pd.Timestamp, rng: np.random.Generator
+    ) -> pd.DataFrame:
+        params: tuple = InitialParams.picking_initial_parameters(model)
+        data_timestep: int = params[5]
+        parameters: list[str] = params[11]
+        raw_cntrl_thresholds: list[float] = params[15]
+        time_window_constant: list[float] = params[18]
+        obc_limits: list[list[float]] = params[19]
+        time_window_constant_max: list[float] = params[21]
+        pr_int: float = params[23]
+
+        n_devices: int = devices.size
+        n_slots: int = 86400 // data_timestep
+        shape: tuple[int, int] = (n_devices, n_slots)
+        slots: npt.NDArray[np.int64] = np.arange(n_slots)
+        hour: npt.NDArray[np.float64] = slots * data_timestep / 3600
+        faults: FaultRates = self.faults
+
+        # Diurnal cycles peaking at 15:00 (temperature) and at noon (sunlight)
+        diurnal: npt.NDArray[np.float64] = np.sin((hour - 9) / 24 * 2 * np.pi)
+        daylight: npt.NDArray[np.float64] = np.clip(np.sin((hour - 6) / 12 * np.pi), 0, None)
+
+        temperature: npt.NDArray[np.float64] = (
+            self.temperature_mean[devices, None]
+            + self.temperature_amplitude[devices, None] * diurnal
+            + rng.normal(0, 0.1, shape)
+        )
+        humidity: npt.NDArray[np.float64] = np.clip(
+            self.humidity_mean[devices, None]
+            - 2 * self.temperature_amplitude[devices, None] * diurnal
+            + rng.normal(0, 0.7, shape),
+            15,
+            94,
+        )
+
+        # Random walks scaled so that they drift by the same amount per day for both cadences
+        pressure_walk: npt.NDArray[np.float64] = self.pressure_drift[devices, None] + np.cumsum(
+            rng.normal(0, 1.5 / math.sqrt(n_slots), shape), axis=1
+        )
+        pressure: npt.NDArray[np.float64] = (
+            self.pressure_mean[devices, None] + pressure_walk + rng.normal(0, 0.03, shape)
+        )
+
+        wind_walk: npt.NDArray[np.float64] = self.wind_direction[devices, None] + np.cumsum(
+            rng.normal(0, 90 / math.sqrt(n_slots), shape), axis=1
+        )
+        wind_direction: npt.NDArray[np.float64] = np.mod(wind_walk + rng.normal(0, 5, shape), 360)
+        wind_speed: npt.NDArray[np.float64] = np.clip(
+            self.wind_speed_mean[devices, None] * (1 + 0.3 * diurnal) * rng.gamma(8, 1 / 8, shape), 0, 40
+        )
+
+        cloudiness: npt.NDArray[np.float64] = rng.uniform(0.3, 1, (n_devices, 1))
+        illuminance: npt.NDArray[np.float64] = 100000 * cloudiness * daylight * rng.uniform(0.97, 1.03, shape)
+
+        # Rain falls on 30% of the device-days, in tips of the rain gauge resolution
+        rainy: npt.NDArray[np.bool_] = rng.random(n_devices) < 0.3  # noqa: PLR2004
+        rain_probability: npt.NDArray[np.float64] = rainy * rng.uniform(0.001, 0.01, n_devices)
+        rain_tips: npt.NDArray[np.float64] = (rng.random(shape) < rain_probability[:, None]) * pr_int
+        if faults.obc_rate:
+            # Precipitation OBC applies to the increase between consecutive slots
+            rain_tips += (rng.random(shape) < faults.obc_rate) * 2 * obc_limits[1][-1]
+        precipitation: npt.NDArray[np.float64] = self.precipitation[devices, None] + np.cumsum(rain_tips, axis=1)
+
+        self.pressure_drift[devices] = pressure_walk[:, -1]
+        self.wind_direction[devices] = np.mod(wind_walk[:, -1], 360)
+        self.precipitation[devices] = precipitation[:, -1]
+
+        values: dict[str, npt.NDArray[np.float64]] = {
+            "temperature": temperature,
+            "humidity": humidity,
+            "wind_speed": wind_speed,
+            "wind_direction": wind_direction,
+            "pressure": pressure,
+            "illuminance": illuminance,
+            "precipitation_accumulated": precipitation,
+        }
+
+        def period(minutes: float, selected: npt.NDArray[np.bool_]) -> npt.NDArray[np.bool_]:
+            # A period of the given duration at a random time of the day, for the selected devices only
+            length: int = min(math.ceil(minutes * 60 / data_timestep), n_slots)
+            start: npt.NDArray[np.int64] = rng.integers(0, n_slots - length + 1, n_devices)
+            return selected[:, None] & (slots >= start[:, None]) & (slots < start[:, None] + length)
+
+        def hold(array: npt.NDArray[np.float64], mask: npt.NDArray[np.bool_]) -> None:
+            # Repeat the value at the start of every period until its end
+            first: npt.NDArray[np.int64] = np.minimum(mask.argmax(axis=1), n_slots - 1)
+            array[:] = np.where(mask, array[np.arange(n_devices), first][:, None], array)
+
+        if faults.frozen_wind_rate:
+            frozen: npt.NDArray[np.bool_] = rng.random(n_devices) < faults.frozen_wind_rate
+            temperature[frozen] -= temperature[frozen].max(axis=1, keepdims=True) + 2
+            frozen_period: npt.NDArray[np.bool_] = period(
+                1.5 * time_window_constant[parameters.index("wind_speed")], frozen
+            )
+            wind_speed[frozen_period] = 0
+            hold(wind_direction, frozen_period)
+
+        for i, parameter in enumerate(parameters):
+            array: npt.NDArray[np.float64] = values[parameter]
+            lower_lim, upper_lim = obc_limits[0][i], obc_limits[1][i]
+
+            if faults.long_constant_rate and not np.isnan(time_window_constant_max[i]):
+                # A sensor stuck on consecutive days keeps its value, so the constant period spans the QoD window
+                stuck: npt.NDArray[np.bool_] = rng.random(n_devices) < faults.long_constant_rate
+                stuck_values: npt.NDArray[np.float64] = self.stuck_values[parameter][devices]
+                stuck_values = np.where(np.isnan(stuck_values), array[:, 0], stuck_values)
+                array[stuck] = stuck_values[stuck, None]
+                self.stuck_values[parameter][devices] = np.where(stuck, stuck_values, np.nan)
+
+            if faults.short_constant_rate and not np.isnan(time_window_constant[i]):
+                hold(array, period(1.5 * time_window_constant[i], rng.random(n_devices) < faults.short_constant_rate))
+
+            if faults.spike_rate and not np.isnan(raw_cntrl_thresholds[i]):
+                # Spikes that do not fit within the limits either way are skipped, they would be OBC instead
+                spike: float = 1.5 * raw_cntrl_thresholds[i]
+                spiked: npt.NDArray[np.bool_] = rng.random(shape) < faults.spike_rate
+                spiked_values: npt.NDArray[np.float64] = np.where(array - spike >= lower_lim, array - spike, array)
+                spiked_values = np.where(array + spike <= upper_lim, array + spike, spiked_values)
+                array[:] = np.where(spiked, spiked_values, array)
+
+            if faults.obc_rate and parameter != "precipitation_accumulated":
+                out_of_bounds: npt.NDArray[np.bool_] = rng.random(shape) < faults.obc_rate
+                array[out_of_bounds] = upper_lim + max(1.0, 0.1 * (upper_lim - lower_lim))
+
+        # Sensor resolutions
+        for parameter, decimals in [
+            ("temperature", 1),
+            ("humidity", 0),
+            ("wind_speed", 1),
+            ("wind_direction", 0),
+            ("pressure", 1),
+            ("illuminance", 0),
+            ("precipitation_accumulated", 3),
+        ]:
+            np.round(values[parameter], decimals, out=values[parameter])
+        np.mod(values["wind_direction"], 360, out=values["wind_direction"])
+
+        # Rows that reach the lake
+        received: npt.NDArray[np.bool_] = rng.random(shape) >= faults.gap_rate
+        if faults.outage_rate:
+            received &= ~period(120, rng.random(n_devices) < faults.outage_rate)
+
+        offsets: npt.NDArray[np.int64] = slots * data_timestep * 10**9
+        if faults.jitter:
+            offsets = offsets + rng.integers(-faults.jitter, faults.jitter + 1, shape) * 10**9
+
+        device_rows, slot_rows = np.nonzero(received)
+        if faults.duplicate_rate:
+            sent: npt.NDArray[np.int64] = np.arange(device_rows.size)
+            sent = np.sort(np.concatenate([sent, np.flatnonzero(rng.random(sent.size) < faults.duplicate_rate)]))
+            device_rows, slot_rows = device_rows[sent], slot_rows[sent]
+
+        timestamps: npt.NDArray[np.int64] = day.value + np.broadcast_to(offsets, shape)[device_rows, slot_rows]
+
+        weather_columns: list[str] = SchemaDefinitions.weather_data_columns()
+        return pd.DataFrame({
+            "device_id": pd.Categorical.from_codes(devices[device_rows], categories=self.device_ids),
+            **{parameter: values[parameter][device_rows, slot_rows] for parameter in weather_columns},
+            "model": pd.Categorical.from_codes(np.full(device_rows.size, MODELS.index(model)), categories=MODELS),
+            "utc_datetime": timestamps.view("datetime64[ns]"),
+        })
@@ -0,0 +1,229 @@
+import os
+import pathlib
+
+import pandas as pd
+import pytest
+
+from obc_sqc.iface.backfill import Backfill
+from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from obc_sqc.schema.schema import SchemaDefinitions
+from obc_sqc.storage.progress_journal import ProgressJournal
+from tests.obc_sqc.fixtures.backfill_fixtures_test import *  # noqa: F403
+
+
+class TestBackfill:
+    """Tests that a backfill reads every day once and matches scoring every date on its own."""
+
+    def test_matches_daily_scoring(
+        self, day_parquets: str, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Tests the results of a backfill spanning chunks against scoring every device-date on its own.
+
+        Args:
+        ----
+            day_parquets (str): the directory of the day parquets
+            tmp_path (pathlib.Path): a temporary directory
+            monkeypatch (pytest.MonkeyPatch): counts the day reads
+
+        Returns:
+        -------
+            None
+        """
+        reads: list[pd.Timestamp] = []
+        read_day = Backfill.read_day
+
+        def counting_read_day(backfill: Backfill, day: pd.Timestamp) -> pd.DataFrame:
+            reads.append(day)
+            return read_day(backfill, day)
+
+        monkeypatch.setattr(Backfill, "read_day", counting_read_day)
+
+        output_path: str = os.path.join(tmp_path, "backfill.parquet")
+        backfill: Backfill = Backfill(day_parquets, chunk_days=2)
+        summary: dict[str, int] = backfill.run("2023-10-29", "2023-10-31", output_path)
+
+        assert summary == {"dates": 3, "success": 9, "failure": 0, "skipped": 0}
+        assert [str(day.date()) for day in reads] == ["2023-10-28", "2023-10-29", "2023-10-30", "2023-10-31"]
+        assert not os.path.exists(f"{output_path}.tmp")
+
+        result_df: pd.DataFrame = pd.read_parquet(output_path)
+        days_df: pd.DataFrame = pd.concat([
+            pd.read_parquet(os.path.join(day_parquets, f"2023_10_{day}.parquet")) for day in range(28, 32)
+        ]).astype({"device_id": str})
+
+        for (device_id, date), device_result_df in result_df.groupby(["device_id", "date"]):
+            start: pd.Timestamp = pd.Timestamp(date) - pd.Timedelta(hours=6)
+            end: pd.Timestamp = pd.Timestamp(date) + pd.Timedelta(hours=23, minutes=59, seconds=59)
+            device_df: pd.DataFrame = days_df[
+                (days_df["device_id"] == device_id) & days_df["utc_datetime"].between(start, end)
+            ]
+            expected_df: pd.DataFrame = ObcSqcCheck.run(
+                device_df
+                .drop(columns=["device_id"])
+                .astype(SchemaDefinitions.qod_input_schema())
+                .reset_index(drop=True)
+            )
+
+            pd.testing.assert_frame_equal(
+                device_result_df[expected_df.columns].reset_index(drop=True),
+                expected_df,
+                check_dtype=False,
+            )
+
+    def test_device_selection_and_failures(self, day_parquets: str, tmp_path: pathlib.Path) -> None:
+        """Tests that only the selected devices are scored and a failing device-date is kept as a failure row.
+
+        Args:
+        ----
+            day_parquets (str): the directory of the day parquets
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        device_ids: list[str] = sorted(
+            pd.read_parquet(os.path.join(day_parquets, "2023_10_29.parquet"))["device_id"].unique()
+        )
+
+        def failing_run(df: pd.DataFrame, date: str | None = None) -> pd.DataFrame:
+            if df["utc_datetime"].max() >= pd.Timestamp("2023-10-31"):
+                raise ValueError("Failing date")
+            return ObcSqcCheck.run(df, date=date)
+
+        output_path: str = os.path.join(tmp_path, "backfill.parquet")
+        backfill: Backfill = Backfill(day_parquets, device_ids[:2], chunk_days=1, score_fn=failing_run)
+        summary: dict[str, int] = backfill.run("2023-10-30", "2023-10-31", output_path)
+
+        result_df: pd.DataFrame = pd.read_parquet(output_path)
+
+        assert summary == {"dates": 2, "success": 2, "failure": 2, "skipped": 0}
+        assert sorted(result_df["device_id"].unique()) == device_ids[:2]
+        assert (result_df.loc[result_df["date"] == "2023-10-31", "status"] == "failure").all()
+        assert (result_df.groupby("date").size() == pd.Series({"2023-10-30": 48, "2023-10-31": 2})).all()
+
+    def test_devices_without_data(self, day_parquets: str, tmp_path: pathlib.Path) -> None:
+        """Tests that a selected device without data within a date gets the NO_DATA result of the date.
+
+        Args:
+        ----
+            day_parquets (str): the directory of the day parquets
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        device_id: str = pd.read_parquet(os.path.join(day_parquets, "2023_10_29.parquet"))["device_id"].iloc[0]
+
+        output_path: str = os.path.join(tmp_path, "backfill.parquet")
+        backfill: Backfill = Backfill(day_parquets, [device_id, "device_offline"], chunk_days=1)
+        summary: dict[str, int] = backfill.run("2023-10-30", "2023-10-31", output_path)
+
+        result_df: pd.DataFrame = pd.read_parquet(output_path)
+        offline_df: pd.DataFrame = result_df[result_df["device_id"] == "device_offline"]
+
+        assert summary == {"dates": 2, "success": 4, "failure": 0, "skipped": 0}
+        assert offline_df.groupby("date").size().to_dict() == {"2023-10-30": 24, "2023-10-31": 24}
+        assert (offline_df["status"] == "success").all()
+        assert (offline_df["qod_score"] == 0).all()
+        assert offline_df["daily_annotation"].str.startswith('{"NO_DATA"').all()
+
+    def test_devices_independent_of_chunks(self, day_parquets: str, tmp_path: pathlib.Path) -> None:
+        """Tests that a device reporting on the last date only gets NO_DATA on the other dates, whatever the chunks.
+
+        Args:
+        ----
+            day_parquets (str): the directory of the day parquets
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        late_device_id: str = pd.read_parquet(os.path.join(day_parquets, "2023_10_31.parquet"))["device_id"].iloc[0]
+        for day in ["2023_10_29", "2023_10_30"]:
+            day_path: str = os.path.join(day_parquets, f"{day}.parquet")
+            day_df: pd.DataFrame = pd.read_parquet(day_path)
+            day_df[day_df["device_id"] != late_device_id].to_parquet(day_path, index=False)
+
+        keys: list[str] = ["date", "device_id", "hour"]
+        results: dict[int, pd.DataFrame] = {}
+        for chunk_days in [1, 3]:
+            output_path: str = os.path.join(tmp_path, f"backfill_{chunk_days}.parquet")
+            summary: dict[str, int] = Backfill(day_parquets, chunk_days=chunk_days).run(
+                "2023-10-29", "2023-10-31", output_path
+            )
+            assert summary == {"dates": 3, "success": 9, "failure": 0, "skipped": 0}
+            results[chunk_days] = pd.read_parquet(output_path).sort_values(keys).reset_index(drop=True)
+
+        late_df: pd.DataFrame = results[1][results[1]["device_id"] == late_device_id]
+
+        assert sorted(late_df["date"].unique()) == ["2023-10-29", "2023-10-30", "2023-10-31"]
+        assert late_df.loc[late_df["date"] < "2023-10-31", "daily_annotation"].str.startswith('{"NO_DATA"').all()
+        pd.testing.assert_frame_equal(results[1], results[3])
+
+    def test_resume_journal(self, day_parquets: str, tmp_path: pathlib.Path) -> None:
+        """Tests that a backfill stopped midway resumes where it stopped and matches an uninterrupted one.
+
+        Args:
+        ----
+            day_parquets (str): the directory of the day parquets
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        expected_path: str = os.path.join(tmp_path, "expected.parquet")
+        Backfill(day_parquets, chunk_days=1).run("2023-10-29", "2023-10-31", expected_path)
+
+        scored_dates: list[str | None] = []
+
+        def stopping_run(df: pd.DataFrame, date: str | None = None) -> pd.DataFrame:
+            if date == "2023-10-31":
+                raise KeyboardInterrupt
+            scored_dates.append(date)
+            return ObcSqcCheck.run(df, date=date)
+
+        output_path: str = os.path.join(tmp_path, "backfill.parquet")
+        journal_path: str = os.path.join(tmp_path, "journal.jsonl")
+        with ProgressJournal(journal_path) as journal, pytest.raises(KeyboardInterrupt):
+            Backfill(day_parquets, chunk_days=1, score_fn=stopping_run, journal=journal).run(
+                "2023-10-29", "2023-10-31", output_path
+            )
+
+        assert not os.path.exists(output_path)
+        assert scored_dates == ["2023-10-29"] * 3 + ["2023-10-30"] * 3
+
+        with ProgressJournal(journal_path) as journal:
+            summary: dict[str, int] = Backfill(day_parquets, chunk_days=1, journal=journal).run(
+                "2023-10-29", "2023-10-31", output_path
+            )
+
+        assert summary == {"dates": 3, "success": 3, "failure": 0, "skipped": 6}
+        pd.testing.assert_frame_equal(
+            pd.read_parquet(output_path).sort_values(["date", "device_id"], kind="stable").reset_index(drop=True),
+            pd.read_parquet(expected_path).sort_values(["date", "device_id"], kind="stable").reset_index(drop=True),
+        )
+
+    def test_parts_without_journal(self, day_parquets: str, tmp_path: pathlib.Path) -> None:
+        """Tests that parts are neither written nor assembled without a journal.
+
+        Args:
+        ----
+            day_parquets (str): the directory of the day parquets
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        backfill: Backfill = Backfill(day_parquets)
+        output_path: str = os.path.join(tmp_path, "backfill.parquet")
+
+        with pytest.raises(ValueError, match="needs a journal"):
+            backfill.write_part(pd.DataFrame({"device_id": ["device_a"]}), pd.Timestamp("2023-10-30"), output_path)
+        with pytest.raises(ValueError, match="needs a journal"):
+            backfill.assemble_parts("2023-10-29", "2023-10-31", output_path)
+        assert not os.path.exists(f"{output_path}.parts")
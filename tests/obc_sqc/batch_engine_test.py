@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from obc_sqc.model.batch_engine import BatchEngine, ParameterMatrices
+from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from obc_sqc.schema.schema import SchemaDefinitions
+from tests.obc_sqc.fixtures.batch_engine_fixtures_test import *  # noqa: F403
+from tests.obc_sqc.fixtures.polars_engine_fixtures_test import StageOutputs
+
+
+class TestBatchEngine:
+    """Tests that the checks run over a batch of devices score every device exactly like on its own."""
+
+    def test_identical_results(self, ws2000_fleet_input: list[pd.DataFrame]) -> None:
+        """Tests that the devices of a batch are annotated and scored like through the pandas engine.
+
+        Args:
+        ----
+            ws2000_fleet_input (list[pd.DataFrame]): the input of every device
+
+        Returns:
+        -------
+            None
+        """
+        matrices: list[ParameterMatrices | None] = BatchEngine.parameter_matrices(ws2000_fleet_input)
+
+        # The offline device has no value to check, which run() scores on its own
+        assert matrices[-1] is None
+
+        for device_df, device_matrices in zip(ws2000_fleet_input[:-1], matrices[:-1], strict=True):
+            pandas_outputs: StageOutputs = StageOutputs()
+            batch_outputs: StageOutputs = StageOutputs()
+
+            expected_df: pd.DataFrame = ObcSqcCheck.run(device_df, pandas_outputs)
+            result_df: pd.DataFrame = ObcSqcCheck.run(device_df, batch_outputs, matrices=device_matrices)
+
+            pd.testing.assert_frame_equal(result_df, expected_df)
+            for parameter, expected_param_df in pandas_outputs.outputs.items():
+                pd.testing.assert_frame_equal(batch_outputs.outputs[parameter], expected_param_df)
+
+    def test_float32_storage(self, ws2000_fleet_input: list[pd.DataFrame]) -> None:
+        """Tests that devices held as float32 keep float32 filled values and score like held as float64.
+
+        Args:
+        ----
+            ws2000_fleet_input (list[pd.DataFrame]): the input of every device
+
+        Returns:
+        -------
+            None
+        """
+        storage_schema: dict = SchemaDefinitions.qod_storage_schema("float32")
+        stored_input: list[pd.DataFrame] = [device_df.astype(storage_schema) for device_df in ws2000_fleet_input]
+        matrices: list[ParameterMatrices | None] = BatchEngine.parameter_matrices(stored_input)
+
+        for device_df, stored_df, device_matrices in zip(
+            ws2000_fleet_input[:-1], stored_input[:-1], matrices[:-1], strict=True
+        ):
+            assert device_matrices is not None
+            assert (device_matrices[1].dtypes == "float32").all()
+            pd.testing.assert_frame_equal(
+                ObcSqcCheck.run(stored_df, matrices=device_matrices), ObcSqcCheck.run(device_df)
+            )
+
+    @pytest.mark.parametrize("window", [1, 7, 50])
+    def test_window_statistics(self, windowed_values: np.ndarray, window: int) -> None:
+        """Tests the window statistics against pandas rolling windows over the slots before every slot.
+
+        Args:
+        ----
+            windowed_values (np.ndarray): the values of two devices
+            window (int): the slots of the window
+
+        Returns:
+        -------
+            None
+        """
+        for device, values in enumerate(windowed_values):
+            rolling = pd.Series(values).rolling(window, min_periods=1, closed="left")
+            median: pd.Series = rolling.apply(np.nanmedian)
+
+            np.testing.assert_array_equal(
+                BatchEngine.window_extreme(windowed_values, window, np.fmax)[device], rolling.max()
+            )
+            np.testing.assert_array_equal(
+                BatchEngine.window_median_beyond(windowed_values, window, 0, True, np.nanmedian)[device], median > 0
+            )
+            np.testing.assert_array_equal(
+                BatchEngine.window_median_beyond(windowed_values, window, 0.5, False, np.nanmedian)[device],
+                median < 0.5,  # noqa: PLR2004
+            )
@@ -0,0 +1,156 @@
+import pandas as pd
+import pytest
+
+from obc_sqc.iface.batch_scoring import BatchScoring, DeviceOutcome
+from obc_sqc.schema.schema import SchemaDefinitions
+from tests.obc_sqc.fixtures.batch_scoring_fixtures_test import *  # noqa: F403
+
+
+def mean_temperature_score(df: pd.DataFrame) -> pd.DataFrame:
+    """Scores a device with its mean temperature, failing when there are no valid temperatures.
+
+    Args:
+    ----
+        df (pd.DataFrame): the raw data of a device
+
+    Returns:
+    -------
+        pd.DataFrame: two hourly rows holding the score and the model
+    """
+    if df["temperature"].isna().all():
+        raise ValueError("No valid temperature")
+
+    return pd.DataFrame({"qod_score": [df["temperature"].mean()] * 2, "model": df["model"].iloc[0], "hour": [0, 1]})
+
+
+def batched_temperature_score(df: pd.DataFrame, matrices: tuple | None = None) -> pd.DataFrame:
+    """Scores a device like mean_temperature_score(), recording the filled temperatures of its batch.
+
+    Args:
+    ----
+        df (pd.DataFrame): the raw data of a device
+        matrices (tuple | None): the parameter matrices of the device
+
+    Returns:
+    -------
+        pd.DataFrame: two hourly rows holding the score, the model and the last filled temperature
+    """
+    assert matrices is not None
+    result_df: pd.DataFrame = mean_temperature_score(df)
+    result_df["filled_temperature"] = matrices[1]["temperature"].iloc[-1]
+
+    return result_df
+
+
+class TestBatchScoring:
+    """Tests the scoring of a batch of devices."""
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_score_devices_isolated_failure(self, batch_model_input_df: pd.DataFrame, max_workers: int) -> None:
+        """Tests that every device is scored on its own data and a failure only affects its device.
+
+        Args:
+        ----
+            batch_model_input_df (pd.DataFrame): the raw data of all devices
+            max_workers (int): the number of processes scoring devices
+
+        Returns:
+        -------
+            None
+        """
+        outcomes: list[DeviceOutcome] = BatchScoring.score_devices(
+            batch_model_input_df, mean_temperature_score, max_workers
+        )
+
+        b_result, a_result, c_result = (outcome.result for outcome in outcomes)
+
+        assert [outcome.device_id for outcome in outcomes] == ["device_b", "device_a", "device_c"]
+        assert b_result is not None and a_result is not None
+        assert b_result["qod_score"].iloc[0] == pytest.approx(10.1)
+        assert a_result["qod_score"].iloc[0] == pytest.approx(20.1)
+        assert c_result is None
+        assert "No valid temperature" in str(outcomes[2].exception)
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_score_devices_batched(self, batch_model_input_df: pd.DataFrame, max_workers: int) -> None:
+        """Tests that devices checked in batches get the matrices of their own data, in their order.
+
+        Args:
+        ----
+            batch_model_input_df (pd.DataFrame): the raw data of all devices
+            max_workers (int): the number of processes scoring batches
+
+        Returns:
+        -------
+            None
+        """
+        outcomes: list[DeviceOutcome] = BatchScoring.score_devices(
+            batch_model_input_df, batched_temperature_score, max_workers, batch_size=2
+        )
+
+        b_result, a_result, c_result = (outcome.result for outcome in outcomes)
+
+        assert [outcome.device_id for outcome in outcomes] == ["device_b", "device_a", "device_c"]
+        assert b_result is not None and a_result is not None
+        assert b_result["filled_temperature"].iloc[0] == pytest.approx(10.2)
+        assert a_result["filled_temperature"].iloc[0] == pytest.approx(20.2)
+        assert c_result is None
+
+    def test_combine_success(self, batch_model_input_df: pd.DataFrame) -> None:
+        """Tests that the results of a batch are concatenated with the device ID and status of every row.
+
+        Args:
+        ----
+            batch_model_input_df (pd.DataFrame): the raw data of all devices
+
+        Returns:
+        -------
+            None
+        """
+        outcomes: list[DeviceOutcome] = BatchScoring.score_devices(batch_model_input_df, mean_temperature_score)
+
+        result: pd.DataFrame = BatchScoring.combine(outcomes)
+
+        assert list(result.columns) == list(SchemaDefinitions.mlflow_obc_sqc_batch_schema().keys())
+        assert result["device_id"].tolist() == ["device_b", "device_b", "device_a", "device_a", "device_c"]
+        assert result["status"].tolist() == ["success"] * 4 + ["failure"]
+        assert result["hour"].tolist()[:4] == [0, 1, 0, 1]
+        assert pd.isna(result["qod_score"].iloc[-1])
+        assert not result["daily_annotation"].iloc[-1]
+
+    def test_combine_model_success(self, batch_model_input_df: pd.DataFrame) -> None:
+        """Tests that every row gets the model of its device, which the QoD result leaves out.
+
+        Args:
+        ----
+            batch_model_input_df (pd.DataFrame): the raw data of all devices
+
+        Returns:
+        -------
+            None
+        """
+        batch_model_input_df.loc[batch_model_input_df["device_id"] == "device_a", "model"] = "WS2000"
+
+        outcomes: list[DeviceOutcome] = BatchScoring.score_devices(
+            batch_model_input_df, lambda df: mean_temperature_score(df).drop(columns=["model"])
+        )
+
+        result: pd.DataFrame = BatchScoring.combine(outcomes)
+
+        assert result["model"].tolist() == ["WS1000", "WS1000", "WS2000", "WS2000", "WS1000"]
+
+    def test_combine_empty_success(self) -> None:
+        """Tests that an empty batch returns an empty result with the batch schema.
+
+        Args:
+        ----
+            None
+
+        Returns:
+        -------
+            None
+        """
+        result: pd.DataFrame = BatchScoring.combine([])
+
+        assert result.empty
+        assert list(result.columns) == list(SchemaDefinitions.mlflow_obc_sqc_batch_schema().keys())
@@ -160,3 +160,31 @@ class TestFillingIgnoringPeriod:
                 filling_ignoring_period_output_empty_df[column2]
             )
             assert result
+
+    @pytest.mark.parametrize("ignoring_period, data_timestep", [(60, 16), (300, 180), (900, 180)])
+    def test_matrix_equals_per_parameter(
+        self, gappy_values_df: pd.DataFrame, ignoring_period: int, data_timestep: int
+    ) -> None:
+        """Tests that filling_ignoring_period_matrix() equals filling_ignoring_period() for every column.
+
+        Args:
+        ----
+            gappy_values_df (pd.DataFrame): the values of several parameters, with nans and gaps
+            ignoring_period (int): the period within nans can be replaced with the latest valid value [in seconds]
+            data_timestep (int): the timestep of the values [in seconds]
+
+        Returns:
+        -------
+            None
+        """
+        for_raw_check, consec_filling = FillingIgnoringPeriod.filling_ignoring_period_matrix(
+            gappy_values_df, ignoring_period, data_timestep
+        )
+
+        for parameter in gappy_values_df.columns:
+            expected_df: pd.DataFrame = FillingIgnoringPeriod.filling_ignoring_period(
+                gappy_values_df[[parameter]].copy(), parameter, ignoring_period, data_timestep
+            )
+
+            assert for_raw_check[parameter].equals(expected_df[f"{parameter}_for_raw_check"])
+            assert consec_filling[parameter].equals(expected_df[f"{parameter}_consec_filling"])
@@ -0,0 +1,25 @@
+import pathlib
+
+import pytest
+
+from obc_sqc.synthetic.station_data_generator import FaultRates, StationDataGenerator
+
+
+@pytest.fixture
+def day_parquets(tmp_path: pathlib.Path) -> str:
+    """Writes four days of three synthetic WS2000 devices with gaps.
+
+    Args:
+    ----
+        tmp_path (pathlib.Path): a temporary directory
+
+    Returns:
+    -------
+        str: the directory of the day parquets
+    """
+    generator: StationDataGenerator = StationDataGenerator(
+        3, ws2000_share=1.0, faults=FaultRates(gap_rate=0.05), seed=5
+    )
+    generator.write_days("2023-10-28", "2023-10-31", str(tmp_path))
+
+    return str(tmp_path)
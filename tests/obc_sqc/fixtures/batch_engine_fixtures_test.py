@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.obc_sqc.fixtures.stage_instrumentation_fixtures_test import synthetic_device_input
+
+
+@pytest.fixture
+def ws2000_fleet_input() -> list[pd.DataFrame]:
+    """Creates the inputs of synthetic WS2000 devices, each triggering different constant data checks.
+
+    Args:
+    ----
+        None
+
+    Returns:
+    -------
+        list[pd.DataFrame]: the input of every device
+    """
+    frames: list[pd.DataFrame] = []
+    for scenario in ["constant", "frozen_wind", "gappy", "offline"]:
+        device_df: pd.DataFrame = synthetic_device_input("WS2000")
+        t: pd.Series = device_df["utc_datetime"]
+
+        if scenario == "constant":
+            device_df.loc[(t > "2023-10-30 02:00") & (t < "2023-10-30 10:00"), "humidity"] = 50.0
+            device_df.loc[t > "2023-10-29 19:00", ["temperature", "wind_speed"]] = [12.5, 3.0]
+            device_df.loc[(t > "2023-10-30 12:00") & (t < "2023-10-30 20:00"), "pressure"] = 1013.0
+        elif scenario == "frozen_wind":
+            device_df.loc[t > "2023-10-30 01:00", ["wind_speed", "wind_direction"]] = 0.0
+            device_df.loc[t > "2023-10-29 20:00", "temperature"] = np.where(
+                np.arange((t > "2023-10-29 20:00").sum()) % 2, 0.5, -0.5
+            )
+        elif scenario == "gappy":
+            # Starts later and ends earlier than the other devices, with a gap and missing humidity
+            device_df.loc[(t > "2023-10-30 05:00") & (t < "2023-10-30 07:00"), "humidity"] = np.nan
+            device_df = device_df[(t > "2023-10-29 19:13") & ((t < "2023-10-30 11:00") | (t > "2023-10-30 11:40"))]
+            device_df = device_df[device_df["utc_datetime"] < "2023-10-30 22:00"]
+        else:
+            device_df["pressure"] = np.nan
+
+        frames.append(device_df.reset_index(drop=True))
+
+    return frames
+
+
+@pytest.fixture
+def windowed_values() -> np.ndarray:
+    """Creates the values of two devices with repeated values, ties around 0 and missing values.
+
+    Args:
+    ----
+        None
+
+    Returns:
+    -------
+        np.ndarray: a (devices x slots) array
+    """
+    rng: np.random.Generator = np.random.default_rng(0)
+    values: np.ndarray = rng.choice([-1.0, -0.5, 0.0, 0.5, 1.0, 2.0, np.nan], size=(2, 200))
+    values[1, 150:] = np.nan
+
+    return values
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+import pytest
+
+
+@pytest.fixture
+def batch_model_input_df() -> pd.DataFrame:
+    """Creates a long-format model input holding the raw data of three devices.
+
+    device_c only has nan temperatures.
+
+    Args:
+    ----
+        None
+
+    Returns:
+    -------
+        pd.DataFrame: the created DataFrame
+    """
+    utc_datetime: list[str] = ["2023-10-30 00:00:00", "2023-10-30 00:00:16", "2023-10-30 00:00:32"]
+    frames: list[pd.DataFrame] = []
+
+    for device_id, temperature in [
+        ("device_b", [10.0, 10.1, 10.2]),
+        ("device_a", [20.0, np.nan, 20.2]),
+        ("device_c", [np.nan, np.nan, np.nan]),
+    ]:
+        frames.append(
+            pd.DataFrame({
+                "utc_datetime": utc_datetime,
+                "temperature": temperature,
+                "humidity": [80.0] * 3,
+                "wind_speed": [1.5] * 3,
+                "wind_direction": [180.0] * 3,
+                "pressure": [1013.0] * 3,
+                "illuminance": [0.0] * 3,
+                "precipitation_accumulated": [0.254] * 3,
+                "model": ["WS1000"] * 3,
+                "device_id": [device_id] * 3,
+            })
+        )
+
+    return pd.concat(frames, ignore_index=True)
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 import pytest
@@ -1208,3 +1209,28 @@ def filling_ignoring_period_output_empty_df(request: pytest.FixtureRequest) -> p
         raise RuntimeError()
 
     return df
+
+
+@pytest.fixture
+def gappy_values_df() -> pd.DataFrame:
+    """Creates a matrix of values with isolated nans and gaps of various lengths in every column.
+
+    Args:
+    ----
+        None
+
+    Returns:
+    -------
+        pd.DataFrame: the values, one column per parameter
+    """
+    rng: np.random.Generator = np.random.default_rng(0)
+    values: np.ndarray = rng.normal(20, 5, size=(500, 4)).round(1)
+
+    for column, nan_rate in enumerate([0.0, 0.05, 0.3, 0.9]):
+        values[rng.random(500) < nan_rate, column] = np.nan
+        for start in rng.integers(0, 500, size=5):
+            stop: int = start + rng.integers(1, 20)
+            values[start:stop, column] = np.nan
+    values[:3, 1] = np.nan
+
+    return pd.DataFrame(values, columns=["temperature", "humidity", "wind_speed", "precipitation_accumulated"])
@@ -0,0 +1,89 @@
+import os
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+import pytest
+
+
+def create_device_partition(device_id: str, utc_datetime: list[str], temperature: list[float]) -> pd.DataFrame:
+    """Creates the raw data of a device, as stored in a date partition.
+
+    Args:
+    ----
+        device_id (str): the device ID
+        utc_datetime (list[str]): the timestamps of the observations
+        temperature (list[float]): the temperature observations
+
+    Returns:
+    -------
+        pd.DataFrame: the created DataFrame
+    """
+    n_rows: int = len(utc_datetime)
+
+    data: dict[str, list] = {
+        "utc_datetime": utc_datetime,
+        "temperature": temperature,
+        "humidity": [80.0] * n_rows,
+        "wind_speed": [1.5] * n_rows,
+        "wind_direction": [180.0] * n_rows,
+        "pressure": [1013.0] * n_rows,
+        "illuminance": [0.0] * n_rows,
+        "precipitation_accumulated": [0.254] * n_rows,
+        "model": ["WS1000"] * n_rows,
+        "name": [device_id] * n_rows,
+    }
+
+    return pd.DataFrame(data)
+
+
+@pytest.fixture
+def fleet_partitions() -> dict[tuple[str, str], pd.DataFrame]:
+    """Creates the date partitions of three devices.
+
+    device_a and device_b have data on both days, while device_c only has nan temperatures.
+
+    Args:
+    ----
+        None
+
+    Returns:
+    -------
+        dict[tuple[str, str], pd.DataFrame]: the data of every (device_id, date) partition
+    """
+    partitions: dict[tuple[str, str], pd.DataFrame] = {}
+    for device_id in ["device_a", "device_b"]:
+        # the first observation of 2023-10-29 is outside the 6-hour lookback of 2023-10-30
+        partitions[(device_id, "2023-10-29")] = create_device_partition(
+            device_id, ["2023-10-29 12:00:00", "2023-10-29 20:00:00"], [10.0, 11.0]
+        )
+        partitions[(device_id, "2023-10-30")] = create_device_partition(
+            device_id, ["2023-10-30 10:00:00", "2023-10-30 10:00:00", "2023-10-30 10:00:16"], [12.0, 12.0, 12.1]
+        )
+    partitions[("device_c", "2023-10-30")] = create_device_partition(
+        "device_c", ["2023-10-30 10:00:00"], [np.nan]
+    )
+
+    return partitions
+
+
+@pytest.fixture
+def fleet_dataset_root(fleet_partitions: dict[tuple[str, str], pd.DataFrame], tmp_path: pathlib.Path) -> str:
+    """Writes the partitions of the fleet to a hive-partitioned dataset on the local filesystem.
+
+    Args:
+    ----
+        fleet_partitions (dict[tuple[str, str], pd.DataFrame]): the data of every partition
+        tmp_path (pathlib.Path): a temporary directory
+
+    Returns:
+    -------
+        str: the root directory of the dataset
+    """
+    for (device_id, date), df in fleet_partitions.items():
+        partition: str = os.path.join(str(tmp_path), f"device_id={device_id}", f"date={date}")
+        os.makedirs(partition)
+        df.to_parquet(os.path.join(partition, "part-0.parquet"))
+
+    return str(tmp_path)
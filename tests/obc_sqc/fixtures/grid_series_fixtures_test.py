@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+import pytest
+
+
+@pytest.fixture
+def irregular_ws1000_df() -> pd.DataFrame:
+    """Creates a WS1000 DataFrame with jittered timestamps, a gap and a repeated slot.
+
+    Args:
+    ----
+        None
+
+    Returns:
+    -------
+        pd.DataFrame: the created DataFrame
+    """
+    utc_datetime: list[str] = [
+        "2023-10-30 00:00:01",  # slot 0
+        "2023-10-30 00:00:15",  # slot 1
+        "2023-10-30 00:00:33",  # slot 2
+        "2023-10-30 00:00:34",  # slot 2, the observation closest to the slot is kept
+        "2023-10-30 00:01:36",  # slot 6, slots 3-5 are absent
+    ]
+    n_rows: int = len(utc_datetime)
+
+    data: dict[str, list] = {
+        "temperature": [10.0, 10.1, 10.2, 10.3, np.nan],
+        "humidity": [80.0] * n_rows,
+        "wind_speed": [1.5] * n_rows,
+        "wind_direction": [180.0] * n_rows,
+        "pressure": [1013.0] * n_rows,
+        "illuminance": [0.0] * n_rows,
+        "precipitation_accumulated": [0.254] * n_rows,
+        "model": ["WS1000"] * n_rows,
+        "utc_datetime": utc_datetime,
+    }
+
+    dtypes: dict[str, str] = {
+        "temperature": "Float64",
+        "humidity": "Float64",
+        "wind_speed": "Float64",
+        "wind_direction": "Float64",
+        "pressure": "Float64",
+        "illuminance": "Float64",
+        "precipitation_accumulated": "Float64",
+        "model": "object",
+        "utc_datetime": "object",
+    }
+
+    df: pd.DataFrame = pd.DataFrame(data).astype(dtypes)
+
+    return df
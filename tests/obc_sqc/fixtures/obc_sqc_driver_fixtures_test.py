@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+
+from tests.obc_sqc.fixtures.stage_instrumentation_fixtures_test import synthetic_device_input
+
+
+@pytest.fixture
+def ws2000_gappy_input() -> pd.DataFrame:
+    """Creates the input of a synthetic WS2000 device, with a single missing temperature and a missing row.
+
+    Args:
+    ----
+        None
+
+    Returns:
+    -------
+        pd.DataFrame: the input of the device
+    """
+    device_df: pd.DataFrame = synthetic_device_input("WS2000")
+    device_df.loc[100, "temperature"] = float("nan")
+
+    return device_df.drop(index=200).reset_index(drop=True)
+
+
+def offline_device_input(model: str, start: str | None = None, end: str | None = None) -> pd.DataFrame:
+    """Creates the input of a synthetic device that never reported a pressure, within a time span.
+
+    Args:
+    ----
+        model (str): the station model, WS1000 or WS2000
+        start (str | None): the first timestamp kept, None to keep the whole input
+        end (str | None): the last timestamp kept, None to keep the whole input
+
+    Returns:
+    -------
+        pd.DataFrame: the input of the device
+    """
+    device_df: pd.DataFrame = synthetic_device_input(model)
+    device_df["pressure"] = float("nan")
+    if start is not None:
+        device_df = device_df[device_df["utc_datetime"].between(pd.Timestamp(start), pd.Timestamp(end))]
+
+    return device_df.reset_index(drop=True)
+
+
+@pytest.fixture(params=["WS1000", "WS2000"])
+def golden_day(request: pytest.FixtureRequest) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Reads the input of a device of each model and its pinned output.
+
+    The inputs are a synthetic day with spikes, out-of-bounds values, plateaus, gaps, an outage and rain, from 18:00
+    of the previous day. The outputs are pinned, so any change to them has to be deliberate and bump QOD_VERSION.
+
+    Args:
+    ----
+        request (pytest.FixtureRequest): the model of the device as its param
+
+    Returns:
+    -------
+        tuple[pd.DataFrame, pd.DataFrame]: the input of the device and its expected output
+    """
+    input_df: pd.DataFrame = pd.read_parquet(
+        f"tests/obc_sqc/fixtures_data/obc_sqc_driver/input/obc_sqc_driver_input_{request.param}_df.parquet"
+    )
+    output_df: pd.DataFrame = pd.read_parquet(
+        f"tests/obc_sqc/fixtures_data/obc_sqc_driver/output/obc_sqc_driver_output_{request.param}_df.parquet"
+    )
+
+    return input_df, output_df
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import http.server
+import json
+import threading
+from typing import Any, Iterator
+
+import pytest
+
+
+class BulkStandInServer(http.server.ThreadingHTTPServer):
+    """A local HTTP server standing in for the OpenSearch bulk API.
+
+    The server exposes the recorded requests as bulk_requests and fails the next failures_left requests.
+    """
+
+    def __init__(self) -> None:
+        """Binds the server to a free port."""
+        super().__init__(("127.0.0.1", 0), BulkStandInHandler)
+        self.bulk_requests: list[list[tuple[str, dict]]] = []
+        self.failures_left: int = 0
+
+
+class BulkStandInHandler(http.server.BaseHTTPRequestHandler):
+    """Answers bulk requests like an OpenSearch cluster and records the indexed documents."""
+
+    server: BulkStandInServer
+
+    def do_POST(self) -> None:  # noqa: D102
+        body: bytes = self.rfile.read(int(self.headers["Content-Length"]))
+
+        if self.server.failures_left > 0:
+            self.server.failures_left -= 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        lines: list[dict] = [json.loads(line) for line in body.decode().splitlines() if line]
+        actions, docs = lines[0::2], lines[1::2]
+        self.server.bulk_requests.append(list(zip([a["index"]["_index"] for a in actions], docs, strict=True)))
+
+        response: bytes = json.dumps({
+            "took": 1,
+            "errors": False,
+            "items": [{"index": {"status": 201}} for _ in docs],
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002, D102
+        pass
+
+
+@pytest.fixture
+def opensearch_stand_in() -> Iterator[BulkStandInServer]:
+    """Runs a local HTTP server standing in for the OpenSearch bulk API.
+
+    Args:
+    ----
+        None
+
+    Returns:
+    -------
+        Iterator[BulkStandInServer]: the running server
+    """
+    server: BulkStandInServer = BulkStandInServer()
+
+    thread: threading.Thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+    thread.join()
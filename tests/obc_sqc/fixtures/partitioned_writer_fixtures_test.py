@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from obc_sqc.iface.batch_scoring import BatchScoring, DeviceOutcome
+from obc_sqc.schema.schema import SchemaDefinitions
+
+
+@pytest.fixture
+def fleet_results() -> pd.DataFrame:
+    """The hourly results of 30 devices of both models on 2023-10-30, and a device that failed.
+
+    Args:
+    ----
+        None
+
+    Returns:
+    -------
+        pd.DataFrame: the results, following SchemaDefinitions.mlflow_obc_sqc_batch_schema()
+    """
+    rng: np.random.Generator = np.random.default_rng(3)
+    result_schema: dict = SchemaDefinitions.mlflow_obc_sqc_schema()
+    outcomes: list[DeviceOutcome] = []
+
+    for i in range(30):
+        result_df: pd.DataFrame = pd.DataFrame({
+            column: [""] * 24 for column, dtype in result_schema.items() if dtype is str
+        })
+        for column in [column for column in result_schema if column.endswith("annotation")]:
+            result_df[column] = rng.choice(["", "OBC", "NO_DATA", "CONSTANT"], 24)
+        for column in [column for column, dtype in result_schema.items() if dtype == "Float64"]:
+            result_df[column] = rng.random(24).round(3)
+        result_df = result_df.assign(
+            model="WS1000" if i % 3 == 0 else "WS2000", qod_version="1.0", year=2023, month=10, day=30, hour=range(24)
+        )
+        outcomes.append(DeviceOutcome(f"device_{i:02d}", result_df.astype(result_schema), None))
+
+    outcomes.append(DeviceOutcome("device_failed", None, "ValueError"))
+
+    return BatchScoring.combine(outcomes)
@@ -0,0 +1,67 @@
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from obc_sqc.model.stage_instrumentation import StageInstrumentation
+from tests.obc_sqc.fixtures.stage_instrumentation_fixtures_test import synthetic_device_input
+
+
+class StageOutputs(StageInstrumentation):
+    """Keeps a copy of the output of the constant data check of every parameter, instead of measuring the stages."""
+
+    def __init__(self) -> None:
+        """Creates the recorder."""
+        super().__init__(enabled=False)
+        self.outputs: dict[str, pd.DataFrame] = {}
+
+    def call(self, stage: str, parameter: str | None, fn: Callable[..., Any], *args: Any) -> Any:
+        """Runs a stage, keeping its output when it is the constant data check.
+
+        Args:
+        ----
+            stage (str): the name of the stage
+            parameter (str | None): the parameter of the stage
+            fn (Callable[..., Any]): the stage
+            *args (Any): the arguments of the stage
+
+        Returns:
+        -------
+            Any: the output of the stage
+        """
+        result: Any = fn(*args)
+        if stage == "constant_data_check" and parameter is not None:
+            self.outputs[parameter] = result.copy()
+
+        return result
+
+
+@pytest.fixture(params=["clean", "constant", "frozen_wind", "missing_parameter"])
+def ws2000_constant_input(request: pytest.FixtureRequest) -> pd.DataFrame:
+    """Creates the input of a synthetic WS2000 device, with data triggering the constant data checks.
+
+    Args:
+    ----
+        request (pytest.FixtureRequest): the scenario as its param
+
+    Returns:
+    -------
+        pd.DataFrame: the input of the device
+    """
+    device_df: pd.DataFrame = synthetic_device_input("WS2000")
+    t: pd.Series = device_df["utc_datetime"]
+
+    if request.param == "constant":
+        # Short constant humidity, temperature constant for more than a day, constant wind speed above 0m/s
+        device_df.loc[(t > "2023-10-30 02:00") & (t < "2023-10-30 10:00"), "humidity"] = 50.0
+        device_df.loc[t > "2023-10-29 19:00", ["temperature", "wind_speed"]] = [12.5, 3.0]
+        device_df.loc[(t > "2023-10-30 12:00") & (t < "2023-10-30 20:00"), "pressure"] = 1013.0
+    elif request.param == "frozen_wind":
+        device_df.loc[t > "2023-10-30 01:00", ["wind_speed", "wind_direction"]] = 0.0
+        device_df.loc[t > "2023-10-29 20:00", "temperature"] = -3.0
+    elif request.param == "missing_parameter":
+        device_df["pressure"] = np.nan
+        device_df.loc[(t > "2023-10-30 05:00") & (t < "2023-10-30 07:00"), "humidity"] = np.nan
+
+    return device_df
@@ -0,0 +1,56 @@
+import time
+
+import pandas as pd
+import pytest
+
+from obc_sqc.synthetic.station_data_generator import StationDataGenerator
+from tests.obc_sqc.fixtures.stage_instrumentation_fixtures_test import synthetic_device_input
+
+
+def sleepy_score(df: pd.DataFrame) -> pd.DataFrame:
+    """Scores a device slowly when its temperatures are all missing, as a pathological device would.
+
+    Args:
+    ----
+        df (pd.DataFrame): the raw data of a device
+
+    Returns:
+    -------
+        pd.DataFrame: the number of rows of the device
+    """
+    if df["temperature"].isna().all():
+        time.sleep(0.3)
+    return pd.DataFrame({"rows": [len(df)]})
+
+
+@pytest.fixture
+def ws2000_input() -> pd.DataFrame:
+    """Creates the input of a synthetic WS2000 device.
+
+    Args:
+    ----
+        None
+
+    Returns:
+    -------
+        pd.DataFrame: the input of the device
+    """
+    return synthetic_device_input("WS2000")
+
+
+@pytest.fixture
+def fleet_input() -> pd.DataFrame:
+    """Creates a day of six synthetic devices, the last one without temperatures.
+
+    Args:
+    ----
+        None
+
+    Returns:
+    -------
+        pd.DataFrame: the raw data of the devices, with their device ID
+    """
+    fleet_df: pd.DataFrame = StationDataGenerator(6, seed=11).generate_day("2023-10-30")
+    fleet_df.loc[fleet_df["device_id"] == "synthetic-000005", "temperature"] = float("nan")
+
+    return fleet_df
@@ -0,0 +1,32 @@
+import json
+import os
+import pathlib
+
+import pytest
+
+
+@pytest.fixture()
+def torn_journal(tmp_path: pathlib.Path) -> str:
+    """A journal left by a run stopped while writing its last entry.
+
+    Args:
+    ----
+        tmp_path (pathlib.Path): a temporary directory
+
+    Returns:
+    -------
+        str: the journal file
+    """
+    output_path: str = os.path.join(tmp_path, "device_a.csv")
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("result\n")
+
+    path: str = os.path.join(tmp_path, "journal.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"device_id": "device_a", "date": "2023-10-30", "status": "success", "output": output_path}))
+        f.write("\n")
+        f.write(json.dumps({"device_id": "device_b", "date": "2023-10-30", "status": "failure", "output": None}))
+        f.write("\n")
+        f.write('{"device_id": "device_c", "date": "2023-10-30", "sta')
+
+    return path
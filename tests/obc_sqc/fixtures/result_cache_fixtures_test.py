@@ -0,0 +1,130 @@
+import os
+import pathlib
+import time
+
+import pandas as pd
+import pytest
+
+from obc_sqc.storage.result_cache import ResultCache
+from tests.obc_sqc.fixtures.stage_instrumentation_fixtures_test import synthetic_device_input
+
+
+class SlowCountingScore:
+    """A scoring function that takes a while and appends a line to a file on every call, for any process."""
+
+    def __init__(self, calls_path: str) -> None:
+        """Creates the function.
+
+        Args:
+        ----
+            calls_path (str): the file counting the calls
+        """
+        self.calls_path: str = calls_path
+
+    def calls(self) -> int:
+        """Returns the number of calls so far.
+
+        Args:
+        ----
+            None
+
+        Returns:
+        -------
+            int: the number of calls
+        """
+        if not os.path.exists(self.calls_path):
+            return 0
+        with open(self.calls_path, encoding="utf-8") as f:
+            return len(f.readlines())
+
+    def __call__(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Returns a result derived from the input.
+
+        Args:
+        ----
+            df (pd.DataFrame): the raw data of a device
+
+        Returns:
+        -------
+            pd.DataFrame: the mean temperature of the device
+        """
+        with open(self.calls_path, "a", encoding="utf-8") as f:
+            f.write("call\n")
+        time.sleep(0.5)
+        return pd.DataFrame({"temperature_score": [df["temperature"].mean()]})
+
+
+class EvictionCountingCache(ResultCache):
+    """A result cache appending a line to a file on every scan of its directory, for any process."""
+
+    def __init__(self, cache_dir: str, evictions_path: str) -> None:
+        """Creates the cache.
+
+        Args:
+        ----
+            cache_dir (str): the directory of the cached results
+            evictions_path (str): the file counting the scans
+        """
+        super().__init__(cache_dir)
+        self.evictions_path: str = evictions_path
+
+    def evictions(self) -> int:
+        """Returns the number of scans so far.
+
+        Args:
+        ----
+            None
+
+        Returns:
+        -------
+            int: the number of scans
+        """
+        if not os.path.exists(self.evictions_path):
+            return 0
+        with open(self.evictions_path, encoding="utf-8") as f:
+            return len(f.readlines())
+
+    def evict(self) -> int:
+        """Counts the scan and scans the directory.
+
+        Args:
+        ----
+            None
+
+        Returns:
+        -------
+            int: the size of the results left
+        """
+        with open(self.evictions_path, "a", encoding="utf-8") as f:
+            f.write("evict\n")
+        return super().evict()
+
+
+@pytest.fixture
+def ws2000_input() -> pd.DataFrame:
+    """Creates the input of a synthetic WS2000 device.
+
+    Args:
+    ----
+        None
+
+    Returns:
+    -------
+        pd.DataFrame: the input of the device
+    """
+    return synthetic_device_input("WS2000")
+
+
+@pytest.fixture
+def counting_cache(tmp_path: pathlib.Path) -> ResultCache:
+    """Creates a cache in front of a SlowCountingScore.
+
+    Args:
+    ----
+        tmp_path (pathlib.Path): a temporary directory
+
+    Returns:
+    -------
+        ResultCache: the cache
+    """
+    return ResultCache(str(tmp_path / "cache"), score_fn=SlowCountingScore(str(tmp_path / "calls.txt")))
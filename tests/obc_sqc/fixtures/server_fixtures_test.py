@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, Iterator
+
+import pandas as pd
+
+import pytest
+
+from obc_sqc.iface.server import QodServer
+
+if TYPE_CHECKING:
+    import pathlib
+
+
+def rows_score(df: pd.DataFrame, date: str | None = None) -> pd.DataFrame:
+    """Scores a device with its number of rows, sleeping first when a temperature is above 100.
+
+    A temperature below -100 makes scoring fail with a ValueError, as a bug of the model would.
+
+    Args:
+    ----
+        df (pd.DataFrame): the raw data of a device
+        date (str | None): the date of the request
+
+    Returns:
+    -------
+        pd.DataFrame: a single row with the number of rows and the model
+    """
+    if (df["temperature"] > 100).any():  # noqa: PLR2004
+        time.sleep(5)
+    if (df["temperature"] < -100).any():  # noqa: PLR2004
+        raise ValueError("Temperature out of the scoring range")
+
+    return pd.DataFrame({"rows": [len(df)], "model": [df["model"].iloc[0]]})
+
+
+@pytest.fixture
+def qod_server(tmp_path: pathlib.Path) -> Iterator[QodServer]:
+    """Runs a QodServer with a single worker and a lightweight scoring function, reading files under tmp_path.
+
+    Args:
+    ----
+        tmp_path (pathlib.Path): a temporary directory, the file root of the server
+
+    Returns:
+    -------
+        Iterator[QodServer]: the running server
+    """
+    server: QodServer = QodServer(
+        port=0, workers=1, request_timeout=1.0, drain_timeout=10.0, score_fn=rows_score, warm_up=False,
+        file_root=str(tmp_path),
+    )
+    thread: threading.Thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.drain()
+    thread.join()
+
+
+@pytest.fixture
+def server_records() -> list[dict]:
+    """Creates the records of a device, as sent in the payload of a request.
+
+    Args:
+    ----
+        None
+
+    Returns:
+    -------
+        list[dict]: the records
+    """
+    return [
+        {
+            "utc_datetime": f"2023-10-30 00:00:{second:02d}",
+            "temperature": 10.0,
+            "humidity": 80.0,
+            "wind_speed": 1.5,
+            "wind_direction": 180.0,
+            "pressure": 1013.0,
+            "illuminance": 0.0,
+            "precipitation_accumulated": 0.254,
+            "model": "WS1000",
+        }
+        for second in [0, 16, 32]
+    ]
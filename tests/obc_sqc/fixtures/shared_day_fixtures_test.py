@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.obc_sqc.fixtures.stage_instrumentation_fixtures_test import synthetic_device_input
+
+
+@pytest.fixture
+def interleaved_fleet_input() -> pd.DataFrame:
+    """Creates the input of three synthetic devices with interleaved rows, missing values and a row without device.
+
+    Args:
+    ----
+        None
+
+    Returns:
+    -------
+        pd.DataFrame: the raw data of all devices, with an extra "device_id" column
+    """
+    frames: list[pd.DataFrame] = []
+    for device_id, model in [("device-b", "WS2000"), ("device-a", "WS1000"), ("device-c", "WS2000")]:
+        device_df: pd.DataFrame = synthetic_device_input(model)
+        device_df.loc[device_df.index % 7 == 0, "humidity"] = np.nan
+        frames.append(device_df.assign(device_id=device_id))
+
+    fleet_df: pd.DataFrame = pd.concat(frames).sample(frac=1, random_state=0)
+    fleet_df.iloc[0, fleet_df.columns.get_loc("device_id")] = None
+
+    return fleet_df.reset_index(drop=True)
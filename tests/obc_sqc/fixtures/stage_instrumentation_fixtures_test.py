@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from obc_sqc.schema.schema import SchemaDefinitions
+from obc_sqc.synthetic.station_data_generator import StationDataGenerator
+
+
+def synthetic_device_input(model: str) -> pd.DataFrame:
+    """Creates the input of ObcSqcCheck.run for a synthetic device.
+
+    Args:
+    ----
+        model (str): the model of the device
+
+    Returns:
+    -------
+        pd.DataFrame: the data of the device from 18:00 of the previous day to the end of the scored day
+    """
+    generator: StationDataGenerator = StationDataGenerator(1, ws2000_share=float(model == "WS2000"), seed=3)
+    days_df: pd.DataFrame = pd.concat([generator.generate_day("2023-10-29"), generator.generate_day("2023-10-30")])
+
+    return (
+        days_df[days_df["utc_datetime"] >= pd.Timestamp("2023-10-29 18:00:00")]
+        .drop(columns=["device_id"])
+        .astype(SchemaDefinitions.qod_input_schema())
+        .reset_index(drop=True)
+    )
+
+
+@pytest.fixture(params=["WS1000", "WS2000"])
+def device_input(request: pytest.FixtureRequest) -> pd.DataFrame:
+    """Creates the input of a synthetic device of each model.
+
+    Args:
+    ----
+        request (pytest.FixtureRequest): the model of the device as its param
+
+    Returns:
+    -------
+        pd.DataFrame: the input of the device
+    """
+    return synthetic_device_input(request.param)
+
+
+@pytest.fixture
+def ws2000_input() -> pd.DataFrame:
+    """Creates the input of a synthetic WS2000 device, the cheaper model to trace.
+
+    Args:
+    ----
+        None
+
+    Returns:
+    -------
+        pd.DataFrame: the input of the device
+    """
+    return synthetic_device_input("WS2000")
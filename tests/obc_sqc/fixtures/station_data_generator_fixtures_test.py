@@ -0,0 +1,18 @@
+import pytest
+
+from obc_sqc.synthetic.station_data_generator import StationDataGenerator
+
+
+@pytest.fixture
+def clean_fleet() -> StationDataGenerator:
+    """Creates a generator of six devices of both models, without faults.
+
+    Args:
+    ----
+        None
+
+    Returns:
+    -------
+        StationDataGenerator: the generator
+    """
+    return StationDataGenerator(6, ws2000_share=0.5, seed=7)
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+import pytest
+
+
+@pytest.fixture
+def jittered_ws1000_df() -> pd.DataFrame:
+    """Creates an unsorted WS1000 DataFrame with jittered timestamps, collisions and a gap.
+
+    Args:
+    ----
+        None
+
+    Returns:
+    -------
+        pd.DataFrame: the created DataFrame
+    """
+    utc_datetime: list[str] = [
+        "2023-10-30 00:00:33",  # slot 2, 1 second away
+        "2023-10-30 00:00:01",  # slot 0
+        "2023-10-30 00:00:20",  # slot 1, 4 seconds away
+        "2023-10-30 00:00:12",  # slot 1, 4 seconds away and earlier, so it is kept
+        "2023-10-30 00:00:35",  # slot 2, 3 seconds away
+        "2023-10-30 00:01:20",  # slot 5, slots 3-4 are missing
+    ]
+    n_rows: int = len(utc_datetime)
+
+    data: dict[str, list] = {
+        "temperature": [10.2, 10.0, 10.4, 10.1, 10.3, 10.5],
+        "humidity": [80.0] * n_rows,
+        "wind_speed": [1.5] * n_rows,
+        "wind_direction": [180.0] * n_rows,
+        "pressure": [1013.0] * n_rows,
+        "illuminance": [0.0] * n_rows,
+        "precipitation_accumulated": [0.254] * n_rows,
+        "model": ["WS1000"] * n_rows,
+        "utc_datetime": pd.to_datetime(utc_datetime),
+    }
+
+    df: pd.DataFrame = pd.DataFrame(data)
+
+    return df
+
+
+@pytest.fixture
+def gridded_ws1000_df() -> pd.DataFrame:
+    """Creates a WS1000 DataFrame that is already on the 16-second grid, with a slot of nan data.
+
+    Args:
+    ----
+        None
+
+    Returns:
+    -------
+        pd.DataFrame: the created DataFrame
+    """
+    utc_datetime: pd.DatetimeIndex = pd.date_range("2023-10-30 00:00:00", periods=5, freq="16s")
+    n_rows: int = len(utc_datetime)
+
+    data: dict[str, list] = {
+        "temperature": [10.0, 10.1, np.nan, 10.3, 10.4],
+        "humidity": [80.0] * n_rows,
+        "wind_speed": [1.5] * n_rows,
+        "wind_direction": [180.0] * n_rows,
+        "pressure": [1013.0] * n_rows,
+        "illuminance": [0.0] * n_rows,
+        "precipitation_accumulated": [0.254] * n_rows,
+        "model": ["WS1000"] * n_rows,
+        "utc_datetime": utc_datetime,
+    }
+
+    df: pd.DataFrame = pd.DataFrame(data)
+
+    return df
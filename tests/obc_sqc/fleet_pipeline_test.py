@@ -0,0 +1,293 @@
+import io
+import os
+import pathlib
+from typing import Callable
+
+import boto3
+import moto
+import pandas as pd
+import pytest
+
+from obc_sqc.iface.fleet_pipeline import DirectoryResultWriter, FleetPipeline, LocalDeviceReader, S3DeviceReader
+from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from obc_sqc.storage.partitioned_writer import PartitionedResultWriter
+from obc_sqc.storage.progress_journal import ProgressJournal
+from tests.obc_sqc.fixtures.fleet_pipeline_fixtures_test import *  # noqa: F403
+from tests.obc_sqc.fixtures.fleet_pipeline_fixtures_test import create_device_partition
+
+
+def count_valid_temperatures(df: pd.DataFrame) -> pd.DataFrame:
+    """Scores a device by counting its valid temperatures, failing when there are none.
+
+    Args:
+    ----
+        df (pd.DataFrame): the raw data of a device
+
+    Returns:
+    -------
+        pd.DataFrame: a single row with the number of valid temperatures
+    """
+    if df["temperature"].isna().all():
+        raise ValueError("No valid temperature")
+
+    return pd.DataFrame({"valid_temperatures": [df["temperature"].notna().sum()]})
+
+
+class TestFleetPipeline:
+    """Tests the readers and the bounded read-score-write pipeline."""
+
+    def test_local_reader_window_success(self, fleet_dataset_root: str) -> None:
+        """Tests that the reader keeps only the rows within the window of the date, without duplicates.
+
+        Args:
+        ----
+            fleet_dataset_root (str): the root directory of the dataset
+
+        Returns:
+        -------
+            None
+        """
+        reader: LocalDeviceReader = LocalDeviceReader(fleet_dataset_root, "2023-10-30")
+
+        device_df: pd.DataFrame = reader("device_a")
+
+        assert reader.partition_dates() == ["2023-10-29", "2023-10-30"]
+        assert device_df["utc_datetime"].tolist() == pd.to_datetime(
+            ["2023-10-29 20:00:00", "2023-10-30 10:00:00", "2023-10-30 10:00:16"]
+        ).tolist()
+        assert device_df["temperature"].dtype == "float64"
+
+    @pytest.mark.parametrize("queue_size", [1, 4])
+    def test_run_statuses_success(self, fleet_dataset_root: str, queue_size: int, tmp_path: pathlib.Path) -> None:
+        """Tests that every device is scored and written, and failures are isolated per device.
+
+        Args:
+        ----
+            fleet_dataset_root (str): the root directory of the dataset
+            queue_size (int): the capacity of the pipeline queues
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        output_dir: str = str(tmp_path / "results")
+        pipeline: FleetPipeline = FleetPipeline(
+            read_fn=LocalDeviceReader(fleet_dataset_root, "2023-10-30"),
+            score_fn=count_valid_temperatures,
+            write_fn=DirectoryResultWriter(output_dir),
+            read_workers=2,
+            score_workers=2,
+            queue_size=queue_size,
+            use_processes=False,
+        )
+
+        statuses: dict[str, str] = pipeline.run(["device_a", "device_b", "device_c", "device_missing"])
+
+        assert statuses == {
+            "device_a": "success",
+            "device_b": "success",
+            "device_c": "failure",
+            "device_missing": "failure",
+        }
+        assert sorted(os.listdir(output_dir)) == ["device_a.csv", "device_b.csv"]
+
+        result_df: pd.DataFrame = pd.read_csv(os.path.join(output_dir, "device_a.csv"), index_col=0)
+        assert result_df["valid_temperatures"].tolist() == [3]
+
+    def test_resume_journal_success(self, fleet_dataset_root: str, tmp_path: pathlib.Path) -> None:
+        """Tests that a resumed run skips the completed devices and retries the failed and lost ones.
+
+        Args:
+        ----
+            fleet_dataset_root (str): the root directory of the dataset
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        output_dir: str = str(tmp_path / "results")
+        journal_path: str = str(tmp_path / "journal.jsonl")
+        device_ids: list[str] = ["device_a", "device_b", "device_c", "device_missing"]
+        scored: list[int] = []
+
+        def counting_score(df: pd.DataFrame, date: str | None = None) -> pd.DataFrame:
+            scored.append(len(df))
+            return count_valid_temperatures(df)
+
+        def run() -> dict[str, str]:
+            with ProgressJournal(journal_path) as journal:
+                pipeline: FleetPipeline = FleetPipeline(
+                    read_fn=LocalDeviceReader(fleet_dataset_root, "2023-10-30"),
+                    score_fn=counting_score,
+                    write_fn=DirectoryResultWriter(output_dir),
+                    read_workers=2,
+                    score_workers=2,
+                    use_processes=False,
+                    journal=journal,
+                    date="2023-10-30",
+                )
+                return pipeline.run(device_ids)
+
+        assert run() == {
+            "device_a": "success",
+            "device_b": "success",
+            "device_c": "failure",
+            "device_missing": "failure",
+        }
+        assert len(scored) == 4  # noqa: PLR2004
+
+        # A result lost after the run is scored again
+        os.remove(os.path.join(output_dir, "device_b.csv"))
+
+        assert run() == {"device_b": "success", "device_c": "failure", "device_missing": "failure"}
+        assert len(scored) == 7  # noqa: PLR2004
+        assert sorted(os.listdir(output_dir)) == ["device_a.csv", "device_b.csv"]
+
+    def test_resume_journal_dataset_crash_before_close(self, fleet_dataset_root: str, tmp_path: pathlib.Path) -> None:
+        """Tests that devices written to a dataset are only journaled once its files are renamed into place.
+
+        Args:
+        ----
+            fleet_dataset_root (str): the root directory of the dataset
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        output_dir: str = str(tmp_path / "results")
+        journal_path: str = str(tmp_path / "journal.jsonl")
+
+        def score(df: pd.DataFrame, date: str | None = None) -> pd.DataFrame:
+            return count_valid_temperatures(df).assign(model=str(df["model"].iloc[0]))
+
+        def crash() -> None:
+            raise RuntimeError("Preempted")
+
+        def run(writer: PartitionedResultWriter, commit_fn: Callable[[], object]) -> dict[str, str]:
+            with ProgressJournal(journal_path) as journal:
+                pipeline: FleetPipeline = FleetPipeline(
+                    read_fn=LocalDeviceReader(fleet_dataset_root, "2023-10-30"),
+                    score_fn=score,
+                    write_fn=writer,
+                    use_processes=False,
+                    journal=journal,
+                    date="2023-10-30",
+                    commit_fn=commit_fn,
+                )
+                try:
+                    return pipeline.run(["device_a", "device_b"])
+                finally:
+                    writer.abort()
+
+        # Stopped after every device is written, before the writer renames its files
+        with pytest.raises(RuntimeError, match="Preempted"):
+            run(PartitionedResultWriter(output_dir, "2023-10-30"), crash)
+
+        with ProgressJournal(journal_path) as journal:
+            assert not journal.entries
+
+        writer: PartitionedResultWriter = PartitionedResultWriter(output_dir, "2023-10-30")
+        assert run(writer, writer.close) == {"device_a": "success", "device_b": "success"}
+
+        with ProgressJournal(journal_path) as journal:
+            assert journal.is_completed("device_a", "2023-10-30")
+            assert journal.is_completed("device_b", "2023-10-30")
+
+    def test_local_reader_missing_device(self, fleet_dataset_root: str) -> None:
+        """Tests that a device without any partition reads as empty data rather than failing.
+
+        Args:
+        ----
+            fleet_dataset_root (str): the root directory of the dataset
+
+        Returns:
+        -------
+            None
+        """
+        device_df: pd.DataFrame = LocalDeviceReader(fleet_dataset_root, "2023-10-30")("device_missing")
+
+        assert device_df.empty
+        assert device_df["utc_datetime"].dtype == "datetime64[ns]"
+
+    def test_device_without_data_in_window(self, fleet_dataset_root: str, tmp_path: pathlib.Path) -> None:
+        """Tests that devices without observations in their window get the NO_DATA result of the date.
+
+        The devices are scored in a process pool, started while the reader and writer threads run.
+
+        Args:
+        ----
+            fleet_dataset_root (str): the root directory of the dataset
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        partition: str = os.path.join(fleet_dataset_root, "device_id=device_offline", "date=2023-10-29")
+        os.makedirs(partition)
+        create_device_partition("device_offline", ["2023-10-29 12:00:00"], [10.0]).to_parquet(
+            os.path.join(partition, "part-0.parquet")
+        )
+
+        output_dir: str = str(tmp_path / "results")
+        pipeline: FleetPipeline = FleetPipeline(
+            read_fn=LocalDeviceReader(fleet_dataset_root, "2023-10-30"),
+            score_fn=ObcSqcCheck.run,
+            write_fn=DirectoryResultWriter(output_dir),
+            score_workers=2,
+            use_processes=True,
+            date="2023-10-30",
+        )
+
+        assert pipeline.run(["device_offline", "device_missing"]) == {
+            "device_offline": "success",
+            "device_missing": "success",
+        }
+
+        for device_id in ["device_offline", "device_missing"]:
+            result_df: pd.DataFrame = pd.read_csv(os.path.join(output_dir, f"{device_id}.csv"), index_col=0)
+            assert len(result_df) == 24  # noqa: PLR2004
+            assert (result_df["qod_score"] == 0).all()
+
+    def test_journal_without_date(self, tmp_path: pathlib.Path) -> None:
+        """Tests that a journal is not accepted without the date of the devices.
+
+        Args:
+        ----
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        with ProgressJournal(str(tmp_path / "journal.jsonl")) as journal, pytest.raises(ValueError):
+            FleetPipeline(count_valid_temperatures, count_valid_temperatures, print, journal=journal)
+
+    def test_s3_reader_window_success(self, fleet_partitions: dict[tuple[str, str], pd.DataFrame]) -> None:
+        """Tests the S3 reader against an in-memory S3 stand-in.
+
+        Args:
+        ----
+            fleet_partitions (dict[tuple[str, str], pd.DataFrame]): the data of every partition
+
+        Returns:
+        -------
+            None
+        """
+        with moto.mock_aws():
+            client = boto3.client("s3", region_name="us-east-1")
+            client.create_bucket(Bucket="lake")
+            for (device_id, date), df in fleet_partitions.items():
+                buffer: io.BytesIO = io.BytesIO()
+                df.to_parquet(buffer)
+                key: str = f"device_data/by_device_date/device_id={device_id}/date={date}/part-0.parquet"
+                client.put_object(Bucket="lake", Key=key, Body=buffer.getvalue())
+
+            reader: S3DeviceReader = S3DeviceReader("lake", "2023-10-30")
+            device_df: pd.DataFrame = reader("device_b")
+
+        assert len(device_df) == 3  # noqa: PLR2004
+        assert device_df["utc_datetime"].min() == pd.Timestamp("2023-10-29 20:00:00")
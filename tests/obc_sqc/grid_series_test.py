@@ -0,0 +1,181 @@
+import os
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from obc_sqc.model.time_normalisation import TimeNormalisation
+from obc_sqc.storage.grid_series import GridSeries
+from tests.obc_sqc.fixtures.grid_series_fixtures_test import *  # noqa: F403
+
+
+class TestGridSeries:
+    """Tests the conversion, storage and memory-mapped reading of grid series."""
+
+    def test_from_dataframe_success(self, irregular_ws1000_df: pd.DataFrame) -> None:
+        """Tests that observations are snapped to the nearest slot of the grid.
+
+        Args:
+        ----
+            irregular_ws1000_df (pd.DataFrame): the dataframe containing the raw data
+
+        Returns:
+        -------
+            None
+        """
+        series: GridSeries = GridSeries.from_dataframe(irregular_ws1000_df)
+
+        assert series.data_timestep == 16  # noqa: PLR2004
+        assert series.origin == pd.Timestamp("2023-10-30 00:00:00")
+        assert series.presence.tolist() == [True, True, True, False, False, False, True]
+
+        target_temperature: np.ndarray = np.array([10.0, 10.1, 10.2, np.nan, np.nan, np.nan, np.nan])
+        np.testing.assert_array_equal(series.values["temperature"], target_temperature)  # noqa: PD011
+
+    @pytest.mark.parametrize("dtype", ["float64", "float32"])
+    def test_write_open_roundtrip_success(
+        self, irregular_ws1000_df: pd.DataFrame, dtype: str, tmp_path: pathlib.Path
+    ) -> None:
+        """Tests that a written series is read back memory-mapped and unchanged.
+
+        Args:
+        ----
+            irregular_ws1000_df (pd.DataFrame): the dataframe containing the raw data
+            dtype (str): the dtype of the stored values
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        series: GridSeries = GridSeries.from_dataframe(irregular_ws1000_df, dtype=dtype)
+        path: str = GridSeries.device_path(str(tmp_path), "2023_10_30", "device")
+        series.write(path)
+
+        opened: GridSeries = GridSeries.open(path)
+
+        assert isinstance(opened.values["temperature"], np.memmap)  # noqa: PD011
+        assert opened.values["temperature"].dtype == np.dtype(dtype)  # noqa: PD011
+        assert opened.origin == series.origin
+        assert opened.model == "WS1000"
+        np.testing.assert_array_equal(opened.presence, series.presence)
+        for column, values in series.values.items():  # noqa: PD011
+            np.testing.assert_array_equal(opened.values[column], values)  # noqa: PD011
+
+    def test_to_dataframe_success(self, irregular_ws1000_df: pd.DataFrame) -> None:
+        """Tests the conversion of a series to the input layout of the pipeline.
+
+        Args:
+        ----
+            irregular_ws1000_df (pd.DataFrame): the dataframe containing the raw data
+
+        Returns:
+        -------
+            None
+        """
+        series: GridSeries = GridSeries.from_dataframe(irregular_ws1000_df)
+
+        filled_df: pd.DataFrame = series.to_dataframe()
+        present_df: pd.DataFrame = series.to_dataframe(fill_absent=False)
+
+        assert len(filled_df) == 7  # noqa: PLR2004
+        assert filled_df["utc_datetime"].iloc[-1] == pd.Timestamp("2023-10-30 00:01:36")
+        assert filled_df["humidity"].isna().sum() == 3  # noqa: PLR2004
+        assert present_df["utc_datetime"].tolist() == pd.to_datetime([
+            "2023-10-30 00:00:00",
+            "2023-10-30 00:00:16",
+            "2023-10-30 00:00:32",
+            "2023-10-30 00:01:36",
+        ]).tolist()
+        assert (present_df["model"] == "WS1000").all()
+
+    def test_convert_day_parquet_success(self, irregular_ws1000_df: pd.DataFrame, tmp_path: pathlib.Path) -> None:
+        """Tests the conversion of a day parquet with multiple devices.
+
+        Args:
+        ----
+            irregular_ws1000_df (pd.DataFrame): the dataframe containing the raw data
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        day_df: pd.DataFrame = pd.concat(
+            [irregular_ws1000_df.assign(device_id="device_a"), irregular_ws1000_df.assign(device_id="device_b")]
+        )
+        parquet_path: str = str(tmp_path / "2023_10_30.parquet")
+        day_df.to_parquet(parquet_path)
+
+        converted: int = GridSeries.convert_day_parquet(parquet_path, str(tmp_path / "store"), "2023_10_30")
+
+        assert converted == 2  # noqa: PLR2004
+        for device_id in ["device_a", "device_b"]:
+            path: str = GridSeries.device_path(str(tmp_path / "store"), "2023_10_30", device_id)
+            opened: GridSeries = GridSeries.open(path)
+            assert len(opened) == 7  # noqa: PLR2004
+
+    def test_from_dataframe_time_normalisation_success(self, irregular_ws1000_df: pd.DataFrame) -> None:
+        """Tests that a series keeps the same observation per slot as the time normalisation of the parquet input.
+
+        Args:
+        ----
+            irregular_ws1000_df (pd.DataFrame): the dataframe containing the raw data
+
+        Returns:
+        -------
+            None
+        """
+        series_df: pd.DataFrame = GridSeries.from_dataframe(irregular_ws1000_df).to_dataframe()
+        normalised_df: pd.DataFrame = TimeNormalisation.time_normalisation_dataframe(irregular_ws1000_df, 16, 8)
+
+        assert series_df["utc_datetime"].tolist() == pd.to_datetime(normalised_df["utc_datetime"]).tolist()
+        np.testing.assert_array_equal(
+            series_df["temperature"].to_numpy("float64"),
+            normalised_df["temperature"].to_numpy("float64", na_value=np.nan),
+        )
+
+    def test_to_dataframe_views_success(self, irregular_ws1000_df: pd.DataFrame, tmp_path: pathlib.Path) -> None:
+        """Tests that the weather columns of an opened series are views of its mapped arrays.
+
+        Args:
+        ----
+            irregular_ws1000_df (pd.DataFrame): the dataframe containing the raw data
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        path: str = GridSeries.device_path(str(tmp_path), "2023_10_30", "device")
+        GridSeries.from_dataframe(irregular_ws1000_df, dtype="float32").write(path)
+        opened: GridSeries = GridSeries.open(path)
+
+        df: pd.DataFrame = opened.to_dataframe()
+
+        assert df["temperature"].dtype == np.dtype("float32")
+        assert np.shares_memory(df["temperature"].to_numpy(), opened.values["temperature"])  # noqa: PD011
+
+    def test_write_replace_success(self, irregular_ws1000_df: pd.DataFrame, tmp_path: pathlib.Path) -> None:
+        """Tests that writing over a series switches it to the new data and removes the previous directory.
+
+        Args:
+        ----
+            irregular_ws1000_df (pd.DataFrame): the dataframe containing the raw data
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        path: str = GridSeries.device_path(str(tmp_path), "2023_10_30", "device")
+        GridSeries.from_dataframe(irregular_ws1000_df).write(path)
+        previous: GridSeries = GridSeries.open(path)
+
+        GridSeries.from_dataframe(irregular_ws1000_df.iloc[:2]).write(path)
+
+        assert os.path.islink(path)
+        assert len(GridSeries.open(path)) == 2  # noqa: PLR2004
+        assert len(previous) == 7  # noqa: PLR2004
+        assert sorted(os.listdir(os.path.dirname(path))) == sorted(["device", os.readlink(path)])
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_PACKAGES: list[str] = ["mlflow", "awswrangler", "opensearchpy", "matplotlib", "polars"]
+
+
+class TestImportLayering:
+    """Tests that the scoring path does not import the packages of the MLflow and AWS integrations.
+
+    Neither does it import matplotlib, which raw_data_check used to plot with, nor polars, which only the polars
+    engine needs.
+    """
+
+    @pytest.mark.parametrize(
+        "module",
+        [
+            "obc_sqc.model.obc_sqc_driver",
+            "obc_sqc.schema.schema",
+            "obc_sqc.iface.file_model_inference",
+            "obc_sqc.iface.direct_model_inference",
+            "obc_sqc.iface.server",
+        ],
+    )
+    def test_no_heavy_imports(self, module: str) -> None:
+        """Tests that importing a module in a fresh interpreter loads none of the heavy packages.
+
+        Args:
+        ----
+            module (str): the module under test
+
+        Returns:
+        -------
+            None
+        """
+        code: str = f"import sys, {module}; print(','.join(p for p in {HEAVY_PACKAGES!r} if p in sys.modules))"
+        env: dict[str, str] = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+
+        completed: subprocess.CompletedProcess = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True
+        )
+
+        assert not completed.stdout.strip()
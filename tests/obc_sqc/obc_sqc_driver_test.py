@@ -0,0 +1,170 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from obc_sqc.model.initial_params import InitialParams
+from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from obc_sqc.model.time_normalisation import TimeNormalisation
+from tests.obc_sqc.fixtures.obc_sqc_driver_fixtures_test import *  # noqa: F403
+from tests.obc_sqc.fixtures.obc_sqc_driver_fixtures_test import offline_device_input
+
+
+class TestObcSqcCheck:
+    """Tests the per-parameter projections and the all-parameter kernels of the driver."""
+
+    def test_input_unchanged(self, ws2000_gappy_input: pd.DataFrame) -> None:
+        """Tests that run() leaves the frame of the caller as it was.
+
+        Args:
+        ----
+            ws2000_gappy_input (pd.DataFrame): the input of a device
+
+        Returns:
+        -------
+            None
+        """
+        expected_df: pd.DataFrame = ws2000_gappy_input.copy()
+
+        ObcSqcCheck.run(ws2000_gappy_input)
+
+        pd.testing.assert_frame_equal(ws2000_gappy_input, expected_df)
+
+    def test_golden_day(self, golden_day: tuple[pd.DataFrame, pd.DataFrame]) -> None:
+        """Tests that the whole output of a device, precipitation included, matches its pinned output.
+
+        Args:
+        ----
+            golden_day (tuple[pd.DataFrame, pd.DataFrame]): the input of a device and its expected output
+
+        Returns:
+        -------
+            None
+        """
+        input_df, expected_df = golden_day
+
+        result_df: pd.DataFrame = ObcSqcCheck.run(input_df)
+
+        # The faults of daily_annotation are keyed in set order, which changes with the hash seed
+        for df in (result_df, expected_df):
+            df["daily_annotation"] = df["daily_annotation"].map(lambda x: json.dumps(json.loads(x), sort_keys=True))
+        pd.testing.assert_frame_equal(result_df, expected_df)
+        assert (expected_df["precipitation_accumulated_score"] < 100).any()  # noqa: PLR2004
+
+    def test_parameter_projection(self, ws2000_gappy_input: pd.DataFrame) -> None:
+        """Tests that every parameter is projected to its own columns and the filled values it depends on.
+
+        Args:
+        ----
+            ws2000_gappy_input (pd.DataFrame): the input of a device
+
+        Returns:
+        -------
+            None
+        """
+        params: tuple = InitialParams.picking_initial_parameters("WS2000")
+        df: pd.DataFrame = TimeNormalisation.time_normalisation_dataframe(
+            ObcSqcCheck.prepare_input(ws2000_gappy_input), params[5], params[6]
+        )
+        filled_values: pd.DataFrame = df[["temperature", "humidity"]].ffill()
+
+        expected_columns: dict[str, list[str]] = {
+            "humidity": ["utc_datetime", "humidity"],
+            "temperature": ["utc_datetime", "temperature", "humidity_for_raw_check"],
+            "wind_direction": [
+                "utc_datetime",
+                "wind_speed",
+                "wind_direction",
+                "temperature_for_raw_check",
+                "humidity_for_raw_check",
+            ],
+            "precipitation_accumulated": ["utc_datetime", "precipitation_accumulated"],
+        }
+        for parameter, columns in expected_columns.items():
+            projection_df: pd.DataFrame = ObcSqcCheck.parameter_projection(df, parameter, filled_values)
+            assert projection_df.columns.tolist() == columns
+
+        projection_df = ObcSqcCheck.parameter_projection(df, "wind_speed", filled_values)
+        projection_df.loc[:, "wind_speed"] = -999.0
+        projection_df.loc[:, "temperature_for_raw_check"] = -999.0
+
+        assert (df["wind_speed"] != -999.0).all()  # noqa: PLR2004
+        assert (filled_values["temperature"] != -999.0).all()  # noqa: PLR2004
+        assert np.isnan(df.loc[100, "temperature"])
+
+    def test_obc_matrix(self, ws2000_gappy_input: pd.DataFrame) -> None:
+        """Tests that obc_matrix() equals obc() for every parameter.
+
+        Args:
+        ----
+            ws2000_gappy_input (pd.DataFrame): the input of a device
+
+        Returns:
+        -------
+            None
+        """
+        params: tuple = InitialParams.picking_initial_parameters("WS2000")
+        df: pd.DataFrame = ObcSqcCheck.prepare_input(ws2000_gappy_input)
+        df.loc[::50, params[11]] = 1e6
+        df.loc[::70, params[11]] = -1e6
+
+        ann_obc_df: pd.DataFrame = ObcSqcCheck.obc_matrix(df[params[11]], params[19][0], params[19][1])
+
+        for i, parameter in enumerate(params[11]):
+            expected_df: pd.DataFrame = ObcSqcCheck.obc(df.copy(), parameter, params[19][0][i], params[19][1][i])
+            assert ann_obc_df[parameter].equals(expected_df["ann_obc"])
+            assert ann_obc_df[parameter].sum() > 0
+
+    @pytest.mark.parametrize(
+        "model, start, end",
+        [
+            ("WS2000", None, None),
+            ("WS2000", "2023-10-30 12:00", "2023-10-30 23:00"),
+            ("WS2000", "2023-10-29 19:31", "2023-10-30 05:13"),
+            ("WS2000", "2023-10-29 00:00", "2023-10-30 02:00"),
+            ("WS1000", "2023-10-29 18:07", "2023-10-30 23:41"),
+        ],
+    )
+    def test_no_data_shortcut(
+        self, model: str, start: str | None, end: str | None, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Tests that a device without any value gets the same result as through the full chain.
+
+        Args:
+        ----
+            model (str): the station model
+            start (str | None): the first timestamp of the input
+            end (str | None): the last timestamp of the input
+            monkeypatch (pytest.MonkeyPatch): disables the shortcut
+
+        Returns:
+        -------
+            None
+        """
+        device_df: pd.DataFrame = offline_device_input(model, start, end)
+
+        result_df: pd.DataFrame = ObcSqcCheck.run(device_df)
+        monkeypatch.setattr(ObcSqcCheck, "NO_DATA_SHORTCUT", False)
+        expected_df: pd.DataFrame = ObcSqcCheck.run(device_df)
+
+        pd.testing.assert_frame_equal(result_df, expected_df)
+
+    def test_empty_input(self) -> None:
+        """Tests that a device without observations gets the NO_DATA result of the date, and only with a date.
+
+        Args:
+        ----
+            None
+
+        Returns:
+        -------
+            None
+        """
+        device_df: pd.DataFrame = offline_device_input("WS2000")
+
+        result_df: pd.DataFrame = ObcSqcCheck.run(device_df.iloc[:0], date="2023-10-30")
+
+        pd.testing.assert_frame_equal(result_df, ObcSqcCheck.run(device_df))
+        with pytest.raises(ValueError, match="date"):
+            ObcSqcCheck.run(device_df.iloc[:0])
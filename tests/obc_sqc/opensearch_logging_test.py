@@ -0,0 +1,166 @@
+import time
+from typing import Any
+
+import opensearchpy
+import pytest
+
+from obc_sqc.iface.opensearch_logging import BulkLogShipper
+from tests.obc_sqc.fixtures.opensearch_logging_fixtures_test import *  # noqa: F403
+from tests.obc_sqc.fixtures.opensearch_logging_fixtures_test import BulkStandInServer
+
+
+def create_client(server: BulkStandInServer) -> opensearchpy.OpenSearch:
+    """Creates a client for the stand-in server, without retries.
+
+    Args:
+    ----
+        server (BulkStandInServer): the stand-in server
+
+    Returns:
+    -------
+        opensearchpy.OpenSearch: the client
+    """
+    return opensearchpy.OpenSearch(hosts=[{"host": "127.0.0.1", "port": server.server_port}], max_retries=0)
+
+
+class TestBulkLogShipper:
+    """Tests the buffering and bulk shipping of status documents."""
+
+    def test_size_triggered_flush_success(self, opensearch_stand_in: BulkStandInServer) -> None:
+        """Tests that a full batch is shipped in one bulk request without waiting for the flush interval.
+
+        Args:
+        ----
+            opensearch_stand_in (BulkStandInServer): the stand-in server
+
+        Returns:
+        -------
+            None
+        """
+        shipper: BulkLogShipper = BulkLogShipper(
+            create_client(opensearch_stand_in), index_prefix="qod-test", max_batch_size=3, flush_interval=60
+        )
+
+        for i in range(3):
+            shipper.log({"device_id": f"device_{i}", "status": "success"})
+
+        deadline: float = time.monotonic() + 10
+        while not opensearch_stand_in.bulk_requests and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert len(opensearch_stand_in.bulk_requests) == 1
+        indexes, docs = zip(*opensearch_stand_in.bulk_requests[0], strict=True)
+        assert all(index.startswith("qod-test-") for index in indexes)
+        assert [doc["device_id"] for doc in docs] == ["device_0", "device_1", "device_2"]
+
+        shipper.close()
+
+    def test_close_flushes_remaining_success(self, opensearch_stand_in: BulkStandInServer) -> None:
+        """Tests that documents below the batch size are shipped when the shipper closes.
+
+        Args:
+        ----
+            opensearch_stand_in (BulkStandInServer): the stand-in server
+
+        Returns:
+        -------
+            None
+        """
+        shipper: BulkLogShipper = BulkLogShipper(
+            create_client(opensearch_stand_in), max_batch_size=100, flush_interval=60
+        )
+
+        shipper.log({"device_id": "device_0", "status": "failure"})
+        assert shipper.pending() == 1
+
+        shipper.close()
+
+        assert shipper.pending() == 0
+        assert [len(request) for request in opensearch_stand_in.bulk_requests] == [1]
+
+    def test_failed_flush_retried(self, opensearch_stand_in: BulkStandInServer) -> None:
+        """Tests that documents of a failed bulk request stay buffered, in order, for the next flush.
+
+        Args:
+        ----
+            opensearch_stand_in (BulkStandInServer): the stand-in server
+
+        Returns:
+        -------
+            None
+        """
+        opensearch_stand_in.failures_left = 1
+        shipper: BulkLogShipper = BulkLogShipper(
+            create_client(opensearch_stand_in), max_batch_size=100, flush_interval=60
+        )
+
+        for i in range(2):
+            shipper.log({"device_id": f"device_{i}", "status": "success"})
+
+        assert shipper.flush() == 0
+        assert shipper.pending() == 2  # noqa: PLR2004
+        assert shipper.flush() == 2  # noqa: PLR2004
+
+        _, docs = zip(*opensearch_stand_in.bulk_requests[0], strict=True)
+        assert [doc["device_id"] for doc in docs] == ["device_0", "device_1"]
+
+        shipper.close()
+
+    def test_failed_flush_overflow_drops_oldest(self, opensearch_stand_in: BulkStandInServer) -> None:
+        """Tests that a failed batch put back into a full buffer drops the oldest documents, not the newest.
+
+        Args:
+        ----
+            opensearch_stand_in (BulkStandInServer): the stand-in server
+
+        Returns:
+        -------
+            None
+        """
+        opensearch_stand_in.failures_left = 1
+        shipper: BulkLogShipper = BulkLogShipper(
+            create_client(opensearch_stand_in), max_batch_size=100, flush_interval=60, max_buffer_size=3
+        )
+        bulk = shipper.client.bulk
+
+        def log_during_bulk(**kwargs: Any) -> dict:
+            # Documents logged while the failing request is in flight
+            if opensearch_stand_in.failures_left:
+                for i in range(2, 4):
+                    shipper.log({"device_id": f"device_{i}", "status": "success"})
+            return bulk(**kwargs)
+
+        shipper.client.bulk = log_during_bulk
+
+        for i in range(2):
+            shipper.log({"device_id": f"device_{i}", "status": "success"})
+
+        assert shipper.flush() == 0
+        assert shipper.flush() == 3  # noqa: PLR2004
+
+        _, docs = zip(*opensearch_stand_in.bulk_requests[0], strict=True)
+        assert [doc["device_id"] for doc in docs] == ["device_1", "device_2", "device_3"]
+
+        shipper.close()
+
+    def test_connect_from_env_success(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Tests that the host may be given as a URL and the port is read from the environment.
+
+        Args:
+        ----
+            monkeypatch (pytest.MonkeyPatch): sets the environment variables
+
+        Returns:
+        -------
+            None
+        """
+        monkeypatch.setenv("ES_QOD_HOST", "https://search.example.com/")
+        monkeypatch.setenv("ES_QOD_PORT", "9200")
+        monkeypatch.setenv("ES_QOD_USER", "user")
+        monkeypatch.setenv("ES_QOD_PASSWORD", "password")
+
+        client: opensearchpy.OpenSearch = BulkLogShipper.connect_from_env()
+
+        assert client.transport.hosts == [{"host": "search.example.com", "port": 9200}]
+
+        client.close()
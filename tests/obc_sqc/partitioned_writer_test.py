@@ -0,0 +1,136 @@
+import os
+import pathlib
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from obc_sqc.schema.schema import SchemaDefinitions
+from obc_sqc.storage.partitioned_writer import PartitionedResultWriter
+from tests.obc_sqc.fixtures.partitioned_writer_fixtures_test import *  # noqa: F403
+
+
+def read_dataset(root: str) -> pd.DataFrame:
+    """Reads a dataset written by a PartitionedResultWriter back into the layout of the results.
+
+    Args:
+    ----
+        root (str): the root directory of the dataset
+
+    Returns:
+    -------
+        pd.DataFrame: the results, sorted by device and hour
+    """
+    batch_schema: dict = SchemaDefinitions.mlflow_obc_sqc_batch_schema()
+    dataset_df: pd.DataFrame = pd.read_parquet(root)
+    dataset_df["model"] = dataset_df["model"].astype(str).replace(PartitionedResultWriter.UNKNOWN_MODEL, "")
+
+    return (
+        dataset_df[list(batch_schema.keys())]
+        .astype(batch_schema)
+        .sort_values(["device_id", "hour"])
+        .reset_index(drop=True)
+    )
+
+
+class TestPartitionedResultWriter:
+    """Tests the partitions, row groups, encodings and atomic files of the dataset writer."""
+
+    def test_round_trip(self, fleet_results: pd.DataFrame, tmp_path: pathlib.Path) -> None:
+        """Tests that the dataset holds the written results, in large dictionary-encoded row groups.
+
+        Args:
+        ----
+            fleet_results (pd.DataFrame): the results of a fleet
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        root: str = str(tmp_path / "dataset")
+        with PartitionedResultWriter(root, "2023-10-30", row_group_rows=200, max_pending=2) as writer:
+            for _, device_df in fleet_results.groupby("device_id", sort=False):
+                writer.write(device_df)
+
+        assert sorted(os.listdir(os.path.join(root, "date=2023-10-30"))) == [
+            "model=WS1000",
+            "model=WS2000",
+            "model=unknown",
+        ]
+        pd.testing.assert_frame_equal(
+            read_dataset(root), fleet_results.sort_values(["device_id", "hour"]).reset_index(drop=True)
+        )
+
+        # 20 WS2000 devices of 24 hours, flushed every 200 rows and once more when closed
+        ws2000_dir: str = os.path.join(root, "date=2023-10-30", "model=WS2000")
+        (file_name,) = os.listdir(ws2000_dir)
+        metadata = pq.ParquetFile(os.path.join(ws2000_dir, file_name)).metadata
+        assert [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)] == [216, 216, 48]
+
+        columns: list[str] = [metadata.schema.column(i).name for i in range(metadata.num_columns)]
+        encodings: dict[str, tuple] = {
+            name: metadata.row_group(0).column(i).encodings for i, name in enumerate(columns)
+        }
+        assert "RLE_DICTIONARY" in encodings["daily_annotation"]
+        assert "RLE_DICTIONARY" not in encodings["qod_score"]
+        assert metadata.row_group(0).column(0).compression == "ZSTD"
+
+    def test_call_returns_final_path(self, fleet_results: pd.DataFrame, tmp_path: pathlib.Path) -> None:
+        """Tests that the write_fn of a fleet points to a file that appears only once the writer is closed.
+
+        Args:
+        ----
+            fleet_results (pd.DataFrame): the results of a fleet
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        device_df: pd.DataFrame = fleet_results[fleet_results["device_id"] == "device_01"]
+        writer: PartitionedResultWriter = PartitionedResultWriter(str(tmp_path), "2023-10-30")
+
+        path: str = writer("device_01", device_df.drop(columns=["device_id", "status"]))
+
+        assert not os.path.exists(path)
+        assert writer.close() == [path]
+        assert pd.read_parquet(path)["device_id"].unique().tolist() == ["device_01"]
+
+    def test_abort_leaves_no_files(self, fleet_results: pd.DataFrame, tmp_path: pathlib.Path) -> None:
+        """Tests that a writer stopped by an exception leaves no file behind, partial or not.
+
+        Args:
+        ----
+            fleet_results (pd.DataFrame): the results of a fleet
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        root: str = str(tmp_path / "dataset")
+        with pytest.raises(KeyboardInterrupt):
+            with PartitionedResultWriter(root, "2023-10-30", row_group_rows=24) as writer:
+                writer.write(fleet_results)
+                raise KeyboardInterrupt
+
+        assert [files for _, _, files in os.walk(root) if files] == []
+
+    def test_thread_error_raised(self, fleet_results: pd.DataFrame, tmp_path: pathlib.Path) -> None:
+        """Tests that a failure of the writing thread is raised to the caller.
+
+        Args:
+        ----
+            fleet_results (pd.DataFrame): the results of a fleet
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        writer: PartitionedResultWriter = PartitionedResultWriter(str(tmp_path), "2023-10-30", row_group_rows=1)
+        writer.write(fleet_results.drop(columns=["model"]))
+
+        with pytest.raises(KeyError):
+            writer.close()
@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from tests.obc_sqc.fixtures.polars_engine_fixtures_test import *  # noqa: F403
+
+pytest.importorskip("polars")
+
+
+class TestPolarsEngine:
+    """Tests that the polars engine scores devices exactly like the pandas engine."""
+
+    def test_identical_results(self, ws2000_constant_input: pd.DataFrame) -> None:
+        """Tests that both engines annotate constant data and score the device identically.
+
+        Args:
+        ----
+            ws2000_constant_input (pd.DataFrame): the input of a device
+
+        Returns:
+        -------
+            None
+        """
+        pandas_outputs: StageOutputs = StageOutputs()  # noqa: F405
+        polars_outputs: StageOutputs = StageOutputs()  # noqa: F405
+
+        expected_df: pd.DataFrame = ObcSqcCheck.run(ws2000_constant_input, pandas_outputs)
+        result_df: pd.DataFrame = ObcSqcCheck.run(ws2000_constant_input, polars_outputs, engine="polars")
+
+        pd.testing.assert_frame_equal(result_df, expected_df)
+        assert polars_outputs.outputs.keys() == pandas_outputs.outputs.keys()
+        for parameter, expected_param_df in pandas_outputs.outputs.items():
+            pd.testing.assert_frame_equal(polars_outputs.outputs[parameter], expected_param_df)
+
+    def test_unknown_engine(self) -> None:
+        """Tests that an unknown engine is rejected before any check runs.
+
+        Args:
+        ----
+            None
+
+        Returns:
+        -------
+            None
+        """
+        with pytest.raises(ValueError, match="Unknown engine"):
+            ObcSqcCheck.run(pd.DataFrame(), engine="numba")
@@ -0,0 +1,92 @@
+import json
+import os
+import pathlib
+import pstats
+
+import pandas as pd
+import pytest
+
+from obc_sqc.iface.batch_scoring import BatchScoring, DeviceOutcome
+from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from obc_sqc.model.profiling_sampler import ProfilingSampler
+from tests.obc_sqc.fixtures.profiling_sampler_fixtures_test import *  # noqa: F403
+from tests.obc_sqc.fixtures.profiling_sampler_fixtures_test import sleepy_score
+
+
+class TestProfilingSampler:
+    """Tests the sampled and slow captures of the profiling sampler and the files they leave."""
+
+    def test_sampled_capture(self, ws2000_input: pd.DataFrame, tmp_path: pathlib.Path) -> None:
+        """Tests that a sampled device gets its profile, metadata and input, and the result of a plain run.
+
+        Args:
+        ----
+            ws2000_input (pd.DataFrame): the input of a device
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        sampler: ProfilingSampler = ProfilingSampler(str(tmp_path), sample_every=1)
+        ws2000_input.attrs["device_id"] = "device_a"
+
+        pd.testing.assert_frame_equal(sampler(ws2000_input), ObcSqcCheck.run(ws2000_input))
+
+        (pstats_name,) = [name for name in os.listdir(tmp_path) if name.endswith(".pstats")]
+        assert pstats_name.startswith("device_a.sampled.")
+        path: str = os.path.join(tmp_path, pstats_name.removesuffix(".pstats"))
+
+        stats: pstats.Stats = pstats.Stats(f"{path}.pstats")
+        assert "run" in stats.get_stats_profile().func_profiles
+
+        with open(f"{path}.json", encoding="utf-8") as f:
+            metadata: dict = json.load(f)
+        assert metadata["device_id"] == "device_a"
+        assert metadata["model"] == "WS2000"
+        assert metadata["rows"] == len(ws2000_input)
+        assert metadata["reason"] == "sampled"
+
+        pd.testing.assert_frame_equal(pd.read_parquet(f"{path}.input.parquet"), ws2000_input)
+
+    def test_sample_stable(self, tmp_path: pathlib.Path) -> None:
+        """Tests that about one in sample_every devices is sampled, the same ones for every sampler.
+
+        Args:
+        ----
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        device_ids: list[str] = [f"device_{i:05d}" for i in range(4000)]
+        sampled: list[str] = [i for i in device_ids if ProfilingSampler(str(tmp_path), 20).is_sampled(i)]
+
+        assert 150 < len(sampled) < 250  # noqa: PLR2004
+        assert sampled == [i for i in device_ids if ProfilingSampler(str(tmp_path), 20).is_sampled(i)]
+        assert not any(ProfilingSampler(str(tmp_path)).is_sampled(i) for i in device_ids)
+
+        with pytest.raises(ValueError):
+            ProfilingSampler(str(tmp_path), -1)
+
+    def test_slow_devices_batch(self, fleet_input: pd.DataFrame, tmp_path: pathlib.Path) -> None:
+        """Tests that only the device slower than the threshold is profiled, under its ID from BatchScoring.
+
+        Args:
+        ----
+            fleet_input (pd.DataFrame): the raw data of the devices
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        sampler: ProfilingSampler = ProfilingSampler(str(tmp_path), slow_seconds=0.2, score_fn=sleepy_score)
+
+        outcomes: list[DeviceOutcome] = BatchScoring.score_devices(fleet_input, sampler, max_workers=2)
+
+        assert all(outcome.result is not None for outcome in outcomes)
+        assert [name.split(".")[:2] for name in os.listdir(tmp_path) if name.endswith(".pstats")] == [
+            ["synthetic-000005", "slow"]
+        ]
@@ -0,0 +1,71 @@
+import os
+import pathlib
+
+from obc_sqc.storage.progress_journal import JournalEntry, ProgressJournal
+from tests.obc_sqc.fixtures.progress_journal_fixtures_test import *  # noqa: F403
+
+
+class TestProgressJournal:
+    """Tests the entries, torn lines and completed units of the progress journal."""
+
+    def test_record_reload(self, tmp_path: pathlib.Path) -> None:
+        """Tests that the latest entry of every unit is read back by a new journal.
+
+        Args:
+        ----
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        path: str = os.path.join(tmp_path, "journal.jsonl")
+        with ProgressJournal(path) as journal:
+            journal.record("device_a", "2023-10-30", "failure")
+            journal.record("device_a", "2023-10-30", "success")
+            journal.record("device_a", "2023-10-31", "failure")
+
+        with ProgressJournal(path) as journal:
+            assert journal.entries == {
+                ("device_a", "2023-10-30"): JournalEntry("success", None),
+                ("device_a", "2023-10-31"): JournalEntry("failure", None),
+            }
+            assert journal.is_completed("device_a", "2023-10-30")
+            assert not journal.is_completed("device_a", "2023-10-31")
+            assert not journal.is_completed("device_b", "2023-10-30")
+
+    def test_torn_line(self, torn_journal: str) -> None:
+        """Tests that a torn last line is ignored and does not swallow the next entry.
+
+        Args:
+        ----
+            torn_journal (str): the journal file
+
+        Returns:
+        -------
+            None
+        """
+        with ProgressJournal(torn_journal) as journal:
+            assert sorted(journal.entries) == [("device_a", "2023-10-30"), ("device_b", "2023-10-30")]
+            journal.record("device_c", "2023-10-30", "success")
+
+        with ProgressJournal(torn_journal) as journal:
+            assert journal.entries[("device_c", "2023-10-30")] == JournalEntry("success", None)
+
+    def test_missing_output(self, torn_journal: str) -> None:
+        """Tests that a success whose output has gone is not completed.
+
+        Args:
+        ----
+            torn_journal (str): the journal file
+
+        Returns:
+        -------
+            None
+        """
+        with ProgressJournal(torn_journal) as journal:
+            assert journal.is_completed("device_a", "2023-10-30")
+            output: str | None = journal.entries[("device_a", "2023-10-30")].output
+            assert output is not None
+            os.remove(output)
+            assert not journal.is_completed("device_a", "2023-10-30")
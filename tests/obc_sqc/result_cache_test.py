@@ -0,0 +1,248 @@
+import os
+import pathlib
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from obc_sqc.schema.schema import SchemaDefinitions
+from obc_sqc.storage.result_cache import ResultCache
+from tests.obc_sqc.fixtures.result_cache_fixtures_test import *  # noqa: F403
+from tests.obc_sqc.fixtures.result_cache_fixtures_test import EvictionCountingCache, SlowCountingScore
+
+
+class TestResultCache:
+    """Tests the keys, hits, eviction and single-flight misses of the result cache."""
+
+    def test_hit_equals_run(self, ws2000_input: pd.DataFrame, tmp_path: pathlib.Path) -> None:
+        """Tests that a cached result equals the result of a run and is stored once.
+
+        Args:
+        ----
+            ws2000_input (pd.DataFrame): the input of a device
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        cache: ResultCache = ResultCache(str(tmp_path))
+        expected_df: pd.DataFrame = ObcSqcCheck.run(ws2000_input)
+
+        pd.testing.assert_frame_equal(cache(ws2000_input), expected_df)
+        pd.testing.assert_frame_equal(cache(ws2000_input), expected_df)
+        assert os.path.exists(cache.path(cache.key(ws2000_input)))
+
+    def test_key(self, ws2000_input: pd.DataFrame, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Tests that the key follows the values, the model and the QoD version, but not the input dtypes.
+
+        Args:
+        ----
+            ws2000_input (pd.DataFrame): the input of a device
+            monkeypatch (pytest.MonkeyPatch): changes the QoD version
+
+        Returns:
+        -------
+            None
+        """
+        key: str = ResultCache.key(ws2000_input)
+
+        assert ResultCache.key(ws2000_input.astype({"temperature": "Float64"})) == key
+        assert ResultCache.key(ws2000_input.assign(model="WS1000")) != key
+
+        changed_df: pd.DataFrame = ws2000_input.copy()
+        changed_df.loc[10, "pressure"] += 0.1
+        assert ResultCache.key(changed_df) != key
+
+        monkeypatch.setattr(ObcSqcCheck, "QOD_VERSION", "0.0.0")
+        assert ResultCache.key(ws2000_input) != key
+
+    def test_key_normalised_window(self, ws2000_input: pd.DataFrame) -> None:
+        """Tests that the key does not follow the row order and duplicate rows of the input.
+
+        Args:
+        ----
+            ws2000_input (pd.DataFrame): the input of a device
+
+        Returns:
+        -------
+            None
+        """
+        key: str = ResultCache.key(ws2000_input)
+
+        assert ResultCache.key(ws2000_input.sample(frac=1, random_state=0)) == key
+        assert ResultCache.key(pd.concat([ws2000_input, ws2000_input.iloc[:10]])) == key
+
+    def test_empty_input(self, tmp_path: pathlib.Path) -> None:
+        """Tests that an empty input is keyed by its date and cached as the NO_DATA result of the date.
+
+        Args:
+        ----
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        empty_df: pd.DataFrame = pd.DataFrame(columns=list(SchemaDefinitions.qod_input_schema().keys()))
+        cache: ResultCache = ResultCache(str(tmp_path))
+
+        assert ResultCache.key(empty_df, "2023-10-30") != ResultCache.key(empty_df, "2023-10-31")
+
+        result_df: pd.DataFrame = cache(empty_df, date="2023-10-30")
+
+        pd.testing.assert_frame_equal(result_df, ObcSqcCheck.run(empty_df, date="2023-10-30"))
+        assert os.path.exists(cache.path(cache.key(empty_df, "2023-10-30")))
+
+    def test_lru_eviction(self, counting_cache: ResultCache) -> None:
+        """Tests that the least recently used results are evicted over max_bytes.
+
+        Args:
+        ----
+            counting_cache (ResultCache): a cache counting the calls of its scoring function
+
+        Returns:
+        -------
+            None
+        """
+        keys: list[str] = ["aa1", "aa2", "bb3"]
+        for i, key in enumerate(keys):
+            counting_cache.put(key, pd.DataFrame({"temperature_score": [float(i)]}))
+            # Distinct modification times
+            os.utime(counting_cache.path(key), (i, i))
+
+        counting_cache.get("aa1")
+        # Over max_bytes with a fourth result, and under low_water once the oldest is evicted
+        counting_cache.max_bytes = int(1.2 * sum(os.path.getsize(counting_cache.path(key)) for key in keys))
+        counting_cache.put("bb4", pd.DataFrame({"temperature_score": [3.0]}))
+
+        assert counting_cache.get("aa2") is None
+        cached: list[pd.DataFrame | None] = [counting_cache.get(key) for key in ["aa1", "bb3", "bb4"]]
+        assert [None if df is None else df["temperature_score"].iloc[0] for df in cached] == [0, 2, 3]
+
+    def test_put_scans_over_max_bytes(self, counting_cache: ResultCache, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Tests that the directory is only scanned by the first put and once the stored results exceed max_bytes.
+
+        Args:
+        ----
+            counting_cache (ResultCache): a cache counting the calls of its scoring function
+            monkeypatch (pytest.MonkeyPatch): counts the scans of the directory
+
+        Returns:
+        -------
+            None
+        """
+        scans: list[int] = []
+        evict = counting_cache.evict
+
+        def counting_evict() -> int:
+            scans.append(1)
+            return evict()
+
+        monkeypatch.setattr(counting_cache, "evict", counting_evict)
+
+        counting_cache.put("aa1", pd.DataFrame({"temperature_score": [0.0]}))
+        counting_cache.max_bytes = 3 * os.path.getsize(counting_cache.path("aa1"))
+        counting_cache.put("aa2", pd.DataFrame({"temperature_score": [1.0]}))
+        counting_cache.put("aa3", pd.DataFrame({"temperature_score": [2.0]}))
+        assert len(scans) == 1
+
+        counting_cache.put("aa4", pd.DataFrame({"temperature_score": [3.0]}))
+        assert len(scans) == 2  # noqa: PLR2004
+        stored_bytes: int | None = counting_cache.stored_bytes()
+        assert stored_bytes is not None
+        assert stored_bytes <= counting_cache.max_bytes * counting_cache.low_water
+
+    def test_put_processes_share_size(self, tmp_path: pathlib.Path) -> None:
+        """Tests that puts from the workers of a process pool, each given its own copy of the cache, scan once.
+
+        Args:
+        ----
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        cache: EvictionCountingCache = EvictionCountingCache(str(tmp_path / "cache"), str(tmp_path / "evictions.txt"))
+        keys: list[str] = [f"{i:02d}{i}" for i in range(8)]
+        frames: list[pd.DataFrame] = [pd.DataFrame({"temperature_score": [float(i)]}) for i in range(8)]
+
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            list(pool.map(cache.put, keys, frames))
+
+        assert cache.evictions() == 1
+        assert cache.stored_bytes() == sum(os.path.getsize(cache.path(key)) for key in keys)
+
+    def test_lock_files(self, counting_cache: ResultCache, ws2000_input: pd.DataFrame) -> None:
+        """Tests that eviction leaves a held lock file, and the holder removes it on release.
+
+        Args:
+        ----
+            counting_cache (ResultCache): a cache counting the calls of its scoring function
+            ws2000_input (pd.DataFrame): the input of a device
+
+        Returns:
+        -------
+            None
+        """
+        counting_cache.put("aa1", pd.DataFrame({"temperature_score": [0.0]}))
+        lock = counting_cache.lock("aa1")
+        counting_cache.max_bytes = 0
+        counting_cache.evict()
+
+        assert counting_cache.get("aa1") is None
+        assert os.path.exists(f"{counting_cache.path('aa1')}.lock")
+
+        counting_cache.unlock("aa1", lock)
+        assert not os.path.exists(f"{counting_cache.path('aa1')}.lock")
+
+        counting_cache.max_bytes = 1 << 30
+        counting_cache(ws2000_input)
+        key: str = counting_cache.key(ws2000_input)
+        assert os.path.exists(counting_cache.path(key))
+        assert not os.path.exists(f"{counting_cache.path(key)}.lock")
+
+    def test_single_flight_threads(self, counting_cache: ResultCache, ws2000_input: pd.DataFrame) -> None:
+        """Tests that concurrent misses of the same key in threads score it once.
+
+        Args:
+        ----
+            counting_cache (ResultCache): a cache counting the calls of its scoring function
+            ws2000_input (pd.DataFrame): the input of a device
+
+        Returns:
+        -------
+            None
+        """
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results: list[pd.DataFrame] = list(pool.map(counting_cache, [ws2000_input] * 4))
+
+        assert isinstance(counting_cache.score_fn, SlowCountingScore)
+        assert counting_cache.score_fn.calls() == 1
+        assert all(result.equals(results[0]) for result in results)
+
+    def test_single_flight_processes(self, counting_cache: ResultCache, ws2000_input: pd.DataFrame) -> None:
+        """Tests that concurrent misses of the same key in processes score it once, and other keys in parallel.
+
+        Args:
+        ----
+            counting_cache (ResultCache): a cache counting the calls of its scoring function
+            ws2000_input (pd.DataFrame): the input of a device
+
+        Returns:
+        -------
+            None
+        """
+        other_df: pd.DataFrame = ws2000_input.assign(temperature=ws2000_input["temperature"] + 1)
+
+        start: float = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            results: list[pd.DataFrame] = list(pool.map(counting_cache, [ws2000_input, ws2000_input, other_df] * 2))
+
+        assert isinstance(counting_cache.score_fn, SlowCountingScore)
+        assert counting_cache.score_fn.calls() == 2  # noqa: PLR2004
+        assert results[0].equals(results[1]) and not results[0].equals(results[2])
+        assert time.perf_counter() - start < 3  # noqa: PLR2004
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import http.client
+import json
+import urllib.error
+import urllib.request
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+import pandas as pd
+import pytest
+
+from obc_sqc.iface.server import QodServer, ScoringRequest
+from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from tests.obc_sqc.fixtures.server_fixtures_test import *  # noqa: F403
+
+if TYPE_CHECKING:
+    import pathlib
+
+
+def request(server: QodServer, path: str, payload: Any = None) -> tuple[int, dict]:
+    """Sends a request to the server, a POST when a payload is given, otherwise a GET.
+
+    Args:
+    ----
+        server (QodServer): the running server
+        path (str): the path of the request
+        payload (Any): the JSON payload
+
+    Returns:
+    -------
+        tuple[int, dict]: the HTTP status code and the response body
+    """
+    data: bytes | None = None if payload is None else json.dumps(payload).encode()
+    http_request = urllib.request.Request(f"http://127.0.0.1:{server.port}{path}", data=data)
+
+    try:
+        with urllib.request.urlopen(http_request, timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        body: dict = json.loads(e.read())
+        e.close()
+        return e.code, body
+
+
+class TestQodServer:
+    """Tests the routing, scoring, timeouts and draining of the QoD server."""
+
+    def test_score_records_success(self, qod_server: QodServer, server_records: list[dict]) -> None:
+        """Tests that records are scored in the worker pool, with duplicates dropped.
+
+        Args:
+        ----
+            qod_server (QodServer): the running server
+            server_records (list[dict]): the records of a device
+
+        Returns:
+        -------
+            None
+        """
+        code, body = request(qod_server, "/score", {"records": [*server_records, server_records[0]]})
+
+        assert code == HTTPStatus.OK
+        assert body == {"status": "success", "result": [{"rows": 3, "model": "WS1000"}]}
+
+    def test_score_file_success(
+        self, qod_server: QodServer, server_records: list[dict], tmp_path: pathlib.Path
+    ) -> None:
+        """Tests that a file reference is filtered to the device and the window of the date.
+
+        Args:
+        ----
+            qod_server (QodServer): the running server
+            server_records (list[dict]): the records of a device
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        day_df: pd.DataFrame = pd.concat([
+            pd.DataFrame(server_records).assign(device_id="device_a"),
+            pd.DataFrame(server_records[:1]).assign(device_id="device_b"),
+            pd.DataFrame(server_records[:1]).assign(device_id="device_a", utc_datetime="2023-10-29 12:00:00"),
+        ])
+        day_file: str = str(tmp_path / "2023_10_30.parquet")
+        day_df.to_parquet(day_file)
+
+        code, body = request(qod_server, "/score", {"file": day_file, "device_id": "device_a", "date": "2023-10-30"})
+
+        assert code == HTTPStatus.OK
+        assert body["result"][0]["rows"] == 3  # noqa: PLR2004
+
+    def test_score_file_outside_root_rejected(
+        self, qod_server: QodServer, server_records: list[dict], tmp_path_factory: pytest.TempPathFactory
+    ) -> None:
+        """Tests that files outside of the file root of the server are not read.
+
+        Args:
+        ----
+            qod_server (QodServer): the running server, reading files under its own temporary directory
+            server_records (list[dict]): the records of a device
+            tmp_path_factory (pytest.TempPathFactory): creates a directory outside of the file root
+
+        Returns:
+        -------
+            None
+        """
+        day_file: str = str(tmp_path_factory.mktemp("outside") / "2023_10_30.parquet")
+        pd.DataFrame(server_records).to_parquet(day_file)
+
+        assert request(qod_server, "/score", {"file": day_file})[0] == HTTPStatus.BAD_REQUEST
+        relative_file: str = f"../{day_file.split('/')[-2]}/2023_10_30.parquet"
+        assert request(qod_server, "/score", {"file": relative_file})[0] == HTTPStatus.BAD_REQUEST
+
+    def test_score_without_observations(self) -> None:
+        """Tests that a request without observations gets the NO_DATA result of its date, and only with a date.
+
+        Args:
+        ----
+            None
+
+        Returns:
+        -------
+            None
+        """
+        result_df: pd.DataFrame = ScoringRequest.score({"records": [], "date": "2023-10-30"}, ObcSqcCheck.run)
+
+        assert len(result_df) == 24  # noqa: PLR2004
+        assert (result_df["qod_score"] == 0).all()
+        with pytest.raises(ValueError, match="date to score"):
+            ScoringRequest.score({"records": []}, ObcSqcCheck.run)
+
+    def test_bad_requests_rejected(self, qod_server: QodServer, server_records: list[dict]) -> None:
+        """Tests that invalid payloads and unknown paths are rejected.
+
+        Args:
+        ----
+            qod_server (QodServer): the running server
+            server_records (list[dict]): the records of a device
+
+        Returns:
+        -------
+            None
+        """
+        assert request(qod_server, "/score", {"device_id": "device_a"})[0] == HTTPStatus.BAD_REQUEST
+        assert request(qod_server, "/score", {"records": [{"temperature": 10.0}]})[0] == HTTPStatus.BAD_REQUEST
+        assert request(qod_server, "/score", [server_records])[0] == HTTPStatus.BAD_REQUEST
+        assert request(qod_server, "/unknown", {"records": server_records})[0] == HTTPStatus.NOT_FOUND
+
+    def test_scoring_error_internal(self, qod_server: QodServer, server_records: list[dict]) -> None:
+        """Tests that a valid payload failing in the scoring function is answered with 500 rather than 400.
+
+        Args:
+        ----
+            qod_server (QodServer): the running server
+            server_records (list[dict]): the records of a device
+
+        Returns:
+        -------
+            None
+        """
+        failing_records: list[dict] = [{**record, "temperature": -150.0} for record in server_records]
+
+        code, body = request(qod_server, "/score", {"records": failing_records})
+
+        assert code == HTTPStatus.INTERNAL_SERVER_ERROR
+        assert "Temperature out of the scoring range" in body["exception"]
+
+    def test_body_too_large_rejected(self, qod_server: QodServer) -> None:
+        """Tests that a request announcing a body larger than max_body_bytes is refused before the body is sent.
+
+        Args:
+        ----
+            qod_server (QodServer): the running server
+
+        Returns:
+        -------
+            None
+        """
+        connection: http.client.HTTPConnection = http.client.HTTPConnection("127.0.0.1", qod_server.port, timeout=30)
+        try:
+            connection.putrequest("POST", "/score")
+            connection.putheader("Content-Length", str(qod_server.max_body_bytes + 1))
+            connection.endheaders()
+            response: http.client.HTTPResponse = connection.getresponse()
+
+            assert response.status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+            assert json.loads(response.read())["status"] == "failure"
+        finally:
+            connection.close()
+
+    def test_request_timeout(self, qod_server: QodServer, server_records: list[dict]) -> None:
+        """Tests that a request running longer than request_timeout is answered with 504.
+
+        Args:
+        ----
+            qod_server (QodServer): the running server
+            server_records (list[dict]): the records of a device
+
+        Returns:
+        -------
+            None
+        """
+        slow_records: list[dict] = [{**record, "temperature": 150.0} for record in server_records]
+
+        code, body = request(qod_server, "/score", {"records": slow_records})
+
+        assert code == HTTPStatus.GATEWAY_TIMEOUT
+        assert body["status"] == "failure"
+
+    def test_request_timeout_frees_worker(self, qod_server: QodServer, server_records: list[dict]) -> None:
+        """Tests that a timed out request is counted until its worker aborts it, and the worker then serves again.
+
+        Args:
+        ----
+            qod_server (QodServer): the running server, with a single worker
+            server_records (list[dict]): the records of a device
+
+        Returns:
+        -------
+            None
+        """
+        slow_records: list[dict] = [{**record, "temperature": 150.0} for record in server_records]
+
+        assert request(qod_server, "/score", {"records": slow_records})[0] == HTTPStatus.GATEWAY_TIMEOUT
+        with qod_server._in_flight_changed:
+            assert qod_server._in_flight_changed.wait_for(lambda: qod_server.in_flight == 0, 3.0)
+
+        assert request(qod_server, "/score", {"records": server_records})[0] == HTTPStatus.OK
+
+    def test_drain_rejects_new_requests(self, qod_server: QodServer, server_records: list[dict]) -> None:
+        """Tests that a draining server reports it and refuses new requests.
+
+        Args:
+        ----
+            qod_server (QodServer): the running server
+            server_records (list[dict]): the records of a device
+
+        Returns:
+        -------
+            None
+        """
+        assert request(qod_server, "/health") == (200, {"status": "ok", "in_flight": 0})
+
+        qod_server.draining = True
+
+        assert request(qod_server, "/health")[0] == HTTPStatus.SERVICE_UNAVAILABLE
+        assert request(qod_server, "/score", {"records": server_records})[0] == HTTPStatus.SERVICE_UNAVAILABLE
@@ -0,0 +1,287 @@
+import os
+import pathlib
+import sys
+
+import pandas as pd
+import pytest
+
+from obc_sqc.iface import file_model_inference
+from obc_sqc.iface.sharding import Shard
+from obc_sqc.storage.grid_series import GridSeries
+from tests.obc_sqc.fixtures.sharding_fixtures_test import *  # noqa: F403
+
+
+class TestShard:
+    """Tests the stable split of the fleet into shards and the merge of their outputs."""
+
+    def test_shards_partition_devices(self) -> None:
+        """Tests that every device belongs to exactly one shard, the same one in every process.
+
+        Args:
+        ----
+            None
+
+        Returns:
+        -------
+            None
+        """
+        device_ids: list[str] = [f"synthetic-{i:06d}" for i in range(1000)]
+        shards: list[list[str]] = [Shard(index, 7).select(device_ids) for index in range(7)]
+
+        assert sorted(device_id for shard in shards for device_id in shard) == device_ids
+        assert all(100 < len(shard) < 190 for shard in shards)  # noqa: PLR2004
+
+        # Fixed values, as a salted hash would differ between processes
+        assert [Shard.of(device_id, 16) for device_id in device_ids[:3]] == [3, 12, 5]
+
+    @pytest.mark.parametrize(("index", "count"), [(0, 0), (-1, 4), (4, 4)])
+    def test_invalid_shard(self, index: int, count: int) -> None:
+        """Tests that a shard index outside of 0 to count - 1 is rejected.
+
+        Args:
+        ----
+            index (int): the index of the shard
+            count (int): the number of shards
+
+        Returns:
+        -------
+            None
+        """
+        with pytest.raises(ValueError, match="Invalid shard"):
+            Shard(index, count)
+
+    def test_read_day_parquet(self, shard_day_parquets: str) -> None:
+        """Tests that reading a day parquet for a shard returns exactly the rows of its devices.
+
+        Args:
+        ----
+            shard_day_parquets (str): the directory of the day parquets
+
+        Returns:
+        -------
+            None
+        """
+        path: str = os.path.join(shard_day_parquets, "2023_10_30.parquet")
+        day_df: pd.DataFrame = pd.read_parquet(path)
+
+        for index in range(2):
+            shard: Shard = Shard(index, 2)
+            shard_df: pd.DataFrame = shard.read_day_parquet(path, list(day_df.columns))
+            expected_df: pd.DataFrame = day_df[day_df["device_id"].isin(shard.select(day_df["device_id"].unique()))]
+
+            pd.testing.assert_frame_equal(shard_df, expected_df.reset_index(drop=True))
+
+    def test_split_run_matches_unsplit(
+        self, shard_day_parquets: str, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Tests that merging the outputs of a run split in shards gives the output of the unsplit run.
+
+        Args:
+        ----
+            shard_day_parquets (str): the directory of the day parquets
+            tmp_path (pathlib.Path): a temporary directory
+            monkeypatch (pytest.MonkeyPatch): sets the command line arguments
+
+        Returns:
+        -------
+            None
+        """
+        output_file_path: str = os.path.join(tmp_path, "result")
+        arguments: list[str] = [
+            "file_model_inference",
+            "--date",
+            "2023-10-30",
+            "--day1",
+            os.path.join(shard_day_parquets, "2023_10_29.parquet"),
+            "--day2",
+            os.path.join(shard_day_parquets, "2023_10_30.parquet"),
+            "--output_file_path",
+            output_file_path,
+        ]
+
+        monkeypatch.setattr(sys, "argv", arguments)
+        file_model_inference.main()
+        expected_df: pd.DataFrame = pd.read_parquet(f"{output_file_path}.parquet")
+        os.remove(f"{output_file_path}.parquet")
+
+        for index in range(2):
+            monkeypatch.setattr(sys, "argv", [*arguments, "--shard_index", str(index), "--shard_count", "2"])
+            file_model_inference.main()
+
+        assert Shard.merge(output_file_path, 2) == len(expected_df)
+
+        result_df: pd.DataFrame = pd.read_parquet(f"{output_file_path}.parquet")
+        assert sorted(result_df["device_id"].unique()) == sorted(expected_df["device_id"].unique())
+        pd.testing.assert_frame_equal(
+            result_df.sort_values(["device_id", "hour"]).reset_index(drop=True),
+            expected_df.sort_values(["device_id", "hour"]).reset_index(drop=True),
+        )
+
+    def test_split_run_dataset(
+        self, shard_day_parquets: str, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Tests that the shards of a split run add their results to a shared dataset without a merge.
+
+        Args:
+        ----
+            shard_day_parquets (str): the directory of the day parquets
+            tmp_path (pathlib.Path): a temporary directory
+            monkeypatch (pytest.MonkeyPatch): sets the command line arguments
+
+        Returns:
+        -------
+            None
+        """
+        output_file_path: str = os.path.join(tmp_path, "result")
+        arguments: list[str] = [
+            "file_model_inference",
+            "--date",
+            "2023-10-30",
+            "--day1",
+            os.path.join(shard_day_parquets, "2023_10_29.parquet"),
+            "--day2",
+            os.path.join(shard_day_parquets, "2023_10_30.parquet"),
+            "--output_file_path",
+            output_file_path,
+        ]
+
+        monkeypatch.setattr(sys, "argv", arguments)
+        file_model_inference.main()
+        expected_df: pd.DataFrame = pd.read_parquet(f"{output_file_path}.parquet")
+
+        dataset_root: str = os.path.join(tmp_path, "dataset")
+        arguments[-1] = dataset_root
+        for index in range(2):
+            monkeypatch.setattr(
+                sys,
+                "argv",
+                [*arguments, "--output_format", "dataset", "--shard_index", str(index), "--shard_count", "2"],
+            )
+            file_model_inference.main()
+
+        partition_dir: str = os.path.join(dataset_root, "date=2023-10-30", "model=WS2000")
+        assert len(os.listdir(partition_dir)) == 2  # noqa: PLR2004
+
+        # The dataset fills the model the results are partitioned by
+        result_df: pd.DataFrame = pd.read_parquet(dataset_root)
+        assert (result_df["model"] == "WS2000").all()
+        result_df["model"] = expected_df["model"].iloc[0]
+        pd.testing.assert_frame_equal(
+            result_df[expected_df.columns].sort_values(["device_id", "hour"]).reset_index(drop=True),
+            expected_df.sort_values(["device_id", "hour"]).reset_index(drop=True),
+        )
+
+    def test_grid_series_missing_device(
+        self, shard_day_parquets: str, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Tests that a device without a series on the day before is scored on the series it has, like in parquets.
+
+        Args:
+        ----
+            shard_day_parquets (str): the directory of the day parquets
+            tmp_path (pathlib.Path): a temporary directory
+            monkeypatch (pytest.MonkeyPatch): sets the command line arguments
+
+        Returns:
+        -------
+            None
+        """
+        day1_path: str = os.path.join(shard_day_parquets, "2023_10_29.parquet")
+        day1_df: pd.DataFrame = pd.read_parquet(day1_path).astype({"device_id": str})
+        device_id: str = str(day1_df["device_id"].iloc[0])
+        day1_df[day1_df["device_id"] != device_id].to_parquet(day1_path, index=False)
+
+        store: str = os.path.join(tmp_path, "store")
+        for day in ["2023_10_29", "2023_10_30"]:
+            GridSeries.convert_day_parquet(os.path.join(shard_day_parquets, f"{day}.parquet"), store, day)
+
+        def run(input_format: str, day_paths: list[str], output_file_path: str, *extra: str) -> pd.DataFrame:
+            monkeypatch.setattr(
+                sys,
+                "argv",
+                [
+                    "file_model_inference",
+                    "--date",
+                    "2023-10-30",
+                    "--day1",
+                    day_paths[0],
+                    "--day2",
+                    day_paths[1],
+                    "--input_format",
+                    input_format,
+                    "--output_file_path",
+                    output_file_path,
+                    *extra,
+                ],
+            )
+            file_model_inference.main()
+            return pd.read_parquet(f"{output_file_path}.parquet")
+
+        parquet_paths: list[str] = [day1_path, os.path.join(shard_day_parquets, "2023_10_30.parquet")]
+        series_paths: list[str] = [os.path.join(store, "2023_10_29"), os.path.join(store, "2023_10_30")]
+        device_arguments: list[str] = ["--device_id", device_id]
+
+        pd.testing.assert_frame_equal(
+            run("grid_series", series_paths, os.path.join(tmp_path, "series_device"), *device_arguments),
+            run("parquet", parquet_paths, os.path.join(tmp_path, "parquet_device"), *device_arguments),
+        )
+
+        fleet_df: pd.DataFrame = run("grid_series", series_paths, os.path.join(tmp_path, "series_fleet"))
+        assert (fleet_df.loc[fleet_df["device_id"] == device_id, "status"] == "success").all()
+        assert fleet_df["device_id"].nunique() == 3  # noqa: PLR2004
+
+    def test_device_dataset_rejected(
+        self, shard_day_parquets: str, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Tests that a single-device run refuses the dataset output, which only a run of every device writes.
+
+        Args:
+        ----
+            shard_day_parquets (str): the directory of the day parquets
+            tmp_path (pathlib.Path): a temporary directory
+            monkeypatch (pytest.MonkeyPatch): sets the command line arguments
+
+        Returns:
+        -------
+            None
+        """
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            [
+                "file_model_inference",
+                "--device_id",
+                "synthetic-000000",
+                "--date",
+                "2023-10-30",
+                "--day1",
+                os.path.join(shard_day_parquets, "2023_10_29.parquet"),
+                "--day2",
+                os.path.join(shard_day_parquets, "2023_10_30.parquet"),
+                "--output_file_path",
+                os.path.join(tmp_path, "dataset"),
+                "--output_format",
+                "dataset",
+            ],
+        )
+
+        with pytest.raises(SystemExit):
+            file_model_inference.main()
+        assert not os.path.exists(os.path.join(tmp_path, "dataset"))
+
+    def test_merge_missing_shard(self, tmp_path: pathlib.Path) -> None:
+        """Tests that merging fails when the output of a shard is missing.
+
+        Args:
+        ----
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        output_file_path: str = os.path.join(tmp_path, "result")
+        pd.DataFrame({"device_id": ["a"]}).to_parquet(f"{Shard(0, 2).path(output_file_path)}.parquet")
+
+        with pytest.raises(FileNotFoundError, match="shard-00001-of-00002"):
+            Shard.merge(output_file_path, 2)
@@ -0,0 +1,35 @@
+import os
+import pathlib
+
+import pandas as pd
+
+from obc_sqc.storage.shared_day import SharedDay
+from tests.obc_sqc.fixtures.shared_day_fixtures_test import *  # noqa: F403
+
+
+class TestSharedDay:
+    """Tests the devices read back from the IPC file of a shared day."""
+
+    def test_device_frames(self, interleaved_fleet_input: pd.DataFrame, tmp_path: pathlib.Path) -> None:
+        """Tests that every device reads back as its group of the input, in order and with its dtypes.
+
+        Args:
+        ----
+            interleaved_fleet_input (pd.DataFrame): the raw data of all devices, with interleaved rows
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        with SharedDay.write(interleaved_fleet_input, str(tmp_path)) as shared_day:
+            assert list(shared_day.devices.keys()) == list(interleaved_fleet_input["device_id"].dropna().unique())
+
+            for device_id, device_df in interleaved_fleet_input.groupby("device_id", sort=False):
+                pd.testing.assert_frame_equal(
+                    SharedDay.device_frame(shared_day.path, *shared_day.devices[device_id]),
+                    device_df.drop(columns=["device_id"]).reset_index(drop=True),
+                )
+
+        assert not os.path.exists(shared_day.path)
+        assert os.listdir(tmp_path) == []
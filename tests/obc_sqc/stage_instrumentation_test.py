@@ -0,0 +1,100 @@
+import tracemalloc
+
+import pandas as pd
+
+from obc_sqc.model.initial_params import InitialParams
+from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from obc_sqc.model.stage_instrumentation import StageInstrumentation
+from tests.obc_sqc.fixtures.stage_instrumentation_fixtures_test import *  # noqa: F403
+
+
+class TestStageInstrumentation:
+    """Tests the per-stage record of ObcSqcCheck.run."""
+
+    def test_records_every_stage(self, device_input: pd.DataFrame) -> None:
+        """Tests that every stage of every parameter is recorded, in order, without changing the result.
+
+        Args:
+        ----
+            device_input (pd.DataFrame): the input of a device
+
+        Returns:
+        -------
+            None
+        """
+        model: str = device_input["model"].iloc[0]
+        parameters: list[str] = InitialParams.picking_initial_parameters(model)[11]
+
+        stages: StageInstrumentation = StageInstrumentation()
+        result_df: pd.DataFrame = ObcSqcCheck.run(device_input, stages)
+        report: dict = stages.report()
+
+        pd.testing.assert_frame_equal(result_df, ObcSqcCheck.run(device_input))
+
+        recorded: list[tuple] = [(stage["stage"], stage["parameter"]) for stage in report["stages"]]
+        assert recorded[:4] == [
+            ("prepare_input", None),
+            ("time_normalisation", None),
+            ("obc_matrix", None),
+            ("filling_ignoring_period_matrix", None),
+        ]
+        assert recorded[-1] == ("daily_annotations", None)
+        assert [parameter for _, parameter in recorded[4:-1]] == sorted(
+            [parameter for _, parameter in recorded[4:-1]], key=parameters.index
+        )
+        assert ("obc_precipitation", "precipitation_accumulated") in recorded
+        assert ("constant_data_check", "precipitation_accumulated") not in recorded
+        assert (("hour_averaging", "temperature") in recorded) == (model == "WS1000")
+
+        for parameter in parameters:
+            assert ("minute_averaging", parameter) in recorded
+            assert ("error_codes_hourly", parameter) in recorded
+
+        for stage in report["stages"]:
+            assert stage["wall_time"] >= 0
+            assert stage["cpu_time"] >= 0
+            assert stage["peak_bytes"] is None
+            assert stage["rows_in"] > 0
+            assert stage["rows_out"] > 0
+
+        assert report["stages"][0]["rows_out"] == len(device_input)
+        assert report["stages"][-1]["rows_out"] == 24  # noqa: PLR2004
+        assert report["wall_time"] == sum(stage["wall_time"] for stage in report["stages"])
+        assert report["peak_bytes"] is None
+
+    def test_disabled_records_nothing(self, device_input: pd.DataFrame) -> None:
+        """Tests that a disabled instrumentation neither records the stages nor traces allocations.
+
+        Args:
+        ----
+            device_input (pd.DataFrame): the input of a device
+
+        Returns:
+        -------
+            None
+        """
+        with StageInstrumentation(enabled=False) as stages:
+            ObcSqcCheck.run(device_input, stages)
+
+        assert stages.report() == {"wall_time": 0, "cpu_time": 0, "peak_bytes": None, "stages": []}
+
+    def test_traced_memory(self, ws2000_input: pd.DataFrame) -> None:
+        """Tests that the peak allocations of every stage are recorded within a with block, and only there.
+
+        Args:
+        ----
+            ws2000_input (pd.DataFrame): the input of a WS2000 device
+
+        Returns:
+        -------
+            None
+        """
+        with StageInstrumentation() as stages:
+            ObcSqcCheck.run(ws2000_input, stages)
+            assert tracemalloc.is_tracing()
+        report: dict = stages.report()
+
+        assert not tracemalloc.is_tracing()
+        assert all(stage["peak_bytes"] >= 0 for stage in report["stages"])
+        assert report["peak_bytes"] == max(stage["peak_bytes"] for stage in report["stages"])
+        assert report["peak_bytes"] > 0
@@ -0,0 +1,133 @@
+import json
+import os
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from obc_sqc.model.initial_params import InitialParams
+from obc_sqc.model.obc_sqc_driver import ObcSqcCheck
+from obc_sqc.schema.schema import SchemaDefinitions
+from obc_sqc.synthetic.station_data_generator import FaultRates, StationDataGenerator
+from tests.obc_sqc.fixtures.station_data_generator_fixtures_test import *  # noqa: F403
+
+
+class TestStationDataGenerator:
+    """Tests the layout, the continuity and the faults of the synthetic station data."""
+
+    def test_clean_day_layout(self, clean_fleet: StationDataGenerator) -> None:
+        """Tests that a clean day has a full grid per device, in the layout of the day parquets and within limits.
+
+        Args:
+        ----
+            clean_fleet (StationDataGenerator): a generator without faults
+
+        Returns:
+        -------
+            None
+        """
+        day_df: pd.DataFrame = clean_fleet.generate_day("2023-10-30")
+
+        assert day_df.columns.tolist() == ["device_id", *SchemaDefinitions.qod_input_schema().keys()]
+        assert not day_df.isna().any().any()
+        assert day_df["utc_datetime"].dt.date.astype(str).unique().tolist() == ["2023-10-30"]
+
+        for (_device_id, model), device_df in day_df.groupby(["device_id", "model"], observed=True):
+            params: tuple = InitialParams.picking_initial_parameters(model)
+            assert len(device_df) == 86400 // params[5]
+            assert (device_df["utc_datetime"].diff().dropna() == pd.Timedelta(seconds=params[5])).all()
+
+            # The limits of precipitation apply to its increase between consecutive slots
+            increase: pd.Series = device_df["precipitation_accumulated"].diff().dropna()
+            for i, parameter in enumerate(params[11]):
+                values: pd.Series = increase if parameter == "precipitation_accumulated" else device_df[parameter]
+                assert values.between(params[19][0][i], params[19][1][i]).all(), parameter
+
+    def test_row_faults(self) -> None:
+        """Tests that gaps, duplicates and jitter change the rows as configured.
+
+        Args:
+        ----
+            None
+
+        Returns:
+        -------
+            None
+        """
+        faults: FaultRates = FaultRates(gap_rate=0.2, duplicate_rate=0.1, jitter=5)
+        generator: StationDataGenerator = StationDataGenerator(4, ws2000_share=0.0, faults=faults, seed=1)
+        day_df: pd.DataFrame = generator.generate_day("2023-10-30")
+
+        unique_df: pd.DataFrame = day_df.drop_duplicates()
+        offsets: pd.Series = (unique_df["utc_datetime"] - pd.Timestamp("2023-10-30")).dt.total_seconds() % 16
+        offsets = np.minimum(offsets, 16 - offsets)
+
+        assert len(unique_df) == pytest.approx(4 * 5400 * 0.8, rel=0.02)
+        assert len(day_df) - len(unique_df) == pytest.approx(len(unique_df) * 0.1, rel=0.1)
+        assert offsets.max() == 5  # noqa: PLR2004
+        assert (offsets > 0).mean() > 0.5  # noqa: PLR2004
+
+    def test_write_days_continuity(self, clean_fleet: StationDataGenerator, tmp_path: pathlib.Path) -> None:
+        """Tests that consecutive days are written as day parquets and join without jumps.
+
+        Args:
+        ----
+            clean_fleet (StationDataGenerator): a generator without faults
+            tmp_path (pathlib.Path): a temporary directory
+
+        Returns:
+        -------
+            None
+        """
+        paths: list[str] = clean_fleet.write_days("2023-10-29", "2023-10-30", str(tmp_path), chunk_size=4)
+
+        assert [os.path.basename(path) for path in paths] == ["2023_10_29.parquet", "2023_10_30.parquet"]
+
+        days_df: pd.DataFrame = pd.concat([pd.read_parquet(path) for path in paths]).astype({"device_id": str})
+        for _, device_df in days_df.sort_values("utc_datetime").groupby("device_id"):
+            assert device_df["precipitation_accumulated"].is_monotonic_increasing
+            assert device_df["pressure"].diff().abs().max() < 0.8  # noqa: PLR2004
+
+    @pytest.mark.parametrize(
+        "faults, expected",
+        [
+            (FaultRates(), {}),
+            (FaultRates(obc_rate=0.01), {"temperature": "OBC", "precipitation_accumulated": "OBC"}),
+            (FaultRates(short_constant_rate=1.0), {"pressure": "SHORT_CONST", "humidity": "SHORT_CONST"}),
+            (FaultRates(frozen_wind_rate=1.0), {"wind_speed": "FROZEN_SENSOR", "wind_direction": "FROZEN_SENSOR"}),
+        ],
+    )
+    def test_faults_annotated(self, faults: FaultRates, expected: dict[str, str]) -> None:
+        """Tests that the injected faults raise the annotations they map to, and clean data raise none.
+
+        Args:
+        ----
+            faults (FaultRates): the injected faults
+            expected (dict[str, str]): an annotation expected in the daily annotation of a parameter
+
+        Returns:
+        -------
+            None
+        """
+        generator: StationDataGenerator = StationDataGenerator(1, ws2000_share=1.0, faults=faults, seed=1)
+        days_df: pd.DataFrame = pd.concat([generator.generate_day("2023-10-29"), generator.generate_day("2023-10-30")])
+        device_df: pd.DataFrame = (
+            days_df[days_df["utc_datetime"] >= pd.Timestamp("2023-10-29 18:00:00")]
+            .drop(columns=["device_id"])
+            .astype(SchemaDefinitions.qod_input_schema())
+            .drop_duplicates()
+            .reset_index(drop=True)
+        )
+
+        result_df: pd.DataFrame = ObcSqcCheck.run(device_df)
+
+        annotations: dict[str, list[str]] = {
+            parameter: [fault for fault, _ in json.loads(result_df[f"daily_{parameter}_annotation"].iloc[0])]
+            for parameter in SchemaDefinitions.weather_data_columns()
+        }
+        if not expected:
+            assert all(not faults for faults in annotations.values())
+            assert result_df["qod_score"].iloc[0] == 1
+        for parameter, fault in expected.items():
+            assert fault in annotations[parameter]
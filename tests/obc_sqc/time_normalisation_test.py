@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from obc_sqc.model.time_normalisation import TimeNormalisation
+from tests.obc_sqc.fixtures.time_normalisation_fixtures_test import *  # noqa: F403
+
+
+class TestTimeNormalisation:
+    """Tests the time_normalisation_dataframe() function in multiple scenarios."""
+
+    def test_jittered_return_success(self, jittered_ws1000_df: pd.DataFrame) -> None:
+        """Tests that observations are snapped to their nearest slot and collisions are resolved.
+
+        Args:
+        ----
+            jittered_ws1000_df (pd.DataFrame): the dataframe containing the raw data
+
+        Returns:
+        -------
+            None
+        """
+        result: pd.DataFrame = TimeNormalisation.time_normalisation_dataframe(jittered_ws1000_df, 16, 8)
+
+        target_utc_datetime: pd.DatetimeIndex = pd.date_range("2023-10-30 00:00:00", periods=6, freq="16s")
+        target_temperature: np.ndarray = np.array([10.0, 10.1, 10.2, np.nan, np.nan, 10.5])
+
+        assert result["utc_datetime"].tolist() == target_utc_datetime.tolist()
+        np.testing.assert_array_equal(result["temperature"].to_numpy(), target_temperature)
+        assert result["humidity"].isna().sum() == 2  # noqa: PLR2004
+        assert (result["model"] == "WS1000").all()
+
+    def test_gridded_return_unchanged(self, gridded_ws1000_df: pd.DataFrame) -> None:
+        """Tests that data already on the grid is returned unchanged.
+
+        Args:
+        ----
+            gridded_ws1000_df (pd.DataFrame): the dataframe containing the raw data
+
+        Returns:
+        -------
+            None
+        """
+        result: pd.DataFrame = TimeNormalisation.time_normalisation_dataframe(gridded_ws1000_df, 16, 8)
+
+        pd.testing.assert_frame_equal(result, gridded_ws1000_df)
+
+    def test_out_of_tolerance_dropped(self, jittered_ws1000_df: pd.DataFrame) -> None:
+        """Tests that observations further than time_tolerance from their slot are dropped.
+
+        Args:
+        ----
+            jittered_ws1000_df (pd.DataFrame): the dataframe containing the raw data
+
+        Returns:
+        -------
+            None
+        """
+        result: pd.DataFrame = TimeNormalisation.time_normalisation_dataframe(jittered_ws1000_df, 16, 3)
+
+        # slot 1 only has observations 4 seconds away from it
+        target_temperature: np.ndarray = np.array([10.0, np.nan, 10.2, np.nan, np.nan, 10.5])
+
+        np.testing.assert_array_equal(result["temperature"].to_numpy(), target_temperature)
+
+    def test_start_end_return_padded(self, gridded_ws1000_df: pd.DataFrame) -> None:
+        """Tests that the grid is extended to the given start and end.
+
+        Args:
+        ----
+            gridded_ws1000_df (pd.DataFrame): the dataframe containing the raw data
+
+        Returns:
+        -------
+            None
+        """
+        start: pd.Timestamp = pd.Timestamp("2023-10-29 23:59:28")
+        end: pd.Timestamp = pd.Timestamp("2023-10-30 00:01:59")
+
+        result: pd.DataFrame = TimeNormalisation.time_normalisation_dataframe(gridded_ws1000_df, 16, 8, start, end)
+
+        assert len(result) == 10  # noqa: PLR2004
+        assert result["utc_datetime"].iloc[0] == start
+        assert result["utc_datetime"].iloc[-1] == pd.Timestamp("2023-10-30 00:01:52")
+        assert result["temperature"].isna().sum() == 6  # noqa: PLR2004
+        assert (result["model"] == "WS1000").all()